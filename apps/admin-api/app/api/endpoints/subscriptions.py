@@ -8,6 +8,7 @@ from typing import Optional, List
 from datetime import datetime, timedelta
 from app.core.admin_auth import get_current_admin, log_admin_action
 from app.core.database import get_supabase_client, first_row
+from app.core.user_cache import invalidate_entitlements, invalidate_user_cache
 
 router = APIRouter(prefix="/subscriptions", tags=["Subscription Management"])
 
@@ -257,6 +258,7 @@ async def cancel_subscription(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Subscription not found",
         )
+    invalidate_entitlements(result.data[0]["user_id"])
 
     # Log admin action
     await log_admin_action(
@@ -321,6 +323,8 @@ async def grant_subscription(
 
     # Update user's plan (DB column: plan)
     supabase.table("users").update({"plan": plan_id}).eq("id", user_id).execute()
+    invalidate_user_cache(user_id)
+    invalidate_entitlements(user_id)
 
     # Log admin action
     await log_admin_action(
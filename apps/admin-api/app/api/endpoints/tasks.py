@@ -152,6 +152,7 @@ BEAT_SCHEDULE_ENTRIES = [
     {"name": "generate-weekly-recaps", "task": "generate_weekly_recaps", "schedule_human": "Mondays 8:00 UTC"},
     {"name": "precreate-daily-checkins", "task": "precreate_daily_checkins", "schedule_human": "Every hour"},
     {"name": "mark-missed-checkins", "task": "mark_missed_checkins", "schedule_human": "Every hour"},
+    {"name": "pregenerate-ai-motivations", "task": "pregenerate_ai_motivations", "schedule_human": "Every 5 minutes"},
     {"name": "send-scheduled-ai-motivations", "task": "send_scheduled_ai_motivations", "schedule_human": "Every minute"},
     {"name": "send-morning-motivations", "task": "send_morning_motivations", "schedule_human": "Every minute"},
     {"name": "send-checkin-prompts", "task": "send_checkin_prompts", "schedule_human": "Every minute"},
@@ -160,7 +161,6 @@ BEAT_SCHEDULE_ENTRIES = [
     {"name": "notify-inactive-partners", "task": "notify_inactive_partners", "schedule_human": "Daily 3:00 UTC"},
     {"name": "reset-missed-streaks", "task": "reset_missed_streaks", "schedule_human": "Every hour"},
     {"name": "reset-weekly-completions", "task": "reset_weekly_completions", "schedule_human": "Monday 0:00 UTC"},
-    {"name": "refresh-analytics-views", "task": "refresh_analytics_views", "schedule_human": "Every hour"},
     {"name": "prewarm-analytics-cache", "task": "prewarm_analytics_cache_task", "schedule_human": "Every 8h (0, 8, 16 UTC)"},
     {"name": "check-expiring-subscriptions", "task": "check_expiring_subscriptions", "schedule_human": "Daily 3:00 UTC"},
     {"name": "process-failed-webhook-events", "task": "process_failed_webhook_events", "schedule_human": "Every 5 minutes"},
@@ -177,6 +177,11 @@ BEAT_SCHEDULE_ENTRIES = [
     {"name": "check-missed-days-intervention", "task": "check_missed_days_intervention", "schedule_human": "Daily 10:00 UTC"},
     {"name": "check-approaching-milestone", "task": "check_approaching_milestone", "schedule_human": "Daily 9:00 UTC"},
     {"name": "cleanup-task-audit-log", "task": "cleanup_task_audit_log", "schedule_human": "Sunday 4:00 UTC"},
+    {"name": "flush-r2-deletions", "task": "flush_r2_deletions", "schedule_human": "Every minute"},
+    {"name": "sweep-orphaned-media-objects", "task": "sweep_orphaned_media_objects", "schedule_human": "Every hour (:15)"},
+    {"name": "sweep-voice-note-uploads", "task": "sweep_voice_note_uploads", "schedule_human": "Every hour (:45)"},
+    {"name": "refresh-partner-match-vectors", "task": "refresh_partner_match_vectors", "schedule_human": "Every minute"},
+    {"name": "requeue-partner-match-vectors", "task": "requeue_partner_match_vectors", "schedule_human": "Sunday 5:00 UTC"},
 ]
 
 
@@ -8,6 +8,7 @@ from typing import Optional, List
 from datetime import datetime
 from app.core.admin_auth import get_current_admin, log_admin_action
 from app.core.database import get_supabase_client, first_row
+from app.core.user_cache import invalidate_user_cache
 
 router = APIRouter(prefix="/users", tags=["User Management"])
 
@@ -351,6 +352,9 @@ async def update_user(
             detail="User not found",
         )
 
+    # Suspension / role changes must reach the API's auth cache promptly
+    invalidate_user_cache(user_id)
+
     # Log admin action
     await log_admin_action(
         admin_user_id=current_admin["id"],
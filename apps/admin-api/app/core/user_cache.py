@@ -0,0 +1,55 @@
+"""
+Invalidation of the main API's authenticated-user cache.
+
+The main API caches the user row resolved on every authenticated request
+(apps/api/app/core/user_cache.py): a Redis entry shared by all workers plus a
+short-lived in-process copy. Deleting the Redis key here makes status/role/plan
+changes made from the admin portal (e.g. suspending a user) take effect within
+the API's local cache TTL (a few seconds).
+
+The API also caches each user's effective plan for feature gates
+(apps/api/app/core/entitlements.py); invalidate_entitlements clears it after
+subscription grants and cancellations.
+"""
+
+import logging
+from typing import Optional
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Must match AUTH_USER_CACHE_PREFIX / ENTITLEMENTS_CACHE_PREFIX in the main API
+AUTH_USER_CACHE_PREFIX = "auth:user"
+ENTITLEMENTS_CACHE_PREFIX = "entitlements:plan"
+
+_redis_client: Optional[redis.Redis] = None
+
+
+def _get_redis() -> Optional[redis.Redis]:
+    global _redis_client
+    if _redis_client is None and settings.redis_connection_url:
+        _redis_client = redis.from_url(settings.redis_connection_url)
+    return _redis_client
+
+
+def invalidate_user_cache(user_id: str) -> None:
+    """Drop a user from the main API's auth cache (best effort)."""
+    try:
+        client = _get_redis()
+        if client:
+            client.delete(f"{AUTH_USER_CACHE_PREFIX}:{user_id}")
+    except Exception as e:
+        logger.warning(f"Failed to invalidate auth user cache for {user_id}: {e}")
+
+
+def invalidate_entitlements(user_id: str) -> None:
+    """Drop a user's cached effective plan in the main API (best effort)."""
+    try:
+        client = _get_redis()
+        if client:
+            client.delete(f"{ENTITLEMENTS_CACHE_PREFIX}:{user_id}")
+    except Exception as e:
+        logger.warning(f"Failed to invalidate entitlements cache for {user_id}: {e}")
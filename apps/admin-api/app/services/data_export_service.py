@@ -96,7 +96,7 @@ def run_generate_user_data_export(user_id: str, email: str, export_id: str) -> b
         )
         user_data["weekly_recaps"] = recaps_result.data or []
 
-        # 10. AI Coach conversations
+        # 10. AI Coach conversations and their messages
         conversations_result = (
             supabase.table("ai_coach_conversations")
             .select("*")
@@ -104,6 +104,15 @@ def run_generate_user_data_export(user_id: str, email: str, export_id: str) -> b
             .execute()
         )
         user_data["ai_coach_conversations"] = conversations_result.data or []
+        ai_messages_result = (
+            supabase.table("ai_coach_messages")
+            .select("*")
+            .eq("user_id", user_id)
+            .order("conversation_id")
+            .order("seq")
+            .execute()
+        )
+        user_data["ai_coach_messages"] = ai_messages_result.data or []
 
         # 11. Social nudges
         nudges_sent_result = (
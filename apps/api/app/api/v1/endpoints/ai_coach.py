@@ -4,12 +4,12 @@ AI Coach Chat API Endpoints
 Provides async (background) chat with AI coach for personalized habit guidance.
 Premium feature with daily message limits for rate control.
 Uses Celery task; user sees message immediately, response via realtime when ready.
-When AI_COACH_STREAM_VIA_REDIS enabled, SSE endpoint streams via Redis pub/sub.
+When AI_COACH_STREAM_VIA_REDIS enabled, SSE endpoint streams via Redis pub/sub
+(one multiplexed async subscriber per worker, see ai_coach_stream_service).
 """
 
 import asyncio
 import json
-import threading
 import time
 from typing import Optional, List
 
@@ -21,9 +21,8 @@ from datetime import datetime, date, timedelta
 from app.core.config import settings
 from app.core.flexible_auth import get_current_user
 from app.core.database import get_supabase_client
-from app.core.cache import get_redis_client
 from app.services.ai_coach_service import get_ai_coach_service
-from app.services.ai_coach_stream_service import check_done
+from app.services.ai_coach_stream_service import get_stream_hub
 from app.services.subscription_service import has_user_feature
 from app.services.logger import logger
 
@@ -84,6 +83,7 @@ class MessageItem(BaseModel):
 
     message_id: Optional[str] = None
     request_id: Optional[str] = None
+    seq: Optional[int] = None  # Position in the conversation; pass as before_seq to page back
     role: str  # 'user' or 'assistant'
     content: str
     created_at: Optional[str]
@@ -308,8 +308,10 @@ async def stream_ai_response(
     if not has_access:
         raise HTTPException(status_code=403, detail=reason)
 
+    hub = get_stream_hub()
+
     # Check if response already complete (late-connecting SSE or Redis done key)
-    done_content = check_done(request_id)
+    done_content = await hub.get_done(request_id) if hub else None
     if done_content is not None:
         # Yield done event and close
         async def already_done():
@@ -329,104 +331,59 @@ async def stream_ai_response(
     # Check DB for completed response (conversation_id optional; Redis done may have expired)
     if conversation_id:
         service = get_ai_coach_service()
-        conv = await service.get_conversation_history(
-            user_id, conversation_id=conversation_id, limit=50, offset=0
-        )
-        if conv and conv.get("messages"):
-            for msg in conv["messages"]:
-                if (
-                    msg.get("role") == "assistant"
-                    and msg.get("request_id") == request_id
-                    and msg.get("status") == "completed"
-                ):
-                    content = msg.get("content") or ""
-
-                    async def db_done():
-                        yield f"data: {json.dumps({'type': 'meta', 'source': 'redis'})}\n\n"
-                        yield f"data: {json.dumps({'type': 'done', 'content': content})}\n\n"
-
-                    return StreamingResponse(
-                        db_done(),
-                        media_type="text/event-stream",
-                        headers={
-                            "Cache-Control": "no-cache",
-                            "Connection": "keep-alive",
-                            "X-Accel-Buffering": "no",
-                        },
-                    )
+        msg = await service.get_request_response(user_id, conversation_id, request_id)
+        if msg and msg.get("status") == "completed":
+            content = msg.get("content") or ""
+
+            async def db_done():
+                yield f"data: {json.dumps({'type': 'meta', 'source': 'redis'})}\n\n"
+                yield f"data: {json.dumps({'type': 'done', 'content': content})}\n\n"
+
+            return StreamingResponse(
+                db_done(),
+                media_type="text/event-stream",
+                headers={
+                    "Cache-Control": "no-cache",
+                    "Connection": "keep-alive",
+                    "X-Accel-Buffering": "no",
+                },
+            )
 
     # Subscribe to Redis and stream
-    redis = get_redis_client()
-    if not redis or not hasattr(redis, "pubsub"):
+    if hub is None:
         raise HTTPException(
             status_code=503,
             detail="Redis not available for streaming.",
         )
 
-    from app.services.ai_coach_stream_service import channel_for_request
-
-    channel = channel_for_request(request_id)
-    queue: asyncio.Queue = asyncio.Queue()
-    done_event = threading.Event()
-    loop = asyncio.get_running_loop()
-
-    def redis_listener():
-        try:
-            pubsub = redis.pubsub()
-            pubsub.subscribe(channel)
-            while not done_event.is_set():
-                msg = pubsub.get_message(timeout=1.0)
-                if msg and msg["type"] == "message":
-                    try:
-                        data = msg["data"]
-                        if isinstance(data, bytes):
-                            data = data.decode("utf-8")
-                        payload = json.loads(data)
-                        loop.call_soon_threadsafe(queue.put_nowait, payload)
-                        if payload.get("type") in ("done", "error"):
-                            break
-                    except Exception:
-                        pass
-            pubsub.unsubscribe(channel)
-            pubsub.close()
-        except Exception as e:
-            logger.warning(f"[AI Coach SSE] Redis listener error: {e}")
-            try:
-                loop.call_soon_threadsafe(
-                    queue.put_nowait, {"type": "error", "message": str(e)}
-                )
-            except Exception:
-                pass
-        finally:
-            done_event.set()
+    heartbeat_secs = settings.AI_COACH_SSE_HEARTBEAT_SECONDS
 
     async def event_generator():
+        # First event: tell client this stream is from Redis
+        yield f"data: {json.dumps({'type': 'meta', 'source': 'redis'})}\n\n"
         try:
-            # First event: tell client this stream is from Redis
-            yield f"data: {json.dumps({'type': 'meta', 'source': 'redis'})}\n\n"
-
-            listener_thread = threading.Thread(target=redis_listener)
-            listener_thread.daemon = True
-            listener_thread.start()
-
-            timeout_secs = 120
-            started = time.monotonic()
-            while True:
-                try:
+            # Leaving the context (done, timeout or client disconnect) unsubscribes
+            async with hub.subscribe(request_id) as queue:
+                timeout_secs = 120
+                started = time.monotonic()
+                while True:
                     remaining = timeout_secs - (time.monotonic() - started)
                     if remaining <= 0:
                         break
-                    event = await asyncio.wait_for(
-                        queue.get(), timeout=min(1.0, remaining)
-                    )
-                    payload = json.dumps(event)
-                    yield f"data: {payload}\n\n"
+                    try:
+                        event = await asyncio.wait_for(
+                            queue.get(), timeout=min(heartbeat_secs, remaining)
+                        )
+                    except asyncio.TimeoutError:
+                        # SSE comment: keeps proxies from closing an idle stream
+                        yield ": keepalive\n\n"
+                        continue
+                    yield f"data: {json.dumps(event)}\n\n"
                     if event.get("type") in ("done", "error"):
                         break
-                except asyncio.TimeoutError:
-                    continue
-        finally:
-            done_event.set()
+        except Exception as e:
+            logger.warning(f"[AI Coach SSE] Redis subscribe error: {e}")
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
 
     return StreamingResponse(
         event_generator(),
@@ -482,6 +439,11 @@ async def get_current_conversation(
     message_offset: int = Query(
         0, ge=0, description="Offset from most recent messages"
     ),
+    before_seq: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Return messages older than this seq (keyset; overrides message_offset)",
+    ),
     goal_id: Optional[str] = Query(
         None,
         description="When set, return the persistent goal-specific thread (or null if none yet).",
@@ -505,7 +467,11 @@ async def get_current_conversation(
 
     service = get_ai_coach_service()
     conversation = await service.get_conversation_history(
-        user_id, goal_id=goal_id, limit=message_limit, offset=message_offset
+        user_id,
+        goal_id=goal_id,
+        limit=message_limit,
+        offset=message_offset,
+        before_seq=before_seq,
     )
 
     if not conversation:
@@ -518,6 +484,7 @@ async def get_current_conversation(
             MessageItem(
                 message_id=msg.get("message_id"),
                 request_id=msg.get("request_id"),
+                seq=msg.get("seq"),
                 role=msg.get("role", "user"),
                 content=msg.get("content", ""),
                 created_at=msg.get("created_at"),
@@ -540,6 +507,11 @@ async def get_conversation(
     message_offset: int = Query(
         0, ge=0, description="Offset from most recent messages"
     ),
+    before_seq: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Return messages older than this seq (keyset; overrides message_offset)",
+    ),
     current_user: dict = Depends(get_current_user),
 ):
     """
@@ -547,6 +519,7 @@ async def get_conversation(
 
     Messages are returned in chronological order (oldest first).
     Pagination works from the END (most recent first):
+    - before_seq=<seq of the oldest message you have>: Returns the page before it
     - offset=0, limit=50: Returns the 50 most recent messages
     - offset=50, limit=50: Returns older messages (51-100 from the end)
 
@@ -561,7 +534,11 @@ async def get_conversation(
 
     service = get_ai_coach_service()
     conversation = await service.get_conversation_history(
-        user_id, conversation_id, limit=message_limit, offset=message_offset
+        user_id,
+        conversation_id,
+        limit=message_limit,
+        offset=message_offset,
+        before_seq=before_seq,
     )
 
     if not conversation:
@@ -574,6 +551,7 @@ async def get_conversation(
             MessageItem(
                 message_id=msg.get("message_id"),
                 request_id=msg.get("request_id"),
+                seq=msg.get("seq"),
                 role=msg.get("role", "user"),
                 content=msg.get("content", ""),
                 created_at=msg.get("created_at"),
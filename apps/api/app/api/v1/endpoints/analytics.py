@@ -327,7 +327,8 @@ async def get_analytics_cache_status(
             "message": "Redis not configured",
         }
 
-    # Keys are analytics:dashboard:{user_id}:{goal_id}:{days}:{end_date}
+    # Keys are analytics:dashboard:{user_id}:{goal_id}:g{generation}:{days}:{end_date}
+    # (includes entries from invalidated generations until they expire)
     pattern = f"analytics:dashboard:{user_id}:*"
     cached_count = 0
     try:
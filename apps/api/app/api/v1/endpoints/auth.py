@@ -18,6 +18,7 @@ from app.core.auth import (
 from app.core.database import get_supabase_client
 from app.core.config import settings
 from app.core.flexible_auth import get_current_user
+from app.core.user_cache import invalidate_user_cache
 from datetime import timedelta, datetime, timezone
 from app.services.email_service import email_service
 from app.services.logger import logger
@@ -789,6 +790,7 @@ async def google_oauth(oauth_data: GoogleOAuth, request: Request):
                 "id", user["id"]
             ).execute()
             user["email_verified"] = True
+            invalidate_user_cache(user["id"])
 
         # Keep profile picture up to date if we have one
         if picture and not user.get("profile_picture_url"):
@@ -796,6 +798,7 @@ async def google_oauth(oauth_data: GoogleOAuth, request: Request):
                 "id", user["id"]
             ).execute()
             user["profile_picture_url"] = picture
+            invalidate_user_cache(user["id"])
 
     upsert_oauth_account(
         user_id=user["id"],
@@ -968,6 +971,7 @@ async def apple_oauth(oauth_data: AppleOAuth, request: Request):
                 "id", user["id"]
             ).execute()
             user["email_verified"] = True
+            invalidate_user_cache(user["id"])
 
     upsert_oauth_account(
         user_id=user["id"],
@@ -1285,6 +1289,7 @@ async def verify_email(
 
     # Mark user email as verified
     supabase.table("users").update({"email_verified": True}).eq("id", user_id).execute()
+    invalidate_user_cache(user_id)
 
     # Get updated user data
     updated_user = await get_user_by_id(user_id)
@@ -1610,6 +1615,7 @@ async def reset_password(reset_data: PasswordResetConfirm):
     supabase.table("users").update({"password_hash": new_password_hash}).eq(
         "id", user_id
     ).execute()
+    invalidate_user_cache(user_id)  # has_password may change
 
     # Mark token as used
     supabase.table("password_reset_tokens").update({"used": True}).eq(
@@ -1928,6 +1934,7 @@ async def set_password(
     supabase.table("users").update({"password_hash": new_password_hash}).eq(
         "id", user_id
     ).execute()
+    invalidate_user_cache(user_id)  # has_password may change
 
     logger.info(f"Password set for OAuth user {user_id}")
 
@@ -34,7 +34,7 @@ router = APIRouter(redirect_slashes=False)
 CHECKIN_SELECT_COLUMNS = (
     "id, goal_id, user_id, check_in_date, status, mood, skip_reason, note, "
     "ai_response, created_at, updated_at, voice_note_url, voice_note_transcript, "
-    "voice_note_sentiment, voice_note_duration"
+    "voice_note_sentiment, voice_note_duration, voice_note_status"
 )
 
 
@@ -105,6 +105,8 @@ class CheckInResponse(BaseModel):
     voice_note_transcript: Optional[str] = None
     voice_note_sentiment: Optional[dict] = None
     voice_note_duration: Optional[int] = None
+    # 'processing' while a direct upload is in the pipeline, then 'ready' / 'failed'
+    voice_note_status: Optional[str] = None
 
     model_config = {"from_attributes": True}
 
@@ -541,9 +543,9 @@ async def get_check_ins(
     offset: int = Query(0, ge=0),
 ):
     """Get user's check-ins with optional filtering."""
-    from app.core.database import get_supabase_client
+    from app.core.database import get_async_supabase_client
 
-    supabase = get_supabase_client()
+    supabase = get_async_supabase_client()
 
     query = supabase.table("check_ins").select(CHECKIN_SELECT_COLUMNS).eq("user_id", current_user["id"])
 
@@ -557,7 +559,7 @@ async def get_check_ins(
         query = query.neq("status", "pending")
 
     result = (
-        query.order("check_in_date", desc=True)
+        await query.order("check_in_date", desc=True)
         .range(offset, offset + limit - 1)
         .execute()
     )
@@ -568,14 +570,14 @@ async def get_check_ins(
 @router.get("/today", response_model=List[CheckInResponse])
 async def get_today_check_ins(current_user: dict = Depends(get_current_user)):
     """Get all of today's check-ins for the user."""
-    from app.core.database import get_supabase_client
+    from app.core.database import get_async_supabase_client
 
-    supabase = get_supabase_client()
+    supabase = get_async_supabase_client()
     user_timezone = current_user.get("timezone", "UTC")
     user_today = get_user_today(user_timezone)
 
     result = (
-        supabase.table("check_ins")
+        await supabase.table("check_ins")
         .select(CHECKIN_SELECT_COLUMNS)
         .eq("user_id", current_user["id"])
         .eq("check_in_date", user_today.isoformat())
@@ -598,15 +600,15 @@ async def get_goal_today_status(
     - check_in: the check-in data if exists
     - can_check_in: whether user can check in (goal is active, scheduled for today)
     """
-    from app.core.database import get_supabase_client
+    from app.core.database import get_async_supabase_client
 
-    supabase = get_supabase_client()
+    supabase = get_async_supabase_client()
     user_id = current_user["id"]
     user_timezone = current_user.get("timezone", "UTC")
 
     # Verify goal belongs to user
     goal = (
-        supabase.table("goals")
+        await supabase.table("goals")
         .select("id, user_id, frequency_type, target_days")
         .eq("id", goal_id)
         .eq("user_id", user_id)
@@ -635,7 +637,7 @@ async def get_goal_today_status(
 
     # Check if user has checked in today
     checkin = (
-        supabase.table("check_ins")
+        await supabase.table("check_ins")
         .select(CHECKIN_SELECT_COLUMNS)
         .eq("goal_id", goal_id)
         .eq("user_id", user_id)
@@ -663,87 +665,31 @@ async def get_check_in_stats(
     goal_id: Optional[str] = Query(None, description="Filter by goal ID"),
 ):
     """Get check-in statistics for user or specific goal."""
-    from app.core.database import get_supabase_client
-
-    supabase = get_supabase_client()
-
-    query = supabase.table("check_ins").select(CHECKIN_SELECT_COLUMNS).eq("user_id", current_user["id"])
-
-    if goal_id:
-        query = query.eq("goal_id", goal_id)
-
-    result = query.execute()
-    checkins = result.data or []
-
-    # V2.1: Exclude pending check-ins from total count
-    total_checkins = len([c for c in checkins if c.get("status") != "pending"])
-    # V2.1: Use status field instead of completed boolean
-    completed_checkins = len([c for c in checkins if c.get("status") == "completed"])
-    completion_rate = (
-        round(completed_checkins / total_checkins * 100, 1) if total_checkins > 0 else 0
-    )
-
-    # Calculate streaks - V2.1: Use status field
-    sorted_checkins = sorted(
-        [c for c in checkins if c.get("status") == "completed"],
-        key=lambda x: x["check_in_date"],
-        reverse=True,
-    )
-
-    current_streak = 0
-    longest_streak = 0
-    temp_streak = 0
-
-    for i, checkin in enumerate(sorted_checkins):
-        if i == 0:
-            temp_streak = 1
-            current_streak = 1
-        else:
-            prev_date = datetime.fromisoformat(
-                sorted_checkins[i - 1]["check_in_date"]
-            ).date()
-            curr_date = datetime.fromisoformat(checkin["check_in_date"]).date()
-            if (prev_date - curr_date).days == 1:
-                temp_streak += 1
-                if i == len(sorted_checkins) - 1 or current_streak == temp_streak - 1:
-                    current_streak = temp_streak
-            else:
-                longest_streak = max(longest_streak, temp_streak)
-                temp_streak = 1
-
-    longest_streak = max(longest_streak, temp_streak)
-
-    # Last 7 and 30 days
-    today = datetime.utcnow().date()
-    week_ago = today - timedelta(days=7)
-    month_ago = today - timedelta(days=30)
-
-    # V2.1: Use status field
-    checkins_7d = len(
-        [
-            c
-            for c in checkins
-            if c.get("status") == "completed"
-            and c.get("check_in_date") >= week_ago.isoformat()
-        ]
-    )
-    checkins_30d = len(
-        [
-            c
-            for c in checkins
-            if c.get("status") == "completed"
-            and c.get("check_in_date") >= month_ago.isoformat()
-        ]
-    )
+    from app.core.database import get_async_supabase_client
+
+    supabase = get_async_supabase_client()
+
+    # Totals, streaks and 7/30-day counts are aggregated in SQL (migration 044):
+    # one row back regardless of how many check-ins the user has.
+    result = await supabase.rpc(
+        "get_check_in_stats",
+        {
+            "p_user_id": current_user["id"],
+            "p_goal_id": goal_id,
+            "p_today": datetime.utcnow().date().isoformat(),
+        },
+    ).execute()
+    rows = result.data or []
+    stats = rows[0] if rows else {}
 
     return CheckInStats(
-        total_checkins=total_checkins,
-        completed_checkins=completed_checkins,
-        completion_rate=completion_rate,
-        current_streak=current_streak,
-        longest_streak=longest_streak,
-        checkins_last_7d=checkins_7d,
-        checkins_last_30d=checkins_30d,
+        total_checkins=stats.get("total_checkins") or 0,
+        completed_checkins=stats.get("completed_checkins") or 0,
+        completion_rate=float(stats.get("completion_rate") or 0),
+        current_streak=stats.get("current_streak") or 0,
+        longest_streak=stats.get("longest_streak") or 0,
+        checkins_last_7d=stats.get("checkins_last_7d") or 0,
+        checkins_last_30d=stats.get("checkins_last_30d") or 0,
     )
 
 
@@ -753,15 +699,15 @@ async def get_streak_info(
     goal_id: Optional[str] = Query(None, description="Filter by goal ID"),
 ):
     """Get streak information for user or specific goal."""
-    from app.core.database import get_supabase_client
+    from app.core.database import get_async_supabase_client
 
-    supabase = get_supabase_client()
+    supabase = get_async_supabase_client()
     user_id = current_user["id"]
 
     if goal_id:
         # Get streak from the goal directly (V2 stores streaks on goal)
         goal = (
-            supabase.table("goals")
+            await supabase.table("goals")
             .select("current_streak, longest_streak")
             .eq("id", goal_id)
             .eq("user_id", user_id)
@@ -776,7 +722,7 @@ async def get_streak_info(
 
         # Get last check-in date (V2: use status instead of completed)
         last_checkin = (
-            supabase.table("check_ins")
+            await supabase.table("check_ins")
             .select("check_in_date")
             .eq("goal_id", goal_id)
             .eq("status", "completed")
@@ -796,7 +742,7 @@ async def get_streak_info(
     else:
         # Get best streak across all goals
         goals = (
-            supabase.table("goals")
+            await supabase.table("goals")
             .select("current_streak, longest_streak")
             .eq("user_id", user_id)
             .execute()
@@ -812,7 +758,7 @@ async def get_streak_info(
 
         # Get last check-in date across all goals (V2: use status)
         last_checkin = (
-            supabase.table("check_ins")
+            await supabase.table("check_ins")
             .select("check_in_date")
             .eq("user_id", user_id)
             .eq("status", "completed")
@@ -839,9 +785,9 @@ async def get_check_in_calendar(
     goal_id: Optional[str] = Query(None),
 ):
     """Get check-ins in calendar format for a specific month."""
-    from app.core.database import get_supabase_client
+    from app.core.database import get_async_supabase_client
 
-    supabase = get_supabase_client()
+    supabase = get_async_supabase_client()
 
     # Default to current month
     if not year or not month:
@@ -868,7 +814,7 @@ async def get_check_in_calendar(
     if goal_id:
         query = query.eq("goal_id", goal_id)
 
-    result = query.execute()
+    result = await query.execute()
 
     # Group by date
     calendar_data = {}
@@ -891,12 +837,12 @@ async def get_check_in(
     current_user: dict = Depends(get_current_user),
 ):
     """Get a specific check-in by ID."""
-    from app.core.database import get_supabase_client
+    from app.core.database import get_async_supabase_client
 
-    supabase = get_supabase_client()
+    supabase = get_async_supabase_client()
 
     result = (
-        supabase.table("check_ins")
+        await supabase.table("check_ins")
         .select(CHECKIN_SELECT_COLUMNS)
         .eq("id", checkin_id)
         .eq("user_id", current_user["id"])
@@ -5,7 +5,7 @@ Handles user data export requests for GDPR compliance.
 Exports are processed asynchronously and sent via email.
 
 V2 Changes:
-- V2 exports: profile, goals, check_ins, achievements, partners, notifications, subscriptions, daily_motivations, weekly_recaps, ai_coach_conversations
+- V2 exports: profile, goals, check_ins, achievements, partners, notifications, subscriptions, daily_motivations, weekly_recaps, ai_coach_conversations, ai_coach_messages
 """
 
 from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks
@@ -56,7 +56,8 @@ async def generate_user_data_export(user_id: str, email: str, export_id: str):
     - subscriptions
     - daily_motivations
     - weekly_recaps
-    - ai_coach_conversations (messages embedded in JSONB column)
+    - ai_coach_conversations
+    - ai_coach_messages (one row per message, ordered by seq)
     - social_nudges
     """
     supabase = get_supabase_client()
@@ -142,7 +143,7 @@ async def generate_user_data_export(user_id: str, email: str, export_id: str):
         )
         user_data["weekly_recaps"] = recaps_result.data or []
 
-        # 10. AI Coach conversations (messages are embedded in the JSONB 'messages' column)
+        # 10. AI Coach conversations and their messages (ai_coach_messages rows)
         conversations_result = (
             supabase.table("ai_coach_conversations")
             .select("*")
@@ -150,6 +151,15 @@ async def generate_user_data_export(user_id: str, email: str, export_id: str):
             .execute()
         )
         user_data["ai_coach_conversations"] = conversations_result.data or []
+        ai_messages_result = (
+            supabase.table("ai_coach_messages")
+            .select("*")
+            .eq("user_id", user_id)
+            .order("conversation_id")
+            .order("seq")
+            .execute()
+        )
+        user_data["ai_coach_messages"] = ai_messages_result.data or []
 
         # 11. Social nudges (sent and received)
         nudges_sent_result = (
@@ -33,12 +33,14 @@ GOAL_SELECT_COLUMNS = (
 # =============================================================================
 
 
-def check_goal_access(
+async def check_goal_access(
     goal_id: str, current_user_id: str, supabase
 ) -> Tuple[bool, Optional[dict], bool]:
     """
     Check if user can access a goal (either owns it or is a partner of the owner).
 
+    `supabase` is the async client (get_async_supabase_client).
+
     Returns:
         Tuple of (has_access, goal_data, is_partner_view)
         - has_access: True if user can view the goal
@@ -47,7 +49,7 @@ def check_goal_access(
     """
     try:
         goal_result = (
-            supabase.table("goals")
+            await supabase.table("goals")
             .select(GOAL_SELECT_COLUMNS)
             .eq("id", goal_id)
             .maybe_single()
@@ -69,7 +71,7 @@ def check_goal_access(
 
     # Case 2: Check if current user is a partner of the goal owner
     partnership_result = (
-        supabase.table("accountability_partners")
+        await supabase.table("accountability_partners")
         .select("id")
         .eq("status", "accepted")
         .or_(
@@ -226,10 +228,10 @@ async def get_goals(
     - completed_today: Whether the goal was completed today
     - progress_this_week: For weekly goals, {completed: X, target: Y}
     """
-    from app.core.database import get_supabase_client
+    from app.core.database import get_async_supabase_client
     from datetime import datetime, timedelta
 
-    supabase = get_supabase_client()
+    supabase = get_async_supabase_client()
     user_id = current_user["id"]
 
     query = supabase.table("goals").select(GOAL_SELECT_COLUMNS).eq("user_id", user_id)
@@ -237,7 +239,7 @@ async def get_goals(
     if active_only:
         query = query.eq("status", "active")
 
-    result = query.order("created_at", desc=True).execute()
+    result = await query.order("created_at", desc=True).execute()
     goals = result.data or []
 
     if not goals or not include_today_status:
@@ -250,7 +252,7 @@ async def get_goals(
     # Batch fetch today's check-ins for all goals
     # V2: Select status instead of completed/is_rest_day
     today_checkins_result = (
-        supabase.table("check_ins")
+        await supabase.table("check_ins")
         .select("goal_id, status")
         .eq("user_id", user_id)
         .eq("check_in_date", today)
@@ -284,7 +286,7 @@ async def get_goals(
     if weekly_goal_ids:
         # V2.1: Select status instead of completed
         week_checkins_result = (
-            supabase.table("check_ins")
+            await supabase.table("check_ins")
             .select("goal_id, status")
             .eq("user_id", user_id)
             .gte("check_in_date", week_start)
@@ -543,11 +545,11 @@ async def create_goal(
 @router.get("/{goal_id}", response_model=GoalResponse)
 async def get_goal(goal_id: str, current_user: dict = Depends(get_current_user)):
     """Get specific goal by ID. Allows access if user owns the goal or is a partner."""
-    from app.core.database import get_supabase_client
+    from app.core.database import get_async_supabase_client
 
-    supabase = get_supabase_client()
+    supabase = get_async_supabase_client()
 
-    has_access, goal, is_partner_view = check_goal_access(
+    has_access, goal, is_partner_view = await check_goal_access(
         goal_id, current_user["id"], supabase
     )
 
@@ -561,7 +563,7 @@ async def get_goal(goal_id: str, current_user: dict = Depends(get_current_user))
     if goal.get("status") == "active" and not is_partner_view:
         user_tz = current_user.get("timezone", "UTC")
         try:
-            result = supabase.rpc(
+            result = await supabase.rpc(
                 "precreate_checkin_for_goal",
                 {
                     "p_goal_id": goal_id,
@@ -54,9 +54,9 @@ async def get_home_dashboard(
     - Current streak: user's best current streak across all goals
     - Longest streak: user's all-time best streak
     """
-    from app.core.database import get_supabase_client
+    from app.core.database import get_async_supabase_client
 
-    supabase = get_supabase_client()
+    supabase = get_async_supabase_client()
     user_id = current_user["id"]
     user_today = get_user_today(timezone)
     today_str = user_today.isoformat()
@@ -73,7 +73,7 @@ async def get_home_dashboard(
         # V2: Get active goals with their streak info
         # V2 schema: goals have current_streak, longest_streak directly
         goals_result = (
-            supabase.table("goals")
+            await supabase.table("goals")
             .select(
                 "id, title, status, frequency_type, frequency_count, target_days, "
                 "reminder_times, why_statement, current_streak, longest_streak, "
@@ -8,10 +8,10 @@ from fastapi import (
     Query,
     Form,
 )
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Literal
 from app.core.flexible_auth import get_current_user
-from datetime import datetime
+from datetime import datetime, timezone
 
 try:
     import magic
@@ -21,20 +21,31 @@ except ImportError:
     MAGIC_AVAILABLE = False
 
 try:
-    from openai import AsyncOpenAI
+    from app.core.openai_client import acreate_chat_completion, acreate_transcription
 
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
-import hashlib
+import asyncio
+import io
 import json
 import logging
 import os
-import tempfile
 from PIL import Image
 import subprocess
 
+from app.core.r2_deletions import queue_r2_deletions
+from app.services.media_objects import (
+    cache_voice_note_analysis,
+    get_media_object,
+    media_object_key,
+    register_media_object,
+    sentiment_context,
+)
+from app.services.media_executor import StageTimer, run_cpu, run_io, user_upload_slot
+from app.services.media_spool import SpooledUpload, UploadTooLarge, spool_upload
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
@@ -44,6 +55,11 @@ router = APIRouter(
 # Media types - determines if we store in database
 MediaType = Literal["voice_note"]
 
+# Hard cap for any upload (validate_file_security); spooling stops here
+MAX_UPLOAD_SIZE_BYTES = 10 * 1024 * 1024
+# R2 uploads above this size go multipart, in parts of this size
+R2_MULTIPART_THRESHOLD_BYTES = 8 * 1024 * 1024
+
 # Voice note constants (fallback defaults if DB lookup fails)
 DEFAULT_VOICE_NOTE_MAX_DURATION_SECONDS = 30
 DEFAULT_VOICE_NOTE_MAX_FILE_SIZE_MB = 5
@@ -119,6 +135,97 @@ async def _queue_ai_response_on_vn_failure(
         )
 
 
+async def _check_voice_note_upload(
+    supabase,
+    user_id: str,
+    checkin_id: str,
+    duration: Optional[int],
+) -> tuple[Optional[str], int, int]:
+    """
+    Checks before accepting a voice note for a check-in (either upload path):
+    premium access, ownership, no voice note yet and the declared duration.
+
+    Returns (goal_id, max_duration_seconds, max_file_size_mb).
+    """
+    from app.services.subscription_service import has_user_feature
+
+    # Check premium access using subscription_service
+    has_access = await has_user_feature(supabase, user_id, "voice_notes")
+    if not has_access:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Voice notes require a premium subscription",
+        )
+
+    # Validate check-in exists and belongs to user (goal_id needed to queue AI task later)
+    checkin_result = (
+        supabase.table("check_ins")
+        .select("id, user_id, goal_id, voice_note_url, voice_note_status")
+        .eq("id", checkin_id)
+        .maybe_single()
+        .execute()
+    )
+
+    checkin = (
+        getattr(checkin_result, "data", None) if checkin_result is not None else None
+    )
+    if not checkin:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Check-in not found"
+        )
+
+    if checkin["user_id"] != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only add voice notes to your own check-ins",
+        )
+
+    vn_goal_id = checkin.get("goal_id")
+
+    # A direct upload of this check-in's voice note is being processed (and
+    # will queue the AI response itself)
+    if checkin.get("voice_note_status") == "processing":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This check-in's voice note is still being processed.",
+        )
+
+    # Check if already has a voice note (one per check-in)
+    if checkin.get("voice_note_url"):
+        logger.warning(
+            "[Media] Voice note upload 400: check-in already has a voice note"
+        )
+        await _queue_ai_response_on_vn_failure(
+            supabase, user_id, checkin_id, vn_goal_id
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This check-in already has a voice note. Delete it first.",
+        )
+
+    # Get voice note limits from database
+    max_duration_seconds, max_file_size_mb = await get_voice_note_limits(
+        supabase, user_id
+    )
+
+    # Validate duration from frontend
+    if duration and duration > max_duration_seconds:
+        logger.warning(
+            "[Media] Voice note upload 400: duration %s > max %s",
+            duration,
+            max_duration_seconds,
+        )
+        await _queue_ai_response_on_vn_failure(
+            supabase, user_id, checkin_id, vn_goal_id
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Voice note too long. Maximum: {max_duration_seconds} seconds",
+        )
+
+    return vn_goal_id, max_duration_seconds, max_file_size_mb
+
+
 # Pydantic models
 class MediaUploadResponse(BaseModel):
     id: Optional[str] = None  # Only present for voice note media
@@ -134,16 +241,9 @@ class MediaDeleteResponse(BaseModel):
     message: str
 
 
-def get_media_duration(file_content: bytes, file_extension: str) -> Optional[int]:
+def get_media_duration(file_path: str) -> Optional[int]:
     """Get duration in seconds for audio/video files using ffprobe"""
     try:
-        with tempfile.NamedTemporaryFile(
-            suffix=file_extension, delete=False
-        ) as temp_file:
-            temp_file.write(file_content)
-            temp_file.flush()
-            temp_path = temp_file.name
-
         result = subprocess.run(
             [
                 "ffprobe",
@@ -152,15 +252,13 @@ def get_media_duration(file_content: bytes, file_extension: str) -> Optional[int
                 "-print_format",
                 "json",
                 "-show_format",
-                temp_path,
+                file_path,
             ],
             capture_output=True,
             text=True,
             timeout=10,
         )
 
-        os.unlink(temp_path)
-
         if result.returncode == 0:
             data = json.loads(result.stdout)
             duration_str = data.get("format", {}).get("duration")
@@ -177,10 +275,8 @@ def get_media_duration(file_content: bytes, file_extension: str) -> Optional[int
     return None
 
 
-async def transcribe_audio_whisper(
-    audio_content: bytes, filename: str
-) -> Optional[str]:
-    """Transcribe audio using OpenAI Whisper API (async)."""
+async def transcribe_audio_whisper(file_path: str) -> Optional[str]:
+    """Transcribe an audio file using OpenAI Whisper API (async)."""
     if not OPENAI_AVAILABLE:
         return None
 
@@ -191,24 +287,12 @@ async def transcribe_audio_whisper(
         return None
 
     try:
-        # Use AsyncOpenAI for proper async operation in FastAPI handlers
-        client = AsyncOpenAI(api_key=api_key)
-
-        # Save to temp file (Whisper API requires a file)
-        suffix = os.path.splitext(filename)[1] or ".mp3"
-        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
-            temp_file.write(audio_content)
-            temp_path = temp_file.name
-
-        # Call Whisper API (async)
-        with open(temp_path, "rb") as audio_file:
-            transcript = await client.audio.transcriptions.create(
+        # Call Whisper API (async); the file name's extension tells it the format
+        with open(file_path, "rb") as audio_file:
+            transcript = await acreate_transcription(
                 model="whisper-1", file=audio_file, response_format="text"
             )
 
-        # Cleanup temp file
-        os.unlink(temp_path)
-
         return transcript.strip() if transcript else None
 
     except Exception as e:
@@ -246,14 +330,13 @@ async def analyze_voice_note_sentiment(
         return None
 
     try:
-        client = AsyncOpenAI(api_key=api_key)
         user_content = f"Transcript: {transcript.strip()}"
         if mood:
             user_content += f"\nSelected mood: {mood}"
         if note and note.strip():
             user_content += f'\nWritten note: "{note.strip()[:200]}"'
 
-        resp = await client.chat.completions.create(
+        resp = await acreate_chat_completion(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": VOICE_NOTE_SENTIMENT_PROMPT},
@@ -310,196 +393,213 @@ async def upload_media(
     - media_type='voice_note': Uploads to R2, transcribes with Whisper,
       updates check-in with voice_note_url and voice_note_transcript.
       PREMIUM FEATURE: Requires voice_notes feature access.
+
+    The app can instead upload straight to R2 (POST /voice-note/upload-url,
+    then /voice-note/complete); the same processing then runs in Celery.
     """
     from app.core.database import get_supabase_client
-    from app.core.config import settings
-    from app.services.subscription_service import has_user_feature
-    import boto3
-    import uuid
 
+    timer = StageTimer()
     user_id = current_user["id"]
     supabase = get_supabase_client()
     vn_goal_id: Optional[str] = None
+    max_duration_seconds: Optional[int] = None
+    max_file_size_mb: Optional[int] = None
 
     # =============================================
     # VOICE NOTE SPECIFIC VALIDATIONS
     # =============================================
     if media_type == "voice_note":
-        # Check premium access using subscription_service
-        has_access = await has_user_feature(supabase, user_id, "voice_notes")
-        if not has_access:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Voice notes require a premium subscription",
-            )
-
-        # Validate check-in exists and belongs to user (goal_id needed to queue AI task later)
-        checkin_result = (
-            supabase.table("check_ins")
-            .select("id, user_id, goal_id, voice_note_url")
-            .eq("id", checkin_id)
-            .maybe_single()
-            .execute()
-        )
-
-        checkin = (
-            getattr(checkin_result, "data", None) if checkin_result is not None else None
-        )
-        if not checkin:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Check-in not found"
-            )
-
-        if checkin["user_id"] != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You can only add voice notes to your own check-ins",
-            )
-
-        vn_goal_id = checkin.get("goal_id")
+        (
+            vn_goal_id,
+            max_duration_seconds,
+            max_file_size_mb,
+        ) = await _check_voice_note_upload(supabase, user_id, checkin_id, duration)
+
+    # Stream the upload to one temp file (size limit enforced while reading;
+    # hash and MIME sniff bytes collected on the way). Every step below reads it.
+    max_size_bytes = MAX_UPLOAD_SIZE_BYTES
+    if media_type == "voice_note":
+        # max_file_size_mb was set in validation block above
+        max_size_bytes = min(max_size_bytes, max_file_size_mb * 1024 * 1024)
 
-        # Check if already has a voice note (one per check-in)
-        if checkin.get("voice_note_url"):
+    try:
+        with timer.stage("spool"):
+            upload = await spool_upload(file, max_size_bytes)
+    except UploadTooLarge:
+        if media_type == "voice_note":
             logger.warning(
-                "[Media] Voice note upload 400: check-in already has a voice note"
+                "[Media] Voice note upload 400: file size > max %s MB",
+                max_file_size_mb,
             )
             await _queue_ai_response_on_vn_failure(
                 supabase, user_id, checkin_id, vn_goal_id
             )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="This check-in already has a voice note. Delete it first.",
+                detail=f"Voice note too large. Maximum: {max_file_size_mb}MB",
             )
-
-        # Get voice note limits from database
-        max_duration_seconds, max_file_size_mb = await get_voice_note_limits(
-            supabase, user_id
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File size exceeds 10MB limit",
         )
 
-        # Validate duration from frontend
-        if duration and duration > max_duration_seconds:
-            logger.warning(
-                "[Media] Voice note upload 400: duration %s > max %s",
-                duration,
-                max_duration_seconds,
+    with upload:
+        try:
+            return await _store_spooled_upload(
+                supabase=supabase,
+                upload=upload,
+                file=file,
+                media_type=media_type,
+                user_id=user_id,
+                checkin_id=checkin_id,
+                vn_goal_id=vn_goal_id,
+                duration=duration,
+                max_duration_seconds=max_duration_seconds,
+                timer=timer,
             )
-            await _queue_ai_response_on_vn_failure(
-                supabase, user_id, checkin_id, vn_goal_id
+        finally:
+            logger.info(
+                "[Media] %s upload for user %s (%s bytes): %s",
+                media_type,
+                user_id,
+                upload.size,
+                timer.summary(),
             )
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Voice note too long. Maximum: {max_duration_seconds} seconds",
-            )
-
-    # Read file content
-    file_content = await file.read()
 
-    # Check voice note file size limit (max_file_size_mb was set in validation block above)
-    if media_type == "voice_note":
-        max_size_bytes = max_file_size_mb * 1024 * 1024
-        if len(file_content) > max_size_bytes:
-            logger.warning(
-                "[Media] Voice note upload 400: file size %s > max %s MB",
-                len(file_content) / (1024 * 1024),
-                max_file_size_mb,
-            )
-            await _queue_ai_response_on_vn_failure(
-                supabase, user_id, checkin_id, vn_goal_id
-            )
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Voice note too large. Maximum: {max_file_size_mb}MB",
-            )
 
-    # Enhanced security validation
-    validation_result = await validate_file_security(file, file_content)
-    if not validation_result["is_valid"]:
-        logger.warning(
-            "[Media] Voice note upload 400: validation %s",
-            validation_result.get("error", "unknown"),
-        )
-        if media_type == "voice_note" and vn_goal_id:
-            await _queue_ai_response_on_vn_failure(
-                supabase, user_id, checkin_id, vn_goal_id
-            )
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=validation_result["error"]
-        )
+async def _store_spooled_upload(
+    supabase,
+    upload: SpooledUpload,
+    file: UploadFile,
+    media_type: MediaType,
+    user_id: str,
+    checkin_id: str,
+    vn_goal_id: Optional[str],
+    duration: Optional[int],
+    max_duration_seconds: Optional[int],
+    timer: StageTimer,
+) -> VoiceNoteUploadResponse:
+    """
+    Validate a spooled upload, store it in R2 and (voice notes) transcribe it.
 
-    detected_mime = validation_result.get("detected_mime", file.content_type)
+    Voice notes are content-addressed (media_objects): bytes already stored
+    skip validation, the R2 PUT and (when cached) Whisper and sentiment.
+    Blocking steps run on the media executors (see media_executor) so the
+    event loop keeps serving other requests; each stage is timed on timer.
+    """
+    from app.core.config import settings
+    from app.services.subscription_service import has_user_feature
+    import uuid
 
-    # Generate unique filename
-    file_extension = os.path.splitext(file.filename)[1].lower()
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
+    media_object = None
+    if media_type == "voice_note":
+        with timer.stage("dedup_lookup"):
+            media_object = await run_io(get_media_object, supabase, upload.sha256)
 
-    # Voice note: validate actual file duration (recorder can flush 2–3s extra; prevent > max)
     actual_duration = None
-    if media_type == "voice_note":
-        actual_duration = get_media_duration(file_content, file_extension)
-        if actual_duration is not None and actual_duration > max_duration_seconds:
+    if media_object is None:
+        # Enhanced security validation
+        with timer.stage("validate"):
+            validation_result = await validate_file_security(file, upload)
+        if not validation_result["is_valid"]:
             logger.warning(
-                "[Media] Voice note upload 400: actual file duration %s > max %s",
-                actual_duration,
-                max_duration_seconds,
-            )
-            await _queue_ai_response_on_vn_failure(
-                supabase, user_id, checkin_id, vn_goal_id
+                "[Media] Voice note upload 400: validation %s",
+                validation_result.get("error", "unknown"),
             )
+            if media_type == "voice_note" and vn_goal_id:
+                await _queue_ai_response_on_vn_failure(
+                    supabase, user_id, checkin_id, vn_goal_id
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Voice note file is {actual_duration}s. Maximum: {max_duration_seconds} seconds.",
+                detail=validation_result["error"],
             )
 
-    # Different path for voice notes
-    if media_type == "voice_note":
-        r2_key = f"voice-notes/{user_id}/{checkin_id}_{unique_filename}"
+        detected_mime = validation_result.get("detected_mime", file.content_type)
+
+        if media_type == "voice_note":
+            with timer.stage("probe"):
+                actual_duration = await run_io(get_media_duration, upload.path)
     else:
-        r2_key = f"media/{user_id}/{unique_filename}"
+        # Same bytes as a stored voice note: already validated and probed
+        logger.info(
+            "[Media] Voice note for checkin_id=%s reuses stored object %s",
+            checkin_id,
+            media_object["r2_key"],
+        )
+        detected_mime = media_object["content_type"]
+        actual_duration = media_object.get("duration_seconds")
+
+    # Voice note: validate actual file duration (recorder can flush 2–3s extra; prevent > max)
+    if (
+        media_type == "voice_note"
+        and actual_duration is not None
+        and actual_duration > max_duration_seconds
+    ):
+        logger.warning(
+            "[Media] Voice note upload 400: actual file duration %s > max %s",
+            actual_duration,
+            max_duration_seconds,
+        )
+        await _queue_ai_response_on_vn_failure(
+            supabase, user_id, checkin_id, vn_goal_id
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Voice note file is {actual_duration}s. Maximum: {max_duration_seconds} seconds.",
+        )
 
     # Get duration for audio/video files (if not provided by frontend)
     if duration is None and (
         detected_mime.startswith("audio/") or detected_mime.startswith("video/")
     ):
-        duration = get_media_duration(file_content, file_extension)
+        if actual_duration is not None or media_object is not None:
+            duration = actual_duration
+        else:
+            with timer.stage("probe"):
+                duration = await run_io(get_media_duration, upload.path)
+
+    if media_object is None:
+        # Voice notes: key derived from the content hash; other media per user
+        if media_type == "voice_note":
+            r2_key = media_object_key(upload.sha256, upload.extension)
+        else:
+            r2_key = f"media/{user_id}/{uuid.uuid4()}{upload.extension}"
+
+        # Upload to Cloudflare R2
+        try:
+            with timer.stage("r2_upload"):
+                await run_io(_upload_file_to_r2, upload.path, r2_key, detected_mime)
+
+            if media_type == "voice_note":
+                media_object = await run_io(
+                    register_media_object,
+                    supabase,
+                    upload.sha256,
+                    r2_key,
+                    detected_mime,
+                    upload.size,
+                    actual_duration,
+                )
+                if media_object["r2_key"] != r2_key:
+                    # A concurrent upload of the same bytes registered first
+                    await queue_r2_deletions([r2_key])
+                    r2_key = media_object["r2_key"]
 
-    # Determine file type category
-    if detected_mime.startswith("image/"):
-        file_type = "image"
-    elif detected_mime.startswith("video/"):
-        file_type = "video"
-    elif detected_mime.startswith("audio/"):
-        file_type = "audio"
+        except Exception as e:
+            if media_type == "voice_note" and vn_goal_id:
+                await _queue_ai_response_on_vn_failure(
+                    supabase, user_id, checkin_id, vn_goal_id
+                )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to upload file: {str(e)}",
+            )
     else:
-        file_type = "other"
-
-    # Upload to Cloudflare R2
-    try:
-        s3_client = boto3.client(
-            "s3",
-            endpoint_url=settings.CLOUDFLARE_R2_ENDPOINT_URL,
-            aws_access_key_id=settings.CLOUDFLARE_R2_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.CLOUDFLARE_R2_SECRET_ACCESS_KEY,
-            region_name="auto",
-        )
+        r2_key = media_object["r2_key"]
 
-        s3_client.put_object(
-            Bucket=settings.CLOUDFLARE_R2_BUCKET_NAME,
-            Key=r2_key,
-            Body=file_content,
-            ContentType=detected_mime,
-        )
-
-        file_url = f"{settings.CLOUDFLARE_R2_PUBLIC_URL}/{r2_key}"
-
-    except Exception as e:
-        if media_type == "voice_note" and vn_goal_id:
-            await _queue_ai_response_on_vn_failure(
-                supabase, user_id, checkin_id, vn_goal_id
-            )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to upload file: {str(e)}",
-        )
+    file_url = f"{settings.CLOUDFLARE_R2_PUBLIC_URL}/{r2_key}"
 
     # Handle voice note specific logic
     transcript = None
@@ -507,35 +607,18 @@ async def upload_media(
     created_at = datetime.utcnow().isoformat() + "Z"
 
     if media_type == "voice_note":
-        # Transcribe with Whisper
-        transcript = await transcribe_audio_whisper(
-            file_content, file.filename or "voice_note.mp3"
-        )
-
-        # GPT sentiment analysis on transcript (for insights AI)
-        if transcript:
-            checkin_ctx = (
-                supabase.table("check_ins")
-                .select("mood, note")
-                .eq("id", checkin_id)
-                .maybe_single()
-                .execute()
-            )
-            mood = None
-            note = None
-            if checkin_ctx.data:
-                mood = checkin_ctx.data.get("mood")
-                note = checkin_ctx.data.get("note")
-            sentiment = await analyze_voice_note_sentiment(
-                transcript=transcript, mood=mood, note=note
-            )
+        transcript, sentiment = await _analyze_voice_note(
+            supabase, upload, checkin_id, media_object, timer
+        )
 
         update_payload = {
             "voice_note_url": file_url,
+            "voice_note_hash": upload.sha256,
             "voice_note_transcript": transcript,
             "voice_note_duration": (
                 actual_duration if actual_duration is not None else duration
             ),
+            "voice_note_status": "ready",
             "updated_at": datetime.utcnow().isoformat(),
         }
         if sentiment is not None:
@@ -546,11 +629,7 @@ async def upload_media(
                 "id", checkin_id
             ).execute()
         except Exception as e:
-            from app.services.tasks import delete_media_from_r2_task
-
-            delete_media_from_r2_task.delay(
-                file_path=r2_key, media_id=f"voice-note-{checkin_id}"
-            )
+            # Nothing references the object now; the orphan sweep deletes it
             await _queue_ai_response_on_vn_failure(
                 supabase, user_id, checkin_id, vn_goal_id
             )
@@ -560,7 +639,7 @@ async def upload_media(
             )
 
         # Queue AI check-in response now that we have transcript + sentiment (premium only)
-        goal_id = checkin_result.data.get("goal_id") if checkin_result.data else None
+        goal_id = vn_goal_id
         if goal_id:
             has_ai = await has_user_feature(supabase, user_id, "ai_checkin_response")
             if has_ai:
@@ -589,7 +668,7 @@ async def upload_media(
     return VoiceNoteUploadResponse(
         url=file_url,
         filename=file.filename,
-        file_size=len(file_content),
+        file_size=upload.size,
         content_type=detected_mime,
         duration=duration,
         created_at=created_at,
@@ -598,6 +677,360 @@ async def upload_media(
     )
 
 
+async def _analyze_voice_note(
+    supabase,
+    upload: SpooledUpload,
+    checkin_id: str,
+    media_object: dict,
+    timer: StageTimer,
+) -> tuple[Optional[str], Optional[dict]]:
+    """
+    Transcript and sentiment for a voice note, reusing what media_object has
+    cached for these bytes (sentiment only for the same mood and note).
+    New results are cached on the object.
+    """
+    transcript = media_object.get("transcript")
+    new_transcript = None
+    if not transcript:
+        # Transcribe with Whisper
+        with timer.stage("transcribe"):
+            transcript = new_transcript = await transcribe_audio_whisper(upload.path)
+
+    sentiment = None
+    new_sentiment = None
+    context = None
+    # GPT sentiment analysis on transcript (for insights AI)
+    if transcript:
+        checkin_ctx = (
+            supabase.table("check_ins")
+            .select("mood, note")
+            .eq("id", checkin_id)
+            .maybe_single()
+            .execute()
+        )
+        mood = None
+        note = None
+        if checkin_ctx.data:
+            mood = checkin_ctx.data.get("mood")
+            note = checkin_ctx.data.get("note")
+
+        context = sentiment_context(mood, note)
+        if (
+            media_object.get("sentiment") is not None
+            and media_object.get("sentiment_context") == context
+        ):
+            sentiment = media_object["sentiment"]
+        else:
+            with timer.stage("sentiment"):
+                sentiment = new_sentiment = await analyze_voice_note_sentiment(
+                    transcript=transcript, mood=mood, note=note
+                )
+
+    if new_transcript or new_sentiment is not None:
+        await run_io(
+            cache_voice_note_analysis,
+            supabase,
+            upload.sha256,
+            new_transcript,
+            new_sentiment,
+            context,
+        )
+
+    return transcript, sentiment
+
+
+def _upload_file_to_r2(file_path: str, r2_key: str, content_type: str) -> None:
+    """Upload a local file to R2 (blocking; runs on the media I/O pool)."""
+    from app.core.config import settings
+    from app.core.r2_client import get_r2_client
+    from boto3.s3.transfer import TransferConfig
+
+    # Streams from the spooled file; multipart above R2_MULTIPART_THRESHOLD_BYTES
+    get_r2_client().upload_file(
+        file_path,
+        settings.CLOUDFLARE_R2_BUCKET_NAME,
+        r2_key,
+        ExtraArgs={"ContentType": content_type},
+        Config=TransferConfig(
+            multipart_threshold=R2_MULTIPART_THRESHOLD_BYTES,
+            multipart_chunksize=R2_MULTIPART_THRESHOLD_BYTES,
+            use_threads=False,
+        ),
+    )
+
+
+# =============================================
+# DIRECT VOICE NOTE UPLOADS (presigned R2 PUT)
+# =============================================
+
+
+class VoiceNoteUploadUrlRequest(BaseModel):
+    checkin_id: str
+    filename: str  # Only the extension is used (picks the signed Content-Type)
+    size_bytes: int = Field(gt=0)
+    duration: Optional[int] = None  # Duration in seconds from frontend
+
+
+class VoiceNoteUploadUrlResponse(BaseModel):
+    upload_id: str  # Pass to /voice-note/complete after the PUT
+    url: str
+    method: str = "PUT"
+    headers: dict[str, str]  # Send exactly these (and Content-Length = size_bytes)
+    expires_in: int
+
+
+class VoiceNoteCompleteRequest(BaseModel):
+    upload_id: str
+
+
+class VoiceNoteCompleteResponse(BaseModel):
+    checkin_id: str
+    voice_note_status: str
+
+
+@router.post("/voice-note/upload-url", response_model=VoiceNoteUploadUrlResponse)
+async def create_voice_note_upload_url(
+    request: VoiceNoteUploadUrlRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Presigned URL to PUT a voice note straight to R2 (see voice_note_uploads).
+
+    Runs the same checks as /upload; the URL only accepts the declared size
+    and the Content-Type for the file's extension.
+    PREMIUM FEATURE: Requires voice_notes feature access.
+    """
+    from app.core.config import settings
+    from app.core.database import get_supabase_client
+    from app.services.voice_note_uploads import (
+        VOICE_NOTE_UPLOAD_TYPES,
+        create_upload_token,
+        presign_put,
+        staging_key,
+    )
+
+    user_id = current_user["id"]
+    supabase = get_supabase_client()
+
+    extension = os.path.splitext(request.filename)[1].lower()
+    content_type = VOICE_NOTE_UPLOAD_TYPES.get(extension)
+    if content_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File extension {extension} not allowed",
+        )
+
+    vn_goal_id, _, max_file_size_mb = await _check_voice_note_upload(
+        supabase, user_id, request.checkin_id, request.duration
+    )
+
+    if request.size_bytes > min(MAX_UPLOAD_SIZE_BYTES, max_file_size_mb * 1024 * 1024):
+        logger.warning(
+            "[Media] Voice note upload 400: file size > max %s MB",
+            max_file_size_mb,
+        )
+        await _queue_ai_response_on_vn_failure(
+            supabase, user_id, request.checkin_id, vn_goal_id
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Voice note too large. Maximum: {max_file_size_mb}MB",
+        )
+
+    r2_key = staging_key(user_id, request.checkin_id, extension)
+    # Signed locally (no R2 round trip)
+    url = presign_put(r2_key, content_type, request.size_bytes)
+    upload_id = create_upload_token(
+        {
+            "user_id": user_id,
+            "checkin_id": request.checkin_id,
+            "r2_key": r2_key,
+            "content_type": content_type,
+            "size_bytes": request.size_bytes,
+            "duration": request.duration,
+        }
+    )
+
+    return VoiceNoteUploadUrlResponse(
+        upload_id=upload_id,
+        url=url,
+        headers={"Content-Type": content_type},
+        expires_in=settings.VOICE_NOTE_UPLOAD_URL_TTL_SECONDS,
+    )
+
+
+@router.post(
+    "/voice-note/complete",
+    response_model=VoiceNoteCompleteResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def complete_voice_note_upload(
+    request: VoiceNoteCompleteRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Queue processing of a voice note PUT with a /voice-note/upload-url URL.
+
+    Sets the check-in's voice_note_status to 'processing'; the
+    process_voice_note_upload task sets 'ready' (with url, transcript and
+    sentiment) or 'failed', which the app receives as a check_ins change.
+    """
+    from app.core.database import get_supabase_client
+    from app.services.tasks import process_voice_note_upload_task
+    from app.services.voice_note_uploads import read_upload_token, staged_object_size
+
+    user_id = current_user["id"]
+    supabase = get_supabase_client()
+
+    claims = read_upload_token(request.upload_id)
+    if not claims or claims.get("user_id") != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid or expired upload",
+        )
+    checkin_id = claims["checkin_id"]
+
+    size = await run_io(staged_object_size, claims["r2_key"])
+    if size is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Voice note file was not uploaded",
+        )
+
+    # Claim the check-in: one voice note, one processing run
+    claimed = (
+        supabase.table("check_ins")
+        .update(
+            {
+                "voice_note_status": "processing",
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+        .eq("id", checkin_id)
+        .eq("user_id", user_id)
+        .is_("voice_note_url", "null")
+        .or_("voice_note_status.is.null,voice_note_status.eq.failed")
+        .execute()
+    )
+    if not claimed.data:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This check-in already has a voice note or one is being processed.",
+        )
+
+    try:
+        process_voice_note_upload_task.delay(
+            user_id=user_id,
+            checkin_id=checkin_id,
+            r2_key=claims["r2_key"],
+            content_type=claims["content_type"],
+            duration=claims.get("duration"),
+        )
+    except Exception as e:
+        logger.error("[Media] Failed to queue voice note processing: %s", e)
+        supabase.table("check_ins").update({"voice_note_status": "failed"}).eq(
+            "id", checkin_id
+        ).execute()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Could not queue voice note processing. Please try again.",
+        )
+
+    return VoiceNoteCompleteResponse(
+        checkin_id=checkin_id, voice_note_status="processing"
+    )
+
+
+async def process_staged_voice_note(
+    user_id: str,
+    checkin_id: str,
+    r2_key: str,
+    content_type: str,
+    duration: Optional[int],
+) -> VoiceNoteUploadResponse:
+    """
+    upload_media for a voice note already in R2 at a staging key: download it
+    and run _store_spooled_upload (dedup, validation, probe, Whisper,
+    sentiment, check-in update). Called by process_voice_note_upload.
+
+    Raises HTTPException when the voice note is rejected, like /upload.
+    """
+    from app.core.database import get_supabase_client
+    from starlette.datastructures import Headers
+    from app.services.voice_note_uploads import download_staged_upload
+
+    timer = StageTimer()
+    supabase = get_supabase_client()
+
+    checkin_result = (
+        supabase.table("check_ins")
+        .select("goal_id")
+        .eq("id", checkin_id)
+        .maybe_single()
+        .execute()
+    )
+    checkin = (
+        getattr(checkin_result, "data", None) if checkin_result is not None else None
+    )
+    if not checkin:
+        # Deleted while the upload was in flight
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Check-in not found"
+        )
+    vn_goal_id = checkin.get("goal_id")
+
+    max_duration_seconds, max_file_size_mb = await get_voice_note_limits(
+        supabase, user_id
+    )
+    extension = os.path.splitext(r2_key)[1].lower()
+
+    try:
+        with timer.stage("download"):
+            upload = await run_io(
+                download_staged_upload,
+                r2_key,
+                min(MAX_UPLOAD_SIZE_BYTES, max_file_size_mb * 1024 * 1024),
+                extension,
+            )
+    except UploadTooLarge:
+        await _queue_ai_response_on_vn_failure(
+            supabase, user_id, checkin_id, vn_goal_id
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Voice note too large. Maximum: {max_file_size_mb}MB",
+        )
+
+    # Validation and the response only read the name and declared type
+    file = UploadFile(
+        file=io.BytesIO(),
+        filename=f"voice_note{extension}",
+        headers=Headers({"content-type": content_type}),
+    )
+
+    with upload:
+        try:
+            return await _store_spooled_upload(
+                supabase=supabase,
+                upload=upload,
+                file=file,
+                media_type="voice_note",
+                user_id=user_id,
+                checkin_id=checkin_id,
+                vn_goal_id=vn_goal_id,
+                duration=duration,
+                max_duration_seconds=max_duration_seconds,
+                timer=timer,
+            )
+        finally:
+            logger.info(
+                "[Media] staged voice_note for user %s (%s bytes): %s",
+                user_id,
+                upload.size,
+                timer.summary(),
+            )
+
+
 def extract_r2_key_from_url(url: str, public_url_base: str) -> Optional[str]:
     """Extract the R2 key from a full URL"""
     if not url or not public_url_base:
@@ -618,7 +1051,6 @@ def extract_r2_key_from_url(url: str, public_url_base: str) -> Optional[str]:
 async def delete_media(media_id: str, current_user: dict = Depends(get_current_user)):
     """Delete media file by ID - for post media stored in database"""
     from app.core.database import get_supabase_client
-    from app.services.tasks import delete_media_from_r2_task
 
     supabase = get_supabase_client()
 
@@ -642,11 +1074,8 @@ async def delete_media(media_id: str, current_user: dict = Depends(get_current_u
     # Delete from database immediately
     supabase.table("media_uploads").delete().eq("id", media_id).execute()
 
-    # Queue background task to delete from Cloudflare R2
-    delete_media_from_r2_task.delay(
-        file_path=r2_key,
-        media_id=media_id,
-    )
+    # Queue for batched deletion from Cloudflare R2
+    await queue_r2_deletions([r2_key])
 
     return MediaDeleteResponse(message="Media deleted successfully")
 
@@ -658,7 +1087,6 @@ async def delete_voice_note(
     """Delete a voice note from a check-in."""
     from app.core.database import get_supabase_client
     from app.core.config import settings
-    from app.services.tasks import delete_media_from_r2_task
 
     user_id = current_user["id"]
     supabase = get_supabase_client()
@@ -666,7 +1094,7 @@ async def delete_voice_note(
     # Get check-in
     checkin_result = (
         supabase.table("check_ins")
-        .select("id, user_id, voice_note_url")
+        .select("id, user_id, voice_note_url, voice_note_hash")
         .eq("id", checkin_id)
         .maybe_single()
         .execute()
@@ -693,22 +1121,23 @@ async def delete_voice_note(
     # Extract R2 key from URL
     r2_key = extract_r2_key_from_url(voice_note_url, settings.CLOUDFLARE_R2_PUBLIC_URL)
 
-    # Clear from database (include voice_note_sentiment)
+    # Clear from database (include voice_note_sentiment); clearing
+    # voice_note_hash releases the shared object (media_objects.ref_count)
     supabase.table("check_ins").update(
         {
             "voice_note_url": None,
+            "voice_note_hash": None,
             "voice_note_transcript": None,
             "voice_note_sentiment": None,
+            "voice_note_status": None,
             "updated_at": datetime.utcnow().isoformat(),
         }
     ).eq("id", checkin_id).execute()
 
-    # Queue background task to delete from R2
-    if r2_key:
-        delete_media_from_r2_task.delay(
-            file_path=r2_key,
-            media_id=f"voice-note-{checkin_id}",
-        )
+    # Content-addressed objects are deleted by the orphan sweep once nothing
+    # references them; older per-upload keys are queued for deletion now
+    if r2_key and not checkin_result.data.get("voice_note_hash"):
+        await queue_r2_deletions([r2_key])
 
     return MediaDeleteResponse(message="Voice note deleted successfully")
 
@@ -727,7 +1156,6 @@ async def delete_media_by_url(
     Validates that the URL belongs to the current user before deleting.
     """
     from app.core.config import settings
-    from app.services.tasks import delete_media_from_r2_task
 
     url = request.url
 
@@ -748,11 +1176,8 @@ async def delete_media_by_url(
             detail="You can only delete your own media",
         )
 
-    # Queue background task to delete from Cloudflare R2
-    delete_media_from_r2_task.delay(
-        file_path=r2_key,
-        media_id=f"url-delete-{current_user['id']}",
-    )
+    # Queue for batched deletion from Cloudflare R2
+    await queue_r2_deletions([r2_key])
 
     return MediaDeleteResponse(message="Media deletion queued")
 
@@ -785,25 +1210,56 @@ async def get_my_media(
 @router.post("/upload-multiple")
 async def upload_multiple_media(
     files: list[UploadFile] = File(...),
+    checkin_ids: list[str] = Form(...),
+    media_type: MediaType = Query(
+        default="voice_note",
+        description="Type of media: voice_note",
+    ),
     current_user: dict = Depends(get_current_user),
 ):
-    """Upload multiple media files at once"""
+    """
+    Upload multiple media files at once (files[i] goes to checkin_ids[i]).
+
+    Files are processed concurrently, up to MEDIA_UPLOADS_PER_USER at a time
+    for this user; results keep the order of files.
+    """
     if len(files) > 10:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Maximum 10 files allowed per request",
         )
+    if len(checkin_ids) != len(files):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide one checkin_id per file",
+        )
+
+    async def upload_one(file: UploadFile, checkin_id: str):
+        async with user_upload_slot(current_user["id"]):
+            # Use the single upload logic
+            return await upload_media(
+                file=file,
+                media_type=media_type,
+                checkin_id=checkin_id,
+                duration=None,
+                current_user=current_user,
+            )
+
+    results = await asyncio.gather(
+        *(upload_one(file, checkin_id) for file, checkin_id in zip(files, checkin_ids)),
+        return_exceptions=True,
+    )
 
     uploaded_files = []
     errors = []
 
-    for file in files:
-        try:
-            # Use the single upload logic
-            response = await upload_media(file, current_user)
-            uploaded_files.append(response)
-        except Exception as e:
-            errors.append({"filename": file.filename, "error": str(e)})
+    for file, result in zip(files, results):
+        if isinstance(result, HTTPException):
+            errors.append({"filename": file.filename, "error": result.detail})
+        elif isinstance(result, BaseException):
+            errors.append({"filename": file.filename, "error": str(result)})
+        else:
+            uploaded_files.append(result)
 
     return {
         "uploaded_files": uploaded_files,
@@ -836,22 +1292,64 @@ async def get_media_info(media_id: str, current_user: dict = Depends(get_current
     return result.data[0]
 
 
-async def validate_file_security(file: UploadFile, file_content: bytes) -> dict:
-    """Comprehensive file security validation"""
+async def validate_file_security(file: UploadFile, upload: SpooledUpload) -> dict:
+    """Comprehensive file security validation of a spooled upload"""
 
-    # File size validation
-    max_size = 10 * 1024 * 1024  # 10MB
-    if len(file_content) > max_size:
+    # File size validation (spool_upload already stops at MAX_UPLOAD_SIZE_BYTES)
+    if upload.size > MAX_UPLOAD_SIZE_BYTES:
         return {"is_valid": False, "error": "File size exceeds 10MB limit"}
 
-    # MIME type validation using python-magic
+    # MIME sniffing, header and image checks are CPU-bound: media process pool
+    result = await run_cpu(
+        inspect_upload_contents,
+        upload.path,
+        upload.head,
+        file.content_type,
+        file.filename,
+    )
+    if not result["is_valid"]:
+        return result
+
+    detected_mime = result["detected_mime"]
+
+    # Video-specific validation (ffprobe subprocess on the I/O pool)
+    if detected_mime.startswith("video/"):
+        error = await run_io(_probe_video, upload.path)
+        if error:
+            return {"is_valid": False, "error": error}
+
+    # SHA-256 computed while spooling, for duplicate detection
+    # Check for duplicate files (optional)
+    # This could be implemented to prevent storage of duplicate files
+
+    return {
+        "is_valid": True,
+        "detected_mime": detected_mime,
+        "file_hash": upload.sha256,
+        "file_size": upload.size,
+    }
+
+
+def inspect_upload_contents(
+    file_path: str,
+    head: bytes,
+    content_type: Optional[str],
+    filename: Optional[str],
+) -> dict:
+    """
+    MIME type, extension, header and image checks of a spooled upload.
+
+    Runs in the media process pool, so it only takes picklable arguments.
+    Returns {"is_valid": False, "error": ...} or {"is_valid": True, "detected_mime": ...}.
+    """
+    # MIME type validation using python-magic (sniffs the start of the file)
     if MAGIC_AVAILABLE:
         try:
-            detected_mime = magic.from_buffer(file_content, mime=True)
+            detected_mime = magic.from_buffer(head, mime=True)
         except Exception:
-            detected_mime = file.content_type
+            detected_mime = content_type
     else:
-        detected_mime = file.content_type
+        detected_mime = content_type
 
     allowed_types = {
         "image/jpeg",
@@ -890,7 +1388,7 @@ async def validate_file_security(file: UploadFile, file_content: bytes) -> dict:
         ".aac",
     }
 
-    file_extension = os.path.splitext(file.filename)[1].lower()
+    file_extension = os.path.splitext(filename or "")[1].lower()
     if file_extension not in allowed_extensions:
         return {
             "is_valid": False,
@@ -899,7 +1397,7 @@ async def validate_file_security(file: UploadFile, file_content: bytes) -> dict:
 
     # Check file header for malicious content (only first 1KB to avoid false positives in binary data)
     # Binary image/video/audio data can contain random byte sequences that match text patterns
-    file_header = file_content[:1024].lower()
+    file_header = head[:1024].lower()
     malicious_signatures = [
         b"<script",
         b"javascript:",
@@ -919,100 +1417,79 @@ async def validate_file_security(file: UploadFile, file_content: bytes) -> dict:
     # Image-specific validation
     if detected_mime.startswith("image/"):
         try:
-            with tempfile.NamedTemporaryFile() as temp_file:
-                temp_file.write(file_content)
-                temp_file.flush()
-
-                # Validate image with PIL
-                with Image.open(temp_file.name) as img:
-                    # Check image dimensions
-                    if img.width > 4096 or img.height > 4096:
-                        return {
-                            "is_valid": False,
-                            "error": "Image dimensions too large (max 4096x4096)",
-                        }
-
-                    # Check for embedded scripts in EXIF data
-                    if hasattr(img, "_getexif") and img._getexif():
-                        exif = img._getexif()
-                        for tag, value in exif.items():
-                            if isinstance(value, str) and any(
-                                script in value.lower()
-                                for script in ["<script", "javascript:", "vbscript:"]
-                            ):
-                                return {
-                                    "is_valid": False,
-                                    "error": "Image contains potentially malicious EXIF data",
-                                }
+            # Validate image with PIL
+            with Image.open(file_path) as img:
+                # Check image dimensions
+                if img.width > 4096 or img.height > 4096:
+                    return {
+                        "is_valid": False,
+                        "error": "Image dimensions too large (max 4096x4096)",
+                    }
+
+                # Check for embedded scripts in EXIF data
+                if hasattr(img, "_getexif") and img._getexif():
+                    exif = img._getexif()
+                    for tag, value in exif.items():
+                        if isinstance(value, str) and any(
+                            script in value.lower()
+                            for script in ["<script", "javascript:", "vbscript:"]
+                        ):
+                            return {
+                                "is_valid": False,
+                                "error": "Image contains potentially malicious EXIF data",
+                            }
         except Exception as e:
             return {"is_valid": False, "error": f"Invalid image file: {str(e)}"}
 
-    # Video-specific validation
-    elif detected_mime.startswith("video/"):
-        try:
-            with tempfile.NamedTemporaryFile(suffix=file_extension) as temp_file:
-                temp_file.write(file_content)
-                temp_file.flush()
-
-                # Use ffprobe to validate video (if available)
-                try:
-                    result = subprocess.run(
-                        [
-                            "ffprobe",
-                            "-v",
-                            "quiet",
-                            "-print_format",
-                            "json",
-                            "-show_format",
-                            "-show_streams",
-                            temp_file.name,
-                        ],
-                        capture_output=True,
-                        text=True,
-                        timeout=10,
-                    )
+    return {"is_valid": True, "detected_mime": detected_mime}
 
-                    if result.returncode != 0:
-                        return {"is_valid": False, "error": "Invalid video file format"}
-                except (subprocess.TimeoutExpired, FileNotFoundError):
-                    # ffprobe not available, skip validation
-                    pass
-        except Exception as e:
-            return {"is_valid": False, "error": f"Invalid video file: {str(e)}"}
 
-    # Calculate file hash for duplicate detection
-    file_hash = hashlib.sha256(file_content).hexdigest()
+def _probe_video(file_path: str) -> Optional[str]:
+    """Validate a video with ffprobe (if available); returns an error or None."""
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "quiet",
+                "-print_format",
+                "json",
+                "-show_format",
+                "-show_streams",
+                file_path,
+            ],
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
 
-    # Check for duplicate files (optional)
-    # This could be implemented to prevent storage of duplicate files
+        if result.returncode != 0:
+            return "Invalid video file format"
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        # ffprobe not available, skip validation
+        pass
+    except Exception as e:
+        return f"Invalid video file: {str(e)}"
 
-    return {
-        "is_valid": True,
-        "detected_mime": detected_mime,
-        "file_hash": file_hash,
-        "file_size": len(file_content),
-    }
+    return None
 
 
-async def scan_file_for_malware(file_content: bytes) -> dict:
-    """Scan file for malware using ClamAV (if available)"""
+async def scan_file_for_malware(file_path: str) -> dict:
+    """Scan a file (e.g. SpooledUpload.path) for malware using ClamAV (if available)"""
     try:
-        with tempfile.NamedTemporaryFile() as temp_file:
-            temp_file.write(file_content)
-            temp_file.flush()
-
-            # Use ClamAV to scan file
-            result = subprocess.run(
-                ["clamscan", "--no-summary", "--infected", temp_file.name],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
+        # Use ClamAV to scan file (on the media I/O pool)
+        result = await run_io(
+            subprocess.run,
+            ["clamscan", "--no-summary", "--infected", file_path],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
 
-            if result.returncode == 1:  # Infected
-                return {"is_clean": False, "threat": result.stdout.strip()}
-            else:
-                return {"is_clean": True, "threat": None}
+        if result.returncode == 1:  # Infected
+            return {"is_clean": False, "threat": result.stdout.strip()}
+        else:
+            return {"is_clean": True, "threat": None}
     except (subprocess.TimeoutExpired, FileNotFoundError):
         # ClamAV not available or timeout
         return {
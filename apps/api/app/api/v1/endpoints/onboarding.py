@@ -11,6 +11,7 @@ from typing import Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 from app.core.flexible_auth import get_current_user
+from app.core.user_cache import invalidate_user_cache
 from app.core.database import get_supabase_client
 from app.services.logger import logger
 
@@ -82,6 +83,7 @@ async def complete_onboarding(
         }
 
         result = supabase.table("users").update(update_data).eq("id", user_id).execute()
+        invalidate_user_cache(user_id)
 
         if not result or not getattr(result, "data", None):
             raise HTTPException(
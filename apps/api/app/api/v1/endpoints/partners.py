@@ -19,11 +19,13 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from app.core.flexible_auth import get_current_user
 from app.services.logger import logger
+from app.services.partner_match_index import match_reasons, partner_match_index
 from app.services.partner_matching_service import (
-    calculate_partner_match_score,
+    build_match_vector,
     extract_goal_categories,
     find_matched_goal_titles,
 )
+from app.services.user_search_service import invalidate_user_search_cache
 
 
 router = APIRouter(redirect_slashes=False)
@@ -275,10 +277,10 @@ async def get_partners(
     - today_goals: List of partner's active goals with today's check-in status
     - logged_today: Whether partner has completed any goal today
     """
-    from app.core.database import get_supabase_client
+    from app.core.database import get_async_supabase_client
     from datetime import date
 
-    supabase = get_supabase_client()
+    supabase = get_async_supabase_client()
     user_id = current_user["id"]
     today = date.today().isoformat()
 
@@ -286,7 +288,7 @@ async def get_partners(
         # Get partnerships where current user is either user_id or partner_user_id
         # Include user status to filter out inactive accounts
         result = (
-            supabase.table("accountability_partners")
+            await supabase.table("accountability_partners")
             .select(
                 """
                 id,
@@ -338,7 +340,7 @@ async def get_partners(
             if include_today_goals:
                 # Fetch full goal data for today's goals display
                 goals_result = (
-                    supabase.table("goals")
+                    await supabase.table("goals")
                     .select(
                         "id, user_id, title, status, frequency_type, target_days, current_streak"
                     )
@@ -354,7 +356,7 @@ async def get_partners(
             else:
                 # Just count active goals
                 goals_result = (
-                    supabase.table("goals")
+                    await supabase.table("goals")
                     .select("user_id")
                     .in_("user_id", partner_user_ids)
                     .eq("status", "active")
@@ -376,7 +378,7 @@ async def get_partners(
 
             if all_goal_ids:
                 checkins_result = (
-                    supabase.table("check_ins")
+                    await supabase.table("check_ins")
                     .select("goal_id, status")
                     .in_("goal_id", all_goal_ids)
                     .eq("check_in_date", today)
@@ -478,16 +480,16 @@ async def get_pending_requests(
     current_user: dict = Depends(get_current_user),
 ):
     """Get pending partner requests (received by current user)"""
-    from app.core.database import get_supabase_client
+    from app.core.database import get_async_supabase_client
 
-    supabase = get_supabase_client()
+    supabase = get_async_supabase_client()
     user_id = current_user["id"]
 
     try:
         # Get pending requests where current user is the partner_user_id (receiver)
         # Include sender's status to filter out inactive accounts
         result = (
-            supabase.table("accountability_partners")
+            await supabase.table("accountability_partners")
             .select(
                 """
                 id,
@@ -553,16 +555,16 @@ async def get_sent_requests(
     current_user: dict = Depends(get_current_user),
 ):
     """Get partner requests sent by current user (outgoing requests)"""
-    from app.core.database import get_supabase_client
+    from app.core.database import get_async_supabase_client
 
-    supabase = get_supabase_client()
+    supabase = get_async_supabase_client()
     user_id = current_user["id"]
 
     try:
         # Get pending requests where current user is the initiator
         # Include receiver's status to filter out inactive accounts
         result = (
-            supabase.table("accountability_partners")
+            await supabase.table("accountability_partners")
             .select(
                 """
                 id,
@@ -626,15 +628,15 @@ async def get_blocked_partners(
     current_user: dict = Depends(get_current_user),
 ):
     """Get partners that the current user has blocked"""
-    from app.core.database import get_supabase_client
+    from app.core.database import get_async_supabase_client
 
-    supabase = get_supabase_client()
+    supabase = get_async_supabase_client()
     user_id = current_user["id"]
 
     try:
         # Get blocked partnerships where current user is the blocker
         result = (
-            supabase.table("accountability_partners")
+            await supabase.table("accountability_partners")
             .select(
                 """
                 id,
@@ -699,10 +701,20 @@ async def get_blocked_partners(
 
 class PaginatedSearchResponse(BaseModel):
     users: List[PartnerSearchResult]
-    total: int
+    total: int  # Exact only with include_total; otherwise results seen so far (+1 if has_more)
     page: int
     limit: int
     has_more: bool
+    next_cursor: Optional[str] = None  # Keyset cursor for the next page (search)
+
+
+def _request_status(partnership_status: Optional[str], i_initiated: bool):
+    """(request_status, is_partner, has_pending) for a partnership status."""
+    if partnership_status == "accepted":
+        return "accepted", True, False
+    if partnership_status == "pending":
+        return ("sent" if i_initiated else "received"), False, True
+    return "none", False, False
 
 
 @router.get("/search", response_model=PaginatedSearchResponse)
@@ -711,113 +723,32 @@ async def search_users_for_partners(
     current_user: dict = Depends(get_current_user),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page (overrides page)"
+    ),
+    include_total: bool = Query(False, description="Compute the exact total"),
 ):
-    """Search users to add as accountability partners with pagination"""
+    """Search users to add as accountability partners with pagination
+
+    Ranked by the search_users RPC (exact username, prefix, then trigram
+    similarity), with partnership status joined in the same query. Blocked
+    users are not returned.
+    """
     from app.core.database import get_supabase_client
+    from app.services.user_search_service import count_search_results, search_users
 
     supabase = get_supabase_client()
     user_id = current_user["id"]
     offset = (page - 1) * limit
 
     try:
-        # Search users by name or username with pagination
-        # Only role='user' - exclude admins from partner search
-        result = (
-            supabase.table("users")
-            .select(
-                "id, name, username, profile_picture_url, last_active_at", count="exact"
-            )
-            .or_(f"name.ilike.%{query}%,username.ilike.%{query}%")
-            .neq("id", user_id)  # Exclude current user
-            .eq("status", "active")
-            .eq("role", "user")  # Only regular users, not admins
-            .not_.is_(
-                "onboarding_completed_at", "null"
-            )  # Only users who completed onboarding
-            .range(offset, offset + limit - 1)
-            .execute()
+        rows, next_cursor = search_users(
+            supabase, user_id, query, limit=limit, cursor=cursor, offset=offset
         )
-
-        total = result.count if hasattr(result, "count") and result.count else 0
-
-        if not result.data:
-            return {
-                "users": [],
-                "total": 0,
-                "page": page,
-                "limit": limit,
-                "has_more": False,
-            }
-
-        # Get existing partnerships (accepted, pending, or blocked)
-        partnerships = (
-            supabase.table("accountability_partners")
-            .select("id, user_id, partner_user_id, status, initiated_by_user_id")
-            .or_(f"user_id.eq.{user_id},partner_user_id.eq.{user_id}")
-            .in_("status", ["accepted", "pending", "blocked"])
-            .execute()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
         )
-
-        # Build lookup dicts with detailed status
-        # Key: other user's id, Value: {status, i_initiated, partnership_id}
-        partnership_info = {}
-
-        for p in partnerships.data or []:
-            other_id = p["partner_user_id"] if p["user_id"] == user_id else p["user_id"]
-            i_initiated = p["initiated_by_user_id"] == user_id
-            partnership_info[other_id] = {
-                "status": p["status"],
-                "i_initiated": i_initiated,
-                "partnership_id": p["id"],
-            }
-
-        # Build response
-        search_results = []
-        for user in result.data:
-            info = partnership_info.get(user["id"])
-
-            # Skip blocked users - don't show them at all
-            if info and info["status"] == "blocked":
-                continue
-
-            if info:
-                if info["status"] == "accepted":
-                    request_status = "accepted"
-                    is_partner = True
-                    has_pending = False
-                else:  # pending
-                    is_partner = False
-                    has_pending = True
-                    request_status = "sent" if info["i_initiated"] else "received"
-                partnership_id = info["partnership_id"]
-            else:
-                request_status = "none"
-                is_partner = False
-                has_pending = False
-                partnership_id = None
-
-            search_results.append(
-                {
-                    "id": user["id"],
-                    "name": user.get("name"),
-                    "username": user.get("username"),
-                    "profile_picture_url": user.get("profile_picture_url"),
-                    "last_active_at": user.get("last_active_at"),
-                    "is_partner": is_partner,
-                    "has_pending_request": has_pending,
-                    "request_status": request_status,
-                    "partnership_id": partnership_id,
-                }
-            )
-
-        return {
-            "users": search_results,
-            "total": total,
-            "page": page,
-            "limit": limit,
-            "has_more": offset + limit < total,
-        }
-
     except Exception as e:
         logger.error(
             f"Failed to search users for user {user_id}: {str(e)}",
@@ -828,6 +759,48 @@ async def search_users_for_partners(
             detail=f"Failed to search users: {str(e)}",
         )
 
+    search_results = []
+    for user in rows:
+        request_status, is_partner, has_pending = _request_status(
+            user.get("partnership_status"),
+            user.get("initiated_by_user_id") == user_id,
+        )
+        search_results.append(
+            {
+                "id": user["id"],
+                "name": user.get("name"),
+                "username": user.get("username"),
+                "profile_picture_url": user.get("profile_picture_url"),
+                "last_active_at": user.get("last_active_at"),
+                "is_partner": is_partner,
+                "has_pending_request": has_pending,
+                "request_status": request_status,
+                "partnership_id": user.get("partnership_id"),
+            }
+        )
+
+    has_more = next_cursor is not None
+    if include_total:
+        try:
+            total = count_search_results(supabase, user_id, query)
+        except Exception as e:
+            logger.warning(
+                f"Failed to count search results for user {user_id}: {str(e)}",
+                {"error": str(e), "user_id": user_id, "query": query},
+            )
+            include_total = False
+    if not include_total:
+        total = offset + len(search_results) + (1 if has_more else 0)
+
+    return {
+        "users": search_results,
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+    }
+
 
 @router.get("/suggested", response_model=PaginatedSearchResponse)
 async def get_suggested_partners(
@@ -843,6 +816,9 @@ async def get_suggested_partners(
     - Similar timezone (within 3 hours) - 25% weight
     - Similar streak level (beginner with beginner) - 10% weight
 
+    Ranks all eligible users (not a sample) from precomputed matching vectors;
+    see app/services/partner_match_index.py.
+
     Returns users sorted by match score with match reasons.
     """
     from app.core.database import get_supabase_client
@@ -869,24 +845,17 @@ async def get_suggested_partners(
             .select("id, title, frequency_type, current_streak")
             .eq("user_id", user_id)
             .eq("status", "active")
+            .order("created_at")
             .execute()
         )
 
-        user_goal_titles = [g["title"] for g in user_goals_result.data or []]
-        user_frequencies = list(
-            set(g.get("frequency_type", "daily") for g in user_goals_result.data or [])
-        )
-        user_max_streak = max(
-            (g.get("current_streak", 0) or 0 for g in user_goals_result.data or []),
-            default=0,
-        )
+        user_goals = user_goals_result.data or []
+        user_goal_titles = [g["title"] for g in user_goals]
 
-        user_data = {
-            "goal_titles": user_goal_titles,
-            "frequencies": user_frequencies,
-            "timezone": user_timezone,
-            "max_streak": user_max_streak,
-        }
+        # The user's own vector is built live so their latest goals count immediately
+        user_vector = build_match_vector(
+            {"id": user_id, "timezone": user_timezone}, user_goals
+        )
 
         # 2. Get existing partnerships and pending requests to exclude
         # Also exclude blocked users - they should never appear in suggestions
@@ -903,114 +872,47 @@ async def get_suggested_partners(
             exclude_ids.add(p["user_id"])
             exclude_ids.add(p["partner_user_id"])
 
-        exclude_list = list(exclude_ids)
-
-        # 3. Get candidate users with their goals (batch query)
-        # We fetch more than needed to allow for scoring and filtering
-        fetch_limit = min(limit * 5, 100)  # Fetch up to 5x or 100 candidates
-
-        # Only role='user' - exclude admins from partner suggestions
-        users_query = (
-            supabase.table("users")
-            .select("id, name, username, profile_picture_url, timezone, last_active_at")
-            .eq("status", "active")
-            .eq("role", "user")
-            .not_.is_(
-                "onboarding_completed_at", "null"
-            )  # Only users who completed onboarding
+        # 3. Rank every eligible user from the partner matching index (in a
+        # thread: the first load and change pulls are blocking Supabase calls)
+        offset = (page - 1) * limit
+        total, ranked = await asyncio.to_thread(
+            partner_match_index.rank,
+            user_vector,
+            exclude_ids,
+            offset,
+            limit,
+            supabase=supabase,
         )
 
-        if exclude_list:
-            exclude_str = f"({','.join(exclude_list)})"
-            users_query = users_query.filter("id", "not.in", exclude_str)
-
-        users_result = users_query.limit(fetch_limit).execute()
-
-        if not users_result.data:
+        if not ranked:
             return {
                 "users": [],
-                "total": 0,
+                "total": total,
                 "page": page,
                 "limit": limit,
-                "has_more": False,
+                "has_more": offset + limit < total,
             }
 
-        # 4. Batch fetch goals for all candidates
-        candidate_ids = [u["id"] for u in users_result.data]
-
-        goals_result = (
-            supabase.table("goals")
-            .select("user_id, title, frequency_type, current_streak")
-            .in_("user_id", candidate_ids)
+        # 4. Fetch display fields for this page only
+        ranked_ids = [cand_id for cand_id, _ in ranked]
+        users_result = (
+            supabase.table("users")
+            .select("id, name, username, profile_picture_url, last_active_at")
+            .in_("id", ranked_ids)
             .eq("status", "active")
             .execute()
         )
+        users_by_id = {u["id"]: u for u in users_result.data or []}
 
-        # Group goals by user_id
-        goals_by_user: Dict[str, List[Dict]] = {}
-        for goal in goals_result.data or []:
-            uid = goal["user_id"]
-            if uid not in goals_by_user:
-                goals_by_user[uid] = []
-            goals_by_user[uid].append(goal)
-
-        # 5. Score each candidate
-        scored_candidates = []
-
-        for candidate in users_result.data:
-            cand_id = candidate["id"]
-            cand_goals = goals_by_user.get(cand_id, [])
-
-            # Skip users with no active goals (nothing to match on)
-            if not cand_goals:
+        # 5. Build response in rank order
+        users = []
+        for cand_id, match_score in ranked:
+            user = users_by_id.get(cand_id)
+            candidate_vector = partner_match_index.get_vector(cand_id)
+            # Deactivated/deleted since the index was loaded
+            if not user or not candidate_vector:
                 continue
 
-            cand_goal_titles = [g["title"] for g in cand_goals]
-            cand_frequencies = list(
-                set(g.get("frequency_type", "daily") for g in cand_goals)
-            )
-            cand_max_streak = max(
-                (g.get("current_streak", 0) or 0 for g in cand_goals), default=0
-            )
-
-            candidate_data = {
-                "goal_titles": cand_goal_titles,
-                "frequencies": cand_frequencies,
-                "timezone": candidate.get("timezone", "UTC"),
-                "max_streak": cand_max_streak,
-            }
-
-            # Calculate match score
-            match_score, match_reasons = calculate_partner_match_score(
-                user_data, candidate_data
-            )
-
-            # Find matched goal titles (for display)
-            matched_goals = find_matched_goal_titles(
-                user_goal_titles, cand_goal_titles, threshold=70, max_results=3
-            )
-
-            scored_candidates.append(
-                {
-                    "user": candidate,
-                    "match_score": match_score,
-                    "match_reasons": match_reasons,
-                    "matched_goals": matched_goals,
-                }
-            )
-
-        # 6. Sort by match score (descending)
-        scored_candidates.sort(key=lambda x: x["match_score"], reverse=True)
-
-        # 7. Paginate
-        total = len(scored_candidates)
-        offset = (page - 1) * limit
-        paginated = scored_candidates[offset : offset + limit]
-
-        # 8. Build response
-        users = []
-        for item in paginated:
-            user = item["user"]
             users.append(
                 {
                     "id": user["id"],
@@ -1022,9 +924,14 @@ async def get_suggested_partners(
                     "has_pending_request": False,
                     "request_status": "none",
                     "partnership_id": None,
-                    "match_score": item["match_score"],
-                    "match_reasons": item["match_reasons"],
-                    "matched_goals": item["matched_goals"],
+                    "match_score": match_score,
+                    "match_reasons": match_reasons(user_vector, candidate_vector),
+                    "matched_goals": find_matched_goal_titles(
+                        user_goal_titles,
+                        candidate_vector["goal_titles"],
+                        threshold=70,
+                        max_results=3,
+                    ),
                 }
             )
 
@@ -1186,6 +1093,7 @@ async def send_partner_request(
 
         row = result.data[0]
         partner_info = partner.data
+        invalidate_user_search_cache(user_id, partner_user_id)
 
         logger.info(
             f"Partner request sent from {user_id} to {partner_user_id}",
@@ -1296,6 +1204,9 @@ async def accept_partner_request(
                 supabase.table("accountability_partners").delete().eq(
                     "id", partnership_id
                 ).execute()
+                invalidate_user_search_cache(
+                    partnership.data["user_id"], partnership.data["partner_user_id"]
+                )
 
                 logger.info(
                     f"Partner request {partnership_id} auto-expired - sender {sender_id} at limit",
@@ -1319,6 +1230,9 @@ async def accept_partner_request(
             .eq("id", partnership_id)
             .execute()
         )
+        invalidate_user_search_cache(
+            partnership.data["user_id"], partnership.data["partner_user_id"]
+        )
 
         logger.info(
             f"Partner request {partnership_id} accepted by {user_id}",
@@ -1415,6 +1329,9 @@ async def reject_partner_request(
         supabase.table("accountability_partners").delete().eq(
             "id", partnership_id
         ).execute()
+        invalidate_user_search_cache(
+            partnership.data["user_id"], partnership.data["partner_user_id"]
+        )
 
         # Fire-and-forget: cleanup partner_request notifications
         from app.services.cleanup_service import fire_and_forget_partner_cleanup
@@ -1474,6 +1391,9 @@ async def cancel_partner_request(
         supabase.table("accountability_partners").delete().eq(
             "id", partnership_id
         ).execute()
+        invalidate_user_search_cache(
+            partnership.data["user_id"], partnership.data["partner_user_id"]
+        )
 
         # Fire-and-forget: cleanup partner_request notifications
         from app.services.cleanup_service import fire_and_forget_partner_cleanup
@@ -1542,6 +1462,9 @@ async def remove_partner(
         supabase.table("accountability_partners").delete().eq(
             "id", partnership_id
         ).execute()
+        invalidate_user_search_cache(
+            partnership.data["user_id"], partnership.data["partner_user_id"]
+        )
 
         # Fire-and-forget: cleanup notifications (pass nudge_ids since they're now deleted)
         from app.services.cleanup_service import fire_and_forget_partner_cleanup
@@ -1881,6 +1804,9 @@ async def block_partner(
                 "updated_at": datetime.utcnow().isoformat(),
             }
         ).eq("id", partnership_id).execute()
+        invalidate_user_search_cache(
+            partnership.data["user_id"], partnership.data["partner_user_id"]
+        )
 
         # Fire-and-forget: cleanup notifications and social_nudges between users
         from app.services.cleanup_service import fire_and_forget_partner_cleanup
@@ -1944,6 +1870,9 @@ async def unblock_partner(
         supabase.table("accountability_partners").delete().eq(
             "id", partnership_id
         ).execute()
+        invalidate_user_search_cache(
+            partnership.data["user_id"], partnership.data["partner_user_id"]
+        )
 
         logger.info(
             f"Partner unblocked (deleted): {partnership_id} by {user_id}",
@@ -1998,6 +1927,7 @@ def _block_partner_if_exists(supabase, blocker_id: str, user_id: str) -> bool:
                 "updated_at": datetime.utcnow().isoformat(),
             }
         ).eq("id", partnership_id).execute()
+        invalidate_user_search_cache(blocker_id, user_id)
 
         # Fire-and-forget: cleanup notifications and social_nudges
         fire_and_forget_partner_cleanup(partnership_id, reason="blocked")
@@ -15,6 +15,8 @@ from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 from app.core.flexible_auth import get_current_user
+from app.core.entitlements import invalidate_entitlements
+from app.core.user_cache import invalidate_user_cache
 
 router = APIRouter(
     redirect_slashes=False
@@ -91,9 +93,8 @@ async def get_available_features(current_user: dict = Depends(get_current_user))
     supabase = get_supabase_client()
 
     # Use centralized helper to get plan and features based on tier inheritance
-    user_plan = current_user.get("plan")
     features_data = get_user_features_by_tier(
-        user_id=current_user["id"], user_plan=user_plan, supabase=supabase
+        user_id=current_user["id"], supabase=supabase
     )
 
     # Transform features to a more usable format
@@ -267,9 +268,11 @@ async def sync_subscription(
             supabase.table("users").update({"plan": revenuecat_plan}).eq(
                 "id", user_id
             ).execute()
+            invalidate_user_cache(user_id)
             logger.info(
                 f"[Sync] Updated user plan {user_id}: {current_db_plan} -> {revenuecat_plan}"
             )
+        invalidate_entitlements(user_id)
 
         return {
             "synced": True,
@@ -306,6 +309,8 @@ async def sync_subscription(
                 ).eq("user_id", user_id).execute()
 
             supabase.table("users").update({"plan": "free"}).eq("id", user_id).execute()
+            invalidate_user_cache(user_id)
+            invalidate_entitlements(user_id)
 
             # Reset AI Coach daily usage for today so they get a fresh free limit (same day)
             from app.services.subscription_service import (
@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, date
 from app.core.flexible_auth import get_current_user
+from app.core.user_cache import invalidate_user_cache
 
 router = APIRouter(
     redirect_slashes=False
@@ -98,15 +99,11 @@ async def get_my_profile(current_user: dict = Depends(get_current_user)):
     if primary_provider and primary_provider not in linked_providers:
         linked_providers.append(primary_provider)
 
-    # Compute has_password
-    password_hash = current_user.get("password_hash")
-    has_password = password_hash is not None and len(str(password_hash)) > 0
-
-    # Build response with computed fields
+    # has_password is computed by the auth user cache (password_hash is not cached)
     return {
         **current_user,
         "linked_providers": linked_providers,
-        "has_password": has_password,
+        "has_password": bool(current_user.get("has_password")),
     }
 
 
@@ -284,6 +281,7 @@ async def update_profile(
             .eq("id", current_user["id"])
             .execute()
         )
+        invalidate_user_cache(current_user["id"])
         return result.data[0]
 
     return current_user
@@ -293,7 +291,7 @@ async def update_profile(
 async def delete_account(current_user: dict = Depends(get_current_user)):
     """Delete user account from public.users, auth.users, and RevenueCat.
 
-    Order: RevenueCat (GDPR) -> public.users (cascade) -> auth.users.
+    Order: RevenueCat (GDPR) -> public.users (cascade) -> auth.users -> R2 media.
     Does NOT cancel Apple/Google subscriptions - user must cancel in store.
     """
     from app.core.database import get_supabase_client
@@ -311,6 +309,7 @@ async def delete_account(current_user: dict = Depends(get_current_user)):
 
     # Step 2: Delete from public.users FIRST (cascade deletes all related data)
     supabase.table("users").delete().eq("id", user_id).execute()
+    invalidate_user_cache(user_id)
     logger.info(f"Deleted user {user_id} from public.users (cascade handled related data)")
 
     # Step 3: Delete from auth.users (for Supabase Auth/Realtime cleanup)
@@ -320,6 +319,15 @@ async def delete_account(current_user: dict = Depends(get_current_user)):
     except Exception as e:
         logger.warning(f"Failed to delete user {user_id} from auth.users: {e}")
 
+    # Step 4: Delete the user's voice notes and media from R2 (one task that
+    # deletes by prefix in 1000-key batches)
+    try:
+        from app.services.tasks import purge_user_media_task
+
+        purge_user_media_task.delay(user_id=user_id)
+    except Exception as e:
+        logger.warning(f"Failed to queue R2 media purge for user {user_id}: {e}")
+
     return {"message": "Account deleted successfully"}
 
 
@@ -417,6 +425,7 @@ async def upload_profile_picture(
         .eq("id", current_user["id"])
         .execute()
     )
+    invalidate_user_cache(current_user["id"])
 
     return {"message": "Profile picture updated successfully", "url": file_url}
 
@@ -438,23 +447,32 @@ async def search_users(
     Excludes the current user from results.
     """
     from app.core.database import get_supabase_client
+    from app.services.user_search_service import search_users as run_user_search
 
     supabase = get_supabase_client()
 
-    # Search by username (case-insensitive partial match)
-    result = (
-        supabase.table("users")
-        .select("id, username, name, profile_picture_url")
-        .ilike("username", f"%{q}%")
-        .neq("id", current_user["id"])  # Exclude current user
-        .eq("status", "active")
-        .limit(limit)
-        .execute()
+    # Ranked username match (trigram index); excludes the current user
+    rows, _ = run_user_search(
+        supabase,
+        current_user["id"],
+        q,
+        limit=limit,
+        partners_only=False,
+        username_only=True,
     )
+    users = [
+        {
+            "id": row["id"],
+            "username": row.get("username"),
+            "name": row.get("name"),
+            "profile_picture_url": row.get("profile_picture_url"),
+        }
+        for row in rows
+    ]
 
     return {
-        "users": result.data if result.data else [],
-        "count": len(result.data or []),
+        "users": users,
+        "count": len(users),
     }
 
 
@@ -494,6 +512,7 @@ async def get_my_referral_code(current_user: dict = Depends(get_current_user)):
         supabase.table("users").update({"referral_code": referral_code}).eq(
             "id", current_user["id"]
         ).execute()
+        invalidate_user_cache(current_user["id"])
 
     return {
         "referral_code": referral_code,
@@ -38,6 +38,9 @@ import os
 import json
 import logging
 
+from app.core.entitlements import invalidate_entitlements
+from app.core.user_cache import invalidate_user_cache
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(redirect_slashes=False)
@@ -511,6 +514,8 @@ async def handle_subscription_active(supabase, event: RevenueCatEvent, user_id:
 
     # Update user's plan
     supabase.table("users").update({"plan": plan}).eq("id", user_id).execute()
+    invalidate_user_cache(user_id)
+    invalidate_entitlements(user_id)
 
     # Reset AI Coach daily usage on INITIAL_PURCHASE and RENEWAL (fresh slate for new period)
     if event.type in ["INITIAL_PURCHASE", "RENEWAL"]:
@@ -556,6 +561,7 @@ async def handle_subscription_cancelled(supabase, event: RevenueCatEvent, user_i
             "updated_at": datetime.utcnow().isoformat(),
         }
     ).eq("user_id", user_id).execute()
+    invalidate_entitlements(user_id)
 
     logger.info(
         f"Subscription cancelled for user {user_id} (still active until expiry)"
@@ -595,6 +601,8 @@ async def handle_subscription_expired(supabase, event: RevenueCatEvent, user_id:
 
     # Downgrade user to free plan
     supabase.table("users").update({"plan": "free"}).eq("id", user_id).execute()
+    invalidate_user_cache(user_id)
+    invalidate_entitlements(user_id)
 
     # Reset AI Coach daily usage for today so they get a fresh free limit (same day)
     await reset_ai_coach_daily_usage_on_downgrade(supabase, user_id)
@@ -673,6 +681,7 @@ async def handle_billing_issue(supabase, event: RevenueCatEvent, user_id: str):
         logger.warning(f"Billing issue for user {user_id}, no grace period info")
 
     supabase.table("subscriptions").update(update_data).eq("user_id", user_id).execute()
+    invalidate_entitlements(user_id)
 
     # Send push notification about billing issue
     try:
@@ -755,6 +764,8 @@ async def handle_product_change(supabase, event: RevenueCatEvent, user_id: str):
 
     # Update user's plan
     supabase.table("users").update({"plan": new_plan}).eq("id", user_id).execute()
+    invalidate_user_cache(user_id)
+    invalidate_entitlements(user_id)
 
     logger.info(f"Plan changed for user {user_id} from {previous_plan} to {new_plan}")
 
@@ -795,6 +806,8 @@ async def handle_subscription_transfer(supabase, event: RevenueCatEvent, user_id
 
         # Downgrade old user to free and handle deactivations
         supabase.table("users").update({"plan": "free"}).eq("id", old_user_id).execute()
+        invalidate_user_cache(old_user_id)
+        invalidate_entitlements(old_user_id)
 
         from app.services.subscription_service import (
             handle_subscription_expiry_deactivation,
@@ -879,6 +892,8 @@ async def handle_non_renewing_purchase(supabase, event: RevenueCatEvent, user_id
 
     # Update user's plan
     supabase.table("users").update({"plan": plan}).eq("id", user_id).execute()
+    invalidate_user_cache(user_id)
+    invalidate_entitlements(user_id)
 
     # Grant referral bonus on non-renewing purchase (lifetime, one-time)
     await process_referral_bonus_on_subscription(supabase, user_id)
@@ -918,6 +933,7 @@ async def handle_subscription_extended(supabase, event: RevenueCatEvent, user_id
         .eq("user_id", user_id)
         .execute()
     )
+    invalidate_entitlements(user_id)
 
     if result.data:
         logger.info(
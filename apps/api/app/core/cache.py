@@ -1,4 +1,5 @@
 import redis
+import redis.asyncio as aioredis
 from typing import Any, Optional
 
 from app.core.config import settings
@@ -40,6 +41,22 @@ class DummyRedis:
     def srem(self, *args: Any, **kwargs: Any) -> None:
         return None
 
+    def mget(self, keys, *args: Any, **kwargs: Any):
+        return [None] * len(keys)
+
+    def hgetall(self, *args: Any, **kwargs: Any):
+        return {}
+
+    def renamenx(self, *args: Any, **kwargs: Any) -> bool:
+        return False
+
+    def pipeline(self, *args: Any, **kwargs: Any) -> "DummyRedis":
+        # Commands queued on the "pipeline" are no-ops; execute returns nothing
+        return self
+
+    def execute(self, *args: Any, **kwargs: Any) -> list:
+        return []
+
     def ping(self, *args: Any, **kwargs: Any) -> None:
         return None
 
@@ -74,3 +91,41 @@ def get_redis_client() -> Optional[redis.Redis]:
         _redis_client = DummyRedis()  # type: ignore[assignment]
 
     return _redis_client
+
+
+_async_redis_client: Optional[aioredis.Redis] = None
+
+
+def get_async_redis_client() -> Optional[aioredis.Redis]:
+    """
+    Lazily create and return the shared asyncio Redis client (connection pool
+    per worker). Unlike get_redis_client() this does not ping on creation;
+    callers must handle connection errors themselves (e.g. fall back locally).
+    """
+
+    global _async_redis_client
+
+    if _async_redis_client is not None:
+        return _async_redis_client
+
+    redis_url = settings.redis_connection_url
+    if not redis_url:
+        return None
+
+    _async_redis_client = aioredis.from_url(
+        redis_url,
+        max_connections=settings.REDIS_ASYNC_MAX_CONNECTIONS,
+        socket_timeout=settings.REDIS_ASYNC_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_ASYNC_SOCKET_TIMEOUT,
+    )
+    return _async_redis_client
+
+
+async def close_async_redis_client() -> None:
+    """Close the asyncio Redis pool (called on app shutdown)."""
+    global _async_redis_client
+    if _async_redis_client is not None:
+        try:
+            await _async_redis_client.aclose()
+        finally:
+            _async_redis_client = None
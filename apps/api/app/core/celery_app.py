@@ -81,6 +81,12 @@ celery_app.conf.update(
             # Marks pending check-ins as 'missed' when their day has passed
             # Uses PostgreSQL batch function - O(1) performance
         },
+        "pregenerate-ai-motivations": {
+            "task": "pregenerate_ai_motivations",
+            "schedule": 60.0 * 5.0,  # Run EVERY 5 MINUTES
+            # Writes AI push copy for reminder slots due in the next 10-30 minutes
+            # (Redis, per goal/slot/date) so the minute tick below only looks it up
+        },
         "send-scheduled-ai-motivations": {
             "task": "send_scheduled_ai_motivations",
             "schedule": 60.0,  # Run EVERY MINUTE to match reminder times
@@ -133,10 +139,10 @@ celery_app.conf.update(
         # REMOVED: "detect-patterns" weekly batch task
         # Pattern insights now generate on-demand after each check-in (more cost-effective)
         # See: generate_goal_insights_task triggered in checkins.py create_check_in endpoint
-        "refresh-analytics-views": {
-            "task": "refresh_analytics_views",
-            "schedule": crontab(minute=0),  # Top of every hour
-        },
+        # REMOVED: "refresh-analytics-views" hourly task
+        # get_analytics_dashboard reads daily_checkin_summaries / goal_weekly_summaries,
+        # which triggers keep current (migration 043). Run refresh_analytics_views manually
+        # from the admin portal if the analytics.* views are needed.
         "prewarm-analytics-cache": {
             "task": "prewarm_analytics_cache_task",
             "schedule": crontab(minute=0, hour="0,8,16"),  # Every 8 hours (midnight, 8am, 4pm UTC)
@@ -239,6 +245,40 @@ celery_app.conf.update(
             "schedule": crontab(hour=4, minute=0, day_of_week=0),  # Sunday 4am UTC
             # Deletes task_audit_log records older than 30 days
         },
+        # Activity tracking (write-behind)
+        "flush-user-activity": {
+            "task": "flush_user_activity",
+            "schedule": 60.0,  # Run EVERY MINUTE
+            # Applies activity recorded in Redis by the API (UserActivityStage)
+            # to users.last_active_at with one bulk RPC per 1000 users
+        },
+        # Media storage (batched R2 deletion)
+        "flush-r2-deletions": {
+            "task": "flush_r2_deletions",
+            "schedule": 60.0,  # Run EVERY MINUTE
+            # Deletes R2 keys queued in Redis by the API, 1000 per DeleteObjects
+        },
+        "sweep-orphaned-media-objects": {
+            "task": "sweep_orphaned_media_objects",
+            "schedule": crontab(minute=15),  # Every hour at :15
+            # Deletes content-addressed voice notes no check-in references
+        },
+        "sweep-voice-note-uploads": {
+            "task": "sweep_voice_note_uploads",
+            "schedule": crontab(minute=45),  # Every hour at :45
+            # Deletes abandoned direct uploads, fails stuck voice note processing
+        },
+        # Partner matching vectors (GET /partners/suggested)
+        "refresh-partner-match-vectors": {
+            "task": "refresh_partner_match_vectors",
+            "schedule": 60.0,  # Run EVERY MINUTE
+            # Rebuilds vectors of users whose goals/profile changed (dirty queue)
+        },
+        "requeue-partner-match-vectors": {
+            "task": "requeue_partner_match_vectors",
+            "schedule": crontab(hour=5, minute=0, day_of_week=0),  # Sunday 5am UTC
+            # Rebuilds every vector so stored UTC offsets follow DST
+        },
     },
 )
 
@@ -30,9 +30,15 @@ class Settings(BaseSettings):
     DEBUG: bool = os.getenv("DEBUG", "true").lower() == "true"
 
     # Uvicorn workers: used when ENVIRONMENT != "development" (reload and workers are mutually exclusive).
-    # Multiple workers ensure sync Supabase/DB work in one request doesn't block others—no per-route changes.
+    # Multiple workers ensure sync Supabase/DB work in one request doesn't block others. Hot endpoints
+    # (auth, home, check-ins, goals, partners) use the async PostgREST client and don't block the loop.
     UVICORN_WORKERS: int = int(os.getenv("UVICORN_WORKERS", "4"))
 
+    # Security pipeline: expose per-stage timings as a Server-Timing response header
+    SECURITY_PIPELINE_SERVER_TIMING: bool = (
+        os.getenv("SECURITY_PIPELINE_SERVER_TIMING", "false").lower() == "true"
+    )
+
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
@@ -46,6 +52,15 @@ class Settings(BaseSettings):
     DATABASE_POOL_MIN_SIZE: int = int(os.getenv("DATABASE_POOL_MIN_SIZE", "2"))
     DATABASE_POOL_MAX_SIZE: int = int(os.getenv("DATABASE_POOL_MAX_SIZE", "10"))
 
+    # Async PostgREST client (per worker, HTTP/2 multiplexed; see get_async_supabase_client)
+    SUPABASE_ASYNC_MAX_CONNECTIONS: int = int(
+        os.getenv("SUPABASE_ASYNC_MAX_CONNECTIONS", "50")
+    )
+    SUPABASE_ASYNC_MAX_KEEPALIVE: int = int(
+        os.getenv("SUPABASE_ASYNC_MAX_KEEPALIVE", "20")
+    )
+    SUPABASE_ASYNC_TIMEOUT: float = float(os.getenv("SUPABASE_ASYNC_TIMEOUT", "30"))
+
     # JWT - Use Supabase JWT secret for compatibility with Supabase Realtime
     # Get your SUPABASE_JWT_SECRET from: Supabase Dashboard → Settings → API → JWT Secret
     SECRET_KEY: str = os.getenv("SUPABASE_JWT_SECRET", os.getenv("SECRET_KEY", ""))
@@ -70,12 +85,53 @@ class Settings(BaseSettings):
     # AI Services
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     ELEVENLABS_API_KEY: str = os.getenv("ELEVENLABS_API_KEY", "")
+
+    # Shared OpenAI clients (see app/core/openai_client.py). OPENAI_BASE_URL points
+    # the SDK elsewhere, e.g. scripts/bench_openai_client.py's local stub server.
+    OPENAI_BASE_URL: Optional[str] = os.getenv("OPENAI_BASE_URL") or None
+    OPENAI_TIMEOUT_SECONDS: float = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "60"))
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = float(
+        os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "5")
+    )
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+    OPENAI_MAX_KEEPALIVE: int = int(os.getenv("OPENAI_MAX_KEEPALIVE", "20"))
+    # SDK default is 5s, which drops the TLS connection between most calls
+    OPENAI_KEEPALIVE_EXPIRY_SECONDS: float = float(
+        os.getenv("OPENAI_KEEPALIVE_EXPIRY_SECONDS", "60")
+    )
+    # In-flight requests per model per process ("default" covers unlisted models),
+    # and how long a call waits for a slot before giving up
+    OPENAI_MODEL_CONCURRENCY: str = os.getenv(
+        "OPENAI_MODEL_CONCURRENCY", "default=16,whisper-1=4"
+    )
+    OPENAI_SLOT_TIMEOUT_SECONDS: float = float(
+        os.getenv("OPENAI_SLOT_TIMEOUT_SECONDS", "30")
+    )
+
     AI_COACH_STREAMING_ENABLED: bool = (
         os.getenv("AI_COACH_STREAMING_ENABLED", "true").lower() == "true"
     )
     AI_COACH_STREAM_VIA_REDIS: bool = (
         os.getenv("AI_COACH_STREAM_VIA_REDIS", "false").lower() == "true"
     )
+    # SSE (GET /ai-coach/stream): keepalive comment interval, and events buffered
+    # per client before older chunks are dropped (chunks carry the full text so far)
+    AI_COACH_SSE_HEARTBEAT_SECONDS: float = float(
+        os.getenv("AI_COACH_SSE_HEARTBEAT_SECONDS", "15")
+    )
+    AI_COACH_STREAM_QUEUE_SIZE: int = int(os.getenv("AI_COACH_STREAM_QUEUE_SIZE", "32"))
+
+    # AI push reminder copy is generated ahead of time by pregenerate_ai_motivations
+    # for slots due within this window (minutes), with at most this many OpenAI
+    # calls in flight; send_scheduled_ai_motivations only looks it up
+    AI_PUSH_PREGEN_MIN_LEAD_MINUTES: int = int(
+        os.getenv("AI_PUSH_PREGEN_MIN_LEAD_MINUTES", "10")
+    )
+    AI_PUSH_PREGEN_MAX_LEAD_MINUTES: int = int(
+        os.getenv("AI_PUSH_PREGEN_MAX_LEAD_MINUTES", "30")
+    )
+    AI_PUSH_PREGEN_CONCURRENCY: int = int(os.getenv("AI_PUSH_PREGEN_CONCURRENCY", "8"))
 
     # Redis Configuration
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
@@ -87,6 +143,61 @@ class Settings(BaseSettings):
     # Legacy support: If REDIS_URL is provided, use it (for backward compatibility)
     REDIS_URL: Optional[str] = os.getenv("REDIS_URL", None)
 
+    # Async Redis pool (per worker), used on the request path (e.g. rate limiting).
+    # Short timeouts so a Redis blip degrades to local fallbacks instead of stalling requests.
+    REDIS_ASYNC_MAX_CONNECTIONS: int = int(os.getenv("REDIS_ASYNC_MAX_CONNECTIONS", "50"))
+    REDIS_ASYNC_SOCKET_TIMEOUT: float = float(
+        os.getenv("REDIS_ASYNC_SOCKET_TIMEOUT", "0.25")
+    )
+
+    # Authenticated-user cache (see app/core/user_cache.py).
+    # Local TTL bounds how long a worker can serve a stale user after invalidation
+    # (e.g. admin suspend), so keep it to a few seconds.
+    AUTH_USER_CACHE_LOCAL_TTL_SECONDS: float = float(
+        os.getenv("AUTH_USER_CACHE_LOCAL_TTL_SECONDS", "5")
+    )
+    AUTH_USER_CACHE_LOCAL_MAX_SIZE: int = int(
+        os.getenv("AUTH_USER_CACHE_LOCAL_MAX_SIZE", "10000")
+    )
+    AUTH_USER_CACHE_REDIS_TTL_SECONDS: int = int(
+        os.getenv("AUTH_USER_CACHE_REDIS_TTL_SECONDS", "300")
+    )
+
+    # Entitlement resolver (see app/core/entitlements.py): per-user effective plan
+    # cache and the in-memory plan catalogue (plan tiers + plan_features)
+    ENTITLEMENTS_LOCAL_TTL_SECONDS: float = float(
+        os.getenv("ENTITLEMENTS_LOCAL_TTL_SECONDS", "5")
+    )
+    ENTITLEMENTS_LOCAL_MAX_SIZE: int = int(
+        os.getenv("ENTITLEMENTS_LOCAL_MAX_SIZE", "10000")
+    )
+    ENTITLEMENTS_REDIS_TTL_SECONDS: int = int(
+        os.getenv("ENTITLEMENTS_REDIS_TTL_SECONDS", "300")
+    )
+    ENTITLEMENTS_CATALOGUE_TTL_SECONDS: float = float(
+        os.getenv("ENTITLEMENTS_CATALOGUE_TTL_SECONDS", "300")
+    )
+
+    # Partner matching index (see app/services/partner_match_index.py): how often
+    # each worker pulls changed vectors, and how often it reloads them all
+    PARTNER_MATCH_INDEX_REFRESH_SECONDS: float = float(
+        os.getenv("PARTNER_MATCH_INDEX_REFRESH_SECONDS", "30")
+    )
+    PARTNER_MATCH_INDEX_REBUILD_SECONDS: float = float(
+        os.getenv("PARTNER_MATCH_INDEX_REBUILD_SECONDS", "3600")
+    )
+
+    # Achievement types held in memory per process (app/services/achievement_service.py)
+    ACHIEVEMENT_CATALOGUE_TTL_SECONDS: float = float(
+        os.getenv("ACHIEVEMENT_CATALOGUE_TTL_SECONDS", "300")
+    )
+
+    # User search (see app/services/user_search_service.py): Redis TTL for
+    # result pages (partnership writes in the partners endpoints invalidate it).
+    USER_SEARCH_CACHE_TTL_SECONDS: int = int(
+        os.getenv("USER_SEARCH_CACHE_TTL_SECONDS", "30")
+    )
+
     # Task audit log: days to retain failure records before cleanup
     TASK_AUDIT_LOG_RETENTION_DAYS: int = int(
         os.getenv("TASK_AUDIT_LOG_RETENTION_DAYS", "30")
@@ -145,6 +256,45 @@ class Settings(BaseSettings):
     def CLOUDFLARE_R2_PUBLIC_URL(self) -> str:
         return self.CLOUDFLARE_PUBLIC_URL
 
+    # Shared R2 client (app/core/r2_client.py); the pool should cover
+    # MEDIA_IO_WORKERS so uploads never wait for a connection
+    R2_MAX_POOL_CONNECTIONS: int = int(os.getenv("R2_MAX_POOL_CONNECTIONS", "32"))
+    R2_CONNECT_TIMEOUT_SECONDS: float = float(
+        os.getenv("R2_CONNECT_TIMEOUT_SECONDS", "5")
+    )
+    R2_READ_TIMEOUT_SECONDS: float = float(os.getenv("R2_READ_TIMEOUT_SECONDS", "60"))
+    R2_MAX_ATTEMPTS: int = int(os.getenv("R2_MAX_ATTEMPTS", "3"))
+    # Queued R2 deletions (app/core/r2_deletions.py): flush attempts per key
+    # before it is dropped and logged
+    R2_DELETE_MAX_ATTEMPTS: int = int(os.getenv("R2_DELETE_MAX_ATTEMPTS", "5"))
+
+    # Content-addressed voice notes (media_objects): minutes an object must be
+    # unreferenced and untouched before the sweep deletes it
+    MEDIA_OBJECT_ORPHAN_GRACE_MINUTES: int = int(
+        os.getenv("MEDIA_OBJECT_ORPHAN_GRACE_MINUTES", "60")
+    )
+
+    # Direct voice note uploads (app/services/voice_note_uploads.py): lifetime
+    # of the presigned PUT URL, minutes a check-in may stay "processing" before
+    # the sweep marks it failed, and hours before unclaimed uploads are deleted
+    VOICE_NOTE_UPLOAD_URL_TTL_SECONDS: int = int(
+        os.getenv("VOICE_NOTE_UPLOAD_URL_TTL_SECONDS", "600")
+    )
+    VOICE_NOTE_PROCESSING_TIMEOUT_MINUTES: int = int(
+        os.getenv("VOICE_NOTE_PROCESSING_TIMEOUT_MINUTES", "30")
+    )
+    VOICE_NOTE_STAGING_MAX_AGE_HOURS: int = int(
+        os.getenv("VOICE_NOTE_STAGING_MAX_AGE_HOURS", "24")
+    )
+
+    # Media upload processing (app/services/media_executor.py)
+    # Threads for blocking I/O: ffprobe, clamscan, R2 uploads
+    MEDIA_IO_WORKERS: int = int(os.getenv("MEDIA_IO_WORKERS", "16"))
+    # Processes for CPU-bound validation (libmagic, PIL); 0 = use the I/O threads
+    MEDIA_CPU_WORKERS: int = int(os.getenv("MEDIA_CPU_WORKERS", "2"))
+    # Files one user can have in processing at once (upload-multiple)
+    MEDIA_UPLOADS_PER_USER: int = int(os.getenv("MEDIA_UPLOADS_PER_USER", "3"))
+
     # Apple OAuth
     APPLE_CLIENT_IDS: str = os.getenv("APPLE_CLIENT_IDS", "")
     APPLE_CLIENT_SECRET: str = os.getenv("APPLE_CLIENT_SECRET", "")
@@ -163,6 +313,14 @@ class Settings(BaseSettings):
     ACTIVITYKIT_APNS_USE_SANDBOX: bool = (
         os.getenv("ACTIVITYKIT_APNS_USE_SANDBOX", "false").lower() == "true"
     )
+    # One HTTP/2 connection per worker event loop (app/services/live_activity_service.py):
+    # pushes in flight on it, and how long it stays open between pushes
+    ACTIVITYKIT_APNS_MAX_CONCURRENT_STREAMS: int = int(
+        os.getenv("ACTIVITYKIT_APNS_MAX_CONCURRENT_STREAMS", "100")
+    )
+    ACTIVITYKIT_APNS_KEEPALIVE_SECONDS: float = float(
+        os.getenv("ACTIVITYKIT_APNS_KEEPALIVE_SECONDS", "600")
+    )
 
     # Android Mode B: FCM (server-driven NextUp ongoing notification)
     # Use a Firebase service account JSON (server-side only).
@@ -217,6 +375,13 @@ class Settings(BaseSettings):
 
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "100"))
+    # Catch-all limit (RATE_LIMITS["api"]["default"], 100/min per user or IP and
+    # path) for routes without a specific rule in SecurityConfig.RATE_LIMIT_ROUTES,
+    # e.g. /auth/verify-email and /auth/refresh. Set RATE_LIMIT_DEFAULT_ENABLED=false
+    # only behind another limiter.
+    RATE_LIMIT_DEFAULT_ENABLED: bool = (
+        os.getenv("RATE_LIMIT_DEFAULT_ENABLED", "true").lower() == "true"
+    )
 
     # Email (Namecheap Private Email)
     SMTP_HOST: str = os.getenv("SMTP_HOST", "mail.privateemail.com")
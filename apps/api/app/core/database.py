@@ -18,11 +18,20 @@ The REST API approach is PREFERRED for most operations as it:
 1. Handles pooling automatically
 2. Respects RLS policies
 3. Is optimized for high concurrency
+
+Sync vs async:
+- get_supabase_client(): sync client, blocks the event loop for the duration of
+  each query. Fine for Celery tasks and low-traffic endpoints.
+- get_async_supabase_client(): async PostgREST client on one pooled HTTP/2
+  httpx.AsyncClient per worker. Use it (with `await ...execute()`) on hot
+  request paths so concurrent requests in a worker don't serialize on I/O.
 """
 
 from supabase import create_client, Client
+from postgrest import AsyncPostgrestClient
 from app.core.config import settings
 import asyncio
+import httpx
 import time
 import functools
 from typing import TypeVar, Callable, Any
@@ -345,6 +354,142 @@ def get_raw_supabase_client() -> Client:
     return _raw_supabase
 
 
+# =============================================================================
+# ASYNC POSTGREST CLIENT (HOT REQUEST PATHS)
+# =============================================================================
+
+
+class AsyncRetryingQueryBuilder:
+    """
+    Async counterpart of RetryingQueryBuilder.
+
+    Proxies the async PostgREST builder; `await execute()` retries on the same
+    transient errors, backing off with asyncio.sleep instead of time.sleep.
+    """
+
+    def __init__(self, builder, max_retries: int = MAX_RETRIES):
+        self._builder = builder
+        self._max_retries = max_retries
+
+    def __getattr__(self, name):
+        """Proxy all attribute access to the underlying builder."""
+        attr = getattr(self._builder, name)
+
+        if callable(attr):
+
+            def wrapper(*args, **kwargs):
+                result = attr(*args, **kwargs)
+                if hasattr(result, "execute"):
+                    return AsyncRetryingQueryBuilder(result, self._max_retries)
+                return result
+
+            return wrapper
+
+        # Properties such as `not_` return a builder too
+        if hasattr(attr, "execute"):
+            return AsyncRetryingQueryBuilder(attr, self._max_retries)
+        return attr
+
+    async def execute(self):
+        """Execute the query with automatic retry on transient errors."""
+        last_error = None
+        delay = INITIAL_RETRY_DELAY
+
+        for attempt in range(self._max_retries + 1):
+            try:
+                return await self._builder.execute()
+            except Exception as e:
+                last_error = e
+                if not is_transient_error(e) or attempt >= self._max_retries:
+                    raise
+
+                logger.warning(
+                    f"[DB Retry] Async query failed with transient error, "
+                    f"retrying in {delay}s (attempt {attempt + 1}/{self._max_retries + 1}): {str(e)[:100]}"
+                )
+                await asyncio.sleep(delay)
+                delay *= 2
+
+        raise last_error
+
+
+class AsyncResilientSupabaseClient:
+    """
+    Async PostgREST client with automatic retry, mirroring ResilientSupabaseClient.
+
+    Usage:
+        client = get_async_supabase_client()
+        result = await client.table("users").select("*").eq("id", uid).execute()
+    """
+
+    def __init__(self, client: AsyncPostgrestClient, max_retries: int = MAX_RETRIES):
+        self._client = client
+        self._max_retries = max_retries
+
+    def table(self, table_name: str):
+        """Get a table reference with retry-enabled async query builder."""
+        return AsyncRetryingQueryBuilder(
+            self._client.from_(table_name), self._max_retries
+        )
+
+    def rpc(self, fn_name: str, params: dict = None):
+        """Call an RPC function with retry."""
+        return AsyncRetryingQueryBuilder(
+            self._client.rpc(fn_name, params or {}), self._max_retries
+        )
+
+    async def aclose(self):
+        """Close the underlying pooled HTTP client."""
+        await self._client.aclose()
+
+
+_async_supabase: AsyncResilientSupabaseClient | None = None
+
+
+def get_async_supabase_client() -> AsyncResilientSupabaseClient:
+    """
+    Get the async resilient Supabase (PostgREST) client for this worker.
+
+    Created lazily on first use so it binds to the running event loop. All
+    queries share one httpx.AsyncClient (HTTP/2, keep-alive pool), so concurrent
+    requests multiplex over a few connections instead of blocking the loop.
+    """
+    global _async_supabase
+    if _async_supabase is None:
+        rest_url = f"{settings.SUPABASE_URL.rstrip('/')}/rest/v1"
+        headers = {
+            "apiKey": settings.SUPABASE_SERVICE_KEY,
+            "Authorization": f"Bearer {settings.SUPABASE_SERVICE_KEY}",
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+        }
+        http_client = httpx.AsyncClient(
+            base_url=rest_url,
+            headers=headers,
+            http2=True,
+            follow_redirects=True,
+            timeout=httpx.Timeout(settings.SUPABASE_ASYNC_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.SUPABASE_ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SUPABASE_ASYNC_MAX_KEEPALIVE,
+            ),
+        )
+        _async_supabase = AsyncResilientSupabaseClient(
+            AsyncPostgrestClient(rest_url, headers=headers, http_client=http_client)
+        )
+    return _async_supabase
+
+
+async def close_async_supabase_client() -> None:
+    """Close the async client's connection pool (called on app shutdown)."""
+    global _async_supabase
+    if _async_supabase is not None:
+        try:
+            await _async_supabase.aclose()
+        finally:
+            _async_supabase = None
+
+
 # For future direct Postgres access (if needed for complex queries)
 # Uncomment and configure DATABASE_POOL_URL if required
 #
@@ -0,0 +1,225 @@
+"""
+Entitlement resolver
+
+Resolves a user's effective plan and full feature map in one call, for the
+feature gates in app/services/subscription_service.py (check_user_feature_limit,
+get_user_feature_value, has_user_feature). Previously each gate ran three
+sequential queries: subscriptions (maybe users), subscription_plans, plan_features.
+
+Caching:
+- Plan catalogue (subscription_plans tiers + enabled plan_features rows) is
+  held in memory per process and reloaded every ENTITLEMENTS_CATALOGUE_TTL_SECONDS.
+- Each user's effective plan is cached like the auth user (app/core/user_cache.py):
+  a short in-process tier plus Redis (ENTITLEMENTS_REDIS_TTL_SECONDS).
+
+Invalidation:
+- Call invalidate_entitlements(user_id) after any write to the user's
+  subscription or users.plan: RevenueCat webhook handlers, /subscriptions/sync,
+  promo grants and the promotional downgrade task. The admin API deletes the
+  same Redis key when it grants or cancels a subscription.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from app.core.cache import get_redis_client
+from app.core.config import settings
+from app.core.database import get_supabase_client
+from app.core.subscriptions import get_user_effective_plan
+from app.core.user_cache import _TTLLRUCache
+from app.services.logger import logger
+
+ENTITLEMENTS_CACHE_PREFIX = "entitlements:plan"
+
+# Used when subscription_plans cannot be read (2-tier system)
+_FALLBACK_TIERS = {"free": 0, "premium": 1}
+
+
+@dataclass(frozen=True)
+class Entitlements:
+    """A user's effective plan and the enabled features of that plan."""
+
+    user_id: str
+    plan: str
+    tier: int
+    # feature_key -> plan_features row (enabled features only, sort_order order)
+    features: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def feature_value(self, feature_key: str) -> Optional[Any]:
+        """feature_value for an enabled feature (None if missing or unlimited)."""
+        feature = self.features.get(feature_key)
+        return feature.get("feature_value") if feature else None
+
+    def has_feature(self, feature_key: str) -> bool:
+        """Enabled for the plan, and not a limit of 0 (0 means disabled)."""
+        feature = self.features.get(feature_key)
+        return feature is not None and feature.get("feature_value") != 0
+
+    def check_limit(self, feature_key: str, current_count: int) -> Dict[str, Any]:
+        """Same result shape as subscription_service.check_user_feature_limit."""
+        feature = self.features.get(feature_key)
+        if feature is None:
+            return {
+                "allowed": False,
+                "limit": 0,
+                "current": current_count,
+                "remaining": 0,
+                "plan": self.plan,
+            }
+
+        limit = feature.get("feature_value")
+
+        # None means unlimited
+        if limit is None:
+            return {
+                "allowed": True,
+                "limit": None,
+                "current": current_count,
+                "remaining": None,
+                "plan": self.plan,
+            }
+
+        remaining = limit - current_count
+        return {
+            "allowed": remaining > 0,
+            "limit": limit,
+            "current": current_count,
+            "remaining": max(0, remaining),
+            "plan": self.plan,
+        }
+
+
+class PlanCatalogue:
+    """In-memory copy of subscription_plans tiers and enabled plan_features."""
+
+    def __init__(self, ttl_seconds: float):
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        self._tiers: Dict[str, int] = {}
+        self._features: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def tier(self, plan: str, supabase=None) -> int:
+        self._ensure_loaded(supabase)
+        if plan in self._tiers:
+            return self._tiers[plan]
+        return _FALLBACK_TIERS.get(plan.lower(), 0)
+
+    def features(self, plan: str, supabase=None) -> Dict[str, Dict[str, Any]]:
+        self._ensure_loaded(supabase)
+        return self._features.get(plan, {})
+
+    def _ensure_loaded(self, supabase=None) -> None:
+        if self._loaded_at and time.monotonic() - self._loaded_at < self._ttl:
+            return
+
+        with self._lock:
+            if self._loaded_at and time.monotonic() - self._loaded_at < self._ttl:
+                return
+            try:
+                self._load(supabase or get_supabase_client())
+            except Exception as e:
+                if not self._loaded_at:
+                    raise
+                # Keep serving the previous catalogue; retry after another TTL
+                logger.warning(f"Plan catalogue reload failed, keeping cached copy: {e}")
+            self._loaded_at = time.monotonic()
+
+    def _load(self, supabase) -> None:
+        plans_result = supabase.table("subscription_plans").select("id, tier").execute()
+        features_result = (
+            supabase.table("plan_features")
+            .select("*")
+            .eq("is_enabled", True)
+            .order("sort_order", desc=False)
+            .execute()
+        )
+
+        tiers = {
+            plan["id"]: plan.get("tier") or 0 for plan in plans_result.data or []
+        }
+        features: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for row in features_result.data or []:
+            features.setdefault(row["plan_id"], {}).setdefault(row["feature_key"], row)
+
+        self._tiers = tiers
+        self._features = features
+
+
+class EntitlementResolver:
+    """Resolves Entitlements from the cached effective plan and the catalogue."""
+
+    def __init__(self):
+        self.catalogue = PlanCatalogue(settings.ENTITLEMENTS_CATALOGUE_TTL_SECONDS)
+        self._local_plans = _TTLLRUCache(
+            max_size=settings.ENTITLEMENTS_LOCAL_MAX_SIZE,
+            ttl_seconds=settings.ENTITLEMENTS_LOCAL_TTL_SECONDS,
+        )
+
+    def resolve(self, user_id: str, supabase=None) -> Entitlements:
+        plan = self._effective_plan(user_id, supabase)
+        return Entitlements(
+            user_id=user_id,
+            plan=plan,
+            tier=self.catalogue.tier(plan, supabase),
+            features=self.catalogue.features(plan, supabase),
+        )
+
+    def invalidate(self, user_id: str) -> None:
+        self._local_plans.pop(user_id)
+
+        redis_client = get_redis_client()
+        if redis_client:
+            try:
+                redis_client.delete(_redis_key(user_id))
+            except Exception as e:
+                logger.warning(f"Entitlements cache invalidation failed for {user_id}: {e}")
+
+    def _effective_plan(self, user_id: str, supabase=None) -> str:
+        cached = self._local_plans.get(user_id)
+        if cached is not None:
+            return cached["plan"]
+
+        redis_client = get_redis_client()
+        if redis_client:
+            try:
+                raw = redis_client.get(_redis_key(user_id))
+                if raw:
+                    plan = raw.decode() if isinstance(raw, bytes) else raw
+                    self._local_plans.set(user_id, {"plan": plan})
+                    return plan
+            except Exception as e:
+                logger.warning(f"Entitlements cache read failed: {e}")
+
+        plan = get_user_effective_plan(user_id, supabase=supabase) or "free"
+        self._local_plans.set(user_id, {"plan": plan})
+
+        if redis_client:
+            try:
+                redis_client.setex(
+                    _redis_key(user_id), settings.ENTITLEMENTS_REDIS_TTL_SECONDS, plan
+                )
+            except Exception as e:
+                logger.warning(f"Entitlements cache write failed: {e}")
+
+        return plan
+
+
+def _redis_key(user_id: str) -> str:
+    return f"{ENTITLEMENTS_CACHE_PREFIX}:{user_id}"
+
+
+entitlement_resolver = EntitlementResolver()
+
+
+def get_entitlements(user_id: str, supabase=None) -> Entitlements:
+    """Plan and feature map for user_id (cached)."""
+    return entitlement_resolver.resolve(user_id, supabase)
+
+
+def invalidate_entitlements(user_id: str) -> None:
+    """Drop a user's cached effective plan (call after subscription/plan writes)."""
+    entitlement_resolver.invalidate(user_id)
+
@@ -8,6 +8,35 @@ from starlette.requests import Request
 from typing import Optional, Dict, Any
 from app.core.auth import USER_SELECT_COLUMNS, verify_token
 from app.core.api_keys import get_api_key_user
+from app.core.user_cache import cache_user, get_cached_user
+
+
+async def _load_user(user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Resolve the user row for an authenticated request.
+
+    Served from the two-tier user cache when possible; on a miss the row is
+    loaded with the async client and cached (without password_hash).
+    """
+    user = await get_cached_user(user_id)
+    if user is not None:
+        return user
+
+    from app.core.database import get_async_supabase_client
+
+    supabase = get_async_supabase_client()
+
+    result = (
+        await supabase.table("users")
+        .select(USER_SELECT_COLUMNS)
+        .eq("id", user_id)
+        .execute()
+    )
+
+    if not result.data:
+        return None
+
+    return await cache_user(user_id, result.data[0])
 
 
 async def get_current_user_flexible(
@@ -92,20 +121,14 @@ async def authenticate_with_jwt(token: str) -> Dict[str, Any]:
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload"
             )
 
-        # Get user from database
-        from app.core.database import get_supabase_client
-
-        supabase = get_supabase_client()
+        # Get user (cached; runs on every authenticated request)
+        user = await _load_user(user_id)
 
-        result = supabase.table("users").select(USER_SELECT_COLUMNS).eq("id", user_id).execute()
-
-        if not result.data:
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
             )
 
-        user = result.data[0]
-
         # Check user status
         user_status = user.get("status", "active")
         if user_status != "active":
@@ -148,22 +171,14 @@ async def authenticate_with_api_key(api_key: str) -> Dict[str, Any]:
                 detail="Invalid or expired API key",
             )
 
-        # Get full user data from database
-        from app.core.database import get_supabase_client
+        # Get full user data (cached)
+        user = await _load_user(user_info["user_id"])
 
-        supabase = get_supabase_client()
-
-        result = (
-            supabase.table("users").select(USER_SELECT_COLUMNS).eq("id", user_info["user_id"]).execute()
-        )
-
-        if not result.data:
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
             )
 
-        user = result.data[0]
-
         # Check user status
         user_status = user.get("status", "active")
         if user_status != "active":
@@ -0,0 +1,440 @@
+"""
+Shared OpenAI clients
+
+Building OpenAI(...) / AsyncOpenAI(...) per call opens a new connection pool,
+so every call paid for TCP + TLS setup. Clients here are built once on a tuned
+httpx pool (longer keep-alive than the SDK default, HTTP/2) and reused:
+
+- get_openai_client(): sync client for Celery tasks, one per process. Rebuilt
+  after fork so prefork children never share the parent's sockets.
+- get_async_openai_client(): AsyncOpenAI for the running event loop. httpx
+  async pools are bound to the loop that opened them, and Celery tasks run
+  coroutines on their own loops (asyncio.run / run_until_complete), so there is
+  one client per loop; clients of closed loops are dropped.
+
+Calls go through create_chat_completion / acreate_chat_completion /
+acreate_transcription, which:
+- hold a per-model concurrency slot (OPENAI_MODEL_CONCURRENCY) for the whole
+  request, including a streamed response, and raise OpenAISlotTimeout if no
+  slot frees up within OPENAI_SLOT_TIMEOUT_SECONDS;
+- record latency, slot wait, time to first streamed chunk and token usage per
+  (operation, model) in this process; see get_openai_metrics().
+
+Set OPENAI_BASE_URL to run against a local stub (scripts/bench_openai_client.py).
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+from app.core.config import settings
+from app.services.logger import logger
+
+DEFAULT_MODEL_CONCURRENCY = 16
+
+
+class OpenAISlotTimeout(TimeoutError):
+    """No concurrency slot for the model freed up in OPENAI_SLOT_TIMEOUT_SECONDS."""
+
+
+def _parse_model_concurrency(spec: str) -> Dict[str, int]:
+    """'default=16,whisper-1=4' -> {"default": 16, "whisper-1": 4}"""
+    limits = {"default": DEFAULT_MODEL_CONCURRENCY}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if not name.strip():
+            continue
+        try:
+            limits[name.strip()] = max(1, int(value))
+        except ValueError:
+            logger.warning(f"[OpenAI] Ignoring invalid concurrency entry: {part!r}")
+    return limits
+
+
+_MODEL_LIMITS = _parse_model_concurrency(settings.OPENAI_MODEL_CONCURRENCY)
+
+
+def _model_limit(model: str) -> int:
+    return _MODEL_LIMITS.get(model, _MODEL_LIMITS["default"])
+
+
+def _client_options() -> Dict[str, Any]:
+    return {
+        "api_key": settings.OPENAI_API_KEY,
+        "base_url": settings.OPENAI_BASE_URL,
+        "max_retries": settings.OPENAI_MAX_RETRIES,
+    }
+
+
+def _http_options() -> Dict[str, Any]:
+    return {
+        "http2": True,
+        "timeout": httpx.Timeout(
+            settings.OPENAI_TIMEOUT_SECONDS,
+            connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS,
+        ),
+        "limits": httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    }
+
+
+# =============================================================================
+# Clients
+# =============================================================================
+
+
+class _SyncState:
+    def __init__(self):
+        self.pid = os.getpid()
+        self.client = OpenAI(
+            **_client_options(), http_client=DefaultHttpxClient(**_http_options())
+        )
+        self.semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self.lock = threading.Lock()
+
+    def semaphore(self, model: str) -> threading.BoundedSemaphore:
+        semaphore = self.semaphores.get(model)
+        if semaphore is None:
+            with self.lock:
+                semaphore = self.semaphores.setdefault(
+                    model, threading.BoundedSemaphore(_model_limit(model))
+                )
+        return semaphore
+
+
+class _LoopState:
+    def __init__(self):
+        self.pid = os.getpid()
+        self.client = AsyncOpenAI(
+            **_client_options(),
+            http_client=DefaultAsyncHttpxClient(**_http_options()),
+        )
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def semaphore(self, model: str) -> asyncio.Semaphore:
+        semaphore = self.semaphores.get(model)
+        if semaphore is None:
+            semaphore = self.semaphores[model] = asyncio.Semaphore(_model_limit(model))
+        return semaphore
+
+
+_sync_state: Optional[_SyncState] = None
+_sync_state_lock = threading.Lock()
+_loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_sync_state() -> _SyncState:
+    global _sync_state
+    state = _sync_state
+    if state is None or state.pid != os.getpid():
+        with _sync_state_lock:
+            state = _sync_state
+            if state is None or state.pid != os.getpid():
+                state = _sync_state = _SyncState()
+    return state
+
+
+def _get_loop_state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    state = _loop_states.get(loop)
+    if state is None or state.pid != os.getpid():
+        # Loops Celery tasks ran on and closed can't close their pools anymore;
+        # drop them so the sockets are released with the client
+        for closed in [l for l in list(_loop_states) if l.is_closed()]:
+            _loop_states.pop(closed, None)
+        state = _loop_states[loop] = _LoopState()
+    return state
+
+
+def get_openai_client() -> OpenAI:
+    """Process-wide sync OpenAI client (pooled, keep-alive)."""
+    return _get_sync_state().client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """AsyncOpenAI client for the running event loop (pooled, keep-alive)."""
+    return _get_loop_state().client
+
+
+async def close_async_openai_client() -> None:
+    """Close the running loop's client pool (called on app shutdown)."""
+    state = _loop_states.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        await state.client.close()
+
+
+# =============================================================================
+# Metrics
+# =============================================================================
+
+_metrics: Dict[Tuple[str, str], Dict[str, float]] = {}
+_metrics_lock = threading.Lock()
+
+
+def _metrics_entry(operation: str, model: str) -> Dict[str, float]:
+    m = _metrics.get((operation, model))
+    if m is None:
+        m = _metrics[(operation, model)] = {
+            "calls": 0,
+            "errors": 0,
+            "slot_timeouts": 0,
+            "latency_total": 0.0,
+            "latency_max": 0.0,
+            "slot_wait_total": 0.0,
+            "first_chunk_total": 0.0,
+            "streams": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        }
+    return m
+
+
+def _record(
+    operation: str,
+    model: str,
+    latency: float,
+    slot_wait: float,
+    usage: Any = None,
+    first_chunk: Optional[float] = None,
+    error: bool = False,
+) -> None:
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    with _metrics_lock:
+        m = _metrics_entry(operation, model)
+        m["calls"] += 1
+        m["errors"] += int(error)
+        m["latency_total"] += latency
+        m["latency_max"] = max(m["latency_max"], latency)
+        m["slot_wait_total"] += slot_wait
+        if first_chunk is not None:
+            m["streams"] += 1
+            m["first_chunk_total"] += first_chunk
+        m["prompt_tokens"] += prompt_tokens
+        m["completion_tokens"] += completion_tokens
+
+    logger.debug(
+        f"[OpenAI] {operation} {model}: {latency * 1000:.0f}ms "
+        f"(slot wait {slot_wait * 1000:.0f}ms), "
+        f"tokens {prompt_tokens}+{completion_tokens}{' ERROR' if error else ''}"
+    )
+
+
+def _record_slot_timeout(operation: str, model: str) -> None:
+    with _metrics_lock:
+        _metrics_entry(operation, model)["slot_timeouts"] += 1
+    logger.warning(f"[OpenAI] No {model} slot for {operation} (limit {_model_limit(model)})")
+
+
+def get_openai_metrics() -> Dict[str, Dict[str, float]]:
+    """Per "operation:model" call counts, latencies (ms) and tokens for this process."""
+    with _metrics_lock:
+        snapshot = {key: dict(m) for key, m in _metrics.items()}
+
+    out = {}
+    for (operation, model), m in snapshot.items():
+        calls = m["calls"] or 1
+        out[f"{operation}:{model}"] = {
+            "calls": m["calls"],
+            "errors": m["errors"],
+            "slot_timeouts": m["slot_timeouts"],
+            "avg_latency_ms": round(m["latency_total"] / calls * 1000, 1),
+            "max_latency_ms": round(m["latency_max"] * 1000, 1),
+            "avg_slot_wait_ms": round(m["slot_wait_total"] / calls * 1000, 1),
+            "avg_first_chunk_ms": (
+                round(m["first_chunk_total"] / m["streams"] * 1000, 1)
+                if m["streams"]
+                else None
+            ),
+            "prompt_tokens": m["prompt_tokens"],
+            "completion_tokens": m["completion_tokens"],
+        }
+    return out
+
+
+def reset_openai_metrics() -> None:
+    with _metrics_lock:
+        _metrics.clear()
+
+
+# =============================================================================
+# Calls
+# =============================================================================
+
+
+@contextmanager
+def _slot(operation: str, model: str) -> Iterator[float]:
+    """Hold one of the model's slots; yields the seconds spent waiting for it."""
+    semaphore = _get_sync_state().semaphore(model)
+    started = time.perf_counter()
+    if not semaphore.acquire(timeout=settings.OPENAI_SLOT_TIMEOUT_SECONDS):
+        _record_slot_timeout(operation, model)
+        raise OpenAISlotTimeout(f"No OpenAI slot for {model}")
+    try:
+        yield time.perf_counter() - started
+    finally:
+        semaphore.release()
+
+
+@asynccontextmanager
+async def _async_slot(operation: str, model: str) -> AsyncIterator[float]:
+    semaphore = _get_loop_state().semaphore(model)
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(
+            semaphore.acquire(), timeout=settings.OPENAI_SLOT_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        _record_slot_timeout(operation, model)
+        raise OpenAISlotTimeout(f"No OpenAI slot for {model}") from None
+    try:
+        yield time.perf_counter() - started
+    finally:
+        semaphore.release()
+
+
+def create_chat_completion(**kwargs):
+    """
+    client.chat.completions.create(**kwargs) on the shared sync client.
+
+    With stream=True this returns an iterator of chunks; the model slot is held
+    until it is exhausted or closed, and usage is requested on the last chunk.
+    """
+    if kwargs.get("stream"):
+        kwargs.setdefault("stream_options", {"include_usage": True})
+        return _stream_chat_completion(kwargs)
+
+    model = kwargs.get("model", "")
+    with _slot("chat", model) as slot_wait:
+        started = time.perf_counter()
+        try:
+            response = get_openai_client().chat.completions.create(**kwargs)
+        except Exception:
+            _record("chat", model, time.perf_counter() - started, slot_wait, error=True)
+            raise
+        _record("chat", model, time.perf_counter() - started, slot_wait, response.usage)
+        return response
+
+
+def _stream_chat_completion(kwargs: Dict[str, Any]):
+    model = kwargs.get("model", "")
+    with _slot("chat", model) as slot_wait:
+        started = time.perf_counter()
+        first_chunk = None
+        usage = None
+        failed = False
+        try:
+            with get_openai_client().chat.completions.create(**kwargs) as stream:
+                for chunk in stream:
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter() - started
+                    usage = getattr(chunk, "usage", None) or usage
+                    yield chunk
+        except Exception:
+            failed = True
+            raise
+        finally:
+            _record(
+                "chat",
+                model,
+                time.perf_counter() - started,
+                slot_wait,
+                usage,
+                first_chunk=first_chunk,
+                error=failed,
+            )
+
+
+async def acreate_chat_completion(**kwargs):
+    """
+    Async client.chat.completions.create(**kwargs) on the loop's shared client.
+
+    With stream=True this returns an async iterator of chunks (see
+    create_chat_completion).
+    """
+    if kwargs.get("stream"):
+        kwargs.setdefault("stream_options", {"include_usage": True})
+        return _astream_chat_completion(kwargs)
+
+    model = kwargs.get("model", "")
+    async with _async_slot("chat", model) as slot_wait:
+        started = time.perf_counter()
+        try:
+            response = await get_async_openai_client().chat.completions.create(
+                **kwargs
+            )
+        except Exception:
+            _record("chat", model, time.perf_counter() - started, slot_wait, error=True)
+            raise
+        _record("chat", model, time.perf_counter() - started, slot_wait, response.usage)
+        return response
+
+
+async def _astream_chat_completion(kwargs: Dict[str, Any]):
+    model = kwargs.get("model", "")
+    async with _async_slot("chat", model) as slot_wait:
+        started = time.perf_counter()
+        first_chunk = None
+        usage = None
+        failed = False
+        try:
+            stream = await get_async_openai_client().chat.completions.create(**kwargs)
+            async with stream:
+                async for chunk in stream:
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter() - started
+                    usage = getattr(chunk, "usage", None) or usage
+                    yield chunk
+        except Exception:
+            failed = True
+            raise
+        finally:
+            _record(
+                "chat",
+                model,
+                time.perf_counter() - started,
+                slot_wait,
+                usage,
+                first_chunk=first_chunk,
+                error=failed,
+            )
+
+
+async def acreate_transcription(**kwargs):
+    """Async client.audio.transcriptions.create(**kwargs) on the loop's shared client."""
+    model = kwargs.get("model", "")
+    async with _async_slot("transcription", model) as slot_wait:
+        started = time.perf_counter()
+        try:
+            transcript = await get_async_openai_client().audio.transcriptions.create(
+                **kwargs
+            )
+        except Exception:
+            _record(
+                "transcription",
+                model,
+                time.perf_counter() - started,
+                slot_wait,
+                error=True,
+            )
+            raise
+        _record(
+            "transcription",
+            model,
+            time.perf_counter() - started,
+            slot_wait,
+            getattr(transcript, "usage", None),
+        )
+        return transcript
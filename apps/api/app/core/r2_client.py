@@ -0,0 +1,55 @@
+"""
+Shared Cloudflare R2 (S3 API) client
+
+boto3.client("s3", ...) resolves credentials, loads the service model and
+opens its own connection pool, so building one per upload or per deleted file
+paid for all of that plus new TLS connections every time. get_r2_client()
+builds it once per process (rebuilt after fork, so prefork Celery children
+never share the parent's sockets) with a pool sized for the media I/O threads.
+boto3 clients are thread-safe once built.
+"""
+
+import os
+import threading
+from typing import Any, Optional
+
+import boto3
+from botocore.config import Config
+
+from app.core.config import settings
+
+_client: Optional[Any] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+
+def _build_client():
+    # Own session: boto3's default session is not safe to build clients from
+    # in several threads at once
+    return boto3.session.Session().client(
+        "s3",
+        endpoint_url=settings.CLOUDFLARE_R2_ENDPOINT_URL,
+        aws_access_key_id=settings.CLOUDFLARE_R2_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.CLOUDFLARE_R2_SECRET_ACCESS_KEY,
+        region_name="auto",
+        config=Config(
+            max_pool_connections=settings.R2_MAX_POOL_CONNECTIONS,
+            connect_timeout=settings.R2_CONNECT_TIMEOUT_SECONDS,
+            read_timeout=settings.R2_READ_TIMEOUT_SECONDS,
+            retries={"max_attempts": settings.R2_MAX_ATTEMPTS, "mode": "standard"},
+            tcp_keepalive=True,
+        ),
+    )
+
+
+def get_r2_client():
+    """Process-wide boto3 S3 client for the R2 bucket (pooled, keep-alive)."""
+    global _client, _client_pid
+    client = _client
+    if client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = _build_client()
+                _client_pid = os.getpid()
+            client = _client
+    return client
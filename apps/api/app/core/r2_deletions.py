@@ -0,0 +1,197 @@
+"""
+Batched deletion of R2 objects
+
+Deleting media used to queue one Celery task per file, each building its own
+boto3 client for a single DeleteObject. Now:
+
+- The API queues keys with queue_r2_deletions(): one SADD on a shared Redis
+  set (duplicates collapse). A Celery beat task (flush_r2_deletions, every
+  minute) drains it with DeleteObjects, up to 1000 keys per call.
+- Whole prefixes (a deleted account's media) are listed and deleted page by
+  page with delete_r2_prefix(), also 1000 keys per call.
+- Celery tasks that delete directly (prefix purge, orphaned media_objects
+  sweep) hand keys that failed to the flush with requeue_r2_deletions().
+
+Flush protocol (same as app/core/user_activity.py):
+- RENAMENX pending → flushing moves the current batch aside; new keys keep
+  landing in a fresh pending set.
+- Keys DeleteObjects reports as failed are retried one by one; keys that
+  still fail go back into pending with an attempt count, and are dropped
+  (logged) after R2_DELETE_MAX_ATTEMPTS. Deleting a missing key succeeds, so
+  replays are harmless.
+"""
+
+import asyncio
+from typing import Dict, Iterable, List, Sequence
+
+from redis.exceptions import ResponseError
+
+from app.core.cache import DummyRedis, get_async_redis_client, get_redis_client
+from app.core.config import settings
+from app.core.r2_client import get_r2_client
+from app.services.logger import logger
+
+R2_DELETE_PENDING_KEY = "r2_delete:pending"
+R2_DELETE_FLUSHING_KEY = "r2_delete:flushing"
+# key -> failed flush attempts
+R2_DELETE_ATTEMPTS_KEY = "r2_delete:attempts"
+
+# DeleteObjects limit
+DELETE_BATCH_SIZE = 1000
+
+
+def delete_r2_objects(keys: Sequence[str]) -> Dict[str, str]:
+    """
+    Delete keys from the bucket with DeleteObjects, DELETE_BATCH_SIZE per call.
+
+    Keys a call reports as failed are retried once each with DeleteObject.
+    Returns {key: error} for keys that were not deleted.
+    """
+    client = get_r2_client()
+    bucket = settings.CLOUDFLARE_R2_BUCKET_NAME
+    failed: Dict[str, str] = {}
+
+    for start in range(0, len(keys), DELETE_BATCH_SIZE):
+        batch = keys[start : start + DELETE_BATCH_SIZE]
+        try:
+            response = client.delete_objects(
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+        except Exception as e:
+            # The whole call failed (network, auth): retry the batch next flush
+            logger.warning(f"[R2] DeleteObjects failed for {len(batch)} keys: {e}")
+            failed.update({key: str(e) for key in batch})
+            continue
+
+        for error in response.get("Errors", []):
+            key = error.get("Key")
+            if not key:
+                continue
+            try:
+                client.delete_object(Bucket=bucket, Key=key)
+            except Exception as e:
+                failed[key] = f"{error.get('Code', 'Error')}; retry: {e}"
+
+    return failed
+
+
+def delete_r2_prefix(prefix: str) -> Dict[str, int]:
+    """
+    Delete every object under prefix, one DeleteObjects call per listed page.
+
+    Keys that could not be deleted are queued for the next flush.
+    """
+    client = get_r2_client()
+    paginator = client.get_paginator("list_objects_v2")
+    listed = 0
+    failed: Dict[str, str] = {}
+
+    for page in paginator.paginate(
+        Bucket=settings.CLOUDFLARE_R2_BUCKET_NAME,
+        Prefix=prefix,
+        PaginationConfig={"PageSize": DELETE_BATCH_SIZE},
+    ):
+        keys = [obj["Key"] for obj in page.get("Contents", [])]
+        listed += len(keys)
+        if keys:
+            failed.update(delete_r2_objects(keys))
+
+    requeue_r2_deletions(failed)
+
+    return {"listed": listed, "deleted": listed - len(failed), "failed": len(failed)}
+
+
+def requeue_r2_deletions(keys: Iterable[str]) -> None:
+    """Queue keys for the next flush from sync code (Celery tasks)."""
+    keys = list(keys)
+    if keys:
+        get_redis_client().sadd(R2_DELETE_PENDING_KEY, *keys)
+
+
+async def queue_r2_deletions(keys: Iterable[str]) -> int:
+    """
+    Queue R2 keys for deletion by the next flush (one Redis call).
+
+    Without Redis the keys are deleted right away, off the event loop.
+    """
+    keys = [key for key in keys if key]
+    if not keys:
+        return 0
+
+    client = get_async_redis_client()
+    if client is not None:
+        try:
+            await client.sadd(R2_DELETE_PENDING_KEY, *keys)
+            return len(keys)
+        except Exception as e:
+            logger.warning(f"[R2] Failed to queue deletions, deleting now: {e}")
+
+    failed = await asyncio.to_thread(delete_r2_objects, keys)
+    for key, error in failed.items():
+        logger.error(f"[R2] Failed to delete {key}: {error}")
+    return len(keys)
+
+
+def flush_r2_deletions() -> Dict[str, int]:
+    """
+    Delete the keys queued by queue_r2_deletions.
+
+    Returns counts of keys read from Redis, deleted, requeued and dropped.
+    """
+    redis = get_redis_client()
+    empty = {"keys": 0, "deleted": 0, "requeued": 0, "dropped": 0}
+    if isinstance(redis, DummyRedis):
+        return empty
+
+    # Move the pending batch aside unless a previous failed batch is still there
+    if not redis.exists(R2_DELETE_FLUSHING_KEY):
+        try:
+            redis.renamenx(R2_DELETE_PENDING_KEY, R2_DELETE_FLUSHING_KEY)
+        except ResponseError:
+            # No such key: nothing queued since the last flush
+            return empty
+
+    keys: List[str] = [
+        key.decode() if isinstance(key, bytes) else key
+        for key in redis.smembers(R2_DELETE_FLUSHING_KEY) or ()
+    ]
+    if not keys:
+        redis.delete(R2_DELETE_FLUSHING_KEY)
+        return empty
+
+    failed = delete_r2_objects(keys)
+
+    requeue: List[str] = []
+    drop: List[str] = []
+    if failed:
+        pipe = redis.pipeline()
+        for key in failed:
+            pipe.hincrby(R2_DELETE_ATTEMPTS_KEY, key, 1)
+        for key, attempts in zip(failed, pipe.execute()):
+            if attempts < settings.R2_DELETE_MAX_ATTEMPTS:
+                requeue.append(key)
+            else:
+                drop.append(key)
+                logger.error(
+                    f"[R2] Giving up deleting {key} after {attempts} attempts: "
+                    f"{failed[key]}"
+                )
+
+    pipe = redis.pipeline()
+    if requeue:
+        pipe.sadd(R2_DELETE_PENDING_KEY, *requeue)
+    # Forget attempt counts of keys that are done (deleted or dropped)
+    if redis.hlen(R2_DELETE_ATTEMPTS_KEY):
+        done = [key for key in keys if key not in failed] + drop
+        for start in range(0, len(done), DELETE_BATCH_SIZE):
+            pipe.hdel(R2_DELETE_ATTEMPTS_KEY, *done[start : start + DELETE_BATCH_SIZE])
+    pipe.delete(R2_DELETE_FLUSHING_KEY)
+    pipe.execute()
+
+    return {
+        "keys": len(keys),
+        "deleted": len(keys) - len(failed),
+        "requeued": len(requeue),
+        "dropped": len(drop),
+    }
@@ -0,0 +1,233 @@
+"""
+Sliding-window rate limiter
+
+Used by the security pipeline's RateLimitStage. One Redis round trip per
+request: a Lua script reads the previous and current fixed-window counters,
+computes the sliding-window estimate and increments atomically (EVALSHA on the
+async Redis pool).
+
+Sliding window counter:
+    estimate = previous_window_count * (1 - elapsed_fraction) + current_window_count
+A request is allowed if estimate + 1 <= limit. Rejected requests are not
+counted.
+
+Rules come from SecurityConfig.RATE_LIMIT_ROUTES (route glob → RATE_LIMITS
+entry, key scope per user or per IP). Routes without a specific rule are not
+limited unless RATE_LIMIT_DEFAULT_ENABLED turns on the catch-all rule.
+
+If Redis errors or times out, the limiter switches to an in-process fallback
+(same algorithm, per worker) for REDIS_RETRY_SECONDS before trying Redis again,
+so a Redis blip neither blocks requests nor disables limiting.
+"""
+
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.cache import get_async_redis_client
+from app.services.logger import logger
+
+RATE_LIMIT_PREFIX = "rl"
+
+# KEYS[1] = current window counter, KEYS[2] = previous window counter
+# ARGV[1] = limit, ARGV[2] = window seconds, ARGV[3] = elapsed fraction of current window
+SLIDING_WINDOW_LUA = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local weight = 1 - tonumber(ARGV[3])
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local estimate = previous * weight + current
+if estimate + 1 > limit then
+  return {0, math.ceil(estimate)}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+  redis.call('EXPIRE', KEYS[1], window * 2)
+end
+return {1, math.ceil(previous * weight + current)}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """A route pattern and its limit. limit=None means exempt."""
+
+    name: str
+    pattern: str
+    limit: Optional[int] = None
+    window: int = 60
+    key: str = "user"  # "user" (falls back to IP) or "ip"
+    methods: Optional[Tuple[str, ...]] = None
+    per_path: bool = False
+
+    def compile(self) -> "re.Pattern[str]":
+        return re.compile(
+            "^" + ".*".join(re.escape(part) for part in self.pattern.split("*")) + "$"
+        )
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int  # Seconds until the current window ends
+    window: int
+
+    def headers(self) -> Dict[str, str]:
+        """RateLimit-* response headers (plus Retry-After when rejected)."""
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset),
+            "RateLimit-Policy": f"{self.limit};w={self.window}",
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.reset)
+        return headers
+
+
+class _LocalSlidingWindow:
+    """In-process fallback with the same sliding-window counter semantics."""
+
+    MAX_KEYS = 50000
+
+    def __init__(self):
+        # key -> (window_index, current_count, previous_count)
+        self._counters: Dict[str, Tuple[int, int, int]] = {}
+
+    def hit(self, key: str, limit: int, window_index: int, elapsed: float) -> Tuple[bool, int]:
+        index, current, previous = self._counters.get(key, (window_index, 0, 0))
+        if index != window_index:
+            previous = current if index == window_index - 1 else 0
+            current = 0
+
+        estimate = previous * (1 - elapsed) + current
+        if estimate + 1 > limit:
+            self._counters[key] = (window_index, current, previous)
+            return False, math.ceil(estimate)
+
+        current += 1
+        self._counters[key] = (window_index, current, previous)
+        if len(self._counters) > self.MAX_KEYS:
+            self._prune(window_index)
+        return True, math.ceil(previous * (1 - elapsed) + current)
+
+    def _prune(self, window_index: int) -> None:
+        stale = [k for k, v in self._counters.items() if v[0] < window_index - 1]
+        for k in stale:
+            del self._counters[k]
+        if len(self._counters) > self.MAX_KEYS:
+            self._counters.clear()
+
+
+class SlidingWindowRateLimiter:
+    """Route-matched sliding-window limiter backed by Redis with local fallback."""
+
+    REDIS_RETRY_SECONDS = 5.0
+
+    def __init__(self, rules: Sequence[RateLimitRule]):
+        self.rules = list(rules)
+        self._compiled = [(rule, rule.compile()) for rule in self.rules]
+        self._script = None
+        self._script_client = None
+        self._redis_down_until = 0.0
+        self._local = _LocalSlidingWindow()
+
+    @classmethod
+    def from_security_config(cls) -> "SlidingWindowRateLimiter":
+        from app.core.security_config import SecurityConfig, security_config
+
+        # Environment-adjusted limits (development is relaxed, production stricter)
+        rate_limits = security_config["rate_limits"]
+
+        rules: List[RateLimitRule] = []
+        for route in SecurityConfig.RATE_LIMIT_ROUTES:
+            if not route.get("enabled", True):
+                continue
+            limit_ref = route.get("limit")
+            limit = window = None
+            if limit_ref:
+                group, name = limit_ref
+                config = rate_limits[group][name]
+                limit, window = config["calls"], config["period"]
+            methods = route.get("methods")
+            rules.append(
+                RateLimitRule(
+                    name=f"{limit_ref[0]}.{limit_ref[1]}" if limit_ref else "exempt",
+                    pattern=route["pattern"],
+                    limit=limit,
+                    window=window or 60,
+                    key=route.get("key", "user"),
+                    methods=tuple(methods) if methods else None,
+                    per_path=route.get("per_path", False),
+                )
+            )
+        return cls(rules)
+
+    def match(self, method: str, path: str) -> Optional[RateLimitRule]:
+        """First rule matching the route; None if exempt or no rule applies."""
+        for rule, regex in self._compiled:
+            if rule.methods and method not in rule.methods:
+                continue
+            if regex.match(path):
+                return rule if rule.limit else None
+        return None
+
+    async def hit(self, rule: RateLimitRule, identity: str, path: str) -> RateLimitResult:
+        """Count one request for identity under rule."""
+        now = time.time()
+        window = rule.window
+        window_index = int(now // window)
+        elapsed = (now - window_index * window) / window
+        reset = max(1, math.ceil(window - (now - window_index * window)))
+
+        bucket = f"{rule.name}:{identity}"
+        if rule.per_path:
+            bucket = f"{bucket}:{path}"
+
+        allowed, count = await self._hit_redis(bucket, rule, window_index, elapsed)
+        if allowed is None:
+            allowed, count = self._local.hit(bucket, rule.limit, window_index, elapsed)
+
+        return RateLimitResult(
+            allowed=allowed,
+            limit=rule.limit,
+            remaining=max(0, rule.limit - count),
+            reset=reset,
+            window=window,
+        )
+
+    async def _hit_redis(
+        self, bucket: str, rule: RateLimitRule, window_index: int, elapsed: float
+    ) -> Tuple[Optional[bool], int]:
+        if time.monotonic() < self._redis_down_until:
+            return None, 0
+
+        client = get_async_redis_client()
+        if client is None:
+            return None, 0
+
+        if self._script is None or self._script_client is not client:
+            self._script = client.register_script(SLIDING_WINDOW_LUA)
+            self._script_client = client
+
+        # Hash tag keeps both windows in one cluster slot
+        base = f"{RATE_LIMIT_PREFIX}:{{{bucket}}}"
+        try:
+            allowed, count = await self._script(
+                keys=[f"{base}:{window_index}", f"{base}:{window_index - 1}"],
+                args=[rule.limit, rule.window, f"{elapsed:.6f}"],
+            )
+        except Exception as e:
+            self._redis_down_until = time.monotonic() + self.REDIS_RETRY_SECONDS
+            logger.warning(
+                f"Rate limiter Redis unavailable, using local fallback for "
+                f"{self.REDIS_RETRY_SECONDS:.0f}s: {e}"
+            )
+            return None, 0
+
+        return bool(allowed), int(count)
@@ -26,6 +26,55 @@ class SecurityConfig:
         },
     }
 
+    # Route → rate limit mapping (first match wins; see app/core/rate_limiter.py)
+    # - pattern: path glob, "*" matches any characters (including "/")
+    # - limit: (group, name) in RATE_LIMITS; omit for exempt routes
+    # - key: "ip" (always per client IP) or "user" (per user when authenticated, else IP)
+    # - methods: only apply to these methods (others fall through to later rules)
+    # - per_path: count each concrete path separately (default bucket)
+    # - enabled: False drops the rule (the catch-all follows RATE_LIMIT_DEFAULT_ENABLED)
+    RATE_LIMIT_ROUTES = [
+        {"pattern": "/health"},
+        {"pattern": "/api/v1/system/health*"},
+        {"pattern": "/api/v1/webhooks/*"},  # Provider retries must not be throttled
+        {"pattern": "/api/v1/auth/login", "limit": ("auth", "login"), "key": "ip"},
+        {"pattern": "/api/v1/auth/signup", "limit": ("auth", "signup"), "key": "ip"},
+        {
+            "pattern": "/api/v1/auth/forgot-password",
+            "limit": ("auth", "forgot_password"),
+            "key": "ip",
+        },
+        {
+            "pattern": "/api/v1/auth/reset-password",
+            "limit": ("auth", "reset_password"),
+            "key": "ip",
+        },
+        {
+            "pattern": "/api/v1/media/upload*",
+            "limit": ("api", "media_upload"),
+            "key": "user",
+        },
+        {
+            "pattern": "/api/v1/goals*",
+            "limit": ("api", "goals"),
+            "key": "user",
+            "methods": ["POST", "PUT", "PATCH", "DELETE"],
+        },
+        {
+            "pattern": "/api/v1/check-ins*",
+            "limit": ("api", "checkins"),
+            "key": "user",
+            "methods": ["POST", "PUT", "PATCH", "DELETE"],
+        },
+        {
+            "pattern": "*",
+            "limit": ("api", "default"),
+            "key": "user",
+            "per_path": True,
+            "enabled": settings.RATE_LIMIT_DEFAULT_ENABLED,
+        },
+    ]
+
     # Account Lockout Configuration
     ACCOUNT_LOCKOUT = {
         "max_failed_attempts": 5,
@@ -201,13 +250,16 @@ class SecurityConfig:
         if environment == "development":
             # Relaxed settings for development
             config["rate_limits"]["api"]["default"]["calls"] = 1000
+            # Local testing signs up / logs in many users from one IP
+            for name in ("login", "signup", "forgot_password", "reset_password"):
+                config["rate_limits"]["auth"][name]["calls"] = 100
             config["account_lockout"]["max_failed_attempts"] = 10
             config["file_upload"]["max_file_size_mb"] = 50
             config["audit_logging"]["retention_days"] = 7
 
         elif environment == "production":
-            # Stricter settings for production
-            config["rate_limits"]["api"]["default"]["calls"] = 50
+            # Stricter settings for production. The catch-all API limit stays at
+            # the 100/min the per-path middleware always enforced.
             config["ip_security"]["enable_whitelist"] = True
             config["session_management"]["max_concurrent_sessions"] = 2
             config["audit_logging"]["retention_days"] = 365
@@ -99,46 +99,27 @@ def get_user_plan_tier(plan: str, supabase=None) -> int:
     return tier_map.get(plan.lower(), 0)
 
 
-def get_user_features_by_tier(
-    user_id: str, user_plan: Optional[str] = None, supabase=None
-) -> Dict[str, Any]:
+def get_user_features_by_tier(user_id: str, supabase=None) -> Dict[str, Any]:
     """
     Get all features available to user based on their plan (V2 simplified).
 
     V2: Features are tied directly to plan_id (free/premium), not tiers.
-    Simply query features for the user's plan.
+    Simply returns the enabled features of the user's plan, in sort_order.
 
     Args:
         user_id: User ID
-        user_plan: Optional users.plan value (to avoid extra query)
         supabase: Optional supabase client
 
     Returns:
         Dict with plan, tier, and list of features
     """
-    if supabase is None:
-        supabase = get_supabase_client()
-
-    # Get effective plan
-    plan = get_user_effective_plan(user_id, user_plan, supabase)
-
-    # Get tier (for backward compatibility)
-    tier = get_user_plan_tier(plan, supabase)
-
-    # V2: Query features directly by plan_id (no tier inheritance)
-    features_result = (
-        supabase.table("plan_features")
-        .select("*")
-        .eq("plan_id", plan)  # V2: Direct plan matching
-        .eq("is_enabled", True)
-        .order("sort_order", desc=False)  # Sort by sort_order
-        .execute()
-    )
+    # Cached plan + in-memory plan catalogue (see app/core/entitlements.py)
+    from app.core.entitlements import get_entitlements
 
-    features = features_result.data or []
+    entitlements = get_entitlements(user_id, supabase)
 
     return {
-        "plan": plan,
-        "tier": tier,
-        "features": features,
+        "plan": entitlements.plan,
+        "tier": entitlements.tier,
+        "features": list(entitlements.features.values()),
     }
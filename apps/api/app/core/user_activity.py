@@ -0,0 +1,92 @@
+"""
+Write-behind tracking of users.last_active_at
+
+The API records activity with one Redis call per authenticated request
+(HSET user_id → unix timestamp on a shared hash; later requests overwrite
+earlier ones). A Celery beat task (flush_user_activity, every minute) drains
+the hash and applies it with one bulk RPC (bulk_touch_last_active), so the
+request path never writes to `users`.
+
+Flush protocol:
+- RENAMENX pending → flushing atomically moves the current batch aside; new
+  activity keeps landing in a fresh pending hash.
+- If the RPC fails, the flushing hash is left in place and retried on the
+  next run (RENAMENX is skipped while it exists). The RPC only moves
+  last_active_at forward, so replays and out-of-order batches are harmless.
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from redis.exceptions import ResponseError
+
+from app.core.cache import get_async_redis_client, get_redis_client
+from app.core.database import get_supabase_client
+from app.services.logger import logger
+
+USER_ACTIVITY_PENDING_KEY = "user_activity:pending"
+USER_ACTIVITY_FLUSHING_KEY = "user_activity:flushing"
+
+# Users per bulk_touch_last_active call
+FLUSH_BATCH_SIZE = 1000
+
+
+async def record_user_activity(user_id: str) -> None:
+    """Record that user_id was active now (best effort, one Redis call)."""
+    client = get_async_redis_client()
+    if client is None:
+        return
+    try:
+        await client.hset(USER_ACTIVITY_PENDING_KEY, user_id, int(time.time()))
+    except Exception as e:
+        logger.warning(f"Failed to record user activity: {e}")
+
+
+def flush_user_activity() -> Dict[str, int]:
+    """
+    Drain recorded activity into users.last_active_at.
+
+    Returns counts of users read from Redis and rows updated.
+    """
+    redis = get_redis_client()
+
+    # Move the pending batch aside unless a previous failed batch is still there
+    if not redis.exists(USER_ACTIVITY_FLUSHING_KEY):
+        try:
+            redis.renamenx(USER_ACTIVITY_PENDING_KEY, USER_ACTIVITY_FLUSHING_KEY)
+        except ResponseError:
+            # No such key: nothing recorded since the last flush
+            return {"users": 0, "updated": 0}
+
+    entries = redis.hgetall(USER_ACTIVITY_FLUSHING_KEY) or {}
+    if not entries:
+        redis.delete(USER_ACTIVITY_FLUSHING_KEY)
+        return {"users": 0, "updated": 0}
+
+    user_ids: List[str] = []
+    active_at: List[str] = []
+    for user_id, timestamp in entries.items():
+        if isinstance(user_id, bytes):
+            user_id = user_id.decode()
+        try:
+            ts = datetime.fromtimestamp(int(timestamp), tz=timezone.utc)
+        except (TypeError, ValueError):
+            continue
+        user_ids.append(user_id)
+        active_at.append(ts.isoformat())
+
+    supabase = get_supabase_client()
+    updated = 0
+    for start in range(0, len(user_ids), FLUSH_BATCH_SIZE):
+        result = supabase.rpc(
+            "bulk_touch_last_active",
+            {
+                "p_user_ids": user_ids[start : start + FLUSH_BATCH_SIZE],
+                "p_active_at": active_at[start : start + FLUSH_BATCH_SIZE],
+            },
+        ).execute()
+        updated += result.data or 0
+
+    redis.delete(USER_ACTIVITY_FLUSHING_KEY)
+    return {"users": len(user_ids), "updated": updated}
@@ -0,0 +1,168 @@
+"""
+Authenticated-user cache
+
+Two-tier cache for the user row resolved by the auth dependency
+(authenticate_with_jwt / authenticate_with_api_key), which otherwise runs a
+`users` select on every authenticated request.
+
+Tiers:
+- L1: in-process TTL LRU (AUTH_USER_CACHE_LOCAL_TTL_SECONDS, a few seconds)
+- L2: Redis, shared by all workers and the admin API
+  (AUTH_USER_CACHE_REDIS_TTL_SECONDS). Reads and fills on the request path
+  use the async pool (get_async_redis_client); invalidation uses the sync
+  client so sync endpoints and Celery tasks can call it.
+
+Invalidation:
+- Call invalidate_user_cache(user_id) after any write that changes what the
+  auth dependency returns: profile, status, plan, role, email verification,
+  password (has_password).
+- Redis is cleared immediately; other workers' L1 entries expire within the
+  local TTL, so a suspended user is blocked within seconds.
+- The admin API deletes the same Redis key (AUTH_USER_CACHE_PREFIX) when it
+  changes a user's status or role.
+
+The password hash is never cached; cached users carry `has_password` instead.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.core.cache import get_async_redis_client, get_redis_client
+from app.core.config import settings
+from app.services.logger import logger
+
+AUTH_USER_CACHE_PREFIX = "auth:user"
+
+
+class _TTLLRUCache:
+    """Small thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._data: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        if self._ttl <= 0 or self._max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self._ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_local_cache = _TTLLRUCache(
+    max_size=settings.AUTH_USER_CACHE_LOCAL_MAX_SIZE,
+    ttl_seconds=settings.AUTH_USER_CACHE_LOCAL_TTL_SECONDS,
+)
+
+
+def _redis_key(user_id: str) -> str:
+    return f"{AUTH_USER_CACHE_PREFIX}:{user_id}"
+
+
+def _to_cacheable(user: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop the password hash, keeping only whether one is set."""
+    cached = dict(user)
+    password_hash = cached.pop("password_hash", None)
+    if "has_password" not in cached:
+        cached["has_password"] = bool(password_hash)
+    return cached
+
+
+async def get_cached_user(user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached user row (L1, then Redis) or None on miss.
+
+    Returns a fresh dict each time; callers may mutate it.
+    """
+    user = _local_cache.get(user_id)
+    if user is not None:
+        return dict(user)
+
+    redis_client = get_async_redis_client()
+    if not redis_client:
+        return None
+
+    try:
+        raw = await redis_client.get(_redis_key(user_id))
+    except Exception as e:
+        logger.warning(f"Auth user cache read failed: {e}")
+        return None
+
+    if not raw:
+        return None
+
+    try:
+        user = json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+
+    _local_cache.set(user_id, user)
+    return dict(user)
+
+
+async def cache_user(user_id: str, user: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Store a freshly loaded user row in both tiers.
+
+    Returns the cacheable form (without password_hash) so callers see the same
+    shape on hits and misses.
+    """
+    cached = _to_cacheable(user)
+    _local_cache.set(user_id, cached)
+
+    redis_client = get_async_redis_client()
+    if redis_client:
+        try:
+            await redis_client.setex(
+                _redis_key(user_id),
+                settings.AUTH_USER_CACHE_REDIS_TTL_SECONDS,
+                json.dumps(cached, default=str),
+            )
+        except Exception as e:
+            logger.warning(f"Auth user cache write failed: {e}")
+
+    return dict(cached)
+
+
+def invalidate_user_cache(user_id: Optional[str]) -> None:
+    """Drop a user from both tiers. Safe to call from sync or async code."""
+    if not user_id:
+        return
+
+    _local_cache.pop(user_id)
+
+    redis_client = get_redis_client()
+    if redis_client:
+        try:
+            redis_client.delete(_redis_key(user_id))
+        except Exception as e:
+            logger.warning(
+                f"Auth user cache invalidation failed for {user_id}: {e}"
+            )
@@ -3,17 +3,100 @@ Achievement Service
 
 Handles achievement badge unlocking logic.
 Checks user progress and unlocks badges when conditions are met.
+
+Event-driven: active achievement types are cached per process and indexed by
+condition type, so an event (source_type "checkin", "nudge", ...) only
+evaluates the badges it can affect (condition_types_for_event). All of them
+are then checked against one progress read (counters maintained on write,
+see migration 047), so the cost is O(relevant badges) plus a single RPC.
 """
 
+import threading
+import time
 from typing import Dict, Any, Optional, List
+
+from app.core.config import settings
 from app.core.database import get_supabase_client
 from app.services.logger import logger
-from app.services.achievement_condition_checker import condition_checker
+from app.services.achievement_condition_checker import (
+    STREAK_CONDITION_TYPES,
+    condition_checker,
+    condition_types_for_event,
+    parse_condition,
+)
+
+
+class AchievementCatalogue:
+    """In-memory copy of active achievement_types, indexed by condition type."""
+
+    def __init__(self, ttl_seconds: float):
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        self._all: List[Dict[str, Any]] = []
+        self._by_type: Dict[str, List[Dict[str, Any]]] = {}
+
+    def for_event(
+        self, source_type: Optional[str] = None, supabase=None
+    ) -> List[Dict[str, Any]]:
+        """Active achievements an event can unlock, in sort_order (all if unknown)."""
+        self._ensure_loaded(supabase)
+        condition_types = condition_types_for_event(source_type)
+        if condition_types is None:
+            return self._all
+        selected = [
+            achievement
+            for condition_type in condition_types
+            for achievement in self._by_type.get(condition_type, [])
+        ]
+        return sorted(selected, key=lambda a: a.get("sort_order") or 0)
+
+    def _ensure_loaded(self, supabase=None) -> None:
+        if self._loaded_at and time.monotonic() - self._loaded_at < self._ttl:
+            return
+
+        with self._lock:
+            if self._loaded_at and time.monotonic() - self._loaded_at < self._ttl:
+                return
+            try:
+                self._load(supabase or get_supabase_client())
+            except Exception as e:
+                if not self._loaded_at:
+                    raise
+                # Keep serving the previous catalogue; retry after another TTL
+                logger.warning(
+                    f"Achievement catalogue reload failed, keeping cached copy: {e}"
+                )
+            self._loaded_at = time.monotonic()
+
+    def _load(self, supabase) -> None:
+        result = (
+            supabase.table("achievement_types")
+            .select("*")
+            .eq("is_active", True)
+            .order("sort_order")
+            .execute()
+        )
+
+        achievements = []
+        by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for row in result.data or []:
+            achievement = {**row, "condition": parse_condition(row.get("unlock_condition"))}
+            achievements.append(achievement)
+            by_type.setdefault(achievement["condition"].get("type"), []).append(
+                achievement
+            )
+
+        self._all = achievements
+        self._by_type = by_type
 
 
 class AchievementService:
     """Service for managing achievement badges"""
 
+    def __init__(self):
+        self.catalogue = AchievementCatalogue(settings.ACHIEVEMENT_CATALOGUE_TTL_SECONDS)
+
     async def check_and_unlock_achievements(
         self,
         user_id: str,
@@ -23,9 +106,12 @@ class AchievementService:
         """
         Check user progress and unlock any eligible achievements.
 
+        Only achievements whose condition the event can change are evaluated
+        (plus time/usage based ones); source_type None checks all of them.
+
         Args:
             user_id: User ID to check
-            source_type: Optional source type for metadata
+            source_type: Event that triggered the check (also stored as metadata)
             source_id: Optional source ID for metadata
 
         Returns:
@@ -35,43 +121,29 @@ class AchievementService:
         newly_unlocked = []
 
         try:
-            # Get all active achievement types
-            achievements = (
-                supabase.table("achievement_types")
-                .select("*")
-                .eq("is_active", True)
-                .order("sort_order")
-                .execute()
-            )
-
-            if not achievements.data:
+            candidates = self.catalogue.for_event(source_type, supabase)
+            if not candidates:
                 return newly_unlocked
 
-            # SCALABILITY: Batch fetch all user's unlocked achievements (1 query vs N)
-            achievement_type_ids = [a["id"] for a in achievements.data]
-            unlocked_achievements = (
-                supabase.table("user_achievements")
-                .select("achievement_type_id")
-                .eq("user_id", user_id)
-                .in_("achievement_type_id", achievement_type_ids)
-                .execute()
-            )
-            unlocked_ids = set(
-                a["achievement_type_id"] for a in unlocked_achievements.data or []
+            # One read: counters, streak (only if a candidate needs it) and
+            # the badges already unlocked
+            progress = condition_checker.get_progress(
+                user_id,
+                include_streak=any(
+                    a["condition"].get("type") in STREAK_CONDITION_TYPES
+                    for a in candidates
+                ),
+                supabase=supabase,
             )
+            unlocked_ids = progress["unlocked_achievement_type_ids"]
 
-            # Check each achievement type
-            for achievement in achievements.data:
-                # Check if already unlocked (from batch data)
+            for achievement in candidates:
                 if achievement["id"] in unlocked_ids:
                     continue  # Already unlocked
 
-                # Check if condition is met using the condition checker
-                # Returns both the result AND metadata to avoid duplicate queries
-                condition_met, condition_metadata = (
-                    await condition_checker.check_condition(
-                        user_id, achievement["unlock_condition"]
-                    )
+                # Returns both the result AND the stat compared (metadata)
+                condition_met, condition_metadata = condition_checker.evaluate(
+                    achievement["condition"], progress
                 )
 
                 if condition_met:
@@ -11,13 +11,36 @@ Features:
 Following SCALABILITY.md: batch context, rate limits, O(1) where possible.
 """
 
-import json
 import uuid
 from datetime import date, datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 from app.core.database import get_supabase_client
 from app.services.logger import logger
 
+# Messages are rows in ai_coach_messages keyed by (conversation_id, seq)
+# (migration 048); ai_coach_conversations.messages is no longer read.
+CONVERSATION_COLUMNS = (
+    "id, user_id, goal_id, title, message_count, total_tokens_used, "
+    "created_at, updated_at, last_message_at, is_archived"
+)
+MESSAGE_COLUMNS = "seq, message_id, request_id, role, content, status, created_at"
+
+
+def append_messages(
+    supabase, conversation_id: str, messages: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Append messages to a conversation (append_ai_coach_messages RPC).
+    Allocates seq and bumps message_count / last_message_at atomically.
+    Returns the inserted rows in order.
+    """
+    result = supabase.rpc(
+        "append_ai_coach_messages",
+        {"p_conversation_id": conversation_id, "p_messages": messages},
+    ).execute()
+    return result.data or []
+
+
 # =====================================================
 # SYSTEM PROMPT - COMPREHENSIVE AI COACH PERSONA
 # =====================================================
@@ -252,7 +275,7 @@ class AICoachService:
         try:
             result = (
                 self.supabase.table("ai_coach_conversations")
-                .select("*")
+                .select(CONVERSATION_COLUMNS)
                 .eq("user_id", user_id)
                 .eq("goal_id", goal_id)
                 .eq("is_archived", False)
@@ -260,10 +283,7 @@ class AICoachService:
                 .execute()
             )
             if result.data and len(result.data) > 0:
-                conv = result.data[0]
-                if isinstance(conv.get("messages"), str):
-                    conv["messages"] = json.loads(conv["messages"])
-                return conv
+                return result.data[0]
             return None
         except Exception as e:
             logger.error(f"Get conversation by goal error: {e}")
@@ -276,6 +296,7 @@ class AICoachService:
         goal_id: Optional[str] = None,
         limit: int = 50,
         offset: int = 0,
+        before_seq: Optional[int] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         Get conversation history for a user with pagination support.
@@ -283,10 +304,13 @@ class AICoachService:
         When goal_id is provided and conversation_id is not, returns the
         goal-specific thread (or None if it doesn't exist yet).
 
-        Messages are returned in chronological order (oldest first in the array).
-        Pagination works from the END of the array (most recent messages first):
-        - offset=0, limit=20: Returns the 20 most recent messages
-        - offset=20, limit=20: Returns messages 21-40 from the end (older messages)
+        Messages are returned in chronological order (oldest first).
+        Pagination works from the most recent message backwards:
+        - before_seq (preferred): the page of messages older than this seq;
+          pass the oldest returned message's seq to load the next page.
+        - offset (older clients): offset=0, limit=20 returns the 20 most
+          recent messages, offset=20 the 20 before those. Ignored when
+          before_seq is given.
 
         Returns:
             Conversation dict with additional fields:
@@ -296,7 +320,7 @@ class AICoachService:
         try:
             query = (
                 self.supabase.table("ai_coach_conversations")
-                .select("*")
+                .select(CONVERSATION_COLUMNS)
                 .eq("user_id", user_id)
                 .eq("is_archived", False)
             )
@@ -321,31 +345,26 @@ class AICoachService:
 
             if result.data and len(result.data) > 0:
                 conversation = result.data[0]
-                # Parse messages JSONB
-                if isinstance(conversation.get("messages"), str):
-                    conversation["messages"] = json.loads(conversation["messages"])
-
-                all_messages = conversation.get("messages") or []
-                total_messages = len(all_messages)
-
-                # Paginate from the end (most recent first)
-                # offset=0 means start from the end
-                if total_messages > 0:
-                    # Calculate start and end indices for slicing
-                    # We want to return messages from the end, going backwards
-                    end_idx = total_messages - offset
-                    start_idx = max(0, end_idx - limit)
-
-                    # Slice the messages (returns in chronological order)
-                    conversation["messages"] = all_messages[start_idx:end_idx]
-
-                    # Check if there are more older messages
-                    conversation["has_more_messages"] = start_idx > 0
-                else:
-                    conversation["messages"] = []
-                    conversation["has_more_messages"] = False
-
-                conversation["total_messages"] = total_messages
+
+                # Newest first on (conversation_id, seq); one extra row tells
+                # us whether there are older messages
+                messages_query = (
+                    self.supabase.table("ai_coach_messages")
+                    .select(MESSAGE_COLUMNS)
+                    .eq("conversation_id", conversation["id"])
+                )
+                if before_seq is not None:
+                    messages_query = messages_query.lt("seq", before_seq)
+                    offset = 0
+                rows = (
+                    messages_query.order("seq", desc=True)
+                    .range(offset, offset + limit)
+                    .execute()
+                ).data or []
+
+                conversation["has_more_messages"] = len(rows) > limit
+                conversation["messages"] = list(reversed(rows[:limit]))
+                conversation["total_messages"] = conversation.get("message_count") or 0
                 return conversation
 
             return None
@@ -354,6 +373,26 @@ class AICoachService:
             logger.error(f"Get conversation history error: {e}")
             return None
 
+    async def get_request_response(
+        self, user_id: str, conversation_id: str, request_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """The assistant message for request_id in a conversation, if any."""
+        try:
+            result = (
+                self.supabase.table("ai_coach_messages")
+                .select(MESSAGE_COLUMNS)
+                .eq("conversation_id", conversation_id)
+                .eq("user_id", user_id)
+                .eq("request_id", request_id)
+                .eq("role", "assistant")
+                .limit(1)
+                .execute()
+            )
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Get request response error: {e}")
+            return None
+
     async def list_conversations(
         self,
         user_id: str,
@@ -455,39 +494,22 @@ class AICoachService:
         Mark pending/generating messages for a request as failed.
         Used when user cancels or when a stuck request is detected (e.g. worker died).
         """
-        import json
-        from datetime import datetime
-
         try:
-            result = (
-                self.supabase.table("ai_coach_conversations")
-                .select("messages")
-                .eq("id", conversation_id)
-                .eq("user_id", user_id)
-                .single()
-                .execute()
-            )
-            if not result.data:
-                return False
-
-            messages = result.data.get("messages", [])
-            if isinstance(messages, str):
-                messages = json.loads(messages)
-
-            for i, msg in enumerate(messages):
-                if msg.get("request_id") != request_id:
-                    continue
-                if msg.get("role") == "user" and msg.get("status") == "pending":
-                    messages[i]["status"] = "completed"
-                elif msg.get("role") == "assistant" and msg.get("status") == "generating":
-                    messages[i]["status"] = "failed"
-
-            self.supabase.table("ai_coach_conversations").update(
-                {
-                    "messages": json.dumps(messages),
-                    "updated_at": datetime.utcnow().isoformat(),
-                }
-            ).eq("id", conversation_id).eq("user_id", user_id).execute()
+            now_iso = datetime.utcnow().isoformat()
+            messages = self.supabase.table("ai_coach_messages")
+
+            # User message was delivered; only the assistant side failed
+            messages.update({"status": "completed", "updated_at": now_iso}).eq(
+                "conversation_id", conversation_id
+            ).eq("user_id", user_id).eq("request_id", request_id).eq(
+                "role", "user"
+            ).eq("status", "pending").execute()
+
+            messages.update({"status": "failed", "updated_at": now_iso}).eq(
+                "conversation_id", conversation_id
+            ).eq("user_id", user_id).eq("request_id", request_id).eq(
+                "role", "assistant"
+            ).eq("status", "generating").execute()
 
             return True
         except Exception as e:
@@ -501,7 +523,6 @@ class AICoachService:
         try:
             payload: Dict[str, Any] = {
                 "user_id": user_id,
-                "messages": [],
                 "message_count": 0,
                 "total_tokens_used": 0,
             }
@@ -566,97 +587,100 @@ class AICoachService:
 
             conversation_id = conversation["id"]
 
-            # Get current messages
-            messages = conversation.get("messages", [])
-            if isinstance(messages, str):
-                messages = json.loads(messages)
-
             # Create a stable request_id + message_ids so UI/task can be idempotent.
             request_id = str(uuid.uuid4())
             user_message_id = str(uuid.uuid4())
             assistant_message_id = str(uuid.uuid4())
-
-            message_index = len(messages)
+            now_iso = datetime.utcnow().isoformat()
+            messages_table = self.supabase.table("ai_coach_messages")
 
             # Add user message with "pending" status (skip on retry - already exists)
             if not is_retry:
-                messages.append(
-                    {
-                        "role": "user",
-                        "content": message,
-                        "status": "pending",
-                        "message_id": user_message_id,
-                        "request_id": request_id,
-                        "created_at": datetime.utcnow().isoformat(),
-                    }
-                )
-                # Add assistant placeholder immediately so "generating" persists across reopen.
-                messages.append(
-                    {
-                        "role": "assistant",
-                        "content": "",
-                        "status": "generating",
-                        "message_id": assistant_message_id,
-                        "request_id": request_id,
-                        "created_at": datetime.utcnow().isoformat(),
-                    }
+                # Assistant placeholder goes in with it so "generating" persists across reopen.
+                appended = append_messages(
+                    self.supabase,
+                    conversation_id,
+                    [
+                        {
+                            "role": "user",
+                            "content": message,
+                            "status": "pending",
+                            "message_id": user_message_id,
+                            "request_id": request_id,
+                            "created_at": now_iso,
+                        },
+                        {
+                            "role": "assistant",
+                            "content": "",
+                            "status": "generating",
+                            "message_id": assistant_message_id,
+                            "request_id": request_id,
+                            "created_at": now_iso,
+                        },
+                    ],
                 )
+                message_index = appended[0]["seq"] - 1
             else:
-                # On retry, find the last user message and update its status to pending
-                # The message_index should point to this existing message
-                # Also reuse request_id/message_id so retries update the same assistant placeholder.
+                # On retry, set the last user message back to pending and reuse its
+                # request_id/message_id so the retry updates the same assistant placeholder.
+                last_user = (
+                    messages_table.select(MESSAGE_COLUMNS)
+                    .eq("conversation_id", conversation_id)
+                    .eq("role", "user")
+                    .order("seq", desc=True)
+                    .limit(1)
+                    .execute()
+                ).data or []
+
                 found_request_id: Optional[str] = None
-                found_user_message_id: Optional[str] = None
                 found_assistant_message_id: Optional[str] = None
-                for i in range(len(messages) - 1, -1, -1):
-                    if messages[i].get("role") == "user":
-                        messages[i]["status"] = "pending"
-                        message_index = i
-                        found_request_id = messages[i].get("request_id")
-                        found_user_message_id = messages[i].get("message_id")
-                        break
-
-                # Try to find the matching assistant placeholder (by request_id).
+                message_index = conversation.get("message_count") or 0
+                if last_user:
+                    user_row = last_user[0]
+                    message_index = user_row["seq"] - 1
+                    found_request_id = user_row.get("request_id")
+                    user_message_id = user_row.get("message_id") or user_message_id
+                    messages_table.update(
+                        {"status": "pending", "updated_at": now_iso}
+                    ).eq("conversation_id", conversation_id).eq(
+                        "seq", user_row["seq"]
+                    ).execute()
+
+                # Reset the matching assistant placeholder (by request_id) for retry.
                 if found_request_id:
-                    for i in range(len(messages) - 1, -1, -1):
-                        if (
-                            messages[i].get("role") == "assistant"
-                            and messages[i].get("request_id") == found_request_id
-                        ):
-                            found_assistant_message_id = messages[i].get("message_id")
-                            # Reset placeholder state for retry
-                            messages[i]["status"] = "generating"
-                            messages[i]["content"] = ""
-                            break
+                    reset = (
+                        messages_table.update(
+                            {"status": "generating", "content": "", "updated_at": now_iso}
+                        )
+                        .eq("conversation_id", conversation_id)
+                        .eq("request_id", found_request_id)
+                        .eq("role", "assistant")
+                        .execute()
+                    ).data or []
+                    if reset:
+                        found_assistant_message_id = reset[0].get("message_id")
 
                 # If we couldn't find a placeholder (legacy messages), create one now.
                 request_id = found_request_id or request_id
-                user_message_id = found_user_message_id or user_message_id
                 assistant_message_id = (
                     found_assistant_message_id or assistant_message_id
                 )
                 if not found_assistant_message_id:
-                    messages.append(
-                        {
-                            "role": "assistant",
-                            "content": "",
-                            "status": "generating",
-                            "message_id": assistant_message_id,
-                            "request_id": request_id,
-                            "created_at": datetime.utcnow().isoformat(),
-                        }
+                    append_messages(
+                        self.supabase,
+                        conversation_id,
+                        [
+                            {
+                                "role": "assistant",
+                                "content": "",
+                                "status": "generating",
+                                "message_id": assistant_message_id,
+                                "request_id": request_id,
+                                "created_at": now_iso,
+                            }
+                        ],
                     )
 
-            # Save to database
-            self.supabase.table("ai_coach_conversations").update(
-                {
-                    "messages": json.dumps(messages),
-                    "message_count": len(messages),
-                    "last_message_at": datetime.utcnow().isoformat(),
-                    "updated_at": datetime.utcnow().isoformat(),
-                }
-            ).eq("id", conversation_id).execute()
-
             # Queue Celery task for background processing
             from app.services.tasks import process_ai_coach_message_task
 
@@ -721,7 +745,7 @@ class AICoachService:
             if conversation_id:
                 result = (
                     self.supabase.table("ai_coach_conversations")
-                    .select("*")
+                    .select(CONVERSATION_COLUMNS)
                     .eq("id", conversation_id)
                     .eq("user_id", user_id)
                     .eq("is_archived", False)
@@ -730,8 +754,6 @@ class AICoachService:
 
                 if result.data and len(result.data) > 0:
                     conv = result.data[0]
-                    if isinstance(conv.get("messages"), str):
-                        conv["messages"] = json.loads(conv["messages"])
                     # Enforce thread purity:
                     # - If goal_id is provided, never reuse a conversation from a different goal (or general).
                     # - If goal_id is not provided (general), never reuse a goal-scoped conversation.
@@ -759,7 +781,7 @@ class AICoachService:
             # Get most recent non-archived conversation
             result = (
                 self.supabase.table("ai_coach_conversations")
-                .select("*")
+                .select(CONVERSATION_COLUMNS)
                 .eq("user_id", user_id)
                 .eq("is_archived", False)
                 .order("last_message_at", desc=True)
@@ -768,10 +790,7 @@ class AICoachService:
             )
 
             if result.data and len(result.data) > 0:
-                conv = result.data[0]
-                if isinstance(conv.get("messages"), str):
-                    conv["messages"] = json.loads(conv["messages"])
-                return conv
+                return result.data[0]
 
             return await self.start_new_conversation(user_id, goal_id=None)
 
@@ -4,12 +4,29 @@ AI Coach Redis Stream Service
 Publishes streaming chunks to Redis pub/sub for SSE delivery.
 When AI_COACH_STREAM_VIA_REDIS is enabled, Celery task publishes chunks here
 instead of writing to DB during streaming. Single DB write when complete.
+
+Subscriber side (StreamHub, API workers):
+- One redis.asyncio pub/sub connection per worker, shared by every SSE
+  client. A channel is subscribed when its first client arrives and
+  unsubscribed when the last one leaves.
+- A single reader task dispatches messages to per-client asyncio queues, so
+  open streams cost a queue each, not a thread and a connection.
+- Queues are bounded. A client that falls behind loses its oldest chunks,
+  never the done/error event: each chunk carries the full text so far, so
+  only the latest one matters.
+- If the connection drops, the reader reconnects, resubscribes and replays
+  done events (from the done key) for requests that finished meanwhile.
 """
 
+import asyncio
 import json
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+import redis.asyncio as aioredis
 
 from app.core.cache import get_redis_client
+from app.core.config import settings
 from app.services.logger import logger
 
 STREAM_CHANNEL_PREFIX = "ai_coach:stream:"
@@ -89,3 +106,208 @@ def check_done(request_id: str) -> Optional[str]:
     except Exception as e:
         logger.warning(f"[AI Coach Stream] Failed to check done: {e}")
         return None
+
+
+# =====================================================
+# Subscriber side (SSE endpoint)
+# =====================================================
+
+# Reader wake-up interval; messages are delivered as soon as they arrive
+READ_TIMEOUT_SECONDS = 1.0
+RECONNECT_MAX_DELAY_SECONDS = 10.0
+
+
+def _offer(queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+    """Put without blocking the reader; a full queue drops its oldest event."""
+    while True:
+        try:
+            queue.put_nowait(event)
+            return
+        except asyncio.QueueFull:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+
+
+class StreamHub:
+    """Multiplexed pub/sub subscriber for one API worker (see module docstring)."""
+
+    def __init__(self, redis_url: str):
+        self._redis_url = redis_url
+        self._client: Optional[aioredis.Redis] = None
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._has_channels = asyncio.Event()
+        self._listeners: Dict[str, Set[asyncio.Queue]] = {}
+
+    @asynccontextmanager
+    async def subscribe(self, request_id: str) -> AsyncIterator[asyncio.Queue]:
+        """
+        Queue of stream events ({"type": "chunk" | "done" | "error", ...}) for
+        request_id while the context is open. Raises if Redis is unreachable.
+        """
+        channel = channel_for_request(request_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.AI_COACH_STREAM_QUEUE_SIZE)
+
+        async with self._lock:
+            self._ensure_pubsub()
+            listeners = self._listeners.setdefault(channel, set())
+            try:
+                if not listeners:
+                    await self._pubsub.subscribe(channel)
+            except Exception:
+                if not listeners:
+                    del self._listeners[channel]
+                raise
+            listeners.add(queue)
+            self._has_channels.set()
+            # Only once SUBSCRIBE has run: before that the PubSub has no
+            # connection and get_message() raises
+            self._ensure_reader()
+
+        try:
+            # Finished between the caller's check_done() and SUBSCRIBE
+            content = await self.get_done(request_id)
+            if content is not None:
+                _offer(queue, {"type": "done", "content": content})
+            yield queue
+        finally:
+            async with self._lock:
+                listeners = self._listeners.get(channel)
+                if listeners is not None:
+                    listeners.discard(queue)
+                    if not listeners:
+                        del self._listeners[channel]
+                        try:
+                            await self._pubsub.unsubscribe(channel)
+                        except Exception as e:
+                            # Resubscription after a reconnect skips it anyway
+                            logger.warning(f"[AI Coach Stream] Unsubscribe failed: {e}")
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_done(self, request_id: str) -> Optional[str]:
+        """Async check_done(): final content if the request already finished."""
+        try:
+            content = await self._ensure_client().get(_done_key(request_id))
+        except Exception as e:
+            logger.warning(f"[AI Coach Stream] Failed to check done: {e}")
+            return None
+        return content.decode("utf-8") if isinstance(content, bytes) else content
+
+    def _ensure_client(self) -> aioredis.Redis:
+        if self._client is None:
+            # Dedicated pool: the pub/sub read blocks, so it can't use the
+            # request-path pool's short socket timeout
+            self._client = aioredis.from_url(
+                self._redis_url,
+                socket_connect_timeout=5,
+                health_check_interval=30,
+            )
+        return self._client
+
+    def _ensure_pubsub(self) -> None:
+        self._ensure_client()
+        if self._pubsub is None:
+            self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+
+    def _ensure_reader(self) -> None:
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self) -> None:
+        delay = 0.5
+        while True:
+            if not self._listeners:
+                self._has_channels.clear()
+                await self._has_channels.wait()
+
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=READ_TIMEOUT_SECONDS
+                )
+                delay = 0.5
+            except Exception as e:
+                logger.warning(f"[AI Coach Stream] Subscriber connection lost: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY_SECONDS)
+                try:
+                    await self._reconnect()
+                except Exception as reconnect_error:
+                    logger.warning(
+                        f"[AI Coach Stream] Resubscribe failed: {reconnect_error}"
+                    )
+                continue
+
+            if message and message.get("type") == "message":
+                self._dispatch(message["channel"], message["data"])
+
+    async def _reconnect(self) -> None:
+        async with self._lock:
+            old = self._pubsub
+            self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await old.aclose()
+            except Exception:
+                pass
+            channels = list(self._listeners)
+            if channels:
+                await self._pubsub.subscribe(*channels)
+
+        # Events published while disconnected are lost; done is also in a key
+        for channel in channels:
+            content = await self.get_done(channel[len(STREAM_CHANNEL_PREFIX) :])
+            if content is not None:
+                self._deliver(channel, {"type": "done", "content": content})
+
+    def _dispatch(self, channel: Any, data: Any) -> None:
+        if isinstance(channel, bytes):
+            channel = channel.decode("utf-8")
+        try:
+            event = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        self._deliver(channel, event)
+
+    def _deliver(self, channel: str, event: Dict[str, Any]) -> None:
+        for queue in list(self._listeners.get(channel) or ()):
+            _offer(queue, event)
+
+
+_stream_hub: Optional[StreamHub] = None
+
+
+def get_stream_hub() -> Optional[StreamHub]:
+    """Per-worker StreamHub, or None when Redis is not configured."""
+    global _stream_hub
+    if _stream_hub is None:
+        redis_url = settings.redis_connection_url
+        if not redis_url:
+            return None
+        _stream_hub = StreamHub(redis_url)
+    return _stream_hub
+
+
+async def close_stream_hub() -> None:
+    """Stop the subscriber and close its connections (called on app shutdown)."""
+    global _stream_hub
+    if _stream_hub is not None:
+        try:
+            await _stream_hub.close()
+        finally:
+            _stream_hub = None
@@ -22,11 +22,12 @@ from collections import defaultdict
 from datetime import date, datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-from openai import AsyncOpenAI
+import numpy as np
 
-from app.core.config import settings
 from app.core.database import get_supabase_client
+from app.core.openai_client import acreate_chat_completion
 from app.services.logger import logger
+from app.services.streaks import STATUS_CODES, CheckInHistory
 
 # Minimum check-ins required before generating insights
 # Dynamic based on goal frequency - roughly 2 weeks of expected activity
@@ -123,54 +124,34 @@ def compute_evidence(checkins: List[Dict]) -> Dict:
     """
     N = len(checkins)
 
+    # Status counts per weekday (0=Sun .. 6=Sat), from the check-in dates
+    history = CheckInHistory.from_rows(checkins, key=None, date_key="date")
+    by_weekday = history.weekday_status_counts()[0]
+    completed_by_day = by_weekday[:, STATUS_CODES["completed"]]
+    rest_by_day = by_weekday[:, STATUS_CODES["rest_day"]]
+    total_by_day = by_weekday.sum(axis=1)
+    missed_by_day = total_by_day - completed_by_day - rest_by_day  # missed / skipped
+
     # Overall counts
     counts = {
-        "completed": 0,
-        "missed": 0,
-        "rest_day": 0,
+        "completed": int(completed_by_day.sum()),
+        "missed": int(missed_by_day.sum()),
+        "rest_day": int(rest_by_day.sum()),
         "total": N,
     }
 
-    # Per-weekday accumulator
-    weekday_raw = defaultdict(
-        lambda: {
-            "total": 0,
-            "completed": 0,
-            "missed": 0,
-            "rest_day": 0,
-        }
-    )
-
-    for ci in checkins:
-        status = ci.get("status")
-        day = ci.get("day_of_week")  # 0=Sun .. 6=Sat
-
-        if day is None:
-            continue
-
-        weekday_raw[day]["total"] += 1
-
-        if status == "completed":
-            counts["completed"] += 1
-            weekday_raw[day]["completed"] += 1
-        elif status == "rest_day":
-            counts["rest_day"] += 1
-            weekday_raw[day]["rest_day"] += 1
-        else:  # missed / skipped
-            counts["missed"] += 1
-            weekday_raw[day]["missed"] += 1
-
     # Final weekday stats with completion_rate
     weekday_stats = {}
-    for day, stats in weekday_raw.items():
-        total = stats["total"]
-        completed = stats["completed"]
-
-        completion_rate = round(completed / total, 3) if total > 0 else 0.0
+    for day in np.flatnonzero(total_by_day):
+        total = int(total_by_day[day])
+        completed = int(completed_by_day[day])
 
         weekday_stats[str(day)] = {
-            **stats,
-            "completion_rate": completion_rate,
+            "total": total,
+            "completed": completed,
+            "missed": int(missed_by_day[day]),
+            "rest_day": int(rest_by_day[day]),
+            "completion_rate": round(completed / total, 3),
         }
 
     return {
@@ -284,7 +265,6 @@ class AIInsightsService:
     """Service for generating AI-powered pattern insights."""
 
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.supabase = get_supabase_client()
 
     async def get_or_generate_insights(
@@ -981,7 +961,7 @@ class AIInsightsService:
 
         user_message = f"Analyze these check-ins and metrics.\n\n{context}"
 
-        response = await self.client.chat.completions.create(
+        response = await acreate_chat_completion(
             model=INSIGHTS_MODEL,
             messages=[
                 {"role": "system", "content": system_prompt},
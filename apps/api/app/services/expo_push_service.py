@@ -8,6 +8,7 @@ Implements Expo's best practices:
 - Automatic invalid token detection and cleanup
 - Proper error handling with specific exception types
 - Centralized notification preference and quiet hours check
+- Bulk cross-user dispatch over one pooled HTTP session (send_push_to_users_bulk_sync)
 
 Reference: https://docs.expo.dev/push-notifications/sending-notifications/
 """
@@ -15,10 +16,13 @@ Reference: https://docs.expo.dev/push-notifications/sending-notifications/
 from __future__ import annotations
 
 import logging
+import threading
 import time
 import httpx
+import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timezone, time as dt_time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from uuid import uuid4
 import pytz
 
@@ -67,6 +71,59 @@ NOTIFICATION_TYPE_TO_PREFERENCE = {
 }
 
 
+def _evaluate_notification_prefs(
+    prefs: Optional[Dict[str, Any]],
+    notification_type: str,
+    skip_preference_check: bool = False,
+    get_timezone: Optional[Callable[[], str]] = None,
+) -> Tuple[bool, str]:
+    """
+    Apply notification_preferences rules to an already-fetched prefs row.
+
+    Shared by the per-user checks and the bulk dispatcher so both follow the same rules.
+    With skip_preference_check=True only enabled + push_notifications are checked.
+
+    Returns:
+        Tuple of (should_send: bool, reason: str)
+    """
+    # If no preferences, default to sending (user hasn't configured yet)
+    if not prefs:
+        return (True, "ok")
+
+    # Check 1: Global notifications enabled
+    if not prefs.get("enabled", True):
+        return (False, "notifications_disabled")
+
+    # Check 2: Push notifications enabled
+    if not prefs.get("push_notifications", True):
+        return (False, "push_notifications_disabled")
+
+    if skip_preference_check:
+        return (True, "ok")
+
+    # Check 3: Specific notification type enabled
+    # Format: (preference_column, unused) - we only use the first value now
+    pref_tuple = NOTIFICATION_TYPE_TO_PREFERENCE.get(notification_type, (None, None))
+    preference_column, _ = pref_tuple
+
+    # Check the preference toggle (e.g., "partners", "reminders", "achievements")
+    if preference_column:
+        if not prefs.get(preference_column, True):
+            return (False, f"{preference_column}_disabled")
+
+    # Check 4: Quiet hours
+    if prefs.get("quiet_hours_enabled", False):
+        quiet_start = prefs.get("quiet_hours_start")
+        quiet_end = prefs.get("quiet_hours_end")
+
+        if quiet_start and quiet_end:
+            user_timezone = (get_timezone() if get_timezone else None) or "UTC"
+            if _is_quiet_hours(quiet_start, quiet_end, user_timezone):
+                return (False, "quiet_hours")
+
+    return (True, "ok")
+
+
 def should_send_push_notification(user_id: str) -> Tuple[bool, str]:
     """
     Check if user has push notifications enabled.
@@ -86,21 +143,9 @@ def should_send_push_notification(user_id: str) -> Tuple[bool, str]:
             .execute()
         )
 
-        prefs = prefs_result.data
-
-        # If no preferences, default to sending
-        if not prefs:
-            return (True, "ok")
-
-        # Check global enabled
-        if not prefs.get("enabled", True):
-            return (False, "notifications_disabled")
-
-        # Check push_notifications specifically
-        if not prefs.get("push_notifications", True):
-            return (False, "push_notifications_disabled")
-
-        return (True, "ok")
+        return _evaluate_notification_prefs(
+            prefs_result.data, "general", skip_preference_check=True
+        )
 
     except Exception as e:
         logger.warning(
@@ -145,46 +190,12 @@ def should_send_notification(
             .execute()
         )
 
-        prefs = prefs_result.data
-
-        # If no preferences, default to sending (user hasn't configured yet)
-        if not prefs:
-            return (True, "ok")
-
-        # Check 1: Global notifications enabled
-        if not prefs.get("enabled", True):
-            return (False, "notifications_disabled")
-
-        # Check 2: Push notifications enabled
-        if not prefs.get("push_notifications", True):
-            return (False, "push_notifications_disabled")
-
-        # Check 3: Specific notification type enabled
-        # Format: (preference_column, unused) - we only use the first value now
-        pref_tuple = NOTIFICATION_TYPE_TO_PREFERENCE.get(
-            notification_type, (None, None)
+        return _evaluate_notification_prefs(
+            prefs_result.data,
+            notification_type,
+            # Get user timezone only if quiet hours need it
+            get_timezone=lambda: user_timezone or _get_user_timezone(supabase, user_id),
         )
-        preference_column, _ = pref_tuple
-
-        # Check the preference toggle (e.g., "partners", "reminders", "achievements")
-        if preference_column:
-            if not prefs.get(preference_column, True):
-                return (False, f"{preference_column}_disabled")
-
-        # Check 3: Quiet hours
-        if prefs.get("quiet_hours_enabled", False):
-            quiet_start = prefs.get("quiet_hours_start")
-            quiet_end = prefs.get("quiet_hours_end")
-
-            if quiet_start and quiet_end:
-                # Get user timezone if not provided
-                if not user_timezone:
-                    user_timezone = _get_user_timezone(supabase, user_id)
-
-                if _is_quiet_hours(quiet_start, quiet_end, user_timezone):
-                    return (False, "quiet_hours")
-
-        return (True, "ok")
 
     except Exception as e:
         logger.warning(f"Error checking notification preferences for {user_id}: {e}")
@@ -287,11 +298,92 @@ INITIAL_RETRY_DELAY = 2  # seconds
 BATCH_DELAY_SECONDS = 0.2  # 200ms delay between batches
 
 
+# Shared HTTP connection pool for Expo (one per process, reused across tasks)
+EXPO_HTTP_POOL_SIZE = 10
+EXPO_HTTP_TIMEOUT_SECONDS = 15
+
+# Hard per-project limit from Expo; the bulk dispatcher throttles to this
+EXPO_MAX_MESSAGES_PER_SECOND = 600
+
+# Max ids per PostgREST in_() filter (keeps request URLs well under proxy limits)
+BULK_IN_FILTER_CHUNK_SIZE = 200
+
+_push_client: Optional[PushClient] = None
+_push_client_lock = threading.Lock()
+
+
 def is_valid_expo_token(token: str) -> bool:
     """Check if token is a valid Expo push token format"""
     return token.startswith("ExponentPushToken[") and token.endswith("]")
 
 
+def get_push_client() -> PushClient:
+    """
+    Process-wide Expo PushClient backed by a pooled requests.Session.
+
+    PushClient() without a session opens a fresh HTTPS connection for every
+    publish; sharing one session keeps TLS connections to exp.host alive.
+    """
+    global _push_client
+
+    if _push_client is not None:
+        return _push_client
+
+    with _push_client_lock:
+        if _push_client is None:
+            session = requests.Session()
+            session.headers.update(
+                {
+                    "accept": "application/json",
+                    "accept-encoding": "gzip, deflate",
+                    "content-type": "application/json",
+                }
+            )
+            adapter = HTTPAdapter(
+                pool_connections=EXPO_HTTP_POOL_SIZE,
+                pool_maxsize=EXPO_HTTP_POOL_SIZE,
+            )
+            session.mount("https://", adapter)
+            _push_client = PushClient(
+                session=session, timeout=EXPO_HTTP_TIMEOUT_SECONDS
+            )
+
+    return _push_client
+
+
+class _ExpoRateLimiter:
+    """
+    Token bucket shared by all bulk sends in this process.
+
+    acquire(n) blocks until n messages may be sent without exceeding
+    EXPO_MAX_MESSAGES_PER_SECOND.
+    """
+
+    def __init__(self, rate_per_second: int):
+        self._rate = float(rate_per_second)
+        self._tokens = float(rate_per_second)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, count: int) -> None:
+        count = min(count, int(self._rate))
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._rate, self._tokens + (now - self._updated_at) * self._rate
+                )
+                self._updated_at = now
+                if self._tokens >= count:
+                    self._tokens -= count
+                    return
+                wait = (count - self._tokens) / self._rate
+            time.sleep(wait)
+
+
+_expo_rate_limiter = _ExpoRateLimiter(EXPO_MAX_MESSAGES_PER_SECOND)
+
+
 async def send_push_to_user(
     user_id: str,
     *,
@@ -499,7 +591,7 @@ async def send_push_to_user(
         for retry_attempt in range(MAX_RETRIES):
             try:
                 # publish_multiple() sends all messages in one request (efficient)
-                responses = PushClient().publish_multiple(push_messages)
+                responses = get_push_client().publish_multiple(push_messages)
                 print(
                     f"✅ Batch {batch_start // EXPO_BATCH_SIZE + 1} sent to Expo (attempt {retry_attempt + 1})"
                 )
@@ -842,7 +934,7 @@ def send_push_to_user_sync(
 
         # Send batch using Expo SDK with retry logic
         try:
-            responses = PushClient().publish_multiple(push_messages)
+            responses = get_push_client().publish_multiple(push_messages)
 
             # Process responses
             for idx, response in enumerate(responses):
@@ -899,3 +991,294 @@ def send_push_to_user_sync(
     except Exception as e:
         logger.error(f"Failed to send push to user {user_id}: {e}")
         return {"success": False, "error": str(e)}
+
+
+# =============================================================================
+# BULK CROSS-USER DISPATCH
+# =============================================================================
+
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _publish_batch_with_retry(push_messages: List[PushMessage]) -> Optional[list]:
+    """Publish one <=100 message batch with exponential backoff. None on permanent failure."""
+    for retry_attempt in range(MAX_RETRIES):
+        try:
+            return get_push_client().publish_multiple(push_messages)
+        except (PushServerError, Exception) as exc:
+            is_retryable = isinstance(exc, PushServerError) or (
+                hasattr(exc, "response")
+                and hasattr(exc.response, "status_code")
+                and exc.response.status_code in [429, 500, 502, 503, 504]
+            )
+            if is_retryable and retry_attempt < MAX_RETRIES - 1:
+                delay = INITIAL_RETRY_DELAY * (2**retry_attempt)
+                logger.warning(
+                    f"Bulk push batch failed, retrying in {delay}s",
+                    extra={"error": str(exc), "attempt": retry_attempt + 1},
+                )
+                time.sleep(delay)
+                continue
+            logger.error(
+                f"Bulk push batch failed after {retry_attempt + 1} attempts",
+                extra={"error": str(exc), "batch_size": len(push_messages)},
+            )
+            return None
+    return None
+
+
+def send_push_to_users_bulk_sync(
+    notifications: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Send many notifications to many users in one pass (for Celery tasks).
+
+    Each item takes the same keys as send_push_to_user_sync's arguments:
+    user_id, title, body, data, notification_type, entity_type, entity_id,
+    category_id, skip_preference_check, save_to_notification_history, plus an
+    optional user_timezone (skips the users lookup for quiet hours).
+
+    Instead of ~6 round trips and one Expo request per recipient, this:
+    1. Bulk inserts notification_history rows
+    2. Prefetches preferences, timezones (only when quiet hours need them),
+       device tokens and badge counts with a few in_()/RPC queries
+    3. Packs messages from all users into 100-message Expo batches over the
+       shared pooled client, throttled to EXPO_MAX_MESSAGES_PER_SECOND
+    4. Bulk updates delivered_at and deactivates DeviceNotRegistered tokens
+
+    Returns:
+        One result per input item (same order, same shape as send_push_to_user_sync)
+    """
+    if not notifications:
+        return []
+
+    supabase = get_supabase_client()
+    now_iso = datetime.now(timezone.utc).isoformat()
+
+    items = []
+    for n in notifications:
+        items.append(
+            {
+                **n,
+                "notification_type": n.get("notification_type") or "general",
+                "data": n.get("data") or {},
+                "notification_id": str(uuid4()),
+            }
+        )
+
+    results: List[Dict[str, Any]] = [
+        {"success": True, "delivered": 0, "notification_id": item["notification_id"]}
+        for item in items
+    ]
+    user_ids = list({item["user_id"] for item in items})
+
+    # STEP 1: Bulk insert notification history (inbox)
+    history_rows = []
+    for item in items:
+        if not item.get("save_to_notification_history", True):
+            continue
+        record = {
+            "id": item["notification_id"],
+            "user_id": item["user_id"],
+            "notification_type": item["notification_type"],
+            "title": item["title"],
+            "body": item["body"],
+            "data": item["data"],
+            "sent_at": now_iso,
+        }
+        if item.get("entity_type") and item.get("entity_id"):
+            record["entity_type"] = item["entity_type"]
+            record["entity_id"] = item["entity_id"]
+        history_rows.append(record)
+
+    for chunk in _chunks(history_rows, 500):
+        try:
+            supabase.table("notification_history").insert(chunk).execute()
+        except Exception as e:
+            logger.error(
+                f"Failed to bulk insert notification history: {e}",
+                extra={"count": len(chunk)},
+            )
+
+    # STEP 2: Prefetch preferences for all recipients
+    prefs_by_user: Dict[str, Dict[str, Any]] = {}
+    prefs_failed = False
+    for chunk in _chunks(user_ids, BULK_IN_FILTER_CHUNK_SIZE):
+        try:
+            prefs_result = (
+                supabase.table("notification_preferences")
+                .select("*")
+                .in_("user_id", chunk)
+                .execute()
+            )
+            for pref in prefs_result.data or []:
+                prefs_by_user[pref["user_id"]] = pref
+        except Exception as e:
+            prefs_failed = True
+            logger.warning(f"Failed to prefetch notification preferences: {e}")
+
+    # Timezones only for users in quiet hours mode without a caller-supplied timezone
+    timezone_by_user: Dict[str, str] = {
+        item["user_id"]: item["user_timezone"]
+        for item in items
+        if item.get("user_timezone")
+    }
+    tz_user_ids = [
+        uid
+        for uid, pref in prefs_by_user.items()
+        if pref.get("quiet_hours_enabled") and uid not in timezone_by_user
+    ]
+    for chunk in _chunks(tz_user_ids, BULK_IN_FILTER_CHUNK_SIZE):
+        try:
+            users_result = (
+                supabase.table("users")
+                .select("id, timezone")
+                .in_("id", chunk)
+                .execute()
+            )
+            for u in users_result.data or []:
+                timezone_by_user[u["id"]] = u.get("timezone") or "UTC"
+        except Exception as e:
+            logger.warning(f"Failed to prefetch user timezones: {e}")
+
+    sendable_indexes = []
+    for idx, item in enumerate(items):
+        user_id = item["user_id"]
+        if prefs_failed and user_id not in prefs_by_user:
+            # Same fallback as should_send_notification: send if prefs can't be read
+            sendable_indexes.append(idx)
+            continue
+        should_send, reason = _evaluate_notification_prefs(
+            prefs_by_user.get(user_id),
+            item["notification_type"],
+            skip_preference_check=item.get("skip_preference_check", False),
+            get_timezone=lambda uid=user_id: timezone_by_user.get(uid, "UTC"),
+        )
+        if should_send:
+            sendable_indexes.append(idx)
+        else:
+            results[idx].update(
+                {
+                    "reason": reason,
+                    "skipped": True,
+                    "saved_to_inbox": item.get("save_to_notification_history", True),
+                }
+            )
+
+    if not sendable_indexes:
+        return results
+
+    # STEP 3: Prefetch active device tokens for sendable users
+    sendable_user_ids = list({items[idx]["user_id"] for idx in sendable_indexes})
+    tokens_by_user: Dict[str, List[Dict[str, Any]]] = {}
+    for chunk in _chunks(sendable_user_ids, BULK_IN_FILTER_CHUNK_SIZE):
+        try:
+            tokens_result = (
+                supabase.table("device_tokens")
+                .select("id, user_id, fcm_token")
+                .in_("user_id", chunk)
+                .eq("is_active", True)
+                .execute()
+            )
+        except Exception as e:
+            logger.error(f"Failed to prefetch device tokens: {e}")
+            continue
+        for row in tokens_result.data or []:
+            token = row.get("fcm_token")
+            if isinstance(token, str) and is_valid_expo_token(token):
+                tokens_by_user.setdefault(row["user_id"], []).append(row)
+
+    # STEP 4: Badge counts for all users with tokens (one RPC per chunk)
+    badge_by_user: Dict[str, int] = {}
+    for chunk in _chunks(list(tokens_by_user.keys()), BULK_IN_FILTER_CHUNK_SIZE):
+        try:
+            counts_result = supabase.rpc(
+                "get_unread_notification_counts", {"p_user_ids": chunk}
+            ).execute()
+            for row in counts_result.data or []:
+                badge_by_user[row["user_id"]] = row.get("unread_count") or 0
+        except Exception as e:
+            logger.warning(f"Failed to get bulk unread counts: {e}")
+
+    # STEP 5: Build messages across all users
+    messages: List[Tuple[int, Dict[str, Any], PushMessage]] = []
+    for idx in sendable_indexes:
+        item = items[idx]
+        user_tokens = tokens_by_user.get(item["user_id"], [])
+        results[idx]["total_tokens"] = len(user_tokens)
+        if not user_tokens:
+            results[idx]["reason"] = "no_tokens"
+            continue
+
+        badge_count = badge_by_user.get(item["user_id"], 0)
+        for token_row in user_tokens:
+            message_kwargs = {
+                "to": token_row["fcm_token"],
+                "title": item["title"],
+                "body": item["body"],
+                "data": item["data"],
+                "sound": "default",
+                "priority": "high",
+            }
+            if badge_count > 0:
+                message_kwargs["badge"] = badge_count
+            if item.get("category_id"):
+                message_kwargs["category"] = item["category_id"]
+            messages.append((idx, token_row, PushMessage(**message_kwargs)))
+
+    # STEP 6: Send in 100-message batches, throttled to Expo's rate limit
+    invalid_token_ids: List[str] = []
+    for batch in _chunks(messages, EXPO_BATCH_SIZE):
+        _expo_rate_limiter.acquire(len(batch))
+        responses = _publish_batch_with_retry([m for _, _, m in batch])
+        if not responses:
+            continue
+
+        for (idx, token_row, _), response in zip(batch, responses):
+            try:
+                response.validate_response()
+                results[idx]["delivered"] += 1
+            except DeviceNotRegisteredError:
+                invalid_token_ids.append(token_row["id"])
+            except (PushTicketError, Exception) as exc:
+                logger.warning(
+                    f"Push failed for token {token_row['fcm_token'][:20]}...: {exc}"
+                )
+
+    # STEP 7: Bulk status writes
+    for chunk in _chunks(invalid_token_ids, BULK_IN_FILTER_CHUNK_SIZE):
+        try:
+            supabase.table("device_tokens").update({"is_active": False}).in_(
+                "id", chunk
+            ).execute()
+        except Exception as e:
+            logger.warning(f"Failed to deactivate invalid tokens: {e}")
+
+    delivered_ids = [
+        items[idx]["notification_id"]
+        for idx in sendable_indexes
+        if results[idx]["delivered"] > 0
+        and items[idx].get("save_to_notification_history", True)
+    ]
+    delivered_at = datetime.now(timezone.utc).isoformat()
+    for chunk in _chunks(delivered_ids, BULK_IN_FILTER_CHUNK_SIZE):
+        try:
+            supabase.table("notification_history").update(
+                {"delivered_at": delivered_at}
+            ).in_("id", chunk).execute()
+        except Exception as e:
+            logger.warning(f"Failed to bulk update notification history: {e}")
+
+    logger.info(
+        "Bulk push dispatched",
+        extra={
+            "notifications": len(items),
+            "messages": len(messages),
+            "delivered": sum(1 for r in results if r["delivered"] > 0),
+            "invalid_tokens": len(invalid_token_ids),
+        },
+    )
+
+    return results
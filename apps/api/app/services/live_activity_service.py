@@ -11,9 +11,13 @@ Mode A (in-app) remains as fallback when tokens are missing or Live Activities d
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
+import os
+import threading
 import time
+import weakref
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
@@ -127,11 +131,72 @@ def _deterministic_sort_key(goal: Dict[str, Any]) -> Tuple[int, str, str]:
 # APNs ActivityKit Push Sender
 # =====================================================
 
+# APNs rejects provider tokens older than an hour and throttles re-signing
+# more often than every 20 minutes: reuse one token, rotate it ahead of expiry
+PROVIDER_TOKEN_ROTATE_SECONDS = 50 * 60
+
+# Device token no longer valid (Unregistered / BadDeviceToken path)
+APNS_INVALID_TOKEN_STATUSES = (404, 410)
+
+_provider_token: Optional[Tuple[str, str, float]] = None  # (signer, jwt, issued_at)
+_provider_token_lock = threading.Lock()
+
+
+class _APNsLoopState:
+    """HTTP/2 connection to APNs (multiplexed) and stream cap for one event loop."""
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        self.client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_connections=1,
+                max_keepalive_connections=1,
+                keepalive_expiry=settings.ACTIVITYKIT_APNS_KEEPALIVE_SECONDS,
+            ),
+        )
+        self.streams = asyncio.Semaphore(
+            max(1, settings.ACTIVITYKIT_APNS_MAX_CONCURRENT_STREAMS)
+        )
+
+
+_apns_loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _APNsLoopState]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_apns_loop_state() -> _APNsLoopState:
+    loop = asyncio.get_running_loop()
+    pid = os.getpid()
+    state = _apns_loop_states.get(loop)
+    if state is not None and state.pid == pid:
+        return state
+
+    for stale_loop, stale in list(_apns_loop_states.items()):
+        # Closed loops can't run aclose(). Clients inherited across a fork share
+        # the parent's sockets: drop them without aclose(), which would end the
+        # parent's TLS session
+        if stale.pid != pid or stale_loop.is_closed():
+            _apns_loop_states.pop(stale_loop, None)
+    state = _apns_loop_states[loop] = _APNsLoopState()
+    return state
+
+
+async def close_activitykit_apns_client() -> None:
+    """Close the running loop's APNs connection (called on app shutdown)."""
+    state = _apns_loop_states.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        await state.client.aclose()
+
 
 class ActivityKitAPNsClient:
     """
     Minimal APNs (HTTP/2) sender for ActivityKit Live Activities.
     Uses Token-based auth (JWT) with ES256.
+
+    Cheap to construct: the connection is shared per event loop and the
+    provider token per process.
     """
 
     def __init__(self) -> None:
@@ -155,11 +220,40 @@ class ActivityKitAPNsClient:
                 "ACTIVITYKIT_APNS_KEY_ID, ACTIVITYKIT_APNS_PRIVATE_KEY, ACTIVITYKIT_APNS_TOPIC."
             )
 
-    def _provider_jwt(self) -> str:
-        now = int(time.time())
-        headers = {"alg": "ES256", "kid": self.key_id, "typ": "JWT"}
-        claims = {"iss": self.team_id, "iat": now}
-        return jwt.encode(claims, self.private_key, algorithm="ES256", headers=headers)
+    def _provider_jwt(self, stale: Optional[str] = None) -> str:
+        """
+        The cached provider token, signed again when it is
+        PROVIDER_TOKEN_ROTATE_SECONDS old or when APNs rejected it (stale).
+        """
+        global _provider_token
+        signer = f"{self.team_id}:{self.key_id}"
+        cached = _provider_token
+        if (
+            cached is not None
+            and cached[0] == signer
+            and cached[1] != stale
+            and time.time() - cached[2] < PROVIDER_TOKEN_ROTATE_SECONDS
+        ):
+            return cached[1]
+
+        with _provider_token_lock:
+            cached = _provider_token
+            if (
+                cached is not None
+                and cached[0] == signer
+                and cached[1] != stale
+                and time.time() - cached[2] < PROVIDER_TOKEN_ROTATE_SECONDS
+            ):
+                return cached[1]
+
+            now = int(time.time())
+            headers = {"alg": "ES256", "kid": self.key_id, "typ": "JWT"}
+            claims = {"iss": self.team_id, "iat": now}
+            token = jwt.encode(
+                claims, self.private_key, algorithm="ES256", headers=headers
+            )
+            _provider_token = (signer, token, now)
+            return token
 
     def _host(self) -> str:
         return (
@@ -168,18 +262,49 @@ class ActivityKitAPNsClient:
             else "https://api.push.apple.com"
         )
 
+    async def _post(
+        self,
+        client: httpx.AsyncClient,
+        token: str,
+        payload: Dict[str, Any],
+        provider_jwt: str,
+    ) -> httpx.Response:
+        return await client.post(
+            f"{self._host()}/3/device/{token}",
+            headers={
+                "authorization": f"bearer {provider_jwt}",
+                "apns-push-type": "liveactivity",
+                "apns-topic": self.topic,
+                "apns-priority": "5",
+            },
+            json=payload,
+        )
+
     async def send(self, token: str, payload: Dict[str, Any]) -> None:
-        url = f"{self._host()}/3/device/{token}"
-        headers = {
-            "authorization": f"bearer {self._provider_jwt()}",
-            "apns-push-type": "liveactivity",
-            "apns-topic": self.topic,
-            "apns-priority": "5",
-        }
-        async with httpx.AsyncClient(http2=True, timeout=10.0) as client:
-            r = await client.post(url, headers=headers, json=payload)
-            if r.status_code >= 400:
-                raise APNsDeliveryError(r.status_code, r.text)
+        state = _get_apns_loop_state()
+        async with state.streams:
+            provider_jwt = self._provider_jwt()
+            r = await self._post(state.client, token, payload, provider_jwt)
+            if r.status_code == 403 and "ProviderToken" in r.text:
+                # ExpiredProviderToken / InvalidProviderToken: sign a new one once
+                provider_jwt = self._provider_jwt(stale=provider_jwt)
+                r = await self._post(state.client, token, payload, provider_jwt)
+        if r.status_code >= 400:
+            raise APNsDeliveryError(r.status_code, r.text)
+
+    async def send_many(
+        self, pushes: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[Optional[BaseException]]:
+        """
+        Send (token, payload) pushes concurrently over the shared connection
+        (at most ACTIVITYKIT_APNS_MAX_CONCURRENT_STREAMS in flight).
+        Returns None per push that was delivered, else its exception.
+        """
+        results = await asyncio.gather(
+            *(self.send(token, payload) for token, payload in pushes),
+            return_exceptions=True,
+        )
+        return [r if isinstance(r, BaseException) else None for r in results]
 
 
 # =====================================================
@@ -315,6 +440,9 @@ async def refresh_live_activity_for_user(user_id: str) -> Dict[str, Any]:
     - start via push_to_start_token when we don't have an activity_push_token
     - update/end via activity_push_token when available
     Dedupe: skip if payload hash unchanged for the same dayKey.
+
+    Pushes for all devices go out concurrently; devices whose token APNs
+    reports gone (404/410) are cleared with one update.
     """
     supabase = get_supabase_client()
     devices_res = (
@@ -329,7 +457,16 @@ async def refresh_live_activity_for_user(user_id: str) -> Dict[str, Any]:
         return {"sent": 0, "devices": 0}
 
     apns = ActivityKitAPNsClient()
-    sent = 0
+
+    # Per device: (device, push or None, state update, apply update only on success)
+    plans: List[
+        Tuple[Dict[str, Any], Optional[Tuple[str, Dict[str, Any]]], Dict[str, Any], bool]
+    ] = []
+    # Devices of one user usually share timezone and lock: compute once each
+    computed: Dict[
+        Tuple[str, Optional[str], Optional[str]],
+        Tuple[Optional[NextUpPayload], str, Optional[str]],
+    ] = {}
 
     for d in devices:
         timezone = d.get("timezone") or "UTC"
@@ -338,15 +475,19 @@ async def refresh_live_activity_for_user(user_id: str) -> Dict[str, Any]:
         )
         locked_day_key = d.get("locked_day_key")
 
-        next_payload, day_key, next_task_id = await compute_next_up_payload_for_user(
-            user_id=user_id,
-            timezone=timezone,
-            locked_task_id=locked_task_id,
-            locked_day_key=locked_day_key,
-        )
+        key = (timezone, locked_task_id, locked_day_key)
+        if key not in computed:
+            computed[key] = await compute_next_up_payload_for_user(
+                user_id=user_id,
+                timezone=timezone,
+                locked_task_id=locked_task_id,
+                locked_day_key=locked_day_key,
+            )
+        next_payload, day_key, next_task_id = computed[key]
 
         # End case
         if next_payload is None:
+            push = None
             # If we have an activity push token, we can end remotely.
             if d.get("activity_push_token"):
                 end_payload = build_activitykit_end_payload(
@@ -360,30 +501,22 @@ async def refresh_live_activity_for_user(user_id: str) -> Dict[str, Any]:
                         totalCount=0,
                     )
                 )
-                try:
-                    await apns.send(str(d["activity_push_token"]), end_payload)
-                    sent += 1
-                except APNsDeliveryError as e:
-                    if e.status_code in (404, 410):
-                        supabase.table("live_activity_devices").update(
-                            {
-                                "push_to_start_token": None,
-                                "activity_id": None,
-                                "activity_push_token": None,
-                            }
-                        ).eq("id", d["id"]).execute()
-                except Exception:
-                    pass
-
-            # Clear state
-            supabase.table("live_activity_devices").update(
-                {
-                    "last_day_key": day_key,
-                    "last_payload_hash": None,
-                    "locked_day_key": None,
-                    "locked_task_id": None,
-                }
-            ).eq("id", d["id"]).execute()
+                push = (str(d["activity_push_token"]), end_payload)
+
+            # Clear state (whether or not the end push goes through)
+            plans.append(
+                (
+                    d,
+                    push,
+                    {
+                        "last_day_key": day_key,
+                        "last_payload_hash": None,
+                        "locked_day_key": None,
+                        "locked_task_id": None,
+                    },
+                    False,
+                )
+            )
             continue
 
         payload_hash = next_payload.stable_hash()
@@ -393,40 +526,67 @@ async def refresh_live_activity_for_user(user_id: str) -> Dict[str, Any]:
         ):
             continue
 
-        try:
-            if d.get("activity_push_token"):
-                await apns.send(
-                    str(d["activity_push_token"]),
-                    build_activitykit_update_payload(next_payload),
-                )
-                sent += 1
-            elif d.get("push_to_start_token"):
-                await apns.send(
-                    str(d["push_to_start_token"]),
-                    build_activitykit_start_payload(next_payload),
-                )
-                sent += 1
-        except APNsDeliveryError as e:
-            if e.status_code in (404, 410):
-                supabase.table("live_activity_devices").update(
-                    {
-                        "push_to_start_token": None,
-                        "activity_id": None,
-                        "activity_push_token": None,
-                    }
-                ).eq("id", d["id"]).execute()
-            continue
-        except Exception:
-            continue
+        push = None
+        if d.get("activity_push_token"):
+            push = (
+                str(d["activity_push_token"]),
+                build_activitykit_update_payload(next_payload),
+            )
+        elif d.get("push_to_start_token"):
+            push = (
+                str(d["push_to_start_token"]),
+                build_activitykit_start_payload(next_payload),
+            )
 
         # Persist dedupe + lock (best-effort flicker prevention)
+        plans.append(
+            (
+                d,
+                push,
+                {
+                    "last_day_key": day_key,
+                    "last_payload_hash": payload_hash,
+                    "locked_day_key": day_key,
+                    "locked_task_id": next_task_id,
+                },
+                True,
+            )
+        )
+
+    pushing = [plan for plan in plans if plan[1] is not None]
+    errors = await apns.send_many([plan[1] for plan in pushing])
+    error_by_device = {
+        plan[0]["id"]: error for plan, error in zip(pushing, errors)
+    }
+
+    sent = sum(1 for error in errors if error is None)
+    invalid_ids = [
+        device_id
+        for device_id, error in error_by_device.items()
+        if isinstance(error, APNsDeliveryError)
+        and error.status_code in APNS_INVALID_TOKEN_STATUSES
+    ]
+    if invalid_ids:
         supabase.table("live_activity_devices").update(
             {
-                "last_day_key": day_key,
-                "last_payload_hash": payload_hash,
-                "locked_day_key": day_key,
-                "locked_task_id": next_task_id,
+                "push_to_start_token": None,
+                "activity_id": None,
+                "activity_push_token": None,
             }
-        ).eq("id", d["id"]).execute()
+        ).in_("id", invalid_ids).execute()
+
+    # Devices getting the same state update share one query
+    updates: Dict[str, Tuple[Dict[str, Any], List[Any]]] = {}
+    for d, push, update, only_on_success in plans:
+        if only_on_success and error_by_device.get(d["id"]) is not None:
+            continue
+        group = updates.setdefault(
+            json.dumps(update, sort_keys=True, default=str), (update, [])
+        )
+        group[1].append(d["id"])
+    for update, device_ids in updates.values():
+        supabase.table("live_activity_devices").update(update).in_(
+            "id", device_ids
+        ).execute()
 
     return {"sent": sent, "devices": len(devices)}
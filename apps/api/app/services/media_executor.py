@@ -0,0 +1,191 @@
+"""
+Media processing executors
+
+Upload handlers are async, but most of what they do to a file is blocking:
+ffprobe / clamscan subprocesses and the boto3 R2 upload wait on I/O, and
+libmagic / PIL parsing burns CPU under the GIL. Run inline, each of these
+stalls every other request on the worker's event loop.
+
+- run_io(fn, *args): bounded thread pool (MEDIA_IO_WORKERS) for blocking I/O.
+- run_cpu(fn, *args): bounded process pool (MEDIA_CPU_WORKERS) for CPU-bound
+  checks. fn and its arguments must be picklable (module-level functions,
+  paths rather than file objects); set MEDIA_CPU_WORKERS=0 to run them on the
+  I/O pool instead. Daemonic processes (Celery prefork workers, which run the
+  voice note pipeline) always use the I/O pool.
+- user_upload_slot(user_id): caps how many files one user has in processing
+  at once in this process (MEDIA_UPLOADS_PER_USER), e.g. for upload-multiple.
+- StageTimer: per-stage wall time for one upload, for the log line.
+
+Pools are per process (rebuilt after fork). The API starts the CPU workers
+with warm_media_executors() and stops both pools with
+shutdown_media_executors() in its lifespan.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager, contextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.logger import logger
+
+
+class _Pools:
+    def __init__(self):
+        self.pid = os.getpid()
+        self.io = ThreadPoolExecutor(
+            max_workers=max(1, settings.MEDIA_IO_WORKERS),
+            thread_name_prefix="media-io",
+        )
+        self.cpu: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+
+    def cpu_pool(self) -> Executor:
+        # Daemonic processes (Celery prefork workers) cannot start children
+        if (
+            settings.MEDIA_CPU_WORKERS <= 0
+            or multiprocessing.current_process().daemon
+        ):
+            return self.io
+        if self.cpu is None:
+            with self.lock:
+                if self.cpu is None:
+                    # spawn: never fork a process that has the event loop,
+                    # the I/O pool threads and open sockets in it
+                    self.cpu = ProcessPoolExecutor(
+                        max_workers=settings.MEDIA_CPU_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self.cpu
+
+    def reset_cpu_pool(self, broken: Executor) -> None:
+        with self.lock:
+            if self.cpu is broken:
+                self.cpu = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        self.io.shutdown(wait=False, cancel_futures=True)
+        if self.cpu is not None:
+            self.cpu.shutdown(wait=False, cancel_futures=True)
+
+
+_pools: Optional[_Pools] = None
+_pools_lock = threading.Lock()
+
+
+def _get_pools() -> _Pools:
+    global _pools
+    pools = _pools
+    if pools is None or pools.pid != os.getpid():
+        with _pools_lock:
+            pools = _pools
+            if pools is None or pools.pid != os.getpid():
+                pools = _pools = _Pools()
+    return pools
+
+
+async def run_io(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run blocking I/O (subprocess, network, disk) on the media thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pools().io, partial(fn, *args, **kwargs))
+
+
+async def run_cpu(fn: Callable[..., Any], *args) -> Any:
+    """
+    Run a CPU-bound, picklable fn(*args) on the media process pool.
+
+    A pool whose worker died (BrokenProcessPool) is replaced and the call
+    retried once.
+    """
+    loop = asyncio.get_running_loop()
+    pools = _get_pools()
+    for attempt in range(2):
+        pool = pools.cpu_pool()
+        try:
+            return await loop.run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            logger.warning("[Media] CPU pool broken, restarting it")
+            pools.reset_cpu_pool(pool)
+            if attempt:
+                raise
+
+
+def warm_media_executors() -> None:
+    """
+    Start the CPU pool's worker processes now (app startup) rather than on
+    the first upload; spawned workers take a second or two to import the app.
+    """
+    pool = _get_pools().cpu_pool()
+    if isinstance(pool, ProcessPoolExecutor):
+        for _ in range(settings.MEDIA_CPU_WORKERS):
+            pool.submit(os.getpid)
+
+
+def shutdown_media_executors() -> None:
+    """Stop the media pools without waiting for queued work (app shutdown)."""
+    global _pools
+    with _pools_lock:
+        pools, _pools = _pools, None
+    if pools is not None and pools.pid == os.getpid():
+        pools.shutdown()
+
+
+# =============================================================================
+# Per-user cap
+# =============================================================================
+
+# user_id -> [semaphore, holders + waiters]; dropped when no one uses it
+_user_slots: Dict[str, List[Any]] = {}
+
+
+@asynccontextmanager
+async def user_upload_slot(user_id: str) -> AsyncIterator[None]:
+    """Hold one of the user's MEDIA_UPLOADS_PER_USER processing slots."""
+    entry = _user_slots.get(user_id)
+    if entry is None:
+        entry = _user_slots[user_id] = [
+            asyncio.Semaphore(max(1, settings.MEDIA_UPLOADS_PER_USER)),
+            0,
+        ]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0 and _user_slots.get(user_id) is entry:
+            del _user_slots[user_id]
+
+
+# =============================================================================
+# Timings
+# =============================================================================
+
+
+class StageTimer:
+    """Wall time per named stage of one upload, in the order they ran."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - started))
+
+    def summary(self) -> str:
+        """e.g. "spool=4ms validate=18ms r2_upload=230ms total=260ms" """
+        parts = [f"{name}={seconds * 1000:.0f}ms" for name, seconds in self.stages]
+        parts.append(f"total={(time.perf_counter() - self.started) * 1000:.0f}ms")
+        return " ".join(parts)
@@ -0,0 +1,98 @@
+"""
+Content-addressed voice note storage (media_objects, migration 050)
+
+One media_objects row per distinct file (SHA-256 from spooling) holds its R2
+key and the cached Whisper transcript and sentiment. Check-ins point at it
+with voice_note_hash; a trigger keeps ref_count, and the hourly
+sweep_orphaned_media_objects task deletes objects nobody references.
+
+Keys are derived from the hash plus a short random suffix: two concurrent
+first uploads of the same bytes each PUT their own key and the loser
+deletes its copy, and a key released by the sweep is never reused by a later
+upload of the same content.
+"""
+
+import hashlib
+import uuid
+from typing import Any, Dict, Optional
+
+from app.services.logger import logger
+
+MEDIA_OBJECT_PREFIX = "voice-notes/objects"
+
+
+def media_object_key(sha256: str, extension: str) -> str:
+    """R2 key for a new object: voice-notes/objects/<sha256>/<suffix><ext>"""
+    return f"{MEDIA_OBJECT_PREFIX}/{sha256}/{uuid.uuid4().hex[:12]}{extension}"
+
+
+def sentiment_context(mood: Optional[str], note: Optional[str]) -> str:
+    """Hash of what besides the transcript goes into the sentiment prompt."""
+    note_part = note.strip()[:200] if note and note.strip() else ""
+    return hashlib.sha256(f"{mood or ''}\n{note_part}".encode()).hexdigest()
+
+
+def get_media_object(supabase, sha256: str) -> Optional[Dict[str, Any]]:
+    """The media_objects row for sha256 (touched for the sweep), or None."""
+    try:
+        result = supabase.rpc("get_media_object", {"p_sha256": sha256}).execute()
+    except Exception as e:
+        logger.warning(f"[Media] media_objects lookup failed: {e}")
+        return None
+    return result.data[0] if result.data else None
+
+
+def register_media_object(
+    supabase,
+    sha256: str,
+    r2_key: str,
+    content_type: str,
+    size_bytes: int,
+    duration_seconds: Optional[int],
+) -> Dict[str, Any]:
+    """
+    Insert the row for a freshly uploaded object and return the stored row.
+
+    If a concurrent upload of the same bytes registered first, its row is
+    returned; the caller then deletes its own r2_key.
+    """
+    supabase.table("media_objects").upsert(
+        {
+            "sha256": sha256,
+            "r2_key": r2_key,
+            "content_type": content_type,
+            "size_bytes": size_bytes,
+            "duration_seconds": duration_seconds,
+        },
+        on_conflict="sha256",
+        ignore_duplicates=True,
+    ).execute()
+    return get_media_object(supabase, sha256) or {
+        "sha256": sha256,
+        "r2_key": r2_key,
+        "content_type": content_type,
+        "size_bytes": size_bytes,
+        "duration_seconds": duration_seconds,
+    }
+
+
+def cache_voice_note_analysis(
+    supabase,
+    sha256: str,
+    transcript: Optional[str],
+    sentiment: Optional[dict],
+    context: Optional[str],
+) -> None:
+    """Store the transcript (and sentiment for context) on the object row."""
+    update: Dict[str, Any] = {}
+    if transcript:
+        update["transcript"] = transcript
+    if sentiment is not None:
+        update["sentiment"] = sentiment
+        update["sentiment_context"] = context
+    if not update:
+        return
+    try:
+        supabase.table("media_objects").update(update).eq("sha256", sha256).execute()
+    except Exception as e:
+        logger.warning(f"[Media] Failed to cache voice note analysis: {e}")
@@ -0,0 +1,144 @@
+"""
+Media upload spooling
+
+Uploads are copied from the request to a single temp file in fixed-size
+chunks instead of being read into memory. While copying, the size limit is
+enforced (the copy stops at the first chunk over it), the SHA-256 is updated
+and the first bytes are kept for MIME sniffing and header checks. Every later
+step (PIL, ffprobe, ClamAV, Whisper, the R2 upload) reads that same file, so
+peak memory per upload is one chunk and the bytes hit disk once.
+
+spool_stream() does the same for a blocking stream, e.g. the body of an R2
+object the client uploaded directly (voice note pipeline task).
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import Optional
+
+from fastapi import UploadFile
+
+SPOOL_CHUNK_SIZE = 64 * 1024
+# libmagic and the malicious-header check only look at the start of the file
+SNIFF_BYTES = 8 * 1024
+
+
+class UploadTooLarge(Exception):
+    """The upload went over max_bytes while it was being spooled."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class SpooledUpload:
+    """
+    An upload on local disk, with its size, SHA-256 and first SNIFF_BYTES.
+
+    Use as a context manager (or call cleanup()) to remove the temp file.
+    """
+
+    def __init__(self, path: str, size: int, sha256: str, head: bytes, extension: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.head = head
+        self.extension = extension
+
+    def open(self):
+        return open(self.path, "rb")
+
+    def cleanup(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cleanup()
+
+
+class _SpoolFile:
+    """Temp file being filled chunk by chunk (size limit, hash, sniff bytes)."""
+
+    def __init__(self, max_bytes: int, extension: str):
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.hasher = hashlib.sha256()
+        self.head = bytearray()
+        self.size = 0
+        fd, self.path = tempfile.mkstemp(prefix="upload-", suffix=extension)
+        self.out = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadTooLarge(self.max_bytes)
+        self.hasher.update(chunk)
+        if len(self.head) < SNIFF_BYTES:
+            self.head += chunk[: SNIFF_BYTES - len(self.head)]
+        self.out.write(chunk)
+
+    def finish(self) -> SpooledUpload:
+        self.out.close()
+        return SpooledUpload(
+            self.path,
+            self.size,
+            self.hasher.hexdigest(),
+            bytes(self.head),
+            self.extension,
+        )
+
+    def discard(self) -> None:
+        self.out.close()
+        os.unlink(self.path)
+
+
+async def spool_upload(
+    file: UploadFile,
+    max_bytes: int,
+    extension: Optional[str] = None,
+) -> SpooledUpload:
+    """
+    Stream file to a temp file (named with extension, for ffprobe) in
+    SPOOL_CHUNK_SIZE chunks. Raises UploadTooLarge as soon as more than
+    max_bytes have been read; nothing is left on disk in that case.
+    """
+    if extension is None:
+        extension = os.path.splitext(file.filename or "")[1].lower()
+
+    spool = _SpoolFile(max_bytes, extension)
+    try:
+        while True:
+            chunk = await file.read(SPOOL_CHUNK_SIZE)
+            if not chunk:
+                break
+            spool.write(chunk)
+    except BaseException:
+        spool.discard()
+        raise
+
+    return spool.finish()
+
+
+def spool_stream(stream, max_bytes: int, extension: str) -> SpooledUpload:
+    """
+    spool_upload for a blocking file-like stream (anything with read(n)),
+    e.g. a boto3 StreamingBody. Same limit and cleanup behaviour.
+    """
+    spool = _SpoolFile(max_bytes, extension)
+    try:
+        while True:
+            chunk = stream.read(SPOOL_CHUNK_SIZE)
+            if not chunk:
+                break
+            spool.write(chunk)
+    except BaseException:
+        spool.discard()
+        raise
+
+    return spool.finish()
@@ -16,16 +16,11 @@ Check-in responses are generated:
 """
 
 from typing import Any, Dict, List, Optional
-from openai import AsyncOpenAI
-from app.core.config import settings
+from app.core.openai_client import acreate_chat_completion
 from app.services.logger import logger
 import random
 
 
-# Initialize OpenAI client
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-
-
 # =============================================================================
 # BACKGROUND STYLE → COLOR MAPPING
 # =============================================================================
@@ -376,7 +371,7 @@ Rules:
 - No emojis in the response
 - Keep it conversational and genuine"""
 
-        response = await client.chat.completions.create(
+        response = await acreate_chat_completion(
             model="gpt-4o-mini",  # Cost-effective model
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -455,7 +450,7 @@ async def generate_daily_motivation(
     style_instruction = style_prompts.get(motivation_style, style_prompts["supportive"])
 
     try:
-        response = await client.chat.completions.create(
+        response = await acreate_chat_completion(
             model="gpt-4o-mini",  # Cost-effective for daily motivations
             messages=[
                 {
@@ -0,0 +1,441 @@
+"""
+Partner matching index
+
+Ranks the whole eligible user population for GET /partners/suggested from the
+precomputed partner_match_vectors rows (migration 045), instead of scoring an
+arbitrary page of users one by one.
+
+Index (per process):
+- Eligible vectors are held as NumPy arrays (category/frequency bitsets, UTC
+  offset, max streak) plus each user's goal titles.
+- Every PARTNER_MATCH_INDEX_REFRESH_SECONDS the index pulls rows changed since
+  its last load (updated_at watermark); rows that became ineligible drop out.
+  It reloads everything every PARTNER_MATCH_INDEX_REBUILD_SECONDS in a
+  background thread and swaps the new arrays in when done; requests keep
+  using the previous index meanwhile. Only the first load is synchronous.
+
+Scoring (same weights and rules as calculate_partner_match_score):
+- goal similarity 40 = category Jaccard (70%) + best fuzzy title ratio (30%)
+- frequency Jaccard 25, timezone proximity 25, streak level 10
+All terms but the fuzzy title ratio are computed for everyone at once. The
+fuzzy ratio adds at most 12 points, so it is only computed (rapidfuzz cdist)
+for candidates whose upper bound can still reach the requested page.
+
+Vector maintenance:
+- Triggers mark users dirty on goal and profile changes; refresh_dirty_vectors
+  (refresh_partner_match_vectors task, every minute) rebuilds their rows.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from app.core.config import settings
+from app.core.database import get_supabase_client
+from app.services.logger import logger
+from app.services.partner_matching_service import (
+    GENERAL_CATEGORY_BIT,
+    MATCH_CATEGORIES,
+    build_match_vector,
+)
+
+VECTOR_COLUMNS = (
+    "user_id, category_mask, frequency_mask, utc_offset_minutes, max_streak, "
+    "goal_titles, eligible, updated_at"
+)
+
+# PostgREST page size for loading vectors
+LOAD_PAGE_SIZE = 1000
+
+# Users rebuilt per claim_partner_match_dirty batch
+REFRESH_BATCH_SIZE = 500
+
+# Max goal points from the fuzzy title ratio (40 * 30%)
+FUZZY_MAX_POINTS = 12.0
+
+# Set bits per value, for Jaccard on category (13 bits) / frequency bitsets
+_POPCOUNT = np.array([bin(i).count("1") for i in range(1 << 13)], dtype=np.int64)
+
+
+def _jaccard(a: int, b: np.ndarray) -> np.ndarray:
+    union = _POPCOUNT[a | b]
+    return np.divide(
+        _POPCOUNT[a & b], union, out=np.zeros(len(b), dtype=np.float64), where=union > 0
+    )
+
+
+def _streak_level(streaks: np.ndarray) -> np.ndarray:
+    # beginner <= 7 < intermediate <= 30 < advanced (get_streak_level)
+    return np.searchsorted(np.array([7, 30]), streaks, side="left")
+
+
+class PartnerMatchIndex:
+    """In-memory eligible partner vectors with incremental refresh."""
+
+    def __init__(self, refresh_seconds: float, rebuild_seconds: float):
+        self._refresh_seconds = refresh_seconds
+        self._rebuild_seconds = rebuild_seconds
+        self._lock = threading.Lock()
+        self._built_at = 0.0
+        self._refreshed_at = 0.0
+        self._rebuilding = False
+        # updated_at of the last change applied; inclusive after a full page
+        self._watermark: Optional[str] = None
+        self._watermark_inclusive = False
+
+        self._positions: Dict[str, int] = {}
+        self.user_ids: List[str] = []
+        self.titles: List[List[str]] = []
+        self.valid = np.zeros(0, dtype=bool)
+        self.category = np.zeros(0, dtype=np.int64)
+        self.frequency = np.zeros(0, dtype=np.int64)
+        self.utc_offset = np.zeros(0, dtype=np.int64)
+        self.max_streak = np.zeros(0, dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def ensure_fresh(self, supabase=None) -> None:
+        now = time.monotonic()
+        if self._built_at and now - self._refreshed_at < self._refresh_seconds:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if self._built_at and now - self._refreshed_at < self._refresh_seconds:
+                return
+            supabase = supabase or get_supabase_client()
+            if not self._built_at:
+                self._install(*self._load_all(supabase))
+                self._built_at = self._refreshed_at = now
+                return
+
+            if now - self._built_at >= self._rebuild_seconds:
+                self._start_rebuild()
+            try:
+                self._apply_changes(supabase)
+            except Exception as e:
+                # Keep serving the current index; retry after another interval
+                logger.warning(f"Partner match index refresh failed: {e}")
+            self._refreshed_at = 0.0 if self._watermark_inclusive else now
+
+    def _start_rebuild(self) -> None:
+        if self._rebuilding:
+            return
+        self._rebuilding = True
+        threading.Thread(
+            target=self._background_rebuild, name="partner-match-rebuild", daemon=True
+        ).start()
+
+    def _background_rebuild(self) -> None:
+        try:
+            rows, watermark = self._load_all(get_supabase_client())
+            with self._lock:
+                self._install(rows, watermark)
+                self._built_at = self._refreshed_at = time.monotonic()
+        except Exception as e:
+            # Retried on the next refresh; the previous index stays in place
+            logger.warning(f"Partner match index rebuild failed: {e}")
+        finally:
+            self._rebuilding = False
+
+    def _load_all(self, supabase) -> Tuple[List[Dict[str, Any]], str]:
+        # Rows written while pages load are re-applied by the next change pull
+        watermark = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            page = (
+                supabase.table("partner_match_vectors")
+                .select(VECTOR_COLUMNS)
+                .eq("eligible", True)
+                .order("user_id")
+                .range(start, start + LOAD_PAGE_SIZE - 1)
+                .execute()
+            ).data or []
+            rows.extend(page)
+            if len(page) < LOAD_PAGE_SIZE:
+                break
+            start += LOAD_PAGE_SIZE
+        return rows, watermark
+
+    def _install(self, rows: List[Dict[str, Any]], watermark: str) -> None:
+        self._positions = {row["user_id"]: i for i, row in enumerate(rows)}
+        self.user_ids = [row["user_id"] for row in rows]
+        self.titles = [list(row.get("goal_titles") or []) for row in rows]
+        self.valid = np.ones(len(rows), dtype=bool)
+        self.category = np.array([row["category_mask"] for row in rows], dtype=np.int64)
+        self.frequency = np.array([row["frequency_mask"] for row in rows], dtype=np.int64)
+        self.utc_offset = np.array(
+            [row["utc_offset_minutes"] for row in rows], dtype=np.int64
+        )
+        self.max_streak = np.array([row["max_streak"] for row in rows], dtype=np.int64)
+        self._watermark = watermark
+        self._watermark_inclusive = False
+
+    def _apply_changes(self, supabase) -> None:
+        query = supabase.table("partner_match_vectors").select(VECTOR_COLUMNS)
+        if self._watermark:
+            if self._watermark_inclusive:
+                query = query.gte("updated_at", self._watermark)
+            else:
+                query = query.gt("updated_at", self._watermark)
+        rows = query.order("updated_at").limit(LOAD_PAGE_SIZE).execute().data or []
+        if not rows:
+            return
+
+        new_rows = []
+        for row in rows:
+            pos = self._positions.get(row["user_id"])
+            if pos is None:
+                if row["eligible"]:
+                    new_rows.append(row)
+                continue
+            self.valid[pos] = bool(row["eligible"])
+            self.category[pos] = row["category_mask"]
+            self.frequency[pos] = row["frequency_mask"]
+            self.utc_offset[pos] = row["utc_offset_minutes"]
+            self.max_streak[pos] = row["max_streak"]
+            self.titles[pos] = list(row.get("goal_titles") or [])
+
+        if new_rows:
+            base = len(self.user_ids)
+            for i, row in enumerate(new_rows):
+                self._positions[row["user_id"]] = base + i
+                self.user_ids.append(row["user_id"])
+                self.titles.append(list(row.get("goal_titles") or []))
+            self.valid = np.append(self.valid, np.ones(len(new_rows), dtype=bool))
+            for attr, column in (
+                ("category", "category_mask"),
+                ("frequency", "frequency_mask"),
+                ("utc_offset", "utc_offset_minutes"),
+                ("max_streak", "max_streak"),
+            ):
+                values = np.array([row[column] for row in new_rows], dtype=np.int64)
+                setattr(self, attr, np.append(getattr(self, attr), values))
+
+        # A refresh batch shares one updated_at; after a full page, re-read the
+        # last timestamp (re-applying rows is harmless) and pull again next call
+        self._watermark = rows[-1]["updated_at"]
+        self._watermark_inclusive = len(rows) == LOAD_PAGE_SIZE
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def rank(
+        self,
+        vector: Dict[str, Any],
+        exclude_ids: Set[str],
+        offset: int,
+        limit: int,
+        supabase=None,
+    ) -> Tuple[int, List[Tuple[str, float]]]:
+        """
+        Rank all eligible candidates for the user described by vector
+        (build_match_vector output). Returns (total candidates, page of
+        (user_id, score)) ordered by score, then user_id.
+        """
+        self.ensure_fresh(supabase)
+        with self._lock:
+            return self._rank(vector, exclude_ids, offset, limit)
+
+    def _rank(
+        self, vector: Dict[str, Any], exclude_ids: Set[str], offset: int, limit: int
+    ) -> Tuple[int, List[Tuple[str, float]]]:
+        candidates = self.valid.copy()
+        for user_id in exclude_ids:
+            pos = self._positions.get(user_id)
+            if pos is not None:
+                candidates[pos] = False
+        total = int(candidates.sum())
+        if total == 0 or offset >= total:
+            return total, []
+
+        base = self._base_scores(vector)
+        user_titles = list(vector.get("goal_titles") or [])
+        fuzzy_max = FUZZY_MAX_POINTS if user_titles else 0.0
+
+        # Candidates that can still reach the top (offset + limit) after fuzzy points
+        k = min(offset + limit, total)
+        candidate_base = np.where(candidates, base, -np.inf)
+        threshold = np.partition(candidate_base, len(base) - k)[len(base) - k]
+        shortlist = np.flatnonzero(candidates & (base + fuzzy_max >= threshold - 0.05))
+
+        scores = base[shortlist]
+        if fuzzy_max:
+            scores = scores + fuzzy_max * self._fuzzy_ratios(user_titles, shortlist)
+        scores = np.round(scores, 1)
+
+        ordered = sorted(
+            zip(shortlist.tolist(), scores.tolist()),
+            key=lambda item: (-item[1], self.user_ids[item[0]]),
+        )
+        page = ordered[offset : offset + limit]
+        return total, [(self.user_ids[pos], score) for pos, score in page]
+
+    def get_vector(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Indexed vector of a candidate (build_match_vector keys), if present."""
+        with self._lock:
+            pos = self._positions.get(user_id)
+            if pos is None:
+                return None
+            return {
+                "user_id": user_id,
+                "category_mask": int(self.category[pos]),
+                "frequency_mask": int(self.frequency[pos]),
+                "utc_offset_minutes": int(self.utc_offset[pos]),
+                "max_streak": int(self.max_streak[pos]),
+                "goal_titles": self.titles[pos],
+            }
+
+    def _base_scores(self, vector: Dict[str, Any]) -> np.ndarray:
+        """All score terms except the fuzzy title ratio, for every row."""
+        n = len(self.user_ids)
+        scores = np.zeros(n, dtype=np.float64)
+
+        # Goal categories: Jaccard without "general", 70% of 40 points
+        user_categories = vector["category_mask"] & ~GENERAL_CATEGORY_BIT
+        if user_categories:
+            scores += 28.0 * _jaccard(user_categories, self.category & ~GENERAL_CATEGORY_BIT)
+
+        # Frequency: Jaccard, 25 points
+        if vector["frequency_mask"]:
+            scores += 25.0 * _jaccard(vector["frequency_mask"], self.frequency)
+
+        # Timezone: full 25 points at 0h, linear to 0 at 3h
+        tz_diff = np.abs(self.utc_offset - vector["utc_offset_minutes"]) / 60.0
+        scores += np.where(tz_diff <= 3, 25.0 - tz_diff * (25.0 / 3), 0.0)
+
+        # Streak level: 10 for the same level, else 5 within 10 days
+        user_streak = vector["max_streak"]
+        same_level = _streak_level(self.max_streak) == _streak_level(np.array([user_streak]))[0]
+        close = np.abs(self.max_streak - user_streak) <= 10
+        scores += np.where(same_level, 10.0, np.where(close, 5.0, 0.0))
+
+        return scores
+
+    def _fuzzy_ratios(self, user_titles: List[str], positions: np.ndarray) -> np.ndarray:
+        """Best token_sort_ratio (0-1) between the user's and each candidate's titles."""
+        counts = np.array([len(self.titles[pos]) for pos in positions], dtype=np.int64)
+        flat = [title for pos in positions for title in self.titles[pos]]
+        ratios = np.zeros(len(positions), dtype=np.float64)
+        if not flat:
+            return ratios
+
+        matrix = process.cdist(
+            user_titles[:5],
+            flat,
+            scorer=fuzz.token_sort_ratio,
+            processor=str.lower,
+            dtype=np.float32,
+        )
+        best_per_title = matrix.max(axis=0)
+        has_titles = counts > 0
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[has_titles]
+        ratios[has_titles] = np.maximum.reduceat(best_per_title, starts) / 100.0
+        return ratios
+
+
+def match_reasons(vector: Dict[str, Any], candidate: Dict[str, Any]) -> List[str]:
+    """Match reason strings (as calculate_partner_match_score) for one candidate vector."""
+    reasons: List[str] = []
+
+    overlap = (vector["category_mask"] & candidate["category_mask"]) & ~GENERAL_CATEGORY_BIT
+    matched = [cat for i, cat in enumerate(MATCH_CATEGORIES) if overlap & (1 << i)]
+    if matched:
+        reasons.append(f"Similar goals: {', '.join(c.capitalize() for c in matched[:2])}")
+
+    if vector["frequency_mask"] and candidate["frequency_mask"]:
+        freq = float(_jaccard(vector["frequency_mask"], np.array([candidate["frequency_mask"]]))[0])
+        if freq >= 0.5:
+            reasons.append("Similar schedule")
+
+    tz_diff = abs(candidate["utc_offset_minutes"] - vector["utc_offset_minutes"]) / 60.0
+    if tz_diff <= 1:
+        reasons.append("Same timezone")
+    elif tz_diff <= 3:
+        reasons.append("Similar timezone")
+
+    user_streak, cand_streak = vector["max_streak"], candidate["max_streak"]
+    levels = _streak_level(np.array([user_streak, cand_streak]))
+    if levels[0] == levels[1] and user_streak > 0 and cand_streak > 0:
+        reasons.append("Similar experience")
+
+    return reasons
+
+
+def refresh_vectors(user_ids: Sequence[str], supabase=None) -> int:
+    """Rebuild partner_match_vectors rows for user_ids. Returns rows written."""
+    if not user_ids:
+        return 0
+    supabase = supabase or get_supabase_client()
+
+    users = (
+        supabase.table("users")
+        .select("id, timezone, status, role, onboarding_completed_at")
+        .in_("id", list(user_ids))
+        .execute()
+    ).data or []
+    goals = (
+        supabase.table("goals")
+        .select("user_id, title, frequency_type, current_streak")
+        .in_("user_id", list(user_ids))
+        .eq("status", "active")
+        .order("created_at")
+        .execute()
+    ).data or []
+
+    goals_by_user: Dict[str, List[Dict[str, Any]]] = {}
+    for goal in goals:
+        goals_by_user.setdefault(goal["user_id"], []).append(goal)
+
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [
+        {**build_match_vector(user, goals_by_user.get(user["id"], [])), "updated_at": now}
+        for user in users
+    ]
+    if rows:
+        supabase.table("partner_match_vectors").upsert(rows, on_conflict="user_id").execute()
+    return len(rows)
+
+
+def refresh_dirty_vectors(max_batches: int = 20) -> Dict[str, int]:
+    """Rebuild vectors for users queued by the dirty-marking triggers."""
+    supabase = get_supabase_client()
+    claimed = refreshed = 0
+
+    for _ in range(max_batches):
+        result = supabase.rpc(
+            "claim_partner_match_dirty", {"p_limit": REFRESH_BATCH_SIZE}
+        ).execute()
+        user_ids = [
+            row if isinstance(row, str) else row.get("claim_partner_match_dirty")
+            for row in result.data or []
+        ]
+        if not user_ids:
+            break
+        claimed += len(user_ids)
+        try:
+            refreshed += refresh_vectors(user_ids, supabase)
+        except Exception:
+            # Put the batch back so the next run retries it
+            supabase.table("partner_match_dirty").upsert(
+                [{"user_id": uid} for uid in user_ids], on_conflict="user_id"
+            ).execute()
+            raise
+        if len(user_ids) < REFRESH_BATCH_SIZE:
+            break
+
+    return {"claimed": claimed, "refreshed": refreshed}
+
+
+partner_match_index = PartnerMatchIndex(
+    refresh_seconds=settings.PARTNER_MATCH_INDEX_REFRESH_SECONDS,
+    rebuild_seconds=settings.PARTNER_MATCH_INDEX_REBUILD_SECONDS,
+)
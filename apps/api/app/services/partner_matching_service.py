@@ -12,6 +12,8 @@ Designed for scalability with 100K+ users:
 - Batch database queries
 - Pre-filtering before scoring
 - Cached category extraction
+- Whole-population ranking from precomputed vectors
+  (build_match_vector, app/services/partner_match_index.py)
 """
 
 from typing import Dict, List, Set, Any, Tuple, Optional
@@ -650,6 +652,17 @@ for category, keywords in GOAL_KEYWORDS.items():
     for keyword in keywords:
         ALL_KEYWORDS[keyword] = category
 
+# Bit order of partner_match_vectors.category_mask (append only: stored masks use it)
+MATCH_CATEGORIES: Tuple[str, ...] = tuple(GOAL_KEYWORDS) + ("general",)
+CATEGORY_BITS: Dict[str, int] = {cat: 1 << i for i, cat in enumerate(MATCH_CATEGORIES)}
+GENERAL_CATEGORY_BIT = CATEGORY_BITS["general"]
+
+# partner_match_vectors.frequency_mask
+FREQUENCY_BITS: Dict[str, int] = {"daily": 1, "weekly": 2}
+
+# Goal titles kept per user for fuzzy matching (scoring only compares 5x5)
+MAX_MATCH_TITLES = 5
+
 
 @lru_cache(maxsize=1000)
 def extract_goal_categories(goal_title: str) -> Tuple[str, ...]:
@@ -734,6 +747,73 @@ def calculate_goal_similarity(
     return combined_score, matched_categories
 
 
+def category_mask(goal_titles: List[str]) -> int:
+    """Bitset (CATEGORY_BITS) of the categories of all goal titles."""
+    mask = 0
+    for title in goal_titles:
+        for category in extract_goal_categories(title):
+            mask |= CATEGORY_BITS[category]
+    return mask
+
+
+def frequency_mask(frequencies: List[str]) -> int:
+    """Bitset (FREQUENCY_BITS) of goal frequency types."""
+    mask = 0
+    for frequency in frequencies:
+        mask |= FREQUENCY_BITS.get(frequency or "daily", 0)
+    return mask
+
+
+def get_utc_offset_minutes(tz: str) -> int:
+    """Current UTC offset of a timezone in minutes (0 if unknown)."""
+    try:
+        from zoneinfo import ZoneInfo
+        from datetime import datetime as dt
+
+        offset = dt.now(ZoneInfo(tz or "UTC")).utcoffset()
+        return int(offset.total_seconds() // 60) if offset is not None else 0
+    except Exception:
+        return 0
+
+
+def get_streak_level(streak: int) -> str:
+    if streak <= 7:
+        return "beginner"
+    elif streak <= 30:
+        return "intermediate"
+    else:
+        return "advanced"
+
+
+def build_match_vector(
+    user: Dict[str, Any], active_goals: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    partner_match_vectors row for a user and their active goals.
+
+    user needs id, timezone, status, role, onboarding_completed_at.
+    """
+    titles = [g["title"] for g in active_goals if g.get("title")]
+    return {
+        "user_id": user["id"],
+        "category_mask": category_mask(titles),
+        "frequency_mask": frequency_mask(
+            [g.get("frequency_type", "daily") for g in active_goals]
+        ),
+        "utc_offset_minutes": get_utc_offset_minutes(user.get("timezone") or "UTC"),
+        "max_streak": max(
+            (g.get("current_streak", 0) or 0 for g in active_goals), default=0
+        ),
+        "goal_titles": titles[:MAX_MATCH_TITLES],
+        "eligible": bool(
+            active_goals
+            and user.get("status") == "active"
+            and user.get("role") == "user"
+            and user.get("onboarding_completed_at")
+        ),
+    }
+
+
 def calculate_timezone_diff_hours(tz1: str, tz2: str) -> float:
     """
     Calculate approximate timezone difference in hours.
@@ -825,14 +905,6 @@ def calculate_partner_match_score(
     user_streak = user_data.get("max_streak", 0) or 0
     cand_streak = candidate_data.get("max_streak", 0) or 0
 
-    def get_streak_level(s: int) -> str:
-        if s <= 7:
-            return "beginner"
-        elif s <= 30:
-            return "intermediate"
-        else:
-            return "advanced"
-
     if get_streak_level(user_streak) == get_streak_level(cand_streak):
         total_score += 10
         if user_streak > 0 and cand_streak > 0:
@@ -13,20 +13,76 @@ V2 Motivation Styles:
 - supportive: Warm, encouraging, gentle reminders
 - tough_love: Direct, challenging, push to action
 - calm: Peaceful, mindful, low-pressure approach
+
+Pre-generated copy:
+pregenerate_ai_motivations generates the copy 10-30 minutes before each
+reminder slot and stores it in Redis under push_copy_key(goal, slot, local
+date); send_scheduled_ai_motivations only reads it back, and falls back to
+_get_fallback_notification for slots that have none.
 """
 
-from openai import OpenAI
-from app.core.config import settings
+from typing import Dict, List, Optional
+from app.core.cache import get_redis_client
+from app.core.openai_client import create_chat_completion
+from app.services.logger import logger
 import json
 import random
 
+PUSH_COPY_PREFIX = "push_copy"
+# Covers the pre-generation lead time plus a late tick
+PUSH_COPY_TTL_SECONDS = 2 * 3600
+
+
+def push_copy_key(goal_id: str, slot_time: str, local_date: str) -> str:
+    """Redis key of the pre-generated copy for one goal reminder slot on a local date."""
+    return f"{PUSH_COPY_PREFIX}:{goal_id}:{local_date}:{slot_time}"
+
+
+def get_push_copies(keys: List[str]) -> Dict[str, dict]:
+    """Pre-generated {title, body} by key, for the keys that have one (one MGET)."""
+    redis = get_redis_client()
+    if not redis or not keys:
+        return {}
+
+    try:
+        values = redis.mget(keys)
+    except Exception as e:
+        logger.warning(f"Push copy lookup failed: {e}")
+        return {}
+
+    copies = {}
+    for key, value in zip(keys, values or []):
+        if not value:
+            continue
+        try:
+            copies[key] = json.loads(value)
+        except (TypeError, ValueError):
+            continue
+    return copies
+
+
+def store_push_copies(copies: Dict[str, dict]) -> None:
+    """Store pre-generated {title, body} by push_copy_key (one pipeline)."""
+    redis = get_redis_client()
+    if not redis or not copies:
+        return
+
+    try:
+        pipe = redis.pipeline(transaction=False)
+        for key, copy in copies.items():
+            pipe.setex(key, PUSH_COPY_TTL_SECONDS, json.dumps(copy))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Push copy write failed: {e}")
+
 
 def generate_push_notification_ai(
     goal_title: str,
     user_context: dict,
     motivation_style: str = "supportive",
     item_type: str = "goal",  # V2: always "goal"
-) -> dict:
+    fallback: bool = True,
+) -> Optional[dict]:
     """
     Generate SHORT push notification REMINDER for goals.
     Optimized for mobile push notifications (lock screen display).
@@ -44,6 +100,7 @@ def generate_push_notification_ai(
         motivation_style: User's preferred motivation style
             V2 Options: "supportive", "tough_love", "calm"
         item_type: Always "goal" in V2
+        fallback: Return template copy when the AI call fails (otherwise None)
 
     Returns:
         dict: {
@@ -52,8 +109,6 @@ def generate_push_notification_ai(
         }
     """
     try:
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
         # Extract context
         streak = user_context.get("current_streak", 0)
         recent_completed = user_context.get("recent_completed", 0)
@@ -170,7 +225,7 @@ Return ONLY valid JSON (no markdown):
   "body": "15-20 word personalized reminder with {user_name}'s name"
 }}"""
 
-        response = client.chat.completions.create(
+        response = create_chat_completion(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -201,6 +256,8 @@ Return ONLY valid JSON (no markdown):
 
     except Exception as e:
         print(f"ERROR in generate_push_notification_ai: {str(e)}")
+        if not fallback:
+            return None
         return _get_fallback_notification(goal_title, user_context, motivation_style)
 
 
@@ -12,6 +12,8 @@ import httpx
 
 from app.core.config import settings
 from app.core.database import get_supabase_client
+from app.core.entitlements import invalidate_entitlements
+from app.core.user_cache import invalidate_user_cache
 from app.services.logger import logger
 
 REVENUECAT_API_URL = "https://api.revenuecat.com/v1"
@@ -225,6 +227,7 @@ def _update_user_plan_for_promo(supabase, user_id: str, bonus_days: int) -> None
         expires_at = (now + timedelta(days=bonus_days)).isoformat()
 
         supabase.table("users").update({"plan": "premium"}).eq("id", user_id).execute()
+        invalidate_user_cache(user_id)
 
         existing = (
             supabase.table("subscriptions")
@@ -277,6 +280,7 @@ def _update_user_plan_for_promo(supabase, user_id: str, bonus_days: int) -> None
                 "updated_at": now_iso,
             }
             supabase.table("subscriptions").insert(sub_data).execute()
+        invalidate_entitlements(user_id)
 
         logger.info("Updated backend plan for promo grant", {"user_id": user_id})
     except Exception as e:
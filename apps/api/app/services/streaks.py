@@ -0,0 +1,297 @@
+"""
+Streak and consistency engine
+
+Shared check-in arithmetic for achievements, weekly recaps, AI insight evidence
+and adaptive nudges. Works on NumPy arrays for many goals (or users) at once
+instead of walking lists of dicts and parsing dates per row:
+
+- CheckInHistory.from_rows() parses all check-in dates in one vectorized call
+  into day numbers (days since 1970-01-01), with a group index per row
+  (goal_id by default) and a small integer status code.
+- Counts, windows, weekday breakdowns and streaks are computed with masks,
+  sort/diff and bincount over the whole history.
+
+Status semantics (same as the app and the SQL analytics):
+- "completed" and "rest_day" are met days for consistency rates (MET_STATUSES).
+- Streaks count "completed" days by default, over distinct dates per group.
+- "pending" is a scheduled day not answered yet.
+
+Weekdays follow Postgres DOW and goals.target_days: 0=Sunday .. 6=Saturday.
+
+Benchmark against the old per-dict loops: scripts/bench_streaks.py
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from itertools import repeat
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+STATUSES = ("pending", "completed", "rest_day", "skipped", "missed")
+STATUS_CODES = {name: code for code, name in enumerate(STATUSES)}
+# None or unrecognized status
+UNKNOWN_STATUS = len(STATUSES)
+N_STATUS_CODES = len(STATUSES) + 1
+
+MET_STATUSES = ("completed", "rest_day")
+
+# 1970-01-01 was a Thursday (DOW 4)
+_EPOCH_DOW = 4
+
+DayLike = Union[int, date, str, np.ndarray]
+
+
+def to_day(value: Union[date, str]) -> int:
+    """Day number (days since 1970-01-01) for a date or ISO date string."""
+    if isinstance(value, str):
+        value = value[:10]
+    return int(np.datetime64(value, "D").astype(np.int64))
+
+
+def from_day(day: int) -> date:
+    """date for a day number."""
+    return np.datetime64(int(day), "D").astype(date)
+
+
+def parse_days(values: Sequence[Any]) -> np.ndarray:
+    """Day numbers for a sequence of dates / ISO date strings (vectorized)."""
+    if len(values) == 0:
+        return np.empty(0, dtype=np.int64)
+    try:
+        days = np.array(values, dtype="datetime64[D]")
+    except ValueError:
+        # Timestamps ("2026-01-05T08:00:00+00:00") → date part
+        days = np.array([str(v)[:10] for v in values], dtype="datetime64[D]")
+    return days.astype(np.int64)
+
+
+def weekdays(days: np.ndarray) -> np.ndarray:
+    """Postgres DOW (0=Sunday) for day numbers."""
+    return (days + _EPOCH_DOW) % 7
+
+
+def status_codes(statuses: Iterable[str]) -> np.ndarray:
+    return np.array([STATUS_CODES[s] for s in statuses], dtype=np.int8)
+
+
+def _as_day(value: Optional[DayLike]) -> Optional[Union[int, np.ndarray]]:
+    if value is None or isinstance(value, (int, np.integer, np.ndarray)):
+        return value
+    return to_day(value)
+
+
+@dataclass(frozen=True)
+class CheckInHistory:
+    """Check-in rows as parallel arrays: group index, day number, status code."""
+
+    keys: List[Any]  # group index -> key (goal_id, user_id, ...)
+    group: np.ndarray  # int64 per row
+    day: np.ndarray  # int64 per row
+    status: np.ndarray  # int8 per row
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Sequence[Dict[str, Any]],
+        key: Optional[str] = "goal_id",
+        keys: Optional[Sequence[Any]] = None,
+        date_key: str = "check_in_date",
+    ) -> "CheckInHistory":
+        """
+        Build from check-in dicts.
+
+        key=None puts every row in one group. keys fixes the group order (and
+        includes groups without rows); rows with other keys are dropped.
+        Rows without a date are dropped.
+        """
+        rows = [r for r in rows if r.get(date_key)]
+
+        if key is None:
+            group_keys = list(keys) if keys is not None else [None]
+            group = np.zeros(len(rows), dtype=np.int64)
+        else:
+            fixed = keys is not None
+            group_keys = list(keys) if fixed else []
+            index = {k: i for i, k in enumerate(group_keys)}
+            if not fixed:
+                for row in rows:
+                    k = row.get(key)
+                    if k not in index:
+                        index[k] = len(group_keys)
+                        group_keys.append(k)
+            group = np.fromiter(
+                map(index.get, [row.get(key) for row in rows], repeat(-1)),
+                dtype=np.int64,
+                count=len(rows),
+            )
+            if fixed and len(rows):
+                known = group >= 0
+                rows = [row for row, ok in zip(rows, known) if ok]
+                group = group[known]
+
+        status = np.fromiter(
+            map(STATUS_CODES.get, [row.get("status") for row in rows], repeat(UNKNOWN_STATUS)),
+            dtype=np.int8,
+            count=len(rows),
+        )
+        day = parse_days([row[date_key] for row in rows])
+        return cls(keys=group_keys, group=group, day=day, status=status)
+
+    @property
+    def n_groups(self) -> int:
+        return len(self.keys)
+
+    def mask(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        start: Optional[DayLike] = None,
+        end: Optional[DayLike] = None,
+    ) -> np.ndarray:
+        """
+        Row mask by status and inclusive day range.
+
+        start/end may be a date, ISO string, day number, or a per-group array of
+        day numbers (one bound per goal, e.g. each user's local today).
+        """
+        m = np.ones(len(self.day), dtype=bool)
+        if statuses is not None:
+            m &= np.isin(self.status, status_codes(statuses))
+        for bound, cmp in ((_as_day(start), np.greater_equal), (_as_day(end), np.less_equal)):
+            if bound is None:
+                continue
+            if isinstance(bound, np.ndarray):
+                bound = bound[self.group]
+            m &= cmp(self.day, bound)
+        return m
+
+    def counts(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        start: Optional[DayLike] = None,
+        end: Optional[DayLike] = None,
+    ) -> np.ndarray:
+        """Rows per group matching statuses within [start, end]."""
+        m = self.mask(statuses, start, end)
+        return np.bincount(self.group[m], minlength=self.n_groups)
+
+    def status_counts(
+        self, start: Optional[DayLike] = None, end: Optional[DayLike] = None
+    ) -> np.ndarray:
+        """(n_groups, N_STATUS_CODES) row counts per status code."""
+        m = self.mask(None, start, end)
+        flat = self.group[m] * N_STATUS_CODES + self.status[m]
+        return np.bincount(flat, minlength=self.n_groups * N_STATUS_CODES).reshape(
+            self.n_groups, N_STATUS_CODES
+        )
+
+    def weekday_status_counts(
+        self, start: Optional[DayLike] = None, end: Optional[DayLike] = None
+    ) -> np.ndarray:
+        """(n_groups, 7, N_STATUS_CODES) row counts per DOW and status code."""
+        m = self.mask(None, start, end)
+        flat = (self.group[m] * 7 + weekdays(self.day[m])) * N_STATUS_CODES + self.status[m]
+        return np.bincount(flat, minlength=self.n_groups * 7 * N_STATUS_CODES).reshape(
+            self.n_groups, 7, N_STATUS_CODES
+        )
+
+    def distinct_days(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        start: Optional[DayLike] = None,
+        end: Optional[DayLike] = None,
+    ) -> np.ndarray:
+        """Distinct dates per group with a matching row."""
+        group, _ = self._unique_days(self.mask(statuses, start, end))
+        return np.bincount(group, minlength=self.n_groups)
+
+    def window_counts(
+        self,
+        today: DayLike,
+        windows: Sequence[int] = (7, 30),
+        statuses: Sequence[str] = ("completed",),
+    ) -> Dict[int, np.ndarray]:
+        """Rolling counts per group: {w: rows in [today - w, today]}."""
+        today = _as_day(today)
+        return {w: self.counts(statuses, start=today - w, end=today) for w in windows}
+
+    def streaks(
+        self,
+        today: Optional[DayLike] = None,
+        statuses: Sequence[str] = ("completed",),
+        grace_days: int = 0,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (current, longest) streak per group over distinct dates.
+
+        With today, rows after today are ignored and the current streak is the
+        run ending on today (or up to grace_days before it; otherwise 0).
+        Without today, it is the run ending at the group's latest date.
+        """
+        today = _as_day(today)
+        group, day = self._unique_days(self.mask(statuses, end=today))
+
+        current = np.zeros(self.n_groups, dtype=np.int64)
+        longest = np.zeros(self.n_groups, dtype=np.int64)
+        if len(day) == 0:
+            return current, longest
+
+        run_start = np.ones(len(day), dtype=bool)
+        run_start[1:] = (group[1:] != group[:-1]) | (np.diff(day) != 1)
+        run_lengths = np.diff(np.append(np.flatnonzero(run_start), len(day)))
+        run_groups = group[run_start]
+        run_ends = day[np.append(np.flatnonzero(run_start)[1:] - 1, len(day) - 1)]
+
+        np.maximum.at(longest, run_groups, run_lengths)
+
+        # Runs are sorted by (group, day): the last run of each group is its latest
+        last_run = np.append(run_groups[1:] != run_groups[:-1], True)
+        latest = run_lengths[last_run]
+        if today is not None:
+            latest = np.where(run_ends[last_run] >= today - grace_days, latest, 0)
+        current[run_groups[last_run]] = latest
+        return current, longest
+
+    def _unique_days(self, m: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted distinct (group, day) pairs among masked rows."""
+        group, day = self.group[m], self.day[m]
+        if len(day) == 0:
+            return group, day
+        order = np.lexsort((day, group))
+        group, day = group[order], day[order]
+        keep = np.ones(len(day), dtype=bool)
+        keep[1:] = (group[1:] != group[:-1]) | (day[1:] != day[:-1])
+        return group[keep], day[keep]
+
+
+def scheduled_day_counts(
+    goals: Sequence[Dict[str, Any]], start: DayLike, end: DayLike
+) -> np.ndarray:
+    """
+    Scheduled days per goal in [start, end] from frequency_type / target_days.
+
+    Daily goals are scheduled every day; weekly goals on their target_days
+    (DOW). A weekly goal without target_days has no scheduled days.
+    """
+    start, end = _as_day(start), _as_day(end)
+    if end < start:
+        return np.zeros(len(goals), dtype=np.int64)
+
+    per_weekday = np.bincount(weekdays(np.arange(start, end + 1)), minlength=7)
+    total = int(per_weekday.sum())
+
+    # One 7-bit weekday mask per goal; daily goals use all bits
+    masks = np.fromiter(
+        (
+            0b1111111
+            if goal.get("frequency_type") != "weekly"
+            else sum(1 << int(d) for d in set(goal.get("target_days") or []))
+            for goal in goals
+        ),
+        dtype=np.int64,
+        count=len(goals),
+    )
+    bits = (masks[:, None] >> np.arange(7)) & 1
+    counts = bits @ per_weekday
+    return np.where(masks == 0b1111111, total, counts)
+
@@ -14,6 +14,7 @@ This service is used by:
 
 from datetime import datetime, date
 from typing import Optional, Dict, Any
+from app.core.entitlements import get_entitlements
 from app.services.logger import logger
 
 
@@ -201,7 +202,8 @@ async def check_user_feature_limit(
     Check if user can perform an action based on their plan limits (V2 simplified).
 
     V2: Features are tied directly to plan_id (free/premium), not tiers.
-    Simply checks if the feature exists for the user's plan.
+    Plan and features come from the cached EntitlementResolver (no queries on
+    a warm cache).
 
     Returns:
     {
@@ -212,57 +214,11 @@ async def check_user_feature_limit(
         "plan": str
     }
     """
-    from app.core.subscriptions import get_user_effective_plan, get_user_plan_tier
-
     try:
-        # Get user's EFFECTIVE plan (checks subscriptions table first, then users.plan)
-        # This correctly handles active subscriptions
-        plan = get_user_effective_plan(user_id, supabase=supabase)
-        user_tier = get_user_plan_tier(plan, supabase)
-
-        # V2: Query features directly by plan_id (no tier inheritance)
-        feature_result = (
-            supabase.table("plan_features")
-            .select("feature_value, is_enabled")
-            .eq("feature_key", feature_key)
-            .eq("plan_id", plan)  # V2: Direct plan matching
-            .eq("is_enabled", True)
-            .limit(1)
-            .execute()
+        return get_entitlements(user_id, supabase).check_limit(
+            feature_key, current_count
         )
 
-        if not feature_result.data:
-            return {
-                "allowed": False,
-                "limit": 0,
-                "current": current_count,
-                "remaining": 0,
-                "plan": plan,
-            }
-
-        limit = feature_result.data[0].get("feature_value")
-
-        # None means unlimited
-        if limit is None:
-            return {
-                "allowed": True,
-                "limit": None,
-                "current": current_count,
-                "remaining": None,
-                "plan": plan,
-            }
-
-        remaining = limit - current_count
-        allowed = remaining > 0
-
-        return {
-            "allowed": allowed,
-            "limit": limit,
-            "current": current_count,
-            "remaining": max(0, remaining),
-            "plan": plan,
-        }
-
     except Exception as e:
         logger.error(
             f"Error checking feature limit {feature_key} for user {user_id}: {e}"
@@ -289,30 +245,8 @@ async def get_user_feature_value(
     - None if feature is not found, disabled, or user doesn't have access
     - feature_value for the feature (None = unlimited for limits)
     """
-    from app.core.subscriptions import get_user_effective_plan, get_user_plan_tier
-
     try:
-        # Get user's EFFECTIVE plan (checks subscriptions table first, then users.plan)
-        # This correctly handles active subscriptions
-        plan = get_user_effective_plan(user_id, supabase=supabase)
-        user_tier = get_user_plan_tier(plan, supabase)
-
-        # V2: Query features directly by plan_id (no tier inheritance)
-        feature_result = (
-            supabase.table("plan_features")
-            .select("feature_value, is_enabled")
-            .eq("feature_key", feature_key)
-            .eq("plan_id", plan)  # V2: Direct plan matching
-            .eq("is_enabled", True)
-            .limit(1)
-            .execute()
-        )
-
-        if not feature_result.data:
-            return None
-
-        # Return feature_value (could be None for unlimited, integer for limits)
-        return feature_result.data[0].get("feature_value")
+        return get_entitlements(user_id, supabase).feature_value(feature_key)
 
     except Exception as e:
         logger.error(
@@ -332,78 +266,19 @@ async def has_user_feature(supabase, user_id: str, feature_key: str) -> bool:
     - True if feature is enabled and user's plan qualifies
     - False otherwise
     """
-    from app.core.subscriptions import get_user_effective_plan, get_user_plan_tier
-
-    try:
-        # Get user's EFFECTIVE plan (checks subscriptions table first, then users.plan)
-        # This correctly handles active subscriptions
-        plan = get_user_effective_plan(user_id, supabase=supabase)
-        user_tier = get_user_plan_tier(plan, supabase)
-
-        # V2: Check if feature exists for user's plan (direct plan matching)
-        feature_result = (
-            supabase.table("plan_features")
-            .select("id, is_enabled, feature_value")
-            .eq("feature_key", feature_key)
-            .eq("plan_id", plan)  # V2: Direct plan matching
-            .eq("is_enabled", True)
-            .limit(1)
-            .execute()
-        )
-
-        if not feature_result.data:
-            return False
-
-        # Feature exists and user qualifies
-        # For limit features, check if value > 0 (0 means disabled)
-        feature_value = feature_result.data[0].get("feature_value")
-        if feature_value == 0:
-            return False
-
-        return True
-
-    except Exception as e:
-        logger.error(f"Error checking feature {feature_key} for user {user_id}: {e}")
-        return False
+    return has_user_feature_sync(supabase, user_id, feature_key)
 
 
 def has_user_feature_sync(supabase, user_id: str, feature_key: str) -> bool:
     """
     Synchronous version of has_user_feature for use in Celery tasks.
 
-    V2: Features are tied directly to plan_id (free/premium), not tiers.
-    Simply checks if the feature exists and is enabled for the user's plan.
-
     Returns:
-    - True if feature is enabled and user's plan qualifies
+    - True if feature is enabled (and not a limit of 0) for the user's plan
     - False otherwise
     """
-    from app.core.subscriptions import get_user_effective_plan
-
     try:
-        # Get user's EFFECTIVE plan (checks subscriptions table first, then users.plan)
-        plan = get_user_effective_plan(user_id, supabase=supabase)
-
-        # V2: Check if feature exists for user's plan (direct plan matching)
-        feature_result = (
-            supabase.table("plan_features")
-            .select("id, is_enabled, feature_value")
-            .eq("feature_key", feature_key)
-            .eq("plan_id", plan)
-            .eq("is_enabled", True)
-            .limit(1)
-            .execute()
-        )
-
-        if not feature_result.data:
-            return False
-
-        # For limit features, check if value > 0 (0 means disabled)
-        feature_value = feature_result.data[0].get("feature_value")
-        if feature_value == 0:
-            return False
-
-        return True
+        return get_entitlements(user_id, supabase).has_feature(feature_key)
 
     except Exception as e:
         logger.error(f"Error checking feature {feature_key} for user {user_id}: {e}")
@@ -12,7 +12,7 @@ All tasks are organized into domain-specific modules:
 - auth_tasks: Refresh token cleanup
 - ai_coach_tasks: AI coach message processing
 - subscription_tasks: Subscription management
-- media_tasks: R2 media file deletion (voice notes)
+- media_tasks: R2 media file deletion, direct voice note upload processing
 - motivation_tasks: AI check-in responses, daily motivations
 
 V2.1 Architecture Notes:
@@ -46,6 +46,7 @@ from app.services.tasks.achievement_tasks import (
 
 # Notification tasks
 from app.services.tasks.notification_tasks import (
+    pregenerate_ai_motivations_task,
     send_scheduled_ai_motivations_task,
     send_reengagement_notifications_task,
     send_checkin_prompts_task,
@@ -89,6 +90,11 @@ from app.services.tasks.ai_coach_tasks import (
 # Media tasks
 from app.services.tasks.media_tasks import (
     delete_media_from_r2_task,
+    flush_r2_deletions_task,
+    process_voice_note_upload_task,
+    purge_user_media_task,
+    sweep_orphaned_media_objects_task,
+    sweep_voice_note_uploads_task,
 )
 
 # Motivation tasks (V2)
@@ -119,9 +125,13 @@ from app.services.tasks.adaptive_nudging_tasks import (
     run_all_adaptive_nudges_task,
 )
 
-# Maintenance tasks (task_audit_log cleanup)
+# Maintenance tasks (task_audit_log cleanup, last_active_at write-behind,
+# partner matching vectors)
 from app.services.tasks.maintenance_tasks import (
     cleanup_task_audit_log_task,
+    flush_user_activity_task,
+    refresh_partner_match_vectors_task,
+    requeue_partner_match_vectors_task,
 )
 
 # Task utilities (for scalable chunking)
@@ -146,6 +156,7 @@ __all__ = [
     "check_achievements_task",
     "check_account_age_achievements_task",
     # Notification tasks
+    "pregenerate_ai_motivations_task",
     "send_scheduled_ai_motivations_task",
     "send_reengagement_notifications_task",
     "send_checkin_prompts_task",
@@ -170,6 +181,11 @@ __all__ = [
     "process_ai_coach_message_task",
     # Media tasks
     "delete_media_from_r2_task",
+    "flush_r2_deletions_task",
+    "process_voice_note_upload_task",
+    "purge_user_media_task",
+    "sweep_orphaned_media_objects_task",
+    "sweep_voice_note_uploads_task",
     # Motivation tasks (V2)
     "generate_checkin_ai_response",
     "send_morning_motivations",
@@ -185,6 +201,9 @@ __all__ = [
     "run_all_adaptive_nudges_task",
     # Maintenance
     "cleanup_task_audit_log_task",
+    "flush_user_activity_task",
+    "refresh_partner_match_vectors_task",
+    "requeue_partner_match_vectors_task",
     # Task utilities
     "chunk_list",
     "dispatch_chunked_tasks",
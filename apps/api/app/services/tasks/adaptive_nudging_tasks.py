@@ -22,6 +22,7 @@ Scalability (per SCALABILITY.md):
 
 from datetime import datetime, timedelta, date
 from typing import Dict, Any, List, Optional, Set
+import numpy as np
 import pytz
 
 from app.services.tasks.base import (
@@ -31,6 +32,7 @@ from app.services.tasks.base import (
 )
 from app.services.expo_push_service import send_push_to_user_sync
 from app.services.subscription_service import has_user_feature_sync
+from app.services.streaks import STATUS_CODES, CheckInHistory, to_day
 
 
 # Constants
@@ -912,13 +914,22 @@ def check_crushing_it_task(self):
             .execute()
         )
 
-        # Build lookup: goal_id -> list of check-ins
-        checkins_by_goal = {}
-        for c in all_checkins_result.data or []:
-            gid = c.get("goal_id")
-            if gid not in checkins_by_goal:
-                checkins_by_goal[gid] = []
-            checkins_by_goal[gid].append(c)
+        # This week's status counts for every goal at once, up to each user's local today
+        history = CheckInHistory.from_rows(all_checkins_result.data or [], keys=goal_ids)
+        local_today_by_tz = {}
+
+        def _local_today(user_id: str) -> int:
+            tz_name = (users_by_id.get(user_id) or {}).get("timezone") or "UTC"
+            if tz_name not in local_today_by_tz:
+                try:
+                    local = datetime.now(pytz.timezone(tz_name)).date()
+                except Exception:
+                    local = utc_today
+                local_today_by_tz[tz_name] = to_day(local)
+            return local_today_by_tz[tz_name]
+
+        local_today = np.array([_local_today(g["user_id"]) for g in goals], dtype=np.int64)
+        week_status_counts = history.status_counts(end=local_today)
 
         # SCALABILITY: Batch prefetch existing "crushing it" nudges this week for ALL users
         # Instead of 1 query per user (N+1), we do 1 query total
@@ -936,7 +947,7 @@ def check_crushing_it_task(self):
             n.get("user_id") for n in (existing_nudges_result.data or [])
         )
 
-        for goal in goals:
+        for goal_index, goal in enumerate(goals):
             processed += 1
             user_id = goal.get("user_id")
             goal_id = goal.get("id")
@@ -966,34 +977,19 @@ def check_crushing_it_task(self):
             if not can_send_nudge(user_tz_str):
                 continue
 
-            # Calculate this week's scheduled days and completions using prefetched data
+            # This week's scheduled days and completions from the prefetched counts
             try:
-                today = now.date()
-
-                # O(1) lookup from prefetched data
-                goal_checkins = checkins_by_goal.get(goal_id, [])
-
-                # Filter to this week based on user's timezone
-                week_checkins = [
-                    c
-                    for c in goal_checkins
-                    if c.get("check_in_date") and c.get("check_in_date") <= str(today)
-                ]
-
-                if not week_checkins:
+                counts = week_status_counts[goal_index]
+                if not counts.sum():
                     continue
 
                 # Count scheduled days completed (using status)
                 # V2.1: status='completed' means done, status='rest_day' is a rest day
-                completed_count = sum(
-                    1 for c in week_checkins if c.get("status") == "completed"
-                )
-                total_scheduled = len(
-                    [
-                        c
-                        for c in week_checkins
-                        if c.get("status") not in ("pending", "rest_day")
-                    ]
+                completed_count = int(counts[STATUS_CODES["completed"]])
+                total_scheduled = int(
+                    counts.sum()
+                    - counts[STATUS_CODES["pending"]]
+                    - counts[STATUS_CODES["rest_day"]]
                 )
 
                 # Need at least 3 scheduled days and all completed
@@ -3,16 +3,22 @@ AI Coach Tasks
 
 Celery tasks for background AI coach message processing.
 Allows users to send a message and leave - response is processed in background.
-Supports streaming: partial content pushed to DB for realtime delivery.
+Supports streaming: partial content is written to the assistant's ai_coach_messages
+row for realtime delivery.
 """
 
 import json
 import time
+import uuid
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from app.services.tasks.base import celery_app, get_supabase_client, logger
 from app.core.config import settings
 from app.core.cache import get_redis_client
+from app.core.openai_client import create_chat_completion
+
+# Most recent messages sent to the model as conversation history
+HISTORY_MESSAGES = 20
 
 
 def _user_today_iso(user_timezone: Optional[str]) -> str:
@@ -118,156 +124,185 @@ def _safe_json_dumps(obj: Any) -> str:
         )
 
 
-def _update_conversation_messages(
+def _ensure_assistant_message(
     supabase,
     conversation_id: str,
-    messages: List[Dict[str, Any]],
+    assistant_message_id: Optional[str],
+    request_id: Optional[str],
+) -> str:
+    """message_id of this request's assistant placeholder; appends one if missing."""
+    from app.services.ai_coach_service import append_messages
+
+    lookups = []
+    if assistant_message_id:
+        lookups.append(("message_id", assistant_message_id))
+    if request_id:
+        lookups.append(("request_id", request_id))
+    for column, value in lookups:
+        result = (
+            supabase.table("ai_coach_messages")
+            .select("message_id")
+            .eq("conversation_id", conversation_id)
+            .eq("role", "assistant")
+            .eq(column, value)
+            .order("seq", desc=True)
+            .limit(1)
+            .execute()
+        )
+        if result.data and result.data[0].get("message_id"):
+            return result.data[0]["message_id"]
+
+    logger.warning(
+        "[AI Coach Task] No matching assistant placeholder found, appending one"
+    )
+    message_id = assistant_message_id or str(uuid.uuid4())
+    append_messages(
+        supabase,
+        conversation_id,
+        [
+            {
+                "role": "assistant",
+                "content": "",
+                "status": "generating",
+                "created_at": datetime.utcnow().isoformat(),
+                "request_id": request_id,
+                "message_id": message_id,
+            }
+        ],
+    )
+    return message_id
+
+
+def _update_assistant_message(
+    supabase,
+    conversation_id: str,
+    message_id: str,
+    content: str,
+    status: str,
 ) -> None:
-    """Update conversation with current messages (partial or final)."""
-    supabase.table("ai_coach_conversations").update(
+    """Write streamed (partial or final) content to the assistant row in place."""
+    supabase.table("ai_coach_messages").update(
         {
-            "messages": json.dumps(messages),
+            "content": content,
+            "status": status,
             "updated_at": datetime.utcnow().isoformat(),
-            "last_message_at": datetime.utcnow().isoformat(),
         }
-    ).eq("id", conversation_id).execute()
+    ).eq("conversation_id", conversation_id).eq("message_id", message_id).execute()
 
 
-def _merge_and_write_messages(
+def _set_request_message_status(
+    supabase,
+    conversation_id: str,
+    role: str,
+    values: Dict[str, Any],
+    message_id: Optional[str],
+    request_id: Optional[str],
+    legacy_status: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Update this request's user or assistant row: by message_id, else by
+    request_id, else (legacy, no ids) rows of that role in legacy_status.
+    Returns the updated rows.
+    """
+    values = {**values, "updated_at": datetime.utcnow().isoformat()}
+    query = (
+        supabase.table("ai_coach_messages")
+        .update(values)
+        .eq("conversation_id", conversation_id)
+        .eq("role", role)
+    )
+    if message_id:
+        query = query.eq("message_id", message_id)
+    elif request_id:
+        query = query.eq("request_id", request_id)
+    elif legacy_status:
+        query = query.eq("status", legacy_status)
+    else:
+        return []
+    return query.execute().data or []
+
+
+def _complete_request_messages(
     supabase,
     conversation_id: str,
     full_response: str,
     request_id: Optional[str],
     assistant_message_id: Optional[str],
     user_message_id: Optional[str],
-    fallback_messages: Optional[List[Dict[str, Any]]] = None
 ) -> None:
     """
-    Re-fetch conversation, merge our assistant response into fresh data, then write.
-    Prevents race where concurrent tasks overwrite each other's messages.
+    Mark this request's user message completed and store the final assistant
+    response. Each is a single-row update, so concurrent requests in the same
+    conversation never overwrite each other.
     """
-    conv_result = (
-        supabase.table("ai_coach_conversations")
-        .select("messages")
-        .eq("id", conversation_id)
-        .single()
-        .execute()
+    from app.services.ai_coach_service import append_messages
+
+    user_rows = _set_request_message_status(
+        supabase,
+        conversation_id,
+        "user",
+        {"status": "completed"},
+        user_message_id,
+        None,
     )
-    if not conv_result.data:
-        if fallback_messages:
-            supabase.table("ai_coach_conversations").update(
-                {
-                    "messages": json.dumps(fallback_messages),
-                    "message_count": len(fallback_messages),
-                    "last_message_at": datetime.utcnow().isoformat(),
-                    "updated_at": datetime.utcnow().isoformat(),
-                }
-            ).eq("id", conversation_id).execute()
-        else:
-            logger.warning("[AI Coach Task] Re-fetch before merge failed, skipping write")
-        return
-
-    fresh = conv_result.data.get("messages", [])
-    if isinstance(fresh, str):
-        fresh = json.loads(fresh) if fresh else []
-
-    now_iso = datetime.utcnow().isoformat()
-
-    # Use fresh as base; add/update our assistant (and user status) so we never overwrite.
-    merged = list(fresh)
-
-    # Find our assistant in merged; update if found
-    assistant_found = False
-    for i, msg in enumerate(merged):
-        if msg.get("role") != "assistant":
-            continue
-        if (request_id and msg.get("request_id") == request_id) or (
-            assistant_message_id and msg.get("message_id") == assistant_message_id
-        ):
-            merged[i] = {**msg, "content": full_response, "status": "completed"}
-            merged[i].setdefault("created_at", now_iso)
-            assistant_found = True
-            break
-
-    if not assistant_found:
-        # Our assistant not in DB; insert after our user message to preserve order
-        our_assistant = {
-            "role": "assistant",
-            "content": full_response,
-            "status": "completed",
-            "created_at": now_iso,
-            "request_id": request_id,
-            "message_id": assistant_message_id,
-        }
-        insert_at = len(merged)
-        for i, msg in enumerate(merged):
-            if msg.get("role") != "user":
-                continue
-            if (user_message_id and msg.get("message_id") == user_message_id) or (
-                request_id and msg.get("request_id") == request_id
-            ):
-                insert_at = i + 1
-                break
-        merged.insert(insert_at, our_assistant)
-
-    # Mark our user message completed
-    for i, msg in enumerate(merged):
-        if msg.get("role") != "user":
-            continue
-        if (user_message_id and msg.get("message_id") == user_message_id) or (
-            request_id and msg.get("request_id") == request_id
-        ):
-            merged[i] = {**msg, "status": "completed"}
-            break
-
-    supabase.table("ai_coach_conversations").update(
-        {
-            "messages": json.dumps(merged),
-            "message_count": len(merged),
-            "last_message_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat(),
-        }
-    ).eq("id", conversation_id).execute()
-
+    if not user_rows:
+        _set_request_message_status(
+            supabase,
+            conversation_id,
+            "user",
+            {"status": "completed"},
+            None,
+            request_id,
+            legacy_status="pending",
+        )
 
-def _find_or_create_assistant_message(
-    messages: List[Dict[str, Any]],
-    assistant_message_id: Optional[str],
-    request_id: Optional[str],
-    now_iso: str,
-) -> int:
-    """Find assistant message index (most recent match) or append one. Returns index."""
-    # Search from end (most recent) to find current turn's assistant placeholder
-    for i in range(len(messages) - 1, -1, -1):
-        msg = messages[i]
-        if msg.get("role") == "assistant":
-            if assistant_message_id and msg.get("message_id") == assistant_message_id:
-                return i
-            if request_id and msg.get("request_id") == request_id:
-                return i
-    logger.warning(
-        "[AI Coach Task] No matching assistant placeholder found, appending one"
+    assistant_values = {"content": full_response, "status": "completed"}
+    assistant_rows = _set_request_message_status(
+        supabase,
+        conversation_id,
+        "assistant",
+        assistant_values,
+        assistant_message_id,
+        None,
     )
-    messages.append(
-        {
-            "role": "assistant",
-            "content": "",
-            "status": "generating",
-            "created_at": now_iso,
-            "request_id": request_id,
-            "message_id": assistant_message_id,
-        }
-    )
-    return len(messages) - 1
+    if not assistant_rows and request_id:
+        assistant_rows = _set_request_message_status(
+            supabase,
+            conversation_id,
+            "assistant",
+            assistant_values,
+            None,
+            request_id,
+        )
+
+    if assistant_rows:
+        now_iso = datetime.utcnow().isoformat()
+        supabase.table("ai_coach_conversations").update(
+            {"last_message_at": now_iso, "updated_at": now_iso}
+        ).eq("id", conversation_id).execute()
+    else:
+        # Placeholder missing (e.g. removed while processing): append the response
+        append_messages(
+            supabase,
+            conversation_id,
+            [
+                {
+                    "role": "assistant",
+                    "content": full_response,
+                    "status": "completed",
+                    "created_at": datetime.utcnow().isoformat(),
+                    "request_id": request_id,
+                    "message_id": assistant_message_id or str(uuid.uuid4()),
+                }
+            ],
+        )
 
 
 def _stream_first_completion(
-    client,
     messages: List[Dict[str, Any]],
     supabase,
     conversation_id: str,
-    messages_list: List[Dict[str, Any]],
-    assistant_message_id: Optional[str],
+    assistant_message_id: str,
     request_id: Optional[str],
 ) -> Dict[str, Any]:
     """
@@ -281,10 +316,6 @@ def _stream_first_completion(
     """
     from app.services.ai_coach_tools import TOOL_DEFINITIONS
 
-    now_iso = datetime.utcnow().isoformat()
-    idx = _find_or_create_assistant_message(
-        messages_list, assistant_message_id, request_id, now_iso
-    )
     accumulated = ""
     tokens_used = 0
     last_update_at = 0.0
@@ -296,7 +327,7 @@ def _stream_first_completion(
     finish_reason = None
 
     try:
-        stream = client.chat.completions.create(
+        stream = create_chat_completion(
             model="gpt-4o-mini",
             messages=messages,
             temperature=0.3,
@@ -327,9 +358,6 @@ def _stream_first_completion(
                     or (now_t - last_update_at >= min_update_interval and accumulated)
                 )
                 if should_update and accumulated:
-                    messages_list[idx]["content"] = accumulated
-                    messages_list[idx]["status"] = "generating"
-                    messages_list[idx].setdefault("created_at", now_iso)
                     stream_via_redis = getattr(
                         settings, "AI_COACH_STREAM_VIA_REDIS", False
                     ) and request_id
@@ -337,8 +365,12 @@ def _stream_first_completion(
                         from app.services.ai_coach_stream_service import publish_chunk
                         publish_chunk(request_id, accumulated)
                     else:
-                        _update_conversation_messages(
-                            supabase, conversation_id, messages_list
+                        _update_assistant_message(
+                            supabase,
+                            conversation_id,
+                            assistant_message_id,
+                            accumulated,
+                            "generating",
                         )
                     last_update_at = now_t
 
@@ -361,10 +393,6 @@ def _stream_first_completion(
                     if getattr(fn, "arguments", None):
                         tool_calls_buf[i]["arguments"] += fn.arguments
 
-        if accumulated:
-            messages_list[idx]["content"] = accumulated
-            messages_list[idx]["status"] = "generating"
-
         has_tool_calls = finish_reason == "tool_calls" and len(tool_calls_buf) > 0
 
         if has_tool_calls:
@@ -407,29 +435,23 @@ def _stream_first_completion(
             from app.services.ai_coach_stream_service import publish_error
             publish_error(request_id, str(e))
         elif accumulated:
-            messages_list[idx]["content"] = accumulated
-            messages_list[idx]["status"] = "generating"
-            _update_conversation_messages(supabase, conversation_id, messages_list)
+            _update_assistant_message(
+                supabase, conversation_id, assistant_message_id, accumulated, "generating"
+            )
         raise
 
 
 def _stream_completion_and_update_db(
-    client,
     messages: List[Dict[str, Any]],
     supabase,
     conversation_id: str,
-    messages_list: List[Dict[str, Any]],
-    assistant_message_id: Optional[str],
+    assistant_message_id: str,
     request_id: Optional[str],
 ) -> tuple[str, int]:
     """
     Stream OpenAI completion and push partial content to DB for realtime.
     Returns (full_response, tokens_used).
     """
-    now_iso = datetime.utcnow().isoformat()
-    idx = _find_or_create_assistant_message(
-        messages_list, assistant_message_id, request_id, now_iso
-    )
     accumulated = ""
     tokens_used = 0
     last_update_at = 0.0
@@ -437,7 +459,7 @@ def _stream_completion_and_update_db(
     min_chunk_chars = 25
 
     try:
-        stream = client.chat.completions.create(
+        stream = create_chat_completion(
             model="gpt-4o-mini",
             messages=messages,
             temperature=0.3,
@@ -461,9 +483,6 @@ def _stream_completion_and_update_db(
                 or (now - last_update_at >= min_update_interval and accumulated)
             )
             if should_update and accumulated:
-                messages_list[idx]["content"] = accumulated
-                messages_list[idx]["status"] = "generating"
-                messages_list[idx].setdefault("created_at", now_iso)
                 stream_via_redis = getattr(
                     settings, "AI_COACH_STREAM_VIA_REDIS", False
                 ) and request_id
@@ -471,14 +490,15 @@ def _stream_completion_and_update_db(
                     from app.services.ai_coach_stream_service import publish_chunk
                     publish_chunk(request_id, accumulated)
                 else:
-                    _update_conversation_messages(
-                        supabase, conversation_id, messages_list
+                    _update_assistant_message(
+                        supabase,
+                        conversation_id,
+                        assistant_message_id,
+                        accumulated,
+                        "generating",
                     )
                 last_update_at = now
 
-        if accumulated:
-            messages_list[idx]["content"] = accumulated
-            messages_list[idx]["status"] = "generating"
         return accumulated, tokens_used
     except Exception as e:
         logger.warning(f"[AI Coach Task] Streaming failed: {e}")
@@ -487,9 +507,9 @@ def _stream_completion_and_update_db(
             from app.services.ai_coach_stream_service import publish_error
             publish_error(request_id, str(e))
         elif accumulated:
-            messages_list[idx]["content"] = accumulated
-            messages_list[idx]["status"] = "generating"
-            _update_conversation_messages(supabase, conversation_id, messages_list)
+            _update_assistant_message(
+                supabase, conversation_id, assistant_message_id, accumulated, "generating"
+            )
         raise
 
 
@@ -534,8 +554,6 @@ def process_ai_coach_message_task(
     Returns:
         Dict with success status and response info
     """
-    from openai import OpenAI
-
     supabase = get_supabase_client()
 
     try:
@@ -552,9 +570,14 @@ def process_ai_coach_message_task(
         )
 
         # Get the conversation (retry handled by ResilientSupabaseClient)
+        from app.services.ai_coach_service import (
+            CONVERSATION_COLUMNS,
+            MESSAGE_COLUMNS,
+        )
+
         conv_result = (
             supabase.table("ai_coach_conversations")
-            .select("*")
+            .select(CONVERSATION_COLUMNS)
             .eq("id", conversation_id)
             .eq("user_id", user_id)
             .single()
@@ -565,9 +588,6 @@ def process_ai_coach_message_task(
             raise Exception(f"Conversation {conversation_id} not found")
 
         conversation = conv_result.data
-        messages = conversation.get("messages", [])
-        if isinstance(messages, str):
-            messages = json.loads(messages)
 
         # If goal_id wasn't passed, fall back to persisted conversation.goal_id.
         if not goal_id:
@@ -575,24 +595,40 @@ def process_ai_coach_message_task(
 
         # Idempotency: if this request_id already has a completed assistant message, bail out.
         if request_id:
-            for msg in messages:
-                if (
-                    msg.get("role") == "assistant"
-                    and msg.get("request_id") == request_id
-                    and msg.get("status") == "completed"
-                    and (msg.get("content") or "")
-                ):
-                    logger.info(
-                        "[AI Coach Task] Request already completed; skipping.",
-                        {"conversation_id": conversation_id, "request_id": request_id},
-                    )
-                    return {
-                        "success": True,
-                        "conversation_id": conversation_id,
-                        "response_length": len(msg.get("content") or ""),
-                        "tokens_used": 0,
-                        "skipped": True,
-                    }
+            done = (
+                supabase.table("ai_coach_messages")
+                .select("content")
+                .eq("conversation_id", conversation_id)
+                .eq("request_id", request_id)
+                .eq("role", "assistant")
+                .eq("status", "completed")
+                .neq("content", "")
+                .limit(1)
+                .execute()
+            )
+            if done.data:
+                logger.info(
+                    "[AI Coach Task] Request already completed; skipping.",
+                    {"conversation_id": conversation_id, "request_id": request_id},
+                )
+                return {
+                    "success": True,
+                    "conversation_id": conversation_id,
+                    "response_length": len(done.data[0].get("content") or ""),
+                    "tokens_used": 0,
+                    "skipped": True,
+                }
+
+        # Only the most recent messages go to the model (keyset read on seq)
+        history = (
+            supabase.table("ai_coach_messages")
+            .select(MESSAGE_COLUMNS)
+            .eq("conversation_id", conversation_id)
+            .order("seq", desc=True)
+            .limit(HISTORY_MESSAGES)
+            .execute()
+        ).data or []
+        conversation["messages"] = list(reversed(history))
 
         # Get user context for personalization
         user_context = _get_user_context_sync(supabase, user_id)
@@ -661,19 +697,20 @@ def process_ai_coach_message_task(
             )
 
         # Call OpenAI
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
         streaming_enabled = getattr(
             settings, "AI_COACH_STREAMING_ENABLED", True
         )
 
         if streaming_enabled:
+            # Partial content is written to this row as it streams
+            assistant_message_id = _ensure_assistant_message(
+                supabase, conversation_id, assistant_message_id, request_id
+            )
             # Stream first completion (works for both content-only and tool_calls)
             result = _stream_first_completion(
-                client=client,
                 messages=openai_messages,
                 supabase=supabase,
                 conversation_id=conversation_id,
-                messages_list=messages,
                 assistant_message_id=assistant_message_id,
                 request_id=request_id,
             )
@@ -698,11 +735,9 @@ def process_ai_coach_message_task(
                         }
                     )
                 full_response, tokens_used = _stream_completion_and_update_db(
-                    client=client,
                     messages=follow_up,
                     supabase=supabase,
                     conversation_id=conversation_id,
-                    messages_list=messages,
                     assistant_message_id=assistant_message_id,
                     request_id=request_id,
                 )
@@ -712,7 +747,7 @@ def process_ai_coach_message_task(
                 tokens_used = result.get("tokens_used", 0)
         else:
             # Non-streaming path (legacy)
-            response = client.chat.completions.create(
+            response = create_chat_completion(
                 model="gpt-4o-mini",
                 messages=openai_messages,
                 temperature=0.3,
@@ -786,7 +821,7 @@ def process_ai_coach_message_task(
                 )
 
             # Get final response (non-streaming path)
-            follow_up_response = client.chat.completions.create(
+            follow_up_response = create_chat_completion(
                 model="gpt-4o-mini",
                 messages=follow_up_messages,
                 temperature=0.3,
@@ -799,89 +834,25 @@ def process_ai_coach_message_task(
             if follow_up_response.usage:
                 tokens_used = follow_up_response.usage.total_tokens
 
-        # Update statuses + fill the assistant placeholder (idempotent).
-        now_iso = datetime.utcnow().isoformat()
-
-        # 1) Mark the correct user message completed
-        user_updated = False
-        if user_message_id:
-            for i, msg in enumerate(messages):
-                if (
-                    msg.get("role") == "user"
-                    and msg.get("message_id") == user_message_id
-                ):
-                    messages[i]["status"] = "completed"
-                    user_updated = True
-                    break
-        if not user_updated and request_id:
-            for i, msg in enumerate(messages):
-                if msg.get("role") == "user" and msg.get("request_id") == request_id:
-                    messages[i]["status"] = "completed"
-                    user_updated = True
-                    break
-        if not user_updated:
-            # Legacy fallback: first pending user message
-            for i, msg in enumerate(messages):
-                if msg.get("status") == "pending" and msg.get("role") == "user":
-                    messages[i]["status"] = "completed"
-                    break
-
-        # 2) Update assistant placeholder (preferred) or create if missing
-        assistant_updated = False
-        if assistant_message_id:
-            for i, msg in enumerate(messages):
-                if (
-                    msg.get("role") == "assistant"
-                    and msg.get("message_id") == assistant_message_id
-                ):
-                    messages[i]["content"] = full_response
-                    messages[i]["status"] = "completed"
-                    messages[i].setdefault("created_at", now_iso)
-                    assistant_updated = True
-                    break
-        if not assistant_updated and request_id:
-            for i, msg in enumerate(messages):
-                if (
-                    msg.get("role") == "assistant"
-                    and msg.get("request_id") == request_id
-                ):
-                    messages[i]["content"] = full_response
-                    messages[i]["status"] = "completed"
-                    messages[i].setdefault("created_at", now_iso)
-                    assistant_updated = True
-                    break
-        if not assistant_updated:
-            messages.append(
-                {
-                    "role": "assistant",
-                    "content": full_response,
-                    "status": "completed",
-                    "created_at": now_iso,
-                    "request_id": request_id,
-                    "message_id": assistant_message_id,
-                }
-            )
-
         # Publish done to Redis when streaming via Redis (for SSE clients)
         if getattr(settings, "AI_COACH_STREAM_VIA_REDIS", False) and request_id:
             from app.services.ai_coach_stream_service import publish_done
             publish_done(request_id, full_response)
 
-        # Re-fetch, merge our updates into fresh data, then write (prevents race overwrites)
-        _merge_and_write_messages(
+        # Update statuses + fill the assistant placeholder (idempotent, row-level).
+        _complete_request_messages(
             supabase=supabase,
             conversation_id=conversation_id,
             full_response=full_response,
             request_id=request_id,
             assistant_message_id=assistant_message_id,
             user_message_id=user_message_id,
-            fallback_messages=messages,
         )
 
         # Generate title if needed
         if not conversation.get("title"):
             _generate_and_save_title(
-                supabase, client, conversation_id, message, full_response
+                supabase, conversation_id, message, full_response
             )
 
         # Update daily usage
@@ -916,68 +887,25 @@ def process_ai_coach_message_task(
 
         # Mark the message/placeholder as failed
         try:
-            conv_result = (
-                supabase.table("ai_coach_conversations")
-                .select("messages")
-                .eq("id", conversation_id)
-                .single()
-                .execute()
+            # User message: mark COMPLETED (user successfully sent it - failure is AI-side only)
+            _set_request_message_status(
+                supabase,
+                conversation_id,
+                "user",
+                {"status": "completed"},
+                user_message_id,
+                request_id,
+                legacy_status="pending",
+            )
+            # Assistant placeholder: mark FAILED (AI failed to respond), keeping partial content
+            _set_request_message_status(
+                supabase,
+                conversation_id,
+                "assistant",
+                {"status": "failed"},
+                assistant_message_id,
+                request_id,
             )
-
-            if conv_result.data:
-                messages = conv_result.data.get("messages", [])
-                if isinstance(messages, str):
-                    messages = json.loads(messages)
-
-                # User message: mark COMPLETED (user successfully sent it - failure is AI-side only)
-                if user_message_id:
-                    for i, msg in enumerate(messages):
-                        if (
-                            msg.get("role") == "user"
-                            and msg.get("message_id") == user_message_id
-                        ):
-                            messages[i]["status"] = "completed"
-                            break
-                elif request_id:
-                    for i, msg in enumerate(messages):
-                        if (
-                            msg.get("role") == "user"
-                            and msg.get("request_id") == request_id
-                        ):
-                            messages[i]["status"] = "completed"
-                            break
-                else:
-                    for i, msg in enumerate(messages):
-                        if msg.get("status") == "pending" and msg.get("role") == "user":
-                            messages[i]["status"] = "completed"
-                            break
-
-                # Assistant placeholder: mark FAILED (AI failed to respond)
-                if assistant_message_id:
-                    for i, msg in enumerate(messages):
-                        if (
-                            msg.get("role") == "assistant"
-                            and msg.get("message_id") == assistant_message_id
-                        ):
-                            messages[i]["status"] = "failed"
-                            messages[i]["content"] = msg.get("content") or ""
-                            break
-                elif request_id:
-                    for i, msg in enumerate(messages):
-                        if (
-                            msg.get("role") == "assistant"
-                            and msg.get("request_id") == request_id
-                        ):
-                            messages[i]["status"] = "failed"
-                            messages[i]["content"] = msg.get("content") or ""
-                            break
-
-                supabase.table("ai_coach_conversations").update(
-                    {
-                        "messages": json.dumps(messages),
-                        "updated_at": datetime.utcnow().isoformat(),
-                    }
-                ).eq("id", conversation_id).execute()
         except Exception as update_error:
             logger.error(f"Failed to mark message as failed: {update_error}")
 
@@ -1238,11 +1166,7 @@ def _build_openai_messages(
 
     # Add conversation history
     history = conversation.get("messages", [])
-    if isinstance(history, str):
-        history = json.loads(history)
-
-    MAX_MESSAGES = 20
-    recent_history = history[-MAX_MESSAGES:]
+    recent_history = history[-HISTORY_MESSAGES:]
     for msg in recent_history:
         role = msg.get("role")
         status = msg.get("status")
@@ -1261,7 +1185,7 @@ def _build_openai_messages(
 
 
 def _generate_and_save_title(
-    supabase, client, conversation_id: str, user_message: str, assistant_response: str
+    supabase, conversation_id: str, user_message: str, assistant_response: str
 ):
     """Generate and save conversation title."""
     try:
@@ -1278,7 +1202,7 @@ Rules:
 
 Title:"""
 
-        response = client.chat.completions.create(
+        response = create_chat_completion(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             max_tokens=20,
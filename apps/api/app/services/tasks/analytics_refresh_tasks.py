@@ -2,7 +2,7 @@
 Analytics Refresh Tasks
 
 Celery tasks for:
-1. Refreshing materialized views (hourly)
+1. Refreshing materialized views (manual; not scheduled)
 2. Pre-warming analytics cache for active users
 
 Following SCALABILITY.md patterns for 100K+ users.
@@ -28,7 +28,8 @@ def refresh_analytics_views_task(self):
     """
     Refresh analytics materialized views in private 'analytics' schema.
 
-    Runs hourly via Celery Beat.
+    No longer scheduled: the dashboard RPC reads incrementally maintained
+    aggregates (migration 043). Trigger manually when the views are needed.
     Uses REFRESH MATERIALIZED VIEW CONCURRENTLY for non-blocking updates.
 
     Views refreshed:
@@ -68,6 +69,18 @@ def refresh_analytics_views_task(self):
 ANALYTICS_CACHE_TTL = 3600  # 1 hour
 ANALYTICS_CACHE_PREFIX = "analytics:dashboard"
 
+# Generation counters embedded in every dashboard key. Invalidation bumps a
+# counter with one INCR; entries under the old generation are never read again
+# and expire on their own (no SCAN over the keyspace).
+# - analytics:ver                      global (clear_all_analytics_cache)
+# - analytics:ver:{user_id}            all goals of a user
+# - analytics:ver:{user_id}:{goal_id}  one goal
+ANALYTICS_VERSION_PREFIX = "analytics:ver"
+# Per-user/goal counters must outlive every entry written under them, otherwise
+# an expired counter could restart and reach an old generation again. Their TTL
+# is refreshed on each bump and each cache write.
+ANALYTICS_VERSION_TTL = 86400  # 24 hours
+
 
 def _user_today_iso(user_timezone: str) -> str:
     """Today's date (YYYY-MM-DD) in user's timezone. Falls back to UTC on error."""
@@ -78,6 +91,29 @@ def _user_today_iso(user_timezone: str) -> str:
         return datetime.utcnow().date().isoformat()
 
 
+def _version_keys(user_id: str, goal_id: str = None) -> list[str]:
+    return [
+        ANALYTICS_VERSION_PREFIX,
+        f"{ANALYTICS_VERSION_PREFIX}:{user_id}",
+        f"{ANALYTICS_VERSION_PREFIX}:{user_id}:{goal_id}",
+    ]
+
+
+def _analytics_cache_key(
+    redis, user_id: str, goal_id: str, days: int, end_date: str = None
+) -> str:
+    """Dashboard key under the current global/user/goal generation (one MGET)."""
+    versions = redis.mget(_version_keys(user_id, goal_id))
+    generation = ".".join(
+        (v.decode() if isinstance(v, bytes) else str(v)) if v else "0"
+        for v in versions
+    )
+    return (
+        f"{ANALYTICS_CACHE_PREFIX}:{user_id}:{goal_id}:g{generation}"
+        f":{days}:{end_date or ''}"
+    )
+
+
 def get_cached_analytics(
     user_id: str, days: int = 30, goal_id: str = None, end_date: str = None
 ) -> dict | None:
@@ -92,9 +128,8 @@ def get_cached_analytics(
     if not redis:
         return None
 
-    cache_key = f"{ANALYTICS_CACHE_PREFIX}:{user_id}:{goal_id}:{days}:{end_date or ''}"
-
     try:
+        cache_key = _analytics_cache_key(redis, user_id, goal_id, days, end_date)
         cached = redis.get(cache_key)
         if cached:
             data = json.loads(cached)
@@ -119,10 +154,13 @@ def set_cached_analytics(
     if not redis:
         return False
 
-    cache_key = f"{ANALYTICS_CACHE_PREFIX}:{user_id}:{goal_id}:{days}:{end_date or ''}"
-
     try:
-        redis.setex(cache_key, ANALYTICS_CACHE_TTL, json.dumps(data))
+        cache_key = _analytics_cache_key(redis, user_id, goal_id, days, end_date)
+        pipe = redis.pipeline(transaction=False)
+        pipe.setex(cache_key, ANALYTICS_CACHE_TTL, json.dumps(data))
+        for version_key in _version_keys(user_id, goal_id)[1:]:
+            pipe.expire(version_key, ANALYTICS_VERSION_TTL)
+        pipe.execute()
         logger.debug(f"Analytics cached for user {user_id}, goal {goal_id}")
         return True
     except Exception as e:
@@ -137,67 +175,66 @@ def invalidate_user_analytics_cache(user_id: str, goal_id: str = None):
     V2: If goal_id provided, invalidates only that goal's cache (all days/end_date).
         If goal_id is None, invalidates ALL goals for the user.
 
-    Call this when user creates a check-in, goal, etc.
+    Call this when user creates a check-in, goal, etc. O(1): bumps one
+    generation counter.
+    """
+    invalidate_analytics_cache_bulk([(user_id, goal_id)])
+
+
+def invalidate_analytics_cache_bulk(pairs) -> int:
+    """
+    Invalidate many (user_id, goal_id) caches in one Redis round trip.
+
+    goal_id may be None to invalidate all of that user's goals.
+    Returns the number of distinct generations bumped.
     """
     redis = get_redis_client()
     if not redis:
-        return
-
-    if goal_id:
-        pattern = f"{ANALYTICS_CACHE_PREFIX}:{user_id}:{goal_id}:*"
-        try:
-            cursor = 0
-            while True:
-                cursor, keys = redis.scan(cursor, match=pattern, count=100)
-                if keys:
-                    redis.delete(*keys)
-                if cursor == 0:
-                    break
-        except Exception as e:
-            logger.warning(f"Error invalidating analytics cache: {e}")
-    else:
-        pattern = f"{ANALYTICS_CACHE_PREFIX}:{user_id}:*"
-        try:
-            cursor = 0
-            while True:
-                cursor, keys = redis.scan(cursor, match=pattern, count=100)
-                if keys:
-                    redis.delete(*keys)
-                if cursor == 0:
-                    break
-        except Exception as e:
-            logger.warning(f"Error invalidating analytics cache: {e}")
+        return 0
+
+    version_keys = {
+        (
+            f"{ANALYTICS_VERSION_PREFIX}:{user_id}:{goal_id}"
+            if goal_id
+            else f"{ANALYTICS_VERSION_PREFIX}:{user_id}"
+        )
+        for user_id, goal_id in pairs
+    }
+    if not version_keys:
+        return 0
+
+    try:
+        pipe = redis.pipeline(transaction=False)
+        for version_key in version_keys:
+            pipe.incr(version_key)
+            pipe.expire(version_key, ANALYTICS_VERSION_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Error invalidating analytics cache: {e}")
+        return 0
+
+    return len(version_keys)
 
 
 def clear_all_analytics_cache() -> int:
     """
-    Clear ALL analytics cache entries.
+    Invalidate ALL analytics cache entries (bumps the global generation).
 
-    Use this when schema changes to avoid stale data errors.
-    Returns number of keys deleted.
+    Use this when schema changes to avoid stale data errors. Old entries
+    expire within ANALYTICS_CACHE_TTL.
+    Returns the new global generation (0 if Redis is unavailable).
     """
     redis = get_redis_client()
     if not redis:
         return 0
 
-    deleted = 0
-    cursor = 0
-    pattern = f"{ANALYTICS_CACHE_PREFIX}:*"
-
     try:
-        # Use SCAN to find all matching keys (safe for production)
-        while True:
-            cursor, keys = redis.scan(cursor, match=pattern, count=100)
-            if keys:
-                redis.delete(*keys)
-                deleted += len(keys)
-            if cursor == 0:
-                break
-        logger.info(f"Cleared {deleted} analytics cache entries")
+        generation = redis.incr(ANALYTICS_VERSION_PREFIX)
+        logger.info(f"Analytics cache cleared (generation {generation})")
+        return generation
     except Exception as e:
         logger.warning(f"Error clearing analytics cache: {e}")
-
-    return deleted
+        return 0
 
 
 # =============================================================================
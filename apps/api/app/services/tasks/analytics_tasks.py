@@ -298,7 +298,8 @@ def _process_user_recaps(user_ids: List[str]) -> int:
 def refresh_analytics_views_task(self) -> Dict[str, Any]:
     """
     Refresh materialized views for analytics dashboards.
-    Runs hourly to keep analytics data fresh without impacting query performance.
+    Not scheduled (the dashboard RPC reads incremental aggregates, migration 043);
+    run manually when the analytics.* views need to be current.
 
     Views refreshed (in analytics schema - private, not exposed via API):
     - analytics.user_engagement_summary: User activity metrics
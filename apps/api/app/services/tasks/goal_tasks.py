@@ -46,7 +46,7 @@ def precreate_daily_checkins_task(self) -> Dict[str, Any]:
     Uses ON CONFLICT DO NOTHING to avoid duplicates.
     """
     from app.services.tasks.analytics_refresh_tasks import (
-        invalidate_user_analytics_cache,
+        invalidate_analytics_cache_bulk,
     )
 
     try:
@@ -91,14 +91,10 @@ def precreate_daily_checkins_task(self) -> Dict[str, Any]:
 
         # Invalidate analytics cache for each user/goal that got a new check-in
         # This ensures fresh data when they view analytics
-        invalidated_count = 0
-        for row in inserted_rows:
-            try:
-                invalidate_user_analytics_cache(row["out_user_id"], row["out_goal_id"])
-                invalidated_count += 1
-            except Exception:
-                # Don't fail the whole task if cache invalidation fails
-                pass
+        # (one pipelined INCR per goal generation, single round trip)
+        invalidated_count = invalidate_analytics_cache_bulk(
+            (row["out_user_id"], row["out_goal_id"]) for row in inserted_rows
+        )
 
         logger.info(
             f"Pre-created daily check-ins",
@@ -7,6 +7,8 @@ Server-driven Mode B:
 
 Implementation notes:
 - Fire-and-forget (best effort). Failures should not break core check-in flow.
+- Tasks run on the worker's persistent event loop (not asyncio.run), so the
+  APNs HTTP/2 connection in live_activity_service is reused across tasks.
 """
 
 from __future__ import annotations
@@ -18,6 +20,20 @@ from app.services.tasks.base import celery_app, logger
 from app.services.live_activity_service import refresh_live_activity_for_user
 
 
+def _run_async(coro):
+    """Helper to run async code in sync Celery task context."""
+    try:
+        loop = asyncio.get_event_loop()
+        if loop.is_closed():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+    return loop.run_until_complete(coro)
+
+
 @celery_app.task(
     name="refresh_live_activity_for_user",
     bind=True,
@@ -26,7 +42,7 @@ from app.services.live_activity_service import refresh_live_activity_for_user
 )
 def refresh_live_activity_for_user_task(self, user_id: str) -> Dict[str, Any]:
     try:
-        result = asyncio.run(refresh_live_activity_for_user(user_id))
+        result = _run_async(refresh_live_activity_for_user(user_id))
         return {"success": True, **result}
     except Exception as e:
         logger.warning(f"[LiveActivity] refresh failed for user {user_id}: {e}")
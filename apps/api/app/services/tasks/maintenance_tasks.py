@@ -1,5 +1,5 @@
 """
-Maintenance Celery tasks - cleanup and housekeeping.
+Maintenance Celery tasks - cleanup, housekeeping and derived data upkeep.
 """
 
 from datetime import datetime, timedelta, timezone
@@ -7,7 +7,9 @@ from datetime import datetime, timedelta, timezone
 from app.core.celery_app import celery_app
 from app.core.config import settings
 from app.core.database import get_supabase_client
+from app.core.user_activity import flush_user_activity
 from app.services.logger import logger
+from app.services.partner_match_index import refresh_dirty_vectors
 
 
 @celery_app.task(name="cleanup_task_audit_log")
@@ -50,3 +52,75 @@ def cleanup_task_audit_log_task() -> dict:
             "success": False,
             "error": str(e),
         }
+
+
+@celery_app.task(name="flush_user_activity")
+def flush_user_activity_task() -> dict:
+    """Write activity recorded in Redis to users.last_active_at in bulk.
+
+    The API only records activity in Redis (UserActivityStage); this applies
+    it with one bulk_touch_last_active call per batch.
+    Schedule: Every minute
+    """
+    try:
+        counts = flush_user_activity()
+
+        if counts["users"]:
+            logger.info("Flushed user activity", counts)
+
+        return {"success": True, **counts}
+
+    except Exception as e:
+        logger.error("Failed to flush user activity", {"error": str(e)})
+        return {
+            "success": False,
+            "error": str(e),
+        }
+
+
+@celery_app.task(name="refresh_partner_match_vectors")
+def refresh_partner_match_vectors_task() -> dict:
+    """Rebuild partner_match_vectors rows for users marked dirty.
+
+    Goal and profile triggers (migration 045) queue users in partner_match_dirty;
+    GET /partners/suggested ranks everyone from these vectors.
+    Schedule: Every minute
+    """
+    try:
+        counts = refresh_dirty_vectors()
+
+        if counts["claimed"]:
+            logger.info("Refreshed partner match vectors", counts)
+
+        return {"success": True, **counts}
+
+    except Exception as e:
+        logger.error("Failed to refresh partner match vectors", {"error": str(e)})
+        return {
+            "success": False,
+            "error": str(e),
+        }
+
+
+@celery_app.task(name="requeue_partner_match_vectors")
+def requeue_partner_match_vectors_task() -> dict:
+    """Queue every user for a partner match vector rebuild.
+
+    Keeps stored UTC offsets in step with DST changes.
+    Schedule: Weekly (Sunday 5am UTC)
+    """
+    try:
+        supabase = get_supabase_client()
+        result = supabase.rpc("mark_all_partner_match_dirty").execute()
+        queued = result.data or 0
+
+        logger.info("Queued partner match vector rebuild", {"queued": queued})
+
+        return {"success": True, "queued": queued}
+
+    except Exception as e:
+        logger.error("Failed to queue partner match vector rebuild", {"error": str(e)})
+        return {
+            "success": False,
+            "error": str(e),
+        }
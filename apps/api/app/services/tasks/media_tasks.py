@@ -1,12 +1,39 @@
 """
 Media Tasks
 
-Celery tasks for media file operations like R2 storage deletion.
+Celery tasks for media file operations: R2 storage deletion and processing
+of voice notes uploaded straight to R2.
 """
 
-from typing import Dict, Any
+from typing import Any, Dict, Optional
 from app.services.tasks.base import celery_app, logger
 
+# R2 prefixes holding one user's objects: media, voice notes stored before
+# content addressing and unprocessed direct uploads. Content-addressed voice
+# notes are released when the user's check-ins are deleted and removed by the
+# orphan sweep.
+USER_MEDIA_PREFIXES = (
+    "voice-notes/{user_id}/",
+    "media/{user_id}/",
+    "uploads/voice-notes/{user_id}/",
+)
+
+
+def _run_async(coro):
+    """Helper to run async code in sync Celery task context."""
+    import asyncio
+
+    try:
+        loop = asyncio.get_event_loop()
+        if loop.is_closed():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+    return loop.run_until_complete(coro)
+
 
 @celery_app.task(
     name="delete_media_from_r2",
@@ -22,6 +49,9 @@ def delete_media_from_r2_task(
     """
     Celery task to delete media file from Cloudflare R2 in the background.
 
+    Kept for messages already queued; new deletions go through
+    queue_r2_deletions (batched by flush_r2_deletions_task).
+
     Args:
         self: Celery task instance (for retry mechanism)
         file_path: The file path in R2 bucket (e.g., "media/user_id/filename.jpg")
@@ -31,19 +61,10 @@ def delete_media_from_r2_task(
         Dict with success status
     """
     from app.core.config import settings
+    from app.core.r2_client import get_r2_client
 
     try:
-        import boto3
-
-        s3_client = boto3.client(
-            "s3",
-            endpoint_url=settings.CLOUDFLARE_R2_ENDPOINT_URL,
-            aws_access_key_id=settings.CLOUDFLARE_R2_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.CLOUDFLARE_R2_SECRET_ACCESS_KEY,
-            region_name="auto",
-        )
-
-        s3_client.delete_object(
+        get_r2_client().delete_object(
             Bucket=settings.CLOUDFLARE_R2_BUCKET_NAME,
             Key=file_path,
         )
@@ -62,3 +83,253 @@ def delete_media_from_r2_task(
             raise self.retry(exc=e)
 
         return {"success": False, "error": str(e), "media_id": media_id}
+
+
+@celery_app.task(name="flush_r2_deletions")
+def flush_r2_deletions_task() -> Dict[str, Any]:
+    """
+    Delete the R2 keys queued in Redis, up to 1000 per DeleteObjects call.
+
+    Keys that fail are retried on the next run (see app/core/r2_deletions.py).
+    Schedule: Every minute
+    """
+    from app.core.r2_deletions import flush_r2_deletions
+
+    try:
+        counts = flush_r2_deletions()
+
+        if counts["keys"]:
+            logger.info("Flushed R2 deletions", counts)
+
+        return {"success": True, **counts}
+
+    except Exception as e:
+        logger.error("Failed to flush R2 deletions", {"error": str(e)})
+        return {"success": False, "error": str(e)}
+
+
+@celery_app.task(
+    name="purge_user_media",
+    bind=True,
+    max_retries=3,
+    default_retry_delay=60,
+)
+def purge_user_media_task(self, user_id: str) -> Dict[str, Any]:
+    """
+    Delete all of a deleted account's per-user R2 objects (voice notes, media).
+
+    Lists each of the user's prefixes and deletes it page by page with
+    DeleteObjects, instead of one task per file.
+    """
+    from app.core.r2_deletions import delete_r2_prefix
+
+    try:
+        totals = {"listed": 0, "deleted": 0, "failed": 0}
+        for prefix in USER_MEDIA_PREFIXES:
+            counts = delete_r2_prefix(prefix.format(user_id=user_id))
+            for name in totals:
+                totals[name] += counts[name]
+
+        logger.info("Purged user media from R2", {"user_id": user_id, **totals})
+
+        return {"success": True, "user_id": user_id, **totals}
+
+    except Exception as e:
+        logger.error(
+            "Failed to purge user media from R2",
+            {"user_id": user_id, "error": str(e), "retry": self.request.retries},
+        )
+
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+
+        return {"success": False, "user_id": user_id, "error": str(e)}
+
+
+# media_objects rows claimed per sweep_orphaned_media_objects call
+ORPHAN_SWEEP_BATCH_SIZE = 1000
+
+
+@celery_app.task(name="sweep_orphaned_media_objects")
+def sweep_orphaned_media_objects_task() -> Dict[str, Any]:
+    """
+    Delete content-addressed voice notes that nothing references anymore.
+
+    Claims media_objects rows with ref_count 0 untouched for
+    MEDIA_OBJECT_ORPHAN_GRACE_MINUTES (migration 050) and deletes their R2
+    objects in DeleteObjects batches; keys that fail go to the flush queue.
+    Schedule: Every hour
+    """
+    from app.core.config import settings
+    from app.core.database import get_supabase_client
+    from app.core.r2_deletions import delete_r2_objects, requeue_r2_deletions
+
+    try:
+        supabase = get_supabase_client()
+        claimed = 0
+        failed = 0
+
+        while True:
+            result = supabase.rpc(
+                "sweep_orphaned_media_objects",
+                {
+                    "p_grace_minutes": settings.MEDIA_OBJECT_ORPHAN_GRACE_MINUTES,
+                    "p_limit": ORPHAN_SWEEP_BATCH_SIZE,
+                },
+            ).execute()
+            rows = result.data or []
+            claimed += len(rows)
+
+            keys = [row["r2_key"] for row in rows if row.get("r2_key")]
+            if keys:
+                failures = delete_r2_objects(keys)
+                requeue_r2_deletions(failures)
+                failed += len(failures)
+
+            if len(rows) < ORPHAN_SWEEP_BATCH_SIZE:
+                break
+
+        if claimed:
+            logger.info(
+                "Swept orphaned media objects", {"claimed": claimed, "requeued": failed}
+            )
+
+        return {"success": True, "claimed": claimed, "requeued": failed}
+
+    except Exception as e:
+        logger.error("Failed to sweep orphaned media objects", {"error": str(e)})
+        return {"success": False, "error": str(e)}
+
+
+def _finish_staged_voice_note(
+    supabase, checkin_id: str, r2_key: str, failed: bool
+) -> None:
+    """Delete the staged upload; on failure also mark the check-in failed."""
+    from app.core.r2_deletions import delete_r2_objects, requeue_r2_deletions
+
+    if failed:
+        supabase.table("check_ins").update({"voice_note_status": "failed"}).eq(
+            "id", checkin_id
+        ).eq("voice_note_status", "processing").execute()
+
+    try:
+        requeue_r2_deletions(delete_r2_objects([r2_key]))
+    except Exception as e:
+        # sweep_voice_note_uploads deletes it later
+        logger.warning(
+            "Failed to delete staged voice note", {"r2_key": r2_key, "error": str(e)}
+        )
+
+
+@celery_app.task(
+    name="process_voice_note_upload",
+    bind=True,
+    max_retries=3,
+    default_retry_delay=30,
+)
+def process_voice_note_upload_task(
+    self,
+    user_id: str,
+    checkin_id: str,
+    r2_key: str,
+    content_type: str,
+    duration: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Process a voice note the app uploaded straight to R2 (POST
+    /media/voice-note/complete): duration probe, validation, Whisper,
+    sentiment and the check-in update, as POST /media/upload does.
+
+    The check-in row change (voice_note_status 'ready' or 'failed') is what
+    the app receives over realtime. Rejected files fail at once; other errors
+    are retried first. The staged object is deleted either way.
+    """
+    from fastapi import HTTPException
+
+    from app.api.v1.endpoints.media import (
+        _queue_ai_response_on_vn_failure,
+        process_staged_voice_note,
+    )
+    from app.core.database import get_supabase_client
+
+    supabase = get_supabase_client()
+
+    try:
+        result = _run_async(
+            process_staged_voice_note(
+                user_id=user_id,
+                checkin_id=checkin_id,
+                r2_key=r2_key,
+                content_type=content_type,
+                duration=duration,
+            )
+        )
+        _finish_staged_voice_note(supabase, checkin_id, r2_key, failed=False)
+
+        logger.info(
+            "Processed voice note upload",
+            {"checkin_id": checkin_id, "url": result.url},
+        )
+
+        return {"success": True, "checkin_id": checkin_id, "url": result.url}
+
+    except HTTPException as e:
+        # Rejected (validation, limits, check-in gone); AI fallback already queued
+        _finish_staged_voice_note(supabase, checkin_id, r2_key, failed=True)
+
+        logger.warning(
+            "Voice note upload rejected",
+            {"checkin_id": checkin_id, "status": e.status_code, "error": e.detail},
+        )
+
+        return {"success": False, "checkin_id": checkin_id, "error": e.detail}
+
+    except Exception as e:
+        logger.error(
+            "Failed to process voice note upload",
+            {"checkin_id": checkin_id, "error": str(e), "retry": self.request.retries},
+        )
+
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+
+        _finish_staged_voice_note(supabase, checkin_id, r2_key, failed=True)
+        checkin = (
+            supabase.table("check_ins")
+            .select("goal_id")
+            .eq("id", checkin_id)
+            .maybe_single()
+            .execute()
+        )
+        if checkin is not None and checkin.data:
+            _run_async(
+                _queue_ai_response_on_vn_failure(
+                    supabase, user_id, checkin_id, checkin.data.get("goal_id")
+                )
+            )
+
+        return {"success": False, "checkin_id": checkin_id, "error": str(e)}
+
+
+@celery_app.task(name="sweep_voice_note_uploads")
+def sweep_voice_note_uploads_task() -> Dict[str, Any]:
+    """
+    Clean up direct voice note uploads that never finished: delete staged
+    objects older than VOICE_NOTE_STAGING_MAX_AGE_HOURS and mark check-ins
+    processing for over VOICE_NOTE_PROCESSING_TIMEOUT_MINUTES as failed.
+    Schedule: Every hour
+    """
+    from app.core.database import get_supabase_client
+    from app.services.voice_note_uploads import sweep_voice_note_uploads
+
+    try:
+        counts = sweep_voice_note_uploads(get_supabase_client())
+
+        if any(counts.values()):
+            logger.info("Swept voice note uploads", counts)
+
+        return {"success": True, **counts}
+
+    except Exception as e:
+        logger.error("Failed to sweep voice note uploads", {"error": str(e)})
+        return {"success": False, "error": str(e)}
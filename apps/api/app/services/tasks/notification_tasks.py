@@ -2,14 +2,15 @@
 FitNudge V2 - Notification Tasks
 
 Celery tasks for sending push notifications:
-- AI-generated motivations at reminder times (goals only)
+- AI-generated motivations at reminder times (goals only), with the copy
+  pre-generated 10-30 minutes ahead
 - Re-engagement notifications for inactive users
 - Check-in prompts after last reminder
 
 """
 
 import random
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.services.tasks.base import (
     celery_app,
     get_supabase_client,
@@ -21,6 +22,9 @@ from app.services.tasks.base import (
 # Constants (defaults when goal has no value - e.g. legacy rows)
 DEFAULT_CHECKIN_PROMPT_DELAY_MINUTES = 30
 
+# Pushes per send_push_to_users_bulk_sync call in the AI motivation tick
+AI_MOTIVATION_DISPATCH_BATCH_SIZE = 500
+
 
 def is_today_a_work_day(
     frequency_type: str, target_days: list, user_today_weekday: int
@@ -82,6 +86,302 @@ def calculate_day_number(created_at_str: str, user_today) -> int:
         return 1
 
 
+def _reminder_skip_reason(
+    goal: Dict[str, Any],
+    user_prefs: Dict[str, Any],
+    local_date,
+    slot_time: str,
+) -> Optional[str]:
+    """
+    Why a goal's reminder slot on local_date gets no AI motivation, or None if it does.
+    Shared by the minute tick and pre-generation so both agree on who is sent one.
+    """
+    # ✅ Check if the day is a work day (V2: frequency_type, target_days)
+    if not is_today_a_work_day(
+        goal.get("frequency_type", "daily"),
+        goal.get("target_days") or [],
+        local_date.weekday(),
+    ):
+        return "not_work_day"
+
+    # ✅ Check notification preferences
+    if not user_prefs.get("enabled", True) or not user_prefs.get(
+        "ai_motivation", True
+    ):
+        return "notifications_disabled"
+
+    # Check quiet hours
+    if user_prefs.get("quiet_hours_enabled", False):
+        quiet_start = user_prefs.get("quiet_hours_start", "22:00")
+        quiet_end = user_prefs.get("quiet_hours_end", "08:00")
+        if is_in_quiet_hours(slot_time, quiet_start, quiet_end):
+            return "quiet_hours"
+
+    return None
+
+
+def _push_user_context(
+    goal: Dict[str, Any],
+    user_name: str,
+    local_now,
+    goal_checkins: list,
+) -> Dict[str, Any]:
+    """User context for generate_push_notification_ai at the user's local time local_now."""
+    from datetime import datetime, timedelta
+
+    local_date = local_now.date()
+
+    # Calculate recent progress (last 7 days)
+    # V2.1: Use status instead of completed (status = 'completed' means done)
+    seven_days_ago = local_date - timedelta(days=7)
+    recent_completed = len(
+        [
+            c
+            for c in goal_checkins
+            if c.get("status") == "completed"
+            and datetime.fromisoformat(c["check_in_date"]).date() >= seven_days_ago
+        ]
+    )
+
+    return {
+        # Use streak from goals table
+        "current_streak": goal.get("current_streak", 0),
+        "recent_completed": recent_completed,
+        "recent_total": 7,
+        "time_of_day": (
+            "morning"
+            if local_now.hour < 12
+            else "afternoon" if local_now.hour < 17 else "evening"
+        ),
+        "user_name": user_name,
+        # Days since goal creation
+        "day_number": calculate_day_number(goal.get("created_at"), local_date),
+        "why_statement": goal.get("why_statement"),
+    }
+
+
+def _fetch_recent_checkins(supabase, goal_ids: list) -> Dict[str, list]:
+    """Last week's check-ins per goal, for _push_user_context's recent_completed."""
+    from datetime import datetime, timedelta
+
+    checkins_by_goal: Dict[str, list] = {}
+    if not goal_ids:
+        return checkins_by_goal
+
+    # One extra day covers users whose local date is behind UTC
+    recent_since = (datetime.utcnow().date() - timedelta(days=8)).isoformat()
+    result = (
+        supabase.table("check_ins")
+        .select("goal_id, check_in_date, status")
+        .in_("goal_id", goal_ids)
+        .gte("check_in_date", recent_since)
+        .execute()
+    )
+    for checkin in result.data or []:
+        checkins_by_goal.setdefault(checkin["goal_id"], []).append(checkin)
+    return checkins_by_goal
+
+
+def _fetch_reminder_rows(supabase, goal_ids: list, user_ids: list):
+    """Active goals, active users and notification prefs for a batch of reminder slots."""
+    goals_result = (
+        supabase.table("goals")
+        .select(
+            "id, user_id, title, frequency_type, target_days, created_at, "
+            "status, current_streak, why_statement"
+        )
+        .eq("status", "active")
+        .in_("id", goal_ids)
+        .execute()
+    )
+
+    users_result = (
+        supabase.table("users")
+        .select("id, name, timezone, status, motivation_style")
+        .in_("id", user_ids)
+        .eq("status", "active")
+        .execute()
+    )
+
+    prefs_result = (
+        supabase.table("notification_preferences")
+        .select(
+            "user_id, enabled, ai_motivation, quiet_hours_enabled, "
+            "quiet_hours_start, quiet_hours_end"
+        )
+        .in_("user_id", user_ids)
+        .execute()
+    )
+
+    goals_by_id = {g["id"]: g for g in goals_result.data or []}
+    users_by_id = {u["id"]: u for u in users_result.data or []}
+    prefs_by_user = {p["user_id"]: p for p in prefs_result.data or []}
+    return goals_by_id, users_by_id, prefs_by_user
+
+
+# pregenerate_ai_motivations stops starting OpenAI calls after this long, well
+# inside the 150s soft time limit; slots it didn't reach are picked up by the
+# next run (every 5 minutes) or get template copy at send time
+PREGEN_TIME_BUDGET_SECONDS = 100
+
+
+@celery_app.task(
+    name="pregenerate_ai_motivations",
+    bind=True,
+    max_retries=0,
+)
+def pregenerate_ai_motivations_task(self) -> Dict[str, Any]:
+    """
+    Generate AI push copy for reminder slots due in the next 10-30 minutes.
+
+    Runs every 5 minutes, so each slot is tried several times before it is due;
+    slots that already have copy are skipped. Copy is stored per (goal, slot,
+    local date) with store_push_copies(); send_scheduled_ai_motivations only
+    looks it up. OpenAI calls run on AI_PUSH_PREGEN_CONCURRENCY threads.
+
+    Slots the tick would skip (not a work day, AI motivations off, quiet hours)
+    are not generated. A failed generation stores nothing, so the next run
+    retries it.
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from datetime import datetime, timedelta
+    from app.core.config import settings
+    from app.services.push_motivation_generator import (
+        generate_push_notification_ai,
+        get_push_copies,
+        push_copy_key,
+        store_push_copies,
+    )
+    import pytz
+
+    try:
+        supabase = get_supabase_client()
+        deadline = time.monotonic() + PREGEN_TIME_BUDGET_SECONDS
+
+        slots = (
+            supabase.rpc(
+                "get_upcoming_reminder_slots",
+                {
+                    "p_min_lead_minutes": settings.AI_PUSH_PREGEN_MIN_LEAD_MINUTES,
+                    "p_max_lead_minutes": settings.AI_PUSH_PREGEN_MAX_LEAD_MINUTES,
+                },
+            )
+            .execute()
+            .data
+            or []
+        )
+        if not slots:
+            return {"success": True, "generated": 0, "details": "No upcoming reminders"}
+
+        # Key each slot by the user's local date at the slot, not now
+        now_utc = datetime.now(pytz.utc)
+        upcoming = []
+        for slot in sorted(slots, key=lambda s: s["minutes_until"]):
+            try:
+                tz = pytz.timezone(slot.get("timezone") or "UTC")
+            except pytz.exceptions.UnknownTimeZoneError:
+                continue
+            local_due = (now_utc + timedelta(minutes=slot["minutes_until"])).astimezone(
+                tz
+            )
+            key = push_copy_key(
+                slot["goal_id"], slot["slot_time"], local_due.date().isoformat()
+            )
+            upcoming.append((key, slot, local_due))
+
+        existing = get_push_copies([key for key, _, _ in upcoming])
+        upcoming = [u for u in upcoming if u[0] not in existing]
+        if not upcoming:
+            return {"success": True, "generated": 0, "already_generated": len(existing)}
+
+        goal_ids = list({slot["goal_id"] for _, slot, _ in upcoming})
+        user_ids = list({slot["user_id"] for _, slot, _ in upcoming})
+        goals_by_id, users_by_id, prefs_by_user = _fetch_reminder_rows(
+            supabase, goal_ids, user_ids
+        )
+
+        checkins_by_goal = _fetch_recent_checkins(supabase, list(goals_by_id))
+
+        jobs = []
+        skipped = 0
+        for key, slot, local_due in upcoming:
+            goal = goals_by_id.get(slot["goal_id"])
+            user_info = users_by_id.get(slot["user_id"])
+            if not goal or not user_info:
+                skipped += 1
+                continue
+            if _reminder_skip_reason(
+                goal,
+                prefs_by_user.get(slot["user_id"], {}),
+                local_due.date(),
+                slot["slot_time"],
+            ):
+                skipped += 1
+                continue
+
+            jobs.append(
+                (
+                    key,
+                    goal["title"],
+                    _push_user_context(
+                        goal,
+                        user_info.get("name") or "Champion",
+                        local_due,
+                        checkins_by_goal.get(goal["id"], []),
+                    ),
+                    user_info.get("motivation_style", "supportive"),
+                )
+            )
+
+        def generate(job):
+            key, goal_title, user_context, motivation_style = job
+            if time.monotonic() > deadline:
+                return key, None
+            return key, generate_push_notification_ai(
+                goal_title=goal_title,
+                user_context=user_context,
+                motivation_style=motivation_style,
+                item_type="goal",
+                fallback=False,
+            )
+
+        copies = {}
+        if jobs:
+            with ThreadPoolExecutor(
+                max_workers=max(1, settings.AI_PUSH_PREGEN_CONCURRENCY)
+            ) as pool:
+                for key, copy in pool.map(generate, jobs):
+                    if copy:
+                        copies[key] = copy
+        store_push_copies(copies)
+
+        logger.info(
+            f"[AI MOTIVATIONS] Pre-generated {len(copies)}/{len(jobs)} push copies",
+            {
+                "generated": len(copies),
+                "attempted": len(jobs),
+                "already_generated": len(existing),
+                "skipped": skipped,
+            },
+        )
+
+        return {
+            "success": True,
+            "generated": len(copies),
+            "failed": len(jobs) - len(copies),
+            "already_generated": len(existing),
+            "skipped": skipped,
+        }
+
+    except Exception as e:
+        logger.error(
+            "Failed to pre-generate AI motivations",
+            {"error": str(e)},
+        )
+        return {"success": False, "error": str(e)}
+
+
 @celery_app.task(
     name="send_scheduled_ai_motivations",
     bind=True,
@@ -94,11 +394,20 @@ def send_scheduled_ai_motivations_task(self) -> Dict[str, Any]:
     Runs every minute to check if any user has a reminder scheduled for current time.
 
     MULTIPLE REMINDER TIMES: When a goal has multiple reminder_times (e.g. 08:00, 12:00, 18:00),
-    a motivation is sent at EACH of those times. times_to_match includes all reminder times
-    plus optional "before" times (reminder_window_before_minutes), so the user gets a nudge
-    at every configured slot.
+    a motivation is sent at EACH of those times, plus optional "before" times
+    (reminder_window_before_minutes), so the user gets a nudge at every configured slot.
+
+    DUE-MINUTE INDEX: Slots are precomputed in goal_reminder_slots (migration 040) with the
+    UTC minute they fall on, maintained by triggers on goals/users and re-synced for DST.
+    get_due_reminder_slots() returns only the slots due this minute, so each tick reads
+    the goals/users/prefs for those reminders only - cost scales with reminders
+    due, not with total users.
+
+    PRE-GENERATED COPY: The AI copy is written ahead of time by pregenerate_ai_motivations.
+    This tick makes no OpenAI calls: it reads all copies in one lookup and uses template
+    copy (_get_fallback_notification) for slots that have none.
 
-    TIMEZONE-AWARE: Checks user's local time against their reminder_times.
+    TIMEZONE-AWARE: The user's local time is still re-checked against the slot before sending.
 
     Features:
     - Only handles goals
@@ -107,9 +416,13 @@ def send_scheduled_ai_motivations_task(self) -> Dict[str, Any]:
     - Calculates actual day number (not always day 1!)
     - Only processes active users
     """
-    from datetime import datetime, timedelta
-    from app.services.expo_push_service import send_push_to_user_sync
-    from app.services.push_motivation_generator import generate_push_notification_ai
+    from datetime import datetime
+    from app.services.expo_push_service import send_push_to_users_bulk_sync
+    from app.services.push_motivation_generator import (
+        _get_fallback_notification,
+        get_push_copies,
+        push_copy_key,
+    )
     import pytz
 
     try:
@@ -124,106 +437,47 @@ def send_scheduled_ai_motivations_task(self) -> Dict[str, Any]:
             "notifications_disabled": 0,
             "quiet_hours": 0,
             "no_push_token": 0,
+            "dispatch_failed": 0,
         }
 
         # ============================================================
-        # STEP 1: Get active users with motivation_style
+        # STEP 1: Get reminder slots due in the current UTC minute
         # ============================================================
-        try:
-            active_users_result = (
-                supabase.table("users")
-                .select("id, name, timezone, status, motivation_style")
-                .eq("status", "active")
-                .not_.is_("onboarding_completed_at", "null")  # Only onboarded users
-                .execute()
-            )
-        except Exception:
-            # Fallback if status filter fails
-            active_users_result = (
-                supabase.table("users")
-                .select("id, name, timezone, motivation_style, onboarding_completed_at")
-                .not_.is_("onboarding_completed_at", "null")  # Only onboarded users
-                .execute()
-            )
-
-        if not active_users_result.data:
+        # One instant for the RPC and every user's local time, so the stale-slot
+        # guard below can't disagree with the slot lookup (minute boundary, clock skew)
+        now_utc = datetime.now(pytz.utc)
+        due_slots_result = supabase.rpc(
+            "get_due_reminder_slots", {"p_now": now_utc.isoformat()}
+        ).execute()
+        due_slots = due_slots_result.data or []
+
+        if not due_slots:
             return {
                 "success": True,
                 "sent": 0,
                 "skipped": 0,
-                "details": "No users found",
+                "details": "No reminders due",
             }
 
-        active_user_ids = [u["id"] for u in active_users_result.data]
-        users_by_id = {u["id"]: u for u in active_users_result.data}
+        slot_by_goal = {s["goal_id"]: s["slot_time"] for s in due_slots}
+        due_goal_ids = list(slot_by_goal.keys())
+        due_user_ids = list({s["user_id"] for s in due_slots})
 
         # ============================================================
-        # STEP 2: Get active goals with reminder times
+        # STEP 2: Get the due goals, their users and notification preferences
         # ============================================================
-        active_goals_result = (
-            supabase.table("goals")
-            .select(
-                "id, user_id, title, reminder_times, reminder_window_before_minutes, "
-                "frequency_type, target_days, created_at, status, current_streak, why_statement"
-            )
-            .eq("status", "active")
-            .in_("user_id", active_user_ids)
-            .execute()
+        goals_by_id, users_by_id, prefs_by_user = _fetch_reminder_rows(
+            supabase, due_goal_ids, due_user_ids
         )
 
         # ============================================================
-        # STEP 3: Pre-fetch check-ins for streak calculation (batch query)
+        # STEP 3: Process each due goal (pushes are queued, sent in bulk below)
         # ============================================================
-        # V2.1: Select status instead of completed for check-in state
-        all_checkins_result = (
-            supabase.table("check_ins")
-            .select("user_id, goal_id, check_in_date, status")
-            .in_("user_id", active_user_ids)
-            .order("check_in_date", desc=True)
-            .execute()
-        )
-
-        # Organize check-ins by goal_id for fast lookup
-        checkins_by_goal = {}
-        for checkin in all_checkins_result.data or []:
-            goal_id = checkin["goal_id"]
-            if goal_id not in checkins_by_goal:
-                checkins_by_goal[goal_id] = []
-            checkins_by_goal[goal_id].append(checkin)
-
-        # ============================================================
-        # STEP 4: Pre-fetch notification preferences
-        # ============================================================
-        prefs_result = (
-            supabase.table("notification_preferences")
-            .select(
-                "user_id, enabled, ai_motivation, quiet_hours_enabled, "
-                "quiet_hours_start, quiet_hours_end"
-            )
-            .in_("user_id", active_user_ids)
-            .execute()
-        )
-
-        prefs_by_user = {}
-        for pref in prefs_result.data or []:
-            prefs_by_user[pref["user_id"]] = pref
-
-        # ============================================================
-        # STEP 5: Process each goal
-        # ============================================================
-        for goal in active_goals_result.data or []:
-            if goal.get("status") != "active":
-                continue
+        queued = []
 
+        for goal in goals_by_id.values():
             goal_id = goal["id"]
             user_id = goal["user_id"]
-            goal_title = goal["title"]
-            reminder_times = goal.get("reminder_times") or []
-            frequency_type = goal.get("frequency_type", "daily")
-            target_days = goal.get("target_days") or []
-
-            if not reminder_times or not isinstance(reminder_times, list):
-                continue
 
             # Get user info
             user_info = users_by_id.get(user_id)
@@ -236,159 +490,139 @@ def send_scheduled_ai_motivations_task(self) -> Dict[str, Any]:
             user_name = user_info.get("name") or "Champion"
 
             try:
-                # Get current time in user's timezone
+                # Tick time in user's timezone
                 user_tz = pytz.timezone(user_timezone_str)
-                user_now = datetime.now(user_tz)
+                user_now = now_utc.astimezone(user_tz)
                 user_today = user_now.date()
                 current_time = user_now.strftime("%H:%M")
 
-                # ✅ Check if current time matches any reminder time OR (reminder - before_minutes)
-                # Normalize reminder times (HH:MM:SS -> HH:MM) for comparison
-                normalized_reminders = [
-                    t[:5] if len(t) >= 5 else t for t in reminder_times
-                ]
-                before_min = goal.get("reminder_window_before_minutes") or 30
-                if before_min < 0:
-                    before_min = 0
-
-                # Build set of times we should send at: exact + optional "before" times
-                times_to_match = set(normalized_reminders)
-                if before_min > 0:
-                    from datetime import time as dt_time, timedelta
-                    for rt in normalized_reminders:
-                        try:
-                            h, m = map(int, rt.split(":"))
-                            t = dt_time(h, m)
-                            td = timedelta(minutes=before_min)
-                            # Combine date + time, subtract, extract time
-                            before_dt = datetime.combine(user_today, t) - td
-                            before_str = before_dt.strftime("%H:%M")
-                            times_to_match.add(before_str)
-                        except (ValueError, IndexError):
-                            pass
-
-                if current_time not in times_to_match:
-                    continue
-
-                # ✅ Check if today is a work day (V2: frequency_type, target_days)
-                if not is_today_a_work_day(
-                    frequency_type, target_days, user_today.weekday()
-                ):
-                    skipped_reasons["not_work_day"] += 1
+                # ✅ Guard against a stale slot (e.g. timezone changed mid-tick)
+                if current_time != slot_by_goal.get(goal_id):
+                    skipped_reasons["no_reminder_match"] += 1
                     skipped_count += 1
                     continue
 
-                # ✅ Check notification preferences
-                user_prefs = prefs_by_user.get(user_id, {})
-                if not user_prefs.get("enabled", True) or not user_prefs.get(
-                    "ai_motivation", True
-                ):
-                    skipped_reasons["notifications_disabled"] += 1
+                skip_reason = _reminder_skip_reason(
+                    goal, prefs_by_user.get(user_id, {}), user_today, current_time
+                )
+                if skip_reason:
+                    skipped_reasons[skip_reason] += 1
                     skipped_count += 1
                     continue
 
-                # Check quiet hours
-                if user_prefs.get("quiet_hours_enabled", False):
-                    quiet_start = user_prefs.get("quiet_hours_start", "22:00")
-                    quiet_end = user_prefs.get("quiet_hours_end", "08:00")
-
-                    if is_in_quiet_hours(current_time, quiet_start, quiet_end):
-                        skipped_reasons["quiet_hours"] += 1
-                        skipped_count += 1
-                        continue
+                queued.append(
+                    {
+                        "goal": goal,
+                        "user_info": user_info,
+                        "user_now": user_now,
+                        "user_timezone": user_timezone_str,
+                        "user_name": user_name,
+                        "copy_key": push_copy_key(
+                            goal_id, current_time, user_today.isoformat()
+                        ),
+                    }
+                )
 
-                # ============================================================
-                # Generate and send push notification
-                # ============================================================
-
-                # Use streak from goals table
-                current_streak = goal.get("current_streak", 0)
-
-                # Calculate day number (days since goal creation)
-                day_number = calculate_day_number(goal.get("created_at"), user_today)
-
-                # Calculate recent progress (last 7 days)
-                # V2.1: Use status instead of completed (status = 'completed' means done)
-                goal_checkins = checkins_by_goal.get(goal_id, [])
-                seven_days_ago = user_today - timedelta(days=7)
-                recent_checkins = [
-                    c
-                    for c in goal_checkins
-                    if datetime.fromisoformat(c["check_in_date"]).date()
-                    >= seven_days_ago
-                ]
-                recent_completed = len(
-                    [c for c in recent_checkins if c.get("status") == "completed"]
+            except pytz.exceptions.UnknownTimeZoneError:
+                logger.error(
+                    f"Invalid timezone for user {user_id}: {user_timezone_str}",
+                    {"user_id": user_id, "timezone": user_timezone_str},
+                )
+                continue
+            except Exception as e:
+                logger.error(
+                    f"Failed to process goal {goal_id}",
+                    {"goal_id": goal_id, "user_id": user_id, "error": str(e)},
                 )
+                continue
 
-                # Get user's motivation style
-                motivation_style = user_info.get("motivation_style", "supportive")
-
-                # Build user context for AI
-                why_statement = goal.get("why_statement")
-                user_context = {
-                    "current_streak": current_streak,
-                    "recent_completed": recent_completed,
-                    "recent_total": 7,
-                    "time_of_day": (
-                        "morning"
-                        if user_now.hour < 12
-                        else "afternoon" if user_now.hour < 17 else "evening"
-                    ),
-                    "user_name": user_name,
-                    "day_number": day_number,
-                    "why_statement": why_statement,
-                }
+        # ============================================================
+        # STEP 4: Look up pre-generated copy (one read), template for misses
+        # ============================================================
+        copies = get_push_copies([item["copy_key"] for item in queued])
+        missing_goal_ids = [
+            item["goal"]["id"]
+            for item in queued
+            if not (copies.get(item["copy_key"]) or {}).get("title")
+        ]
+        # Template copy gets the same recent progress the AI copy would have
+        fallback_checkins = _fetch_recent_checkins(supabase, missing_goal_ids)
+        fallback_count = 0
+        pending_pushes = []
+
+        for item in queued:
+            goal = item["goal"]
+            goal_id = goal["id"]
 
-                # Generate push notification
-                push_content = generate_push_notification_ai(
-                    goal_title=goal_title,
-                    user_context=user_context,
-                    motivation_style=motivation_style,
-                    item_type="goal",
+            push_content = copies.get(item["copy_key"])
+            if not push_content or not push_content.get("title"):
+                fallback_count += 1
+                push_content = _get_fallback_notification(
+                    goal["title"],
+                    _push_user_context(
+                        goal,
+                        item["user_name"],
+                        item["user_now"],
+                        fallback_checkins.get(goal_id, []),
+                    ),
+                    item["user_info"].get("motivation_style", "supportive"),
                 )
 
-                # Deep link for Expo Router
-                deep_link = f"/(user)/(goals)/details?id={goal_id}"
+            # Deep link for Expo Router
+            deep_link = f"/(user)/(goals)/details?id={goal_id}"
 
-                # Use sync version for Celery consistency
-                notification_result = send_push_to_user_sync(
-                    user_id=user_id,
-                    title=push_content["title"],
-                    body=push_content["body"],
-                    data={
+            pending_pushes.append(
+                {
+                    "user_id": goal["user_id"],
+                    "title": push_content["title"],
+                    "body": push_content["body"],
+                    "data": {
                         "type": "ai_motivation",
                         "itemType": "goal",
                         "itemId": goal_id,
                         "deepLink": deep_link,
                     },
-                    notification_type="ai_motivation",
-                    entity_type="goal",
-                    entity_id=goal_id,
+                    "notification_type": "ai_motivation",
+                    "entity_type": "goal",
+                    "entity_id": goal_id,
+                    "user_timezone": item["user_timezone"],
+                }
+            )
+
+        # ============================================================
+        # STEP 5: Dispatch all queued pushes in one bulk pass
+        # ============================================================
+        # A failed batch is logged and dropped, not retried: retrying the task
+        # would resend the batches (and history rows) that already went out
+        for start in range(0, len(pending_pushes), AI_MOTIVATION_DISPATCH_BATCH_SIZE):
+            batch = pending_pushes[start : start + AI_MOTIVATION_DISPATCH_BATCH_SIZE]
+            try:
+                batch_results = send_push_to_users_bulk_sync(batch)
+            except Exception as e:
+                logger.error(
+                    f"[AI MOTIVATIONS] Failed to dispatch {len(batch)} pushes",
+                    {"batch_start": start, "batch_size": len(batch), "error": str(e)},
                 )
+                skipped_reasons["dispatch_failed"] += len(batch)
+                skipped_count += len(batch)
+                continue
 
+            for notification_result in batch_results:
                 if notification_result.get("notification_id"):
                     sent_count += 1
                 else:
                     skipped_reasons["no_push_token"] += 1
                     skipped_count += 1
 
-            except pytz.exceptions.UnknownTimeZoneError:
-                logger.error(
-                    f"Invalid timezone for user {user_id}: {user_timezone_str}",
-                    {"user_id": user_id, "timezone": user_timezone_str},
-                )
-                continue
-            except Exception as e:
-                logger.error(
-                    f"Failed to process goal {goal_id}",
-                    {"goal_id": goal_id, "user_id": user_id, "error": str(e)},
-                )
-                continue
-
         logger.info(
-            f"[AI MOTIVATIONS] Sent: {sent_count}, Skipped: {skipped_count}",
-            {"sent": sent_count, "skipped": skipped_count, "reasons": skipped_reasons},
+            f"[AI MOTIVATIONS] Sent: {sent_count}, Skipped: {skipped_count}, "
+            f"Template copy: {fallback_count}",
+            {
+                "sent": sent_count,
+                "skipped": skipped_count,
+                "reasons": skipped_reasons,
+                "template_copy": fallback_count,
+            },
         )
 
         return {
@@ -396,6 +630,7 @@ def send_scheduled_ai_motivations_task(self) -> Dict[str, Any]:
             "sent": sent_count,
             "skipped": skipped_count,
             "skip_reasons": skipped_reasons,
+            "template_copy": fallback_count,
         }
 
     except Exception as e:
@@ -455,10 +690,10 @@ def send_reengagement_notifications_task(self) -> Dict[str, Any]:
     - Uses users.last_active_at (updated by API middleware on any authenticated request).
     - Sends only if last_active_at is older than 7 days (or null and onboarding was 7+ days ago).
     - Preference check (enabled, push_notifications, reengagement, quiet hours) is done inside
-      send_push_to_user_sync via should_send_notification when skip_preference_check=False.
+      send_push_to_users_bulk_sync (same rules as should_send_notification).
     """
     from datetime import datetime, timedelta, timezone
-    from app.services.expo_push_service import send_push_to_user_sync
+    from app.services.expo_push_service import send_push_to_users_bulk_sync
 
     try:
         supabase = get_supabase_client()
@@ -512,44 +747,37 @@ def send_reengagement_notifications_task(self) -> Dict[str, Any]:
         if not inactive_users:
             return {"success": True, "sent": 0, "skipped": 0}
 
-        # send_push_to_user_sync (with skip_preference_check=False) runs
-        # should_send_notification(user_id, "reengagement") which checks
-        # enabled, push_notifications, reengagement, and quiet hours. No need to check prefs here.
+        # send_push_to_users_bulk_sync (skip_preference_check=False) applies
+        # enabled, push_notifications, reengagement, and quiet hours per user from
+        # one batched preferences query. No need to check prefs here.
+        pending_pushes = []
         for user_info in inactive_users:
-            user_id = user_info["id"]
-            try:
-                user_name = user_info.get("name", "Champion")
-                msg = random.choice(REENGAGEMENT_MESSAGES)
-                title = msg["title"].format(user_name=user_name)
-                body = msg["body"].format(user_name=user_name)
-
-                notification_result = send_push_to_user_sync(
-                    user_id=user_id,
-                    title=title,
-                    body=body,
-                    data={
+            user_name = user_info.get("name", "Champion")
+            msg = random.choice(REENGAGEMENT_MESSAGES)
+            pending_pushes.append(
+                {
+                    "user_id": user_info["id"],
+                    "title": msg["title"].format(user_name=user_name),
+                    "body": msg["body"].format(user_name=user_name),
+                    "data": {
                         "type": "reengagement",
                         "deepLink": "/(user)/(tabs)",
                     },
-                    notification_type="reengagement",
-                    save_to_notification_history=False,
-                )
-
-                if notification_result.get("skipped"):
-                    skipped_count += 1
-                    skipped_reasons["prefs_disabled"] += 1
-                else:
-                    sent_count += 1
-                    logger.info(
-                        f"Sent re-engagement to user {user_id} (app inactive 7+ days)"
-                    )
+                    "notification_type": "reengagement",
+                    "save_to_notification_history": False,
+                }
+            )
 
-            except Exception as e:
-                logger.warning(
-                    f"Failed to process re-engagement for user {user_id}",
-                    {"error": str(e), "user_id": user_id},
+        results = send_push_to_users_bulk_sync(pending_pushes)
+        for user_info, notification_result in zip(inactive_users, results):
+            if notification_result.get("skipped"):
+                skipped_count += 1
+                skipped_reasons["prefs_disabled"] += 1
+            elif notification_result.get("success"):
+                sent_count += 1
+                logger.info(
+                    f"Sent re-engagement to user {user_info['id']} (app inactive 7+ days)"
                 )
-                continue
 
         return {
             "success": True,
@@ -592,10 +820,11 @@ def send_checkin_prompts_task(self) -> Dict[str, Any]:
        - Check if prompt already sent today -> skip
        - Otherwise, send "How did it go?" notification
 
-    SCALABILITY: Uses batch prefetching to avoid N+1 queries.
+    SCALABILITY: Uses batch prefetching to avoid N+1 queries, and sends all due
+    prompts in one send_push_to_users_bulk_sync pass.
     """
     from datetime import datetime, timedelta, time as dt_time
-    from app.services.expo_push_service import send_push_to_user_sync
+    from app.services.expo_push_service import send_push_to_users_bulk_sync
     import pytz
 
     try:
@@ -679,6 +908,8 @@ def send_checkin_prompts_task(self) -> Dict[str, Any]:
                     prompts_by_goal_user[key] = []
                 prompts_by_goal_user[key].append(p.get("created_at"))
 
+        pending_pushes = []
+
         for goal in goals:
             goal_id = goal["id"]
             user_id = goal["user_id"]
@@ -764,48 +995,28 @@ def send_checkin_prompts_task(self) -> Dict[str, Any]:
                     skipped_already_prompted += 1
                     continue
 
-                # ✅ Send the check-in prompt notification (sync, non-blocking)
-                try:
-                    notification_result = send_push_to_user_sync(
-                        user_id=user_id,
-                        title=f"How did {goal_title} go? ✅",
-                        body=f"Hey {user_name}, did you complete {goal_title} today? Tap to check in.",
-                        data={
+                # ✅ Queue the check-in prompt notification (sent in bulk below)
+                pending_pushes.append(
+                    {
+                        "user_id": user_id,
+                        "title": f"How did {goal_title} go? ✅",
+                        "body": f"Hey {user_name}, did you complete {goal_title} today? Tap to check in.",
+                        "data": {
                             "type": "reminder",
                             "subtype": "checkin_prompt",
                             "goalId": goal_id,
                             "deepLink": f"/(user)/(goals)/details?id={goal_id}&openCheckIn=true",
                         },
-                        notification_type="reminder",
-                        entity_type="goal",
-                        entity_id=goal_id,
-                    )
-
-                    if (
-                        notification_result.get("success")
-                        or notification_result.get("delivered", 0) > 0
-                    ):
-                        sent_count += 1
-                        # Add to lookup to avoid duplicate prompts in same run
-                        key = (goal_id, user_id)
-                        if key not in prompts_by_goal_user:
-                            prompts_by_goal_user[key] = []
-                        prompts_by_goal_user[key].append(
-                            datetime.now(pytz.UTC).isoformat()
-                        )
-                        logger.info(
-                            f"Sent check-in prompt for goal '{goal_title}' to {user_name}"
-                        )
-
-                except Exception as push_error:
-                    logger.warning(
-                        f"Failed to send check-in prompt for goal {goal_id}",
-                        {
-                            "error": str(push_error),
-                            "goal_id": goal_id,
-                            "user_id": user_id,
-                        },
-                    )
+                        "notification_type": "reminder",
+                        "entity_type": "goal",
+                        "entity_id": goal_id,
+                        "user_timezone": user_timezone_str,
+                    }
+                )
+                # Add to lookup to avoid duplicate prompts in same run
+                prompts_by_goal_user.setdefault((goal_id, user_id), []).append(
+                    datetime.now(pytz.UTC).isoformat()
+                )
 
             except pytz.exceptions.UnknownTimeZoneError:
                 logger.error(
@@ -820,6 +1031,23 @@ def send_checkin_prompts_task(self) -> Dict[str, Any]:
                 )
                 continue
 
+        try:
+            results = send_push_to_users_bulk_sync(pending_pushes)
+        except Exception as push_error:
+            logger.warning(
+                "Failed to send check-in prompts",
+                {"error": str(push_error), "count": len(pending_pushes)},
+            )
+            results = []
+
+        for push, notification_result in zip(pending_pushes, results):
+            if (
+                notification_result.get("success")
+                or notification_result.get("delivered", 0) > 0
+            ):
+                sent_count += 1
+                logger.info(f"Sent check-in prompt for goal {push['entity_id']}")
+
         logger.info(
             f"[CHECK-IN PROMPTS] Sent: {sent_count}, "
             f"Skipped (completed): {skipped_already_completed}, "
@@ -866,10 +1094,11 @@ def send_checkin_followups_task(self) -> Dict[str, Any]:
 
     This is a gentle "I didn't hear back from you" nudge.
 
-    SCALABILITY: Uses batch prefetching to avoid N+1 queries.
+    SCALABILITY: Uses batch prefetching to avoid N+1 queries, and sends all due
+    follow-ups in one send_push_to_users_bulk_sync pass.
     """
     from datetime import datetime, timedelta
-    from app.services.expo_push_service import send_push_to_user_sync
+    from app.services.expo_push_service import send_push_to_users_bulk_sync
     import pytz
 
     try:
@@ -951,6 +1180,8 @@ def send_checkin_followups_task(self) -> Dict[str, Any]:
                     followups_by_goal_user[key] = []
                 followups_by_goal_user[key].append(f.get("created_at"))
 
+        pending_pushes = []
+
         for goal in goals:
             goal_id = goal["id"]
             user_id = goal["user_id"]
@@ -1033,48 +1264,28 @@ def send_checkin_followups_task(self) -> Dict[str, Any]:
                     skipped_already_followed_up += 1
                     continue
 
-                # Send the follow-up notification (sync, non-blocking for Celery)
-                try:
-                    notification_result = send_push_to_user_sync(
-                        user_id=user_id,
-                        title=f"Hey {user_name}, I didn't hear back 💭",
-                        body=f"How did {goal_title} go today? Tap to check in.",
-                        data={
+                # Queue the follow-up notification (sent in bulk below)
+                pending_pushes.append(
+                    {
+                        "user_id": user_id,
+                        "title": f"Hey {user_name}, I didn't hear back 💭",
+                        "body": f"How did {goal_title} go today? Tap to check in.",
+                        "data": {
                             "type": "reminder",
                             "subtype": "checkin_followup",
                             "goalId": goal_id,
                             "deepLink": f"/(user)/(goals)/details?id={goal_id}&openCheckIn=true",
                         },
-                        notification_type="reminder",
-                        entity_type="goal",
-                        entity_id=goal_id,
-                    )
-
-                    if (
-                        notification_result.get("success")
-                        or notification_result.get("delivered", 0) > 0
-                    ):
-                        sent_count += 1
-                        # Add to lookup to avoid duplicate follow-ups in same run
-                        key = (goal_id, user_id)
-                        if key not in followups_by_goal_user:
-                            followups_by_goal_user[key] = []
-                        followups_by_goal_user[key].append(
-                            datetime.now(pytz.UTC).isoformat()
-                        )
-                        logger.info(
-                            f"Sent 2hr follow-up for goal '{goal_title}' to {user_name}"
-                        )
-
-                except Exception as push_error:
-                    logger.warning(
-                        f"Failed to send follow-up for goal {goal_id}",
-                        {
-                            "error": str(push_error),
-                            "goal_id": goal_id,
-                            "user_id": user_id,
-                        },
-                    )
+                        "notification_type": "reminder",
+                        "entity_type": "goal",
+                        "entity_id": goal_id,
+                        "user_timezone": user_timezone_str,
+                    }
+                )
+                # Add to lookup to avoid duplicate follow-ups in same run
+                followups_by_goal_user.setdefault((goal_id, user_id), []).append(
+                    datetime.now(pytz.UTC).isoformat()
+                )
 
             except pytz.exceptions.UnknownTimeZoneError:
                 logger.error(
@@ -1085,6 +1296,23 @@ def send_checkin_followups_task(self) -> Dict[str, Any]:
                 logger.error(f"Failed to process follow-up for goal {goal_id}: {e}")
                 continue
 
+        try:
+            results = send_push_to_users_bulk_sync(pending_pushes)
+        except Exception as push_error:
+            logger.warning(
+                "Failed to send check-in follow-ups",
+                {"error": str(push_error), "count": len(pending_pushes)},
+            )
+            results = []
+
+        for push, notification_result in zip(pending_pushes, results):
+            if (
+                notification_result.get("success")
+                or notification_result.get("delivered", 0) > 0
+            ):
+                sent_count += 1
+                logger.info(f"Sent 2hr follow-up for goal {push['entity_id']}")
+
         print(
             f"[CHECK-IN FOLLOWUPS] Sent: {sent_count}, "
             f"Skipped (completed): {skipped_completed}, "
@@ -14,6 +14,8 @@ from datetime import datetime, timedelta
 from typing import Optional
 from app.core.celery_app import celery_app
 from app.core.database import get_supabase_client
+from app.core.entitlements import invalidate_entitlements
+from app.core.user_cache import invalidate_user_cache
 from app.services.logger import logger
 
 
@@ -442,6 +444,8 @@ def downgrade_expired_promotional_subscriptions_task(self) -> dict:
                 supabase.table("users").update({"plan": "free"}).eq(
                     "id", user_id
                 ).execute()
+                invalidate_user_cache(user_id)
+                invalidate_entitlements(user_id)
 
                 # 3. Reset AI Coach daily usage
                 loop.run_until_complete(
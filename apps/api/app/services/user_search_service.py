@@ -0,0 +1,175 @@
+"""
+User search
+
+Ranked name/username search backed by the search_users RPC (pg_trgm indexes,
+migration 046). Each row carries the searcher's partnership status, so
+callers don't need a second accountability_partners lookup.
+
+Pagination:
+- Keyset: next_cursor encodes the last row's (rank, id); pass it back as
+  cursor to continue. Pages never shift when rows are added behind them.
+- Page numbers still work (OFFSET) for older clients.
+- Exact totals are opt-in (count_user_search); otherwise callers report
+  what they have seen.
+
+Caching:
+- Result pages are cached in Redis for USER_SEARCH_CACHE_TTL_SECONDS, keyed
+  by searcher and normalized query, so typing / backspacing through the same
+  prefixes and re-opening the search screen don't re-run the query.
+- Keys embed a per-searcher generation counter. The partners endpoints call
+  invalidate_user_search_cache() for both users on every partnership write;
+  other writers (cleanup, subscription downgrades) rely on the short TTL.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.core.cache import get_redis_client
+from app.core.config import settings
+from app.services.logger import logger
+
+USER_SEARCH_CACHE_PREFIX = "user_search"
+USER_SEARCH_VERSION_PREFIX = "user_search:ver"
+# Outlives every page written under it (see analytics generation counters)
+USER_SEARCH_VERSION_TTL = 3600
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def encode_cursor(rank: Any, user_id: str) -> str:
+    return f"{rank}:{user_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """(rank, user_id) from encode_cursor(). Raises ValueError if malformed."""
+    rank, _, user_id = cursor.partition(":")
+    float(rank)
+    UUID(user_id)
+    return rank, user_id
+
+
+def _version_key(user_id: str) -> str:
+    return f"{USER_SEARCH_VERSION_PREFIX}:{user_id}"
+
+
+def _cache_key(redis, user_id: str, query: str, variant: str) -> str:
+    version = redis.get(_version_key(user_id))
+    generation = (
+        version.decode() if isinstance(version, bytes) else str(version or 0)
+    )
+    return f"{USER_SEARCH_CACHE_PREFIX}:{user_id}:g{generation}:{variant}:{query}"
+
+
+def invalidate_user_search_cache(*user_ids: Optional[str]) -> None:
+    """Drop cached search pages for these searchers (one INCR each)."""
+    redis = get_redis_client()
+    if not redis:
+        return
+
+    try:
+        pipe = redis.pipeline(transaction=False)
+        for user_id in {u for u in user_ids if u}:
+            pipe.incr(_version_key(user_id))
+            pipe.expire(_version_key(user_id), USER_SEARCH_VERSION_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"User search cache invalidation failed: {e}")
+
+
+def search_users(
+    supabase,
+    user_id: str,
+    query: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    partners_only: bool = True,
+    username_only: bool = False,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of ranked matches for user_id and the cursor of the next page.
+
+    Rows: id, name, username, profile_picture_url, last_active_at, rank,
+    partnership_id, partnership_status, initiated_by_user_id. With
+    partners_only, admins, users who haven't onboarded and users blocked in
+    either direction are excluded. offset is ignored when cursor is given.
+    Raises ValueError for a malformed cursor.
+    """
+    query = normalize_query(query)
+    after_rank, after_id = decode_cursor(cursor) if cursor else (None, None)
+    if cursor:
+        offset = 0
+
+    variant = (
+        f"{int(partners_only)}{int(username_only)}:{limit}:{cursor or offset}"
+    )
+    redis = get_redis_client()
+    cache_key = None
+    if redis:
+        try:
+            cache_key = _cache_key(redis, user_id, query, variant)
+            cached = redis.get(cache_key)
+            if cached:
+                page = json.loads(cached)
+                return page["rows"], page["next_cursor"]
+        except Exception as e:
+            logger.warning(f"User search cache read failed: {e}")
+
+    # One extra row tells us whether there is a next page
+    result = supabase.rpc(
+        "search_users",
+        {
+            "p_user_id": user_id,
+            "p_query": query,
+            "p_limit": limit + 1,
+            "p_after_rank": after_rank,
+            "p_after_id": after_id,
+            "p_offset": offset,
+            "p_partners_only": partners_only,
+            "p_username_only": username_only,
+        },
+    ).execute()
+
+    rows = result.data or []
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["rank"], rows[-1]["id"])
+
+    if cache_key:
+        try:
+            pipe = redis.pipeline(transaction=False)
+            pipe.setex(
+                cache_key,
+                settings.USER_SEARCH_CACHE_TTL_SECONDS,
+                json.dumps({"rows": rows, "next_cursor": next_cursor}, default=str),
+            )
+            pipe.expire(_version_key(user_id), USER_SEARCH_VERSION_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"User search cache write failed: {e}")
+
+    return rows, next_cursor
+
+
+def count_search_results(
+    supabase,
+    user_id: str,
+    query: str,
+    partners_only: bool = True,
+    username_only: bool = False,
+) -> int:
+    """Exact number of search_users matches (full count; use sparingly)."""
+    result = supabase.rpc(
+        "count_user_search",
+        {
+            "p_user_id": user_id,
+            "p_query": normalize_query(query),
+            "p_partners_only": partners_only,
+            "p_username_only": username_only,
+        },
+    ).execute()
+    return int(result.data or 0)
@@ -0,0 +1,181 @@
+"""
+Direct-to-R2 voice note uploads
+
+Instead of streaming the recording through the API (POST /media/upload), the
+app can:
+
+1. POST /media/voice-note/upload-url: the API checks access and limits,
+   picks a staging key under uploads/voice-notes/<user_id>/ and returns a
+   presigned PUT URL. Content-Type and Content-Length are part of the
+   signature, so R2 rejects any other type or size. The response also
+   carries upload_id, a short-lived token signed by the API describing the
+   upload (nothing is stored server-side).
+2. PUT the file to R2.
+3. POST /media/voice-note/complete with upload_id: the API checks the object
+   landed, marks the check-in voice_note_status='processing' and queues
+   process_voice_note_upload (duration probe, validation, Whisper,
+   sentiment, check-in update: the same steps as the direct upload path).
+   The result reaches the app through the check_ins realtime change.
+
+Staged objects are deleted once processed. sweep_voice_note_uploads deletes
+ones never completed and fails check-ins stuck in processing.
+"""
+
+import hashlib
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from jose import JWTError, jwt
+
+from app.core.config import settings
+from app.core.r2_client import get_r2_client
+from app.core.r2_deletions import (
+    DELETE_BATCH_SIZE,
+    delete_r2_objects,
+    requeue_r2_deletions,
+)
+from app.services.logger import logger
+from app.services.media_spool import SpooledUpload, spool_stream
+
+STAGING_PREFIX = "uploads/voice-notes"
+
+# Extensions the app may upload -> the Content-Type signed into the URL
+VOICE_NOTE_UPLOAD_TYPES = {
+    ".m4a": "audio/mp4",
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".aac": "audio/aac",
+}
+
+UPLOAD_TOKEN_TYPE = "voice_note_upload"
+
+
+def staging_key(user_id: str, checkin_id: str, extension: str) -> str:
+    """uploads/voice-notes/<user_id>/<checkin_id>/<uuid><ext>"""
+    return f"{STAGING_PREFIX}/{user_id}/{checkin_id}/{uuid.uuid4().hex}{extension}"
+
+
+def presign_put(key: str, content_type: str, size_bytes: int) -> str:
+    """Presigned PUT URL for key, valid for exactly this type and size."""
+    return get_r2_client().generate_presigned_url(
+        "put_object",
+        Params={
+            "Bucket": settings.CLOUDFLARE_R2_BUCKET_NAME,
+            "Key": key,
+            "ContentType": content_type,
+            "ContentLength": size_bytes,
+        },
+        ExpiresIn=settings.VOICE_NOTE_UPLOAD_URL_TTL_SECONDS,
+        HttpMethod="PUT",
+    )
+
+
+def _token_key() -> str:
+    # Derived from SECRET_KEY so an upload token is never a valid access token
+    secret = f"{UPLOAD_TOKEN_TYPE}:{settings.SECRET_KEY}"
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def create_upload_token(claims: Dict[str, Any]) -> str:
+    """
+    Sign the upload description. It stays valid for twice the URL lifetime:
+    a PUT started just before the URL expires still gets to /complete.
+    """
+    now = int(time.time())
+    payload = {
+        **claims,
+        "type": UPLOAD_TOKEN_TYPE,
+        "iat": now,
+        "exp": now + 2 * settings.VOICE_NOTE_UPLOAD_URL_TTL_SECONDS,
+    }
+    return jwt.encode(payload, _token_key(), algorithm="HS256")
+
+
+def read_upload_token(token: str) -> Optional[Dict[str, Any]]:
+    """Claims of a valid, unexpired upload token, or None."""
+    try:
+        payload = jwt.decode(token, _token_key(), algorithms=["HS256"])
+    except JWTError:
+        return None
+    if payload.get("type") != UPLOAD_TOKEN_TYPE:
+        return None
+    return payload
+
+
+def staged_object_size(key: str) -> Optional[int]:
+    """Size of the staged object, or None if the client never uploaded it."""
+    try:
+        head = get_r2_client().head_object(
+            Bucket=settings.CLOUDFLARE_R2_BUCKET_NAME, Key=key
+        )
+    except Exception as e:
+        error = getattr(e, "response", {}).get("Error", {})
+        if error.get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+    return head.get("ContentLength")
+
+
+def download_staged_upload(key: str, max_bytes: int, extension: str) -> SpooledUpload:
+    """
+    Stream the staged object to a temp file (spool_stream: size limit,
+    SHA-256, sniff bytes), as if it had been posted to the API.
+    """
+    response = get_r2_client().get_object(
+        Bucket=settings.CLOUDFLARE_R2_BUCKET_NAME, Key=key
+    )
+    body = response["Body"]
+    try:
+        return spool_stream(body, max_bytes, extension)
+    finally:
+        body.close()
+
+
+def sweep_voice_note_uploads(supabase) -> Dict[str, int]:
+    """
+    Delete staged uploads older than VOICE_NOTE_STAGING_MAX_AGE_HOURS (never
+    completed, or their processing died) and mark check-ins that have been
+    processing for over VOICE_NOTE_PROCESSING_TIMEOUT_MINUTES as failed.
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(hours=settings.VOICE_NOTE_STAGING_MAX_AGE_HOURS)
+
+    paginator = get_r2_client().get_paginator("list_objects_v2")
+    stale = []
+    for page in paginator.paginate(
+        Bucket=settings.CLOUDFLARE_R2_BUCKET_NAME,
+        Prefix=f"{STAGING_PREFIX}/",
+        PaginationConfig={"PageSize": DELETE_BATCH_SIZE},
+    ):
+        stale.extend(
+            obj["Key"]
+            for obj in page.get("Contents", [])
+            if obj["LastModified"] < cutoff
+        )
+
+    failed = delete_r2_objects(stale) if stale else {}
+    requeue_r2_deletions(failed)
+
+    processing_cutoff = now - timedelta(
+        minutes=settings.VOICE_NOTE_PROCESSING_TIMEOUT_MINUTES
+    )
+    timed_out = (
+        supabase.table("check_ins")
+        .update({"voice_note_status": "failed"})
+        .eq("voice_note_status", "processing")
+        .lt("updated_at", processing_cutoff.isoformat())
+        .execute()
+    )
+    timed_out_count = len(timed_out.data or [])
+    if timed_out_count:
+        logger.warning(
+            f"[Media] Marked {timed_out_count} voice notes failed after processing timeout"
+        )
+
+    return {
+        "staged_deleted": len(stale) - len(failed),
+        "staged_requeued": len(failed),
+        "timed_out": timed_out_count,
+    }
@@ -14,15 +14,21 @@ Schema Notes:
 
 from typing import Dict, Any, Optional, List
 from datetime import date, timedelta, datetime
-from collections import defaultdict, Counter
-from openai import AsyncOpenAI
+from collections import Counter
+import numpy as np
 from app.core.database import get_supabase_client
-from app.core.config import settings
+from app.core.openai_client import acreate_chat_completion
 from app.services.logger import logger
+from app.services.streaks import (
+    MET_STATUSES,
+    STATUS_CODES,
+    UNKNOWN_STATUS,
+    CheckInHistory,
+)
 
 
-# Initialize OpenAI client
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+# Postgres DOW order (0=Sunday), as used by app.services.streaks
+DAY_NAMES = ("Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday")
 
 
 class WeeklyRecapService:
@@ -373,10 +379,13 @@ class WeeklyRecapService:
         Uses pre-aggregated summaries when available for faster calculation,
         falls back to counting raw check-ins when summaries are empty.
         """
+        history = CheckInHistory.from_rows(check_ins, key=None)
+        status_counts = history.status_counts()[0]
+
         # Scheduled opportunities for this week (across goals):
         # - include pending (e.g. today, before user checks in)
         # - rest_day is still a scheduled day; it just counts as "met"
-        total_scheduled = len([c for c in check_ins if c.get("status") is not None])
+        total_scheduled = int(status_counts[:UNKNOWN_STATUS].sum())
 
         # Use summaries for aggregate counts if available (faster) BUT compute completion% against
         # scheduled opportunities (multi-goal safe).
@@ -392,20 +401,12 @@ class WeeklyRecapService:
             )
         else:
             # Match app definition: rest_day counts as a successful completion
-            completed_count = len(
-                [c for c in check_ins if c.get("status") in ("completed", "rest_day")]
-            )
-            rest_day_count = len([c for c in check_ins if c.get("status") == "rest_day"])
-            total_check_ins = len([c for c in check_ins if c.get("status") != "pending"])
+            rest_day_count = int(status_counts[STATUS_CODES["rest_day"]])
+            completed_count = int(status_counts[STATUS_CODES["completed"]]) + rest_day_count
+            total_check_ins = len(history.day) - int(status_counts[STATUS_CODES["pending"]])
             peak_streak_this_week = 0
 
-        days_with_checkins = len(
-            set(
-                c.get("check_in_date")
-                for c in check_ins
-                if c.get("status") in ("completed", "rest_day") and c.get("check_in_date")
-            )
-        )
+        days_with_checkins = int(history.distinct_days(MET_STATUSES)[0])
 
         # Get current/longest streak from goals (V2 stores streaks on goals table)
         current_streak = max(
@@ -421,8 +422,7 @@ class WeeklyRecapService:
 
         completion_rate = round((completed_count / total_scheduled) * 100, 1) if total_scheduled > 0 else 0
 
-        # Analyze day patterns (still needs raw check-ins)
-        strongest_day, weakest_day = self._analyze_day_patterns(check_ins)
+        strongest_day, weakest_day = self._analyze_day_patterns(history)
 
         return {
             "completed_check_ins": completed_count,
@@ -440,27 +440,23 @@ class WeeklyRecapService:
         }
 
     def _analyze_day_patterns(
-        self, check_ins: List[Dict[str, Any]]
+        self, history: CheckInHistory
     ) -> tuple[Optional[str], Optional[str]]:
         """Analyze check-ins by day of week to find strongest/weakest days."""
-        day_counts: Counter = Counter()
-
-        for checkin in check_ins:
-            # V2.1: Use status field instead of completed boolean
-            if checkin.get("status") == "completed":
-                try:
-                    d = date.fromisoformat(checkin["check_in_date"])
-                    day_name = d.strftime("%A")
-                    day_counts[day_name] += 1
-                except (ValueError, KeyError):
-                    pass
-
-        if not day_counts:
+        # V2.1: Use status field instead of completed boolean
+        completed_by_dow = history.weekday_status_counts()[0][:, STATUS_CODES["completed"]]
+
+        # Days with at least one completion, most completions first (DOW order on ties)
+        active = [
+            int(d)
+            for d in np.argsort(-completed_by_dow, kind="stable")
+            if completed_by_dow[d]
+        ]
+        if not active:
             return None, None
 
-        sorted_days = day_counts.most_common()
-        strongest = sorted_days[0][0] if sorted_days else None
-        weakest = sorted_days[-1][0] if len(sorted_days) > 1 else None
+        strongest = DAY_NAMES[active[0]]
+        weakest = DAY_NAMES[active[-1]] if len(active) > 1 else None
 
         return strongest, weakest
 
@@ -473,31 +469,25 @@ class WeeklyRecapService:
         goal_lookup = {g["id"]: g for g in personal_goals}
 
         # Aggregate by goal_id
-        goal_stats: Dict[str, Dict[str, Any]] = defaultdict(
-            lambda: {"completed": 0, "total": 0, "days": set(), "moods": []}
+        history = CheckInHistory.from_rows(
+            [c for c in check_ins if c.get("goal_id")], key="goal_id"
         )
-
-        for checkin in check_ins:
-            goal_id = checkin.get("goal_id")
-            if not goal_id:
-                continue
-            # V2.1: Use status instead of completed boolean
-            checkin_status = checkin.get("status", "pending")
-            # Scheduled opportunities for this goal (include pending; rest_day is still scheduled)
-            if checkin_status is not None:
-                goal_stats[goal_id]["total"] += 1
-            # Match app definition: rest_day counts as a successful completion
-            if checkin_status in ("completed", "rest_day"):
-                goal_stats[goal_id]["completed"] += 1
-                goal_stats[goal_id]["days"].add(checkin.get("check_in_date"))
-            if checkin.get("mood"):
-                goal_stats[goal_id]["moods"].append(checkin["mood"])
+        status_counts = history.status_counts()
+        # Scheduled opportunities for this goal (include pending; rest_day is still scheduled)
+        totals = status_counts[:, :UNKNOWN_STATUS].sum(axis=1)
+        # Match app definition: rest_day counts as a successful completion
+        completed = (
+            status_counts[:, STATUS_CODES["completed"]]
+            + status_counts[:, STATUS_CODES["rest_day"]]
+        )
+        days_active = history.distinct_days(MET_STATUSES)
 
         breakdown = []
-        for gid, stats in goal_stats.items():
+        for i, gid in enumerate(history.keys):
             goal_info = goal_lookup.get(gid, {})
-            scheduled = int(stats.get("total", 0) or 0)
-            completion_rate = round((stats["completed"] / scheduled) * 100, 1) if scheduled > 0 else 0
+            scheduled = int(totals[i])
+            goal_completed = int(completed[i])
+            completion_rate = round((goal_completed / scheduled) * 100, 1) if scheduled > 0 else 0
 
             status = (
                 "excellent"
@@ -509,9 +499,9 @@ class WeeklyRecapService:
                 {
                     "goal_id": gid,
                     "title": goal_info.get("title", "Unknown Goal"),
-                    "completed": stats["completed"],
+                    "completed": goal_completed,
                     "total": scheduled,
-                    "days_active": len(stats["days"]),
+                    "days_active": int(days_active[i]),
                     "completion_rate": completion_rate,
                     "status": status,
                     "current_streak": goal_info.get("current_streak", 0),
@@ -626,33 +616,37 @@ class WeeklyRecapService:
         trend = []
 
         try:
-            for weeks_ago in range(3, -1, -1):
-                week_start = current_week_start - timedelta(weeks=weeks_ago)
-                week_end = week_start + timedelta(days=6)
+            first_week_start = current_week_start - timedelta(weeks=3)
 
-                # V2.1: Select status instead of completed
-                query = (
-                    supabase.table("check_ins")
-                    .select("id, status")
-                    .eq("user_id", user_id)
-                    .gte("check_in_date", week_start.isoformat())
-                    .lte("check_in_date", week_end.isoformat())
-                )
+            # One query for all 4 weeks; V2.1: Select status instead of completed
+            query = (
+                supabase.table("check_ins")
+                .select("check_in_date, status")
+                .eq("user_id", user_id)
+                .gte("check_in_date", first_week_start.isoformat())
+                .lte("check_in_date", (current_week_start + timedelta(days=6)).isoformat())
+            )
 
-                if goal_id:
-                    query = query.eq("goal_id", goal_id)
-                elif active_goal_ids:
-                    query = query.in_("goal_id", active_goal_ids)
+            if goal_id:
+                query = query.eq("goal_id", goal_id)
+            elif active_goal_ids:
+                query = query.in_("goal_id", active_goal_ids)
+
+            result = query.execute()
+            history = CheckInHistory.from_rows(result.data or [], key=None)
 
-                result = query.execute()
-                check_ins = result.data or []
+            for weeks_ago in range(3, -1, -1):
+                week_start = current_week_start - timedelta(weeks=weeks_ago)
+                week_end = week_start + timedelta(days=6)
+                status_counts = history.status_counts(week_start, week_end)[0]
 
                 # V2.1: Count by status instead of completed boolean
                 # Match app definition: rest_day counts as a successful completion
-                completed = len(
-                    [c for c in check_ins if c.get("status") in ("completed", "rest_day")]
+                completed = int(
+                    status_counts[STATUS_CODES["completed"]]
+                    + status_counts[STATUS_CODES["rest_day"]]
                 )
-                total_scheduled = len([c for c in check_ins if c.get("status") is not None])
+                total_scheduled = int(status_counts[:UNKNOWN_STATUS].sum())
                 completion_rate = (
                     round((completed / total_scheduled) * 100, 1)
                     if total_scheduled > 0
@@ -802,7 +796,7 @@ Respond in JSON format:
 {{"summary": "...", "win": "...", "insight": "...", "focus_next_week": "..."}}"""
 
         try:
-            response = await client.chat.completions.create(
+            response = await acreate_chat_completion(
                 model="gpt-4o-mini",
                 messages=[
                     {
@@ -9,19 +9,18 @@ import uvicorn
 from dotenv import load_dotenv
 
 from app.core.config import settings
-from app.core.database import create_tables
+from app.core.database import create_tables, close_async_supabase_client
+from app.core.cache import close_async_redis_client
+from app.core.openai_client import close_async_openai_client
+from app.services.ai_coach_stream_service import close_stream_hub
+from app.services.live_activity_service import close_activitykit_apns_client
+from app.services.media_executor import (
+    shutdown_media_executors,
+    warm_media_executors,
+)
 from app.core.analytics import initialize_posthog, shutdown_posthog
 from app.api.v1.router import api_router
-from app.core.middleware import (
-    SecurityHeadersMiddleware,
-    RateLimitMiddleware,
-    AccountLockoutMiddleware,
-    IPWhitelistMiddleware,
-    AuditLoggingMiddleware,
-    UserActivityMiddleware,
-    SQLInjectionProtectionMiddleware,
-    SessionManagementMiddleware,
-)
+from app.core.middleware import SecurityPipelineMiddleware
 from app.api.v1.endpoints.system_health import read_health
 
 # Load environment variables
@@ -32,12 +31,19 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     # Startup
     await create_tables()
+    warm_media_executors()
     if settings.POSTHOG_API_KEY:
         initialize_posthog()
         print("📈 PostHog analytics active")
     print("🚀 FitNudge API started successfully!")
     yield
     # Shutdown
+    await close_async_supabase_client()
+    await close_async_redis_client()
+    await close_async_openai_client()
+    await close_stream_hub()
+    await close_activitykit_apns_client()
+    shutdown_media_executors()
     if settings.POSTHOG_API_KEY:
         try:
             shutdown_posthog()
@@ -77,17 +83,13 @@ if (
 ):
     app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.allowed_hosts_list)
 
-# Add security middleware (order matters!)
-app.add_middleware(SecurityHeadersMiddleware)
-app.add_middleware(SQLInjectionProtectionMiddleware)
-app.add_middleware(IPWhitelistMiddleware)
-app.add_middleware(AccountLockoutMiddleware)
-app.add_middleware(RateLimitMiddleware)
-app.add_middleware(AuditLoggingMiddleware)
-app.add_middleware(SessionManagementMiddleware)
+# Security checks run as ordered stages of one pure-ASGI middleware (order is
+# defined in default_security_stages): user activity, sessions, audit logging,
+# rate limiting, account lockout, IP checks, SQL injection, security headers.
 app.add_middleware(
-    UserActivityMiddleware
-)  # Track user activity for partner suggestions
+    SecurityPipelineMiddleware,
+    server_timing=settings.SECURITY_PIPELINE_SERVER_TIMING,
+)
 
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
@@ -103,7 +105,8 @@ app.add_api_route(
 
 if __name__ == "__main__":
     is_dev = settings.ENVIRONMENT == "development"
-    # Production: multiple workers so sync Supabase in one request doesn't block others.
+    # Production: multiple workers so sync Supabase in one request doesn't block others
+    # (hot endpoints use the async client, but many routes are still sync).
     # Dev: single worker only. --reload and --workers > 1 are incompatible; multiple
     # workers also complicate debugging (which process, breakpoints, interleaved logs).
     run_kwargs = {
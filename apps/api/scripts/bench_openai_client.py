@@ -0,0 +1,313 @@
+"""
+Benchmark OpenAI calls: a new client per call vs. the shared pooled clients.
+
+Runs a local OpenAI-compatible stub server (chat completions, streamed or not,
+and audio transcriptions) and points the SDK at it with OPENAI_BASE_URL, so no
+API key or network is needed and the model itself costs a fixed --latency-ms.
+
+"before" builds OpenAI(...) / AsyncOpenAI(...) for every call, as
+push_motivation_generator, ai_coach_tasks and the media endpoints used to.
+"after" goes through app.core.openai_client (shared pool, per-model slots).
+
+Usage:
+    cd apps/api
+    poetry run python scripts/bench_openai_client.py
+    poetry run python scripts/bench_openai_client.py --requests 500 --concurrency 16
+    poetry run python scripts/bench_openai_client.py --tls   # include handshakes
+
+    # Stub only, e.g. for a local API / worker started with
+    # OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+    poetry run python scripts/bench_openai_client.py --serve
+
+Reports p50/p95/p99 latency and calls/second per mode, and the per-model
+metrics recorded by app.core.openai_client for the "after" runs.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure app is on path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HOST = "127.0.0.1"
+
+
+# =============================================================================
+# Stub server
+# =============================================================================
+
+
+def build_stub_app(latency_ms: float, chunks: int):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+    app = FastAPI()
+    delay = latency_ms / 1000
+
+    def _usage():
+        return {"prompt_tokens": 120, "completion_tokens": chunks * 2, "total_tokens": 120 + chunks * 2}
+
+    def _chunk(model: str, delta: dict, finish_reason=None, usage=None):
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": (
+                []
+                if usage
+                else [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            ),
+            "usage": usage,
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "gpt-4o-mini")
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay)
+            return JSONResponse(
+                {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": "Keep going!"},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": _usage(),
+                }
+            )
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+        async def events():
+            for i in range(chunks):
+                await asyncio.sleep(delay / chunks)
+                yield f"data: {json.dumps(_chunk(model, {'content': f'tok{i} '}))}\n\n"
+            yield f"data: {json.dumps(_chunk(model, {}, finish_reason='stop'))}\n\n"
+            if include_usage:
+                yield f"data: {json.dumps(_chunk(model, {}, usage=_usage()))}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/audio/transcriptions")
+    async def transcriptions(request: Request):
+        form = await request.form()
+        await asyncio.sleep(delay)
+        if form.get("response_format") == "text":
+            return PlainTextResponse("I did my workout today.")
+        return JSONResponse({"text": "I did my workout today."})
+
+    return app
+
+
+def _self_signed_cert(directory: str):
+    cert = os.path.join(directory, "stub.crt")
+    key = os.path.join(directory, "stub.key")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", key, "-out", cert, "-days", "1",
+            "-subj", f"/CN={HOST}", "-addext", f"subjectAltName=IP:{HOST}",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+def start_stub(port: int, latency_ms: float, chunks: int, tls_files=None):
+    import uvicorn
+
+    config = uvicorn.Config(
+        build_stub_app(latency_ms, chunks),
+        host=HOST,
+        port=port,
+        log_level="warning",
+        ssl_certfile=tls_files[0] if tls_files else None,
+        ssl_keyfile=tls_files[1] if tls_files else None,
+    )
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+MESSAGES = [
+    {"role": "system", "content": "You are a personal accountability coach."},
+    {"role": "user", "content": "Generate the personalized response."},
+]
+
+
+def report(label: str, latencies, elapsed: float):
+    latencies = sorted(latencies)
+    q = statistics.quantiles(latencies, n=100)
+    print(
+        f"  {label:<34} p50 {q[49] * 1000:7.1f}ms  p95 {q[94] * 1000:7.1f}ms  "
+        f"p99 {q[98] * 1000:7.1f}ms  {len(latencies) / elapsed:8.1f} calls/s"
+    )
+
+
+def run_sync(label: str, call, n: int, concurrency: int):
+    def timed(_):
+        started = time.perf_counter()
+        call()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(n)))
+    report(label, latencies, time.perf_counter() - started)
+
+
+async def run_async(label: str, call, n: int, concurrency: int):
+    limiter = asyncio.Semaphore(concurrency)
+
+    async def timed():
+        async with limiter:
+            started = time.perf_counter()
+            await call()
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(timed() for _ in range(n)))
+    report(label, latencies, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50, help="simulated model latency")
+    parser.add_argument("--chunks", type=int, default=20, help="chunks per streamed reply")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tls", action="store_true", help="serve HTTPS (self-signed)")
+    parser.add_argument("--serve", action="store_true", help="only run the stub server")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    tls_files = _self_signed_cert(tmpdir) if args.tls else None
+    scheme = "https" if args.tls else "http"
+    base_url = f"{scheme}://{HOST}:{args.port}/v1"
+
+    server = start_stub(args.port, args.latency_ms, args.chunks, tls_files)
+    if args.serve:
+        print(f"OpenAI stub listening on {base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.should_exit = True
+            return
+
+    # The SDK reads these; settings are read on import below
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "sk-stub"
+    if tls_files:
+        os.environ["SSL_CERT_FILE"] = tls_files[0]
+
+    from openai import AsyncOpenAI, OpenAI
+
+    from app.core.openai_client import (
+        acreate_chat_completion,
+        acreate_transcription,
+        create_chat_completion,
+        get_openai_metrics,
+    )
+
+    n, c = args.requests, args.concurrency
+    audio = b"\x00" * 32_000
+    print(
+        f"{n} calls, concurrency {c}, model latency {args.latency_ms:.0f}ms, "
+        f"{scheme.upper()} stub at {base_url}\n"
+    )
+
+    # --- sync (Celery tasks) ---
+    def before_chat():
+        OpenAI().chat.completions.create(model="gpt-4o-mini", messages=MESSAGES, max_tokens=80)
+
+    def after_chat():
+        create_chat_completion(model="gpt-4o-mini", messages=MESSAGES, max_tokens=80)
+
+    def before_stream():
+        for _ in OpenAI().chat.completions.create(
+            model="gpt-4o-mini", messages=MESSAGES, stream=True
+        ):
+            pass
+
+    def after_stream():
+        for _ in create_chat_completion(model="gpt-4o-mini", messages=MESSAGES, stream=True):
+            pass
+
+    print("sync chat completion")
+    run_sync("before (client per call)", before_chat, n, c)
+    run_sync("after (shared pool)", after_chat, n, c)
+    print("sync streamed chat completion")
+    run_sync("before (client per call)", before_stream, n, c)
+    run_sync("after (shared pool)", after_stream, n, c)
+
+    # --- async (request path: media uploads, insights, recaps) ---
+    async def run_async_modes():
+        async def before_chat_async():
+            await AsyncOpenAI().chat.completions.create(
+                model="gpt-4o-mini", messages=MESSAGES, max_tokens=150
+            )
+
+        async def after_chat_async():
+            await acreate_chat_completion(model="gpt-4o-mini", messages=MESSAGES, max_tokens=150)
+
+        async def before_transcription():
+            await AsyncOpenAI().audio.transcriptions.create(
+                model="whisper-1", file=("note.m4a", audio), response_format="text"
+            )
+
+        async def after_transcription():
+            await acreate_transcription(
+                model="whisper-1", file=("note.m4a", audio), response_format="text"
+            )
+
+        print("async chat completion")
+        await run_async("before (client per call)", before_chat_async, n, c)
+        await run_async("after (shared pool)", after_chat_async, n, c)
+        print("async transcription")
+        await run_async("before (client per call)", before_transcription, n, c)
+        await run_async("after (shared pool)", after_transcription, n, c)
+
+    asyncio.run(run_async_modes())
+
+    print("\napp.core.openai_client metrics (after runs)")
+    for key, m in sorted(get_openai_metrics().items()):
+        print(f"  {key}: {m}")
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Benchmark the security middleware: BaseHTTPMiddleware chain vs. pure-ASGI pipeline.
+
+"before" wraps each security stage in its own BaseHTTPMiddleware (the layout
+main.py used: eight stacked middlewares). "after" runs the same stages inside
+one SecurityPipelineMiddleware. Both serve the same trivial FastAPI routes
+in-process (httpx ASGITransport), so the difference is middleware overhead only.
+
+Usage:
+    cd apps/api
+    poetry run python scripts/bench_security_pipeline.py
+    poetry run python scripts/bench_security_pipeline.py --requests 5000
+
+Reports p50/p95/p99 latency, requests/second and CPU time per request for
+a GET and a JSON POST, plus per-stage timings from the pipeline.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Ensure app is on path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load env before importing app modules
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from app.core.middleware import (
+    PipelineContext,
+    RateLimitStage,
+    SecurityPipelineMiddleware,
+    default_security_stages,
+)
+from app.core.rate_limiter import RateLimitRule, SlidingWindowRateLimiter
+
+
+def bench_stages():
+    """Default stages, with a rate limit high enough not to trip during the run."""
+    stages = default_security_stages()
+    limiter = SlidingWindowRateLimiter(
+        [RateLimitRule(name="bench", pattern="*", limit=10**9, per_path=True)]
+    )
+    return [
+        RateLimitStage(limiter) if isinstance(stage, RateLimitStage) else stage
+        for stage in stages
+    ]
+
+
+def _stage_as_base_http_middleware(stage):
+    """Run one pipeline stage as its own BaseHTTPMiddleware (the old layout)."""
+
+    class StageMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            ctx = PipelineContext(request)
+            if stage.wants_body(ctx):
+                ctx.body = await request.body()
+            try:
+                await stage.on_request(ctx)
+            except Exception as exc:
+                return JSONResponse(
+                    {"detail": getattr(exc, "detail", str(exc))},
+                    status_code=getattr(exc, "status_code", 500),
+                )
+            response = await call_next(request)
+            ctx.status_code = response.status_code
+            stage.on_response_start(ctx, response.headers)
+            await stage.after_response(ctx)
+            return response
+
+    StageMiddleware.__name__ = f"{type(stage).__name__}Middleware"
+    return StageMiddleware
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/api/v1/echo")
+    async def echo(payload: dict):
+        return {"ok": True, "keys": len(payload)}
+
+    return app
+
+
+def build_before() -> FastAPI:
+    app = _build_app()
+    # Stages are listed outermost first; add_middleware puts the last one outermost
+    for stage in reversed(bench_stages()):
+        app.add_middleware(_stage_as_base_http_middleware(stage))
+    return app
+
+
+def build_after() -> FastAPI:
+    app = _build_app()
+    app.add_middleware(SecurityPipelineMiddleware, stages=bench_stages())
+    return app
+
+
+async def _run(app: FastAPI, method: str, path: str, n: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 50000))
+    payload = {"title": "Morning run", "notes": "5k easy", "tags": ["run", "cardio"]}
+    latencies = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up (route compilation, first Redis connection attempt, etc.)
+        for _ in range(50):
+            await client.request(method, path, json=payload if method == "POST" else None)
+
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with sem:
+                started = time.perf_counter()
+                response = await client.request(
+                    method, path, json=payload if method == "POST" else None
+                )
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(n)))
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+    latencies.sort()
+    q = statistics.quantiles(latencies, n=100)
+    return {
+        "p50_ms": q[49] * 1000,
+        "p95_ms": q[94] * 1000,
+        "p99_ms": q[98] * 1000,
+        "rps": n / wall,
+        "cpu_us_per_req": cpu / n * 1e6,
+    }
+
+
+def _print_row(label: str, result: dict):
+    print(
+        f"  {label:<8} p50={result['p50_ms']:.3f}ms  p95={result['p95_ms']:.3f}ms  "
+        f"p99={result['p99_ms']:.3f}ms  {result['rps']:.0f} req/s  "
+        f"cpu={result['cpu_us_per_req']:.0f}us/req"
+    )
+
+
+async def main(n: int, concurrency: int):
+    before = build_before()
+    after = build_after()
+
+    for method, path in (("GET", "/api/v1/ping"), ("POST", "/api/v1/echo")):
+        print(f"\n{method} {path}  ({n} requests, concurrency {concurrency})")
+        before_result = await _run(before, method, path, n, concurrency)
+        after_result = await _run(after, method, path, n, concurrency)
+        _print_row("before", before_result)
+        _print_row("after", after_result)
+        print(
+            f"  p50 change: {(after_result['p50_ms'] / before_result['p50_ms'] - 1) * 100:+.1f}%  "
+            f"cpu/req change: "
+            f"{(after_result['cpu_us_per_req'] / before_result['cpu_us_per_req'] - 1) * 100:+.1f}%"
+        )
+
+    # Per-stage timings from the pipeline instance (stack is built on first request)
+    pipeline = after.middleware_stack
+    while pipeline is not None and not isinstance(pipeline, SecurityPipelineMiddleware):
+        pipeline = getattr(pipeline, "app", None)
+    if pipeline is not None:
+        print("\nPer-stage timings (pipeline):")
+        for name, stat in pipeline.stage_stats().items():
+            print(f"  {name:<10} calls={stat['calls']:<7} avg={stat['avg_ms']:.4f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
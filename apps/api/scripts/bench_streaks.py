@@ -0,0 +1,218 @@
+"""
+Benchmark the streak engine (app/services/streaks.py) against the per-dict loops it replaced.
+
+"before" runs the old implementations goal by goal over lists of check-in dicts
+(ISO date strings parsed per row): the achievement current-streak walk, the
+/check-ins/stats streak and 7/30-day filters, compute_evidence's weekday
+accumulator and check_crushing_it's weekly counts. "after" computes the same
+results for every goal at once with CheckInHistory, including date parsing.
+Both are checked to agree before timings are reported.
+
+Usage:
+    cd apps/api
+    poetry run python scripts/bench_streaks.py
+    poetry run python scripts/bench_streaks.py --goals 10000 --days 120
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+# Ensure app is on path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.streaks import STATUS_CODES, CheckInHistory, to_day
+
+TODAY = date(2026, 10, 16)
+WEEK_START = TODAY - timedelta(days=TODAY.weekday())
+
+
+def generate(n_goals: int, n_days: int, seed: int = 7):
+    """Per-goal check-in dict lists, newest first (as the old queries returned them)."""
+    rng = random.Random(seed)
+    statuses = ["completed"] * 6 + ["missed", "skipped", "rest_day"]
+    goals = {}
+    for g in range(n_goals):
+        goal_id = f"goal-{g}"
+        rows = []
+        for offset in range(n_days):
+            d = TODAY - timedelta(days=offset)
+            status = "pending" if offset == 0 and rng.random() < 0.5 else rng.choice(statuses)
+            rows.append(
+                {
+                    "goal_id": goal_id,
+                    "check_in_date": d.isoformat(),
+                    "day_of_week": (d.weekday() + 1) % 7,
+                    "status": status,
+                }
+            )
+        goals[goal_id] = rows
+    return goals
+
+
+# =============================================================================
+# Old per-dict implementations (one goal at a time)
+# =============================================================================
+
+
+def old_current_streak(check_ins):
+    """AchievementConditionChecker.get_current_streak (completed rows, newest first)."""
+    streak = 0
+    current_date = TODAY
+    for check_in in check_ins:
+        if check_in["status"] != "completed":
+            continue
+        check_in_date_val = date.fromisoformat(str(check_in["check_in_date"]))
+        if check_in_date_val == current_date:
+            streak += 1
+            current_date -= timedelta(days=1)
+        elif check_in_date_val < current_date:
+            break
+    return streak
+
+
+def old_longest_and_windows(checkins):
+    """get_check_in_stats longest streak and 7/30-day completed counts."""
+    sorted_checkins = sorted(
+        [c for c in checkins if c.get("status") == "completed"],
+        key=lambda x: x["check_in_date"],
+        reverse=True,
+    )
+    longest_streak = 0
+    temp_streak = 0
+    for i, checkin in enumerate(sorted_checkins):
+        if i == 0:
+            temp_streak = 1
+        else:
+            prev_date = datetime.fromisoformat(sorted_checkins[i - 1]["check_in_date"]).date()
+            curr_date = datetime.fromisoformat(checkin["check_in_date"]).date()
+            if (prev_date - curr_date).days == 1:
+                temp_streak += 1
+            else:
+                longest_streak = max(longest_streak, temp_streak)
+                temp_streak = 1
+    longest_streak = max(longest_streak, temp_streak)
+
+    week_ago = (TODAY - timedelta(days=7)).isoformat()
+    month_ago = (TODAY - timedelta(days=30)).isoformat()
+    last_7d = len(
+        [c for c in checkins if c.get("status") == "completed" and c["check_in_date"] >= week_ago]
+    )
+    last_30d = len(
+        [c for c in checkins if c.get("status") == "completed" and c["check_in_date"] >= month_ago]
+    )
+    return longest_streak, last_7d, last_30d
+
+
+def old_weekday_completed(checkins):
+    """compute_evidence weekday accumulator (completed per DOW)."""
+    weekday_raw = defaultdict(lambda: {"total": 0, "completed": 0, "missed": 0, "rest_day": 0})
+    for ci in checkins:
+        status = ci.get("status")
+        day = ci.get("day_of_week")
+        if day is None:
+            continue
+        weekday_raw[day]["total"] += 1
+        if status == "completed":
+            weekday_raw[day]["completed"] += 1
+        elif status == "rest_day":
+            weekday_raw[day]["rest_day"] += 1
+        else:
+            weekday_raw[day]["missed"] += 1
+    return [weekday_raw[d]["completed"] if d in weekday_raw else 0 for d in range(7)]
+
+
+def old_week_counts(goal_checkins):
+    """check_crushing_it: completed and scheduled this week, up to today."""
+    week_checkins = [
+        c
+        for c in goal_checkins
+        if str(WEEK_START) <= c["check_in_date"] <= str(TODAY)
+    ]
+    completed = sum(1 for c in week_checkins if c.get("status") == "completed")
+    scheduled = len([c for c in week_checkins if c.get("status") not in ("pending", "rest_day")])
+    return completed, scheduled
+
+
+def run_before(goals):
+    results = []
+    for rows in goals.values():
+        longest, last_7d, last_30d = old_longest_and_windows(rows)
+        completed, scheduled = old_week_counts(rows)
+        results.append(
+            (
+                old_current_streak(rows),
+                longest,
+                last_7d,
+                last_30d,
+                completed,
+                scheduled,
+                old_weekday_completed(rows),
+            )
+        )
+    return results
+
+
+# =============================================================================
+# Streak engine (all goals at once)
+# =============================================================================
+
+
+def run_after(rows, goal_ids):
+    history = CheckInHistory.from_rows(rows, keys=goal_ids)
+    current, longest = history.streaks(today=TODAY)
+    windows = history.window_counts(TODAY, (7, 30))
+    week = history.status_counts(start=WEEK_START, end=TODAY)
+    completed = week[:, STATUS_CODES["completed"]]
+    scheduled = week.sum(axis=1) - week[:, STATUS_CODES["pending"]] - week[:, STATUS_CODES["rest_day"]]
+    by_weekday = history.weekday_status_counts()[:, :, STATUS_CODES["completed"]]
+    return current, longest, windows[7], windows[30], completed, scheduled, by_weekday
+
+
+def main(n_goals: int, n_days: int, repeat: int):
+    goals = generate(n_goals, n_days)
+    goal_ids = list(goals)
+    flat_rows = [row for rows in goals.values() for row in rows]
+    print(f"{n_goals} goals x {n_days} days = {len(flat_rows)} check-ins")
+
+    before_times, after_times = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        before = run_before(goals)
+        before_times.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        after = run_after(flat_rows, goal_ids)
+        after_times.append(time.perf_counter() - started)
+
+    # Same answers for every goal
+    expected = np.array([r[:6] for r in before])
+    actual = np.column_stack(after[:6])
+    assert (expected == actual).all(), "streak engine disagrees with the per-dict loops"
+    assert (np.array([r[6] for r in before]) == after[6]).all(), "weekday counts disagree"
+
+    before_best, after_best = min(before_times), min(after_times)
+    print(f"  before (per-dict loops): {before_best * 1000:.1f}ms")
+    print(f"  after  (streak engine):  {after_best * 1000:.1f}ms")
+    print(f"  speedup: {before_best / after_best:.1f}x")
+
+    # Engine without parsing (history already built, e.g. reused across stats)
+    history = CheckInHistory.from_rows(flat_rows, keys=goal_ids)
+    started = time.perf_counter()
+    history.streaks(today=to_day(TODAY))
+    print(f"  streaks only (prebuilt history): {(time.perf_counter() - started) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--goals", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.goals, args.days, args.repeat)
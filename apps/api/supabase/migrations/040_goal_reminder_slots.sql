@@ -0,0 +1,302 @@
+-- =====================================================
+-- Goal reminder slot index (UTC minute -> goal reminders)
+-- =====================================================
+-- send_scheduled_ai_motivations runs every minute. Previously it loaded every
+-- active user, every active goal and their full check-in history, then converted
+-- each goal's reminder_times to the user's timezone just to find the few goals
+-- due in the current minute.
+--
+-- goal_reminder_slots precomputes one row per (goal, local HH:MM slot), including
+-- the optional "before" slot (reminder_time - reminder_window_before_minutes),
+-- together with the UTC minute-of-day the slot currently falls on. Each tick then
+-- reads only the rows for the current UTC minute.
+--
+-- Kept up to date by:
+--   - trigger on goals (reminder_times, reminder_window_before_minutes, status, user_id)
+--   - trigger on users (timezone)
+--   - sync_reminder_slot_offsets(): re-derives utc_minute when a timezone's UTC
+--     offset changes (DST). Called at the start of every get_due_reminder_slots()
+--     so DST shifts apply from the first affected minute. Cost is O(distinct timezones).
+-- =====================================================
+
+-- =====================================================
+-- 1. TABLES
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS goal_reminder_slots (
+  goal_id UUID NOT NULL REFERENCES goals(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  slot_time TEXT NOT NULL,              -- 'HH:MM' in the user's local time
+  timezone TEXT NOT NULL DEFAULT 'UTC',
+  utc_offset_minutes INTEGER NOT NULL DEFAULT 0,
+  utc_minute SMALLINT NOT NULL CHECK (utc_minute BETWEEN 0 AND 1439),
+  PRIMARY KEY (goal_id, slot_time)
+);
+
+CREATE INDEX IF NOT EXISTS idx_goal_reminder_slots_utc_minute
+  ON goal_reminder_slots(utc_minute);
+CREATE INDEX IF NOT EXISTS idx_goal_reminder_slots_timezone
+  ON goal_reminder_slots(timezone);
+CREATE INDEX IF NOT EXISTS idx_goal_reminder_slots_user
+  ON goal_reminder_slots(user_id);
+
+-- One row per timezone referenced by goal_reminder_slots, with the offset the
+-- slots were last computed for. Lets the DST sync touch only changed timezones.
+CREATE TABLE IF NOT EXISTS reminder_slot_timezones (
+  timezone TEXT PRIMARY KEY,
+  utc_offset_minutes INTEGER NOT NULL,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- RLS: internal scheduling data, service role only.
+ALTER TABLE goal_reminder_slots ENABLE ROW LEVEL SECURITY;
+CREATE POLICY goal_reminder_slots_service_only ON goal_reminder_slots
+  FOR ALL USING (false);
+
+ALTER TABLE reminder_slot_timezones ENABLE ROW LEVEL SECURITY;
+CREATE POLICY reminder_slot_timezones_service_only ON reminder_slot_timezones
+  FOR ALL USING (false);
+
+-- =====================================================
+-- 2. HELPERS
+-- =====================================================
+
+-- Current UTC offset (minutes east of UTC) for a timezone. NULL if the
+-- timezone name is invalid (such goals are skipped, same as the old task).
+CREATE OR REPLACE FUNCTION timezone_utc_offset_minutes(
+  p_timezone TEXT,
+  p_at TIMESTAMPTZ DEFAULT NOW()
+)
+RETURNS INTEGER AS $$
+BEGIN
+  RETURN (
+    EXTRACT(EPOCH FROM (p_at AT TIME ZONE p_timezone) - (p_at AT TIME ZONE 'UTC')) / 60
+  )::INTEGER;
+EXCEPTION WHEN OTHERS THEN
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Local 'HH:MM' + offset -> UTC minute of day (0-1439)
+CREATE OR REPLACE FUNCTION reminder_slot_utc_minute(
+  p_slot_time TEXT,
+  p_utc_offset_minutes INTEGER
+)
+RETURNS SMALLINT AS $$
+  SELECT (
+    (
+      (EXTRACT(HOUR FROM p_slot_time::TIME) * 60 + EXTRACT(MINUTE FROM p_slot_time::TIME))::INTEGER
+      - p_utc_offset_minutes
+    ) % 1440 + 1440
+  ) % 1440;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- =====================================================
+-- 3. REBUILD SLOTS FOR A GOAL
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION rebuild_goal_reminder_slots(p_goal_id UUID)
+RETURNS INTEGER AS $$
+DECLARE
+  v_goal RECORD;
+  v_timezone TEXT;
+  v_offset INTEGER;
+  v_before INTEGER;
+  v_count INTEGER := 0;
+BEGIN
+  DELETE FROM goal_reminder_slots WHERE goal_id = p_goal_id;
+
+  SELECT g.id, g.user_id, g.status, g.reminder_times, g.reminder_window_before_minutes
+  INTO v_goal
+  FROM goals g
+  WHERE g.id = p_goal_id;
+
+  IF NOT FOUND OR v_goal.status <> 'active' OR v_goal.user_id IS NULL
+     OR v_goal.reminder_times IS NULL THEN
+    RETURN 0;
+  END IF;
+
+  SELECT COALESCE(NULLIF(u.timezone, ''), 'UTC') INTO v_timezone
+  FROM users u
+  WHERE u.id = v_goal.user_id;
+
+  v_timezone := COALESCE(v_timezone, 'UTC');
+  v_offset := timezone_utc_offset_minutes(v_timezone);
+
+  IF v_offset IS NULL THEN
+    RETURN 0;
+  END IF;
+
+  v_before := GREATEST(COALESCE(v_goal.reminder_window_before_minutes, 30), 0);
+
+  -- Exact reminder times plus optional "before" times (wraps past midnight)
+  INSERT INTO goal_reminder_slots (goal_id, user_id, slot_time, timezone, utc_offset_minutes, utc_minute)
+  SELECT DISTINCT ON (slot.slot_time)
+    v_goal.id,
+    v_goal.user_id,
+    slot.slot_time,
+    v_timezone,
+    v_offset,
+    reminder_slot_utc_minute(slot.slot_time, v_offset)
+  FROM (
+    SELECT to_char(rt::TIME, 'HH24:MI') AS slot_time
+    FROM unnest(v_goal.reminder_times) AS rt
+    WHERE rt ~ '^[0-9]{1,2}:[0-9]{2}'
+    UNION
+    SELECT to_char(rt::TIME - make_interval(mins => v_before), 'HH24:MI')
+    FROM unnest(v_goal.reminder_times) AS rt
+    WHERE rt ~ '^[0-9]{1,2}:[0-9]{2}' AND v_before > 0
+  ) AS slot
+  ON CONFLICT (goal_id, slot_time) DO NOTHING;
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+
+  IF v_count > 0 THEN
+    INSERT INTO reminder_slot_timezones (timezone, utc_offset_minutes)
+    VALUES (v_timezone, v_offset)
+    ON CONFLICT (timezone) DO NOTHING;
+  END IF;
+
+  RETURN v_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+COMMENT ON FUNCTION rebuild_goal_reminder_slots(UUID) IS
+  'Recomputes goal_reminder_slots rows for one goal (exact + before-window slots). Returns number of slots.';
+
+-- =====================================================
+-- 4. TRIGGERS
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION trg_goal_reminder_slots_sync()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM rebuild_goal_reminder_slots(NEW.id);
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_goal_reminder_slots_insert ON goals;
+CREATE TRIGGER trg_goal_reminder_slots_insert
+  AFTER INSERT ON goals
+  FOR EACH ROW EXECUTE FUNCTION trg_goal_reminder_slots_sync();
+
+DROP TRIGGER IF EXISTS trg_goal_reminder_slots_update ON goals;
+CREATE TRIGGER trg_goal_reminder_slots_update
+  AFTER UPDATE OF reminder_times, reminder_window_before_minutes, status, user_id ON goals
+  FOR EACH ROW
+  WHEN (
+    OLD.reminder_times IS DISTINCT FROM NEW.reminder_times
+    OR OLD.reminder_window_before_minutes IS DISTINCT FROM NEW.reminder_window_before_minutes
+    OR OLD.status IS DISTINCT FROM NEW.status
+    OR OLD.user_id IS DISTINCT FROM NEW.user_id
+  )
+  EXECUTE FUNCTION trg_goal_reminder_slots_sync();
+
+-- Timezone change: recompute offset/utc_minute for all of the user's slots
+CREATE OR REPLACE FUNCTION trg_user_timezone_reminder_slots_sync()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_goal_id UUID;
+BEGIN
+  FOR v_goal_id IN
+    SELECT g.id FROM goals g WHERE g.user_id = NEW.id AND g.status = 'active'
+  LOOP
+    PERFORM rebuild_goal_reminder_slots(v_goal_id);
+  END LOOP;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_user_timezone_reminder_slots ON users;
+CREATE TRIGGER trg_user_timezone_reminder_slots
+  AFTER UPDATE OF timezone ON users
+  FOR EACH ROW
+  WHEN (OLD.timezone IS DISTINCT FROM NEW.timezone)
+  EXECUTE FUNCTION trg_user_timezone_reminder_slots_sync();
+
+-- =====================================================
+-- 5. DST SYNC
+-- =====================================================
+-- Compares each indexed timezone's current offset with the one its slots were
+-- computed for, and shifts utc_minute for timezones that changed.
+-- Returns the number of timezones updated (0 on almost every call).
+
+CREATE OR REPLACE FUNCTION sync_reminder_slot_offsets(p_now TIMESTAMPTZ DEFAULT NOW())
+RETURNS INTEGER AS $$
+DECLARE
+  rec RECORD;
+  v_updated INTEGER := 0;
+BEGIN
+  FOR rec IN
+    SELECT t.timezone, timezone_utc_offset_minutes(t.timezone, p_now) AS new_offset
+    FROM reminder_slot_timezones t
+  LOOP
+    CONTINUE WHEN rec.new_offset IS NULL;
+
+    IF EXISTS (
+      SELECT 1 FROM reminder_slot_timezones t
+      WHERE t.timezone = rec.timezone AND t.utc_offset_minutes <> rec.new_offset
+    ) THEN
+      UPDATE goal_reminder_slots s
+      SET utc_offset_minutes = rec.new_offset,
+          utc_minute = reminder_slot_utc_minute(s.slot_time, rec.new_offset)
+      WHERE s.timezone = rec.timezone;
+
+      UPDATE reminder_slot_timezones
+      SET utc_offset_minutes = rec.new_offset, updated_at = NOW()
+      WHERE timezone = rec.timezone;
+
+      v_updated := v_updated + 1;
+    END IF;
+  END LOOP;
+
+  RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- =====================================================
+-- 6. DUE SLOTS RPC (called every minute)
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION get_due_reminder_slots(p_now TIMESTAMPTZ DEFAULT NOW())
+RETURNS TABLE (
+  goal_id UUID,
+  user_id UUID,
+  slot_time TEXT,
+  timezone TEXT
+) AS $$
+DECLARE
+  v_utc_minute SMALLINT;
+BEGIN
+  PERFORM sync_reminder_slot_offsets(p_now);
+
+  v_utc_minute := (
+    EXTRACT(HOUR FROM (p_now AT TIME ZONE 'UTC')) * 60
+    + EXTRACT(MINUTE FROM (p_now AT TIME ZONE 'UTC'))
+  )::SMALLINT;
+
+  RETURN QUERY
+  SELECT s.goal_id, s.user_id, s.slot_time, s.timezone
+  FROM goal_reminder_slots s
+  JOIN users u ON u.id = s.user_id
+  WHERE s.utc_minute = v_utc_minute
+    AND u.status = 'active'
+    AND u.onboarding_completed_at IS NOT NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+COMMENT ON FUNCTION get_due_reminder_slots(TIMESTAMPTZ) IS
+  'Returns goal reminder slots due at the given UTC minute for active, onboarded users. Applies DST offset changes first.';
+
+GRANT EXECUTE ON FUNCTION get_due_reminder_slots(TIMESTAMPTZ) TO service_role;
+GRANT EXECUTE ON FUNCTION sync_reminder_slot_offsets(TIMESTAMPTZ) TO service_role;
+GRANT EXECUTE ON FUNCTION rebuild_goal_reminder_slots(UUID) TO service_role;
+
+-- =====================================================
+-- 7. BACKFILL
+-- =====================================================
+
+SELECT rebuild_goal_reminder_slots(g.id)
+FROM goals g
+WHERE g.status = 'active';
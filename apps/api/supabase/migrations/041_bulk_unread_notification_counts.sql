@@ -0,0 +1,28 @@
+-- =====================================================
+-- Bulk unread notification counts (app icon badge)
+-- =====================================================
+-- send_push_to_users_bulk_sync dispatches notifications for many users at once.
+-- The per-user path counts unread notification_history rows with one COUNT
+-- query per recipient; this RPC returns all badge counts for a batch in one call.
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_notification_history_user_unread
+  ON notification_history(user_id)
+  WHERE opened_at IS NULL;
+
+CREATE OR REPLACE FUNCTION get_unread_notification_counts(p_user_ids UUID[])
+RETURNS TABLE (
+  user_id UUID,
+  unread_count INTEGER
+) AS $$
+  SELECT nh.user_id, COUNT(*)::INTEGER AS unread_count
+  FROM notification_history nh
+  WHERE nh.user_id = ANY(p_user_ids)
+    AND nh.opened_at IS NULL
+  GROUP BY nh.user_id;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+COMMENT ON FUNCTION get_unread_notification_counts(UUID[]) IS
+  'Unread notification_history count per user for a batch of users (push badge). Users with 0 unread are omitted.';
+
+GRANT EXECUTE ON FUNCTION get_unread_notification_counts(UUID[]) TO service_role;
@@ -0,0 +1,39 @@
+-- =====================================================
+-- Bulk last_active_at updates (write-behind activity tracking)
+-- =====================================================
+-- The API records activity in Redis (app/core/user_activity.py) instead of
+-- updating users on the request path. The flush_user_activity Celery task
+-- drains those records every minute and applies them with this RPC in one
+-- statement per batch.
+--
+-- last_active_at only moves forward, so replayed or out-of-order batches
+-- never rewind it, and rows that are already newer are not rewritten.
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION bulk_touch_last_active(
+  p_user_ids UUID[],
+  p_active_at TIMESTAMPTZ[]
+)
+RETURNS INTEGER AS $$
+DECLARE
+  v_updated INTEGER;
+BEGIN
+  UPDATE users u
+  SET last_active_at = v.active_at
+  FROM (
+    SELECT a.user_id, MAX(a.active_at) AS active_at
+    FROM unnest(p_user_ids, p_active_at) AS a(user_id, active_at)
+    GROUP BY a.user_id
+  ) v
+  WHERE u.id = v.user_id
+    AND (u.last_active_at IS NULL OR u.last_active_at < v.active_at);
+
+  GET DIAGNOSTICS v_updated = ROW_COUNT;
+  RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+COMMENT ON FUNCTION bulk_touch_last_active(UUID[], TIMESTAMPTZ[]) IS
+  'Advance users.last_active_at from parallel (user_id, active_at) arrays; returns rows updated. Called by flush_user_activity.';
+
+GRANT EXECUTE ON FUNCTION bulk_touch_last_active(UUID[], TIMESTAMPTZ[]) TO service_role;
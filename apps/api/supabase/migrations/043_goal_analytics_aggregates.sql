@@ -0,0 +1,629 @@
+-- =============================================================================
+-- MIGRATION: Incremental per-goal analytics aggregates
+-- =============================================================================
+-- get_analytics_dashboard recomputed everything from raw check_ins on every
+-- cache miss, including a gaps-and-islands streak pass over every check-in
+-- since the goal was created. The dashboard now reads pre-aggregated rows that
+-- are maintained on every check-in write:
+--
+-- 1. daily_checkin_summaries (per goal/day, trg_sync_daily_checkin_summary)
+--    gains the day's status, mood and skip_reason, so heatmap, this-week,
+--    weekly consistency, skip reasons, mood and monthly trend read <= 1 row
+--    per day in range.
+-- 2. goal_weekly_summaries (new, per goal/week) holds completed days and the
+--    longest completed/rest_day run in the week (days since the goal's
+--    created_at only), recomputed from that week's <= 7 daily rows whenever
+--    one of them changes. streak_history reads 12 rows.
+--
+-- Both are updated by the existing row trigger on check_ins, so check-in
+-- create/update/delete and the missed-check-in batch (mark_missed_checkins
+-- updates rows pending -> missed) keep them current. Pending check-ins have no
+-- summary row; the dashboard reads the few recent pending rows from check_ins.
+--
+-- The analytics.* materialized views refreshed hourly by refresh_analytics_views
+-- are not read by any endpoint or RPC; the hourly beat entry is retired (the
+-- function and task remain for manual refreshes).
+-- =============================================================================
+
+-- =============================================================================
+-- 1. Daily summaries: day status, mood, skip reason
+-- =============================================================================
+
+ALTER TABLE daily_checkin_summaries
+    ADD COLUMN IF NOT EXISTS status TEXT,
+    ADD COLUMN IF NOT EXISTS mood TEXT,
+    ADD COLUMN IF NOT EXISTS skip_reason TEXT;
+
+-- =============================================================================
+-- 2. Weekly summaries
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS goal_weekly_summaries (
+    goal_id UUID NOT NULL REFERENCES goals(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    week_start DATE NOT NULL,  -- DATE_TRUNC('week'), Monday
+    completed_days INTEGER NOT NULL DEFAULT 0,  -- completed or rest_day
+    max_streak INTEGER NOT NULL DEFAULT 0,  -- longest consecutive completed/rest_day run in the week
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (goal_id, week_start)
+);
+
+CREATE INDEX IF NOT EXISTS idx_goal_weekly_summaries_user
+    ON goal_weekly_summaries(user_id, goal_id, week_start DESC);
+
+ALTER TABLE goal_weekly_summaries ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS goal_weekly_summaries_select_own ON goal_weekly_summaries;
+CREATE POLICY goal_weekly_summaries_select_own ON goal_weekly_summaries
+  FOR SELECT TO authenticated
+  USING (user_id = get_user_id_from_auth());
+
+COMMENT ON TABLE goal_weekly_summaries IS
+  'Per-goal weekly aggregates for analytics (streak history). Maintained by recalculate_goal_weekly_summary from daily_checkin_summaries.';
+
+CREATE OR REPLACE FUNCTION recalculate_goal_weekly_summary(
+    p_user_id UUID,
+    p_goal_id UUID,
+    p_week_start DATE
+) RETURNS VOID AS $$
+DECLARE
+    v_completed INTEGER;
+    v_max_streak INTEGER;
+BEGIN
+    IF p_goal_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    -- Gaps-and-islands over this week's daily rows only (<= 7); days before the
+    -- goal was created don't count (back-dated check-ins)
+    SELECT COALESCE(SUM(run_len), 0), COALESCE(MAX(run_len), 0)
+    INTO v_completed, v_max_streak
+    FROM (
+        SELECT COUNT(*) as run_len
+        FROM (
+            SELECT summary_date,
+                summary_date - (ROW_NUMBER() OVER (ORDER BY summary_date))::INT as grp
+            FROM daily_checkin_summaries
+            WHERE goal_id = p_goal_id
+              AND user_id = p_user_id
+              AND summary_date >= p_week_start
+              AND summary_date < p_week_start + 7
+              AND summary_date >= (SELECT created_at::DATE FROM goals WHERE id = p_goal_id)
+              AND status IN ('completed', 'rest_day')
+        ) days
+        GROUP BY grp
+    ) runs;
+
+    IF v_completed > 0 THEN
+        INSERT INTO goal_weekly_summaries (
+            goal_id, user_id, week_start, completed_days, max_streak, updated_at
+        ) VALUES (
+            p_goal_id, p_user_id, p_week_start, v_completed, v_max_streak, NOW()
+        )
+        ON CONFLICT (goal_id, week_start) DO UPDATE SET
+            completed_days = v_completed,
+            max_streak = v_max_streak,
+            updated_at = NOW();
+    ELSE
+        DELETE FROM goal_weekly_summaries
+        WHERE goal_id = p_goal_id
+          AND week_start = p_week_start;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION recalculate_goal_weekly_summary(UUID, UUID, DATE) IS
+  'Recomputes one goal_weekly_summaries row from that week''s daily_checkin_summaries. Called by recalculate_daily_checkin_summary.';
+
+-- =============================================================================
+-- 3. recalculate_daily_checkin_summary (from 023): also store status/mood/
+--    skip_reason and refresh the week's aggregate
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION recalculate_daily_checkin_summary(
+    p_user_id UUID,
+    p_goal_id UUID,
+    p_date DATE
+) RETURNS VOID AS $$
+DECLARE
+    v_total INTEGER;
+    v_completed INTEGER;
+    v_rest_day INTEGER;
+    v_skipped INTEGER;
+    v_streak INTEGER;
+    v_status TEXT;
+    v_mood TEXT;
+    v_skip_reason TEXT;
+BEGIN
+    IF p_goal_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    -- Count check-ins by status (exclude pending)
+    SELECT 
+        COUNT(*) FILTER (WHERE status != 'pending'),
+        COUNT(*) FILTER (WHERE status = 'completed'),
+        COUNT(*) FILTER (WHERE status = 'rest_day'),
+        COUNT(*) FILTER (WHERE status IN ('skipped', 'missed'))
+    INTO v_total, v_completed, v_rest_day, v_skipped
+    FROM check_ins
+    WHERE user_id = p_user_id 
+      AND goal_id = p_goal_id 
+      AND check_in_date = p_date;
+
+    -- Day status/mood/skip reason (one check-in per goal/day; prefer the best status)
+    SELECT status, mood, skip_reason
+    INTO v_status, v_mood, v_skip_reason
+    FROM check_ins
+    WHERE user_id = p_user_id 
+      AND goal_id = p_goal_id 
+      AND check_in_date = p_date
+      AND status != 'pending'
+    ORDER BY CASE status
+        WHEN 'completed' THEN 0 WHEN 'rest_day' THEN 1 WHEN 'skipped' THEN 2 ELSE 3
+    END
+    LIMIT 1;
+
+    -- Get current streak from goal
+    SELECT COALESCE(current_streak, 0) INTO v_streak
+    FROM goals 
+    WHERE id = p_goal_id;
+
+    IF v_total > 0 THEN
+        INSERT INTO daily_checkin_summaries (
+            user_id, goal_id, summary_date,
+            total_check_ins, completed_count, rest_day_count, skipped_count, streak_at_date,
+            status, mood, skip_reason,
+            created_at, updated_at
+        ) VALUES (
+            p_user_id, p_goal_id, p_date,
+            v_total, v_completed, v_rest_day, v_skipped, v_streak,
+            v_status, v_mood, v_skip_reason,
+            NOW(), NOW()
+        )
+        ON CONFLICT (user_id, goal_id, summary_date) DO UPDATE SET
+            total_check_ins = v_total,
+            completed_count = v_completed,
+            rest_day_count = v_rest_day,
+            skipped_count = v_skipped,
+            streak_at_date = v_streak,
+            status = v_status,
+            mood = v_mood,
+            skip_reason = v_skip_reason,
+            updated_at = NOW();
+    ELSE
+        DELETE FROM daily_checkin_summaries
+        WHERE user_id = p_user_id 
+          AND goal_id = p_goal_id 
+          AND summary_date = p_date;
+    END IF;
+
+    PERFORM recalculate_goal_weekly_summary(
+        p_user_id, p_goal_id, DATE_TRUNC('week', p_date)::DATE
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- =============================================================================
+-- 4. Backfill
+-- =============================================================================
+
+UPDATE daily_checkin_summaries s
+SET status = ci.status,
+    mood = ci.mood,
+    skip_reason = ci.skip_reason
+FROM check_ins ci
+WHERE ci.user_id = s.user_id
+  AND ci.goal_id = s.goal_id
+  AND ci.check_in_date = s.summary_date
+  AND ci.status != 'pending';
+
+INSERT INTO goal_weekly_summaries (goal_id, user_id, week_start, completed_days, max_streak, updated_at)
+SELECT goal_id, user_id, week_start, SUM(run_len)::INT, MAX(run_len)::INT, NOW()
+FROM (
+    SELECT goal_id, user_id, week_start, COUNT(*) as run_len
+    FROM (
+        SELECT s.goal_id, s.user_id,
+            DATE_TRUNC('week', s.summary_date)::DATE as week_start,
+            s.summary_date - (ROW_NUMBER() OVER (
+                PARTITION BY s.goal_id, DATE_TRUNC('week', s.summary_date)
+                ORDER BY s.summary_date
+            ))::INT as grp
+        FROM daily_checkin_summaries s
+        JOIN goals g ON g.id = s.goal_id
+        WHERE s.summary_date >= g.created_at::DATE
+          AND s.status IN ('completed', 'rest_day')
+    ) days
+    GROUP BY goal_id, user_id, week_start, grp
+) runs
+GROUP BY goal_id, user_id, week_start
+ON CONFLICT (goal_id, week_start) DO UPDATE SET
+    completed_days = EXCLUDED.completed_days,
+    max_streak = EXCLUDED.max_streak,
+    updated_at = NOW();
+
+-- =============================================================================
+-- 5. get_analytics_dashboard: read the aggregates
+-- =============================================================================
+-- Same JSON shape as 030. Reads at most (p_days + 1) daily summary rows, a
+-- handful of pending check-ins and 12 weekly rows.
+
+CREATE OR REPLACE FUNCTION get_analytics_dashboard(
+    p_user_id UUID,
+    p_goal_id UUID,
+    p_days INT DEFAULT 30,
+    p_end_date DATE DEFAULT NULL
+)
+RETURNS JSON
+LANGUAGE sql
+SECURITY DEFINER
+STABLE
+PARALLEL SAFE
+AS $$
+WITH
+effective_end AS (
+    SELECT COALESCE(p_end_date, CURRENT_DATE)::DATE as end_date
+),
+date_range AS (
+    SELECT 
+        GREATEST(
+            (SELECT created_at::DATE FROM goals WHERE id = p_goal_id),
+            (SELECT end_date FROM effective_end) - p_days
+        ) as start_date,
+        (SELECT end_date FROM effective_end) as end_date
+),
+
+goal_info AS (
+    SELECT 
+        id,
+        title,
+        current_streak,
+        longest_streak,
+        frequency_type,
+        frequency_count,
+        target_days,
+        created_at
+    FROM goals
+    WHERE id = p_goal_id
+      AND user_id = p_user_id
+      AND status = 'active'
+),
+
+-- Per-day rows for the window the dashboard reads (range, this week, mood trend):
+-- finalized days from daily_checkin_summaries (kept current by trg_sync_daily_checkin_summary)
+-- plus today's/recent pending check-ins (pending days have no summary row).
+day_rows AS (
+    SELECT 
+        s.summary_date as check_in_date,
+        s.status,
+        s.mood,
+        s.skip_reason
+    FROM daily_checkin_summaries s
+    WHERE s.goal_id = p_goal_id
+      AND s.user_id = p_user_id
+      AND s.summary_date >= LEAST(
+            (SELECT start_date FROM date_range),
+            (SELECT end_date FROM effective_end) - 14
+          )
+      AND s.summary_date <= (SELECT end_date FROM effective_end)
+    UNION ALL
+    SELECT 
+        ci.check_in_date,
+        ci.status,
+        ci.mood,
+        ci.skip_reason
+    FROM check_ins ci
+    WHERE ci.goal_id = p_goal_id
+      AND ci.user_id = p_user_id
+      AND ci.status = 'pending'
+      AND ci.check_in_date >= LEAST(
+            (SELECT start_date FROM date_range),
+            (SELECT end_date FROM effective_end) - 6
+          )
+      AND ci.check_in_date <= (SELECT end_date FROM effective_end)
+),
+
+goal_checkins AS (
+    SELECT 
+        d.check_in_date,
+        d.status,
+        d.mood,
+        d.skip_reason,
+        EXTRACT(DOW FROM d.check_in_date)::INT as day_of_week
+    FROM day_rows d
+    WHERE d.check_in_date >= (SELECT start_date FROM date_range)
+      AND d.check_in_date <= (SELECT end_date FROM date_range)
+      AND d.status != 'pending'
+),
+
+heatmap_all_dates AS (
+    SELECT generate_series(
+        (SELECT start_date FROM date_range),
+        (SELECT end_date FROM date_range),
+        '1 day'::INTERVAL
+    )::DATE as day_date
+),
+
+heatmap_with_checkins AS (
+    SELECT 
+        d.day_date,
+        ci.status as checkin_status,
+        EXTRACT(DOW FROM d.day_date)::INT as day_of_week,
+        (SELECT frequency_type FROM goal_info) as frequency_type,
+        (SELECT target_days FROM goal_info) as target_days,
+        (SELECT created_at::DATE FROM goal_info) as goal_created_at
+    FROM heatmap_all_dates d
+    LEFT JOIN day_rows ci ON ci.check_in_date = d.day_date
+),
+
+heatmap_data AS (
+    SELECT 
+        h.day_date::TEXT as date,
+        CASE 
+            WHEN h.day_date < h.goal_created_at THEN 'no_data'
+            WHEN h.checkin_status IS NOT NULL THEN h.checkin_status
+            ELSE 
+                CASE 
+                    WHEN h.frequency_type = 'daily' THEN 'missed'
+                    WHEN h.frequency_type = 'weekly' THEN
+                        CASE 
+                            WHEN h.target_days IS NULL OR h.target_days = '{}'::INTEGER[] THEN 'missed'
+                            WHEN h.day_of_week = ANY(h.target_days) THEN 'missed'
+                            ELSE 'not_scheduled'
+                        END
+                    ELSE 'not_scheduled'
+                END
+        END as status,
+        CASE 
+            WHEN h.checkin_status = 'completed' THEN 4
+            WHEN h.checkin_status = 'rest_day' THEN 3
+            WHEN h.checkin_status IN ('skipped', 'missed') THEN 0
+            WHEN h.checkin_status = 'pending' THEN 2
+            WHEN h.checkin_status IS NULL AND (
+                h.frequency_type = 'daily'
+                OR (h.frequency_type = 'weekly' AND (
+                    h.target_days IS NULL OR h.target_days = '{}'::INTEGER[] OR h.day_of_week = ANY(h.target_days)
+                ))
+            ) THEN 0
+            ELSE 1
+        END as intensity
+    FROM heatmap_with_checkins h
+    ORDER BY h.day_date
+),
+
+this_week_days AS (
+    SELECT generate_series(
+        (SELECT end_date FROM effective_end) - 6,
+        (SELECT end_date FROM effective_end),
+        '1 day'::INTERVAL
+    )::DATE as day_date
+),
+
+this_week_checkins AS (
+    SELECT d.check_in_date, d.status
+    FROM day_rows d
+    WHERE d.check_in_date >= (SELECT end_date FROM effective_end) - 6
+      AND d.check_in_date <= (SELECT end_date FROM effective_end)
+),
+
+this_week_summary AS (
+    SELECT 
+        d.day_date::TEXT as date,
+        TO_CHAR(d.day_date, 'Dy') as day_name,
+        EXTRACT(DOW FROM d.day_date)::INT as day_of_week,
+        CASE 
+            WHEN d.day_date < (SELECT created_at::DATE FROM goal_info) THEN 'no_data'
+            WHEN c.status IS NOT NULL THEN c.status
+            ELSE 
+                CASE 
+                    WHEN (SELECT frequency_type FROM goal_info) = 'daily' THEN 'missed'
+                    WHEN (SELECT frequency_type FROM goal_info) = 'weekly' THEN
+                        CASE 
+                            WHEN (SELECT target_days FROM goal_info) IS NULL 
+                                 OR (SELECT target_days FROM goal_info) = '{}'::INTEGER[] THEN 'missed'
+                            WHEN EXTRACT(DOW FROM d.day_date)::INT IN (
+                                SELECT UNNEST((SELECT target_days FROM goal_info))
+                            ) THEN 'missed'
+                            ELSE 'not_scheduled'
+                        END
+                    ELSE 'not_scheduled'
+                END
+        END as status
+    FROM this_week_days d
+    LEFT JOIN this_week_checkins c ON c.check_in_date = d.day_date
+    ORDER BY d.day_date
+),
+
+-- Schedule-aware: one row per scheduled day in range with effective status
+-- (from check-in or 'missed'). Off-days excluded; only scheduled days count for rate.
+schedule_aware_days AS (
+    SELECT 
+        h.day_date,
+        h.day_of_week,
+        CASE 
+            WHEN h.checkin_status IS NOT NULL THEN h.checkin_status
+            WHEN h.frequency_type = 'daily' THEN 'missed'
+            WHEN h.frequency_type = 'weekly' AND (
+                h.target_days IS NULL OR h.target_days = '{}'::INTEGER[] OR h.day_of_week = ANY(h.target_days)
+            ) THEN 'missed'
+            ELSE NULL
+        END as status
+    FROM heatmap_with_checkins h
+    WHERE h.day_date >= h.goal_created_at
+      AND (
+        h.frequency_type = 'daily'
+        OR (h.frequency_type = 'weekly' AND (
+            h.target_days IS NULL OR h.target_days = '{}'::INTEGER[] OR h.day_of_week = ANY(h.target_days)
+        ))
+      )
+),
+
+-- Summary from scheduled days only: completion_rate = completed/rest_day over scheduled_days (off-days not in rate)
+schedule_aware_summary AS (
+    SELECT 
+        COUNT(*)::INT as total_check_ins,
+        COUNT(*) FILTER (WHERE status IN ('completed', 'rest_day'))::INT as completed_check_ins,
+        CASE 
+            WHEN COUNT(*) > 0 
+            THEN ROUND((COUNT(*) FILTER (WHERE status IN ('completed', 'rest_day'))::NUMERIC / COUNT(*)) * 100, 1)
+            ELSE 0 
+        END as completion_rate
+    FROM schedule_aware_days
+),
+
+weekly_consistency AS (
+    SELECT 
+        CASE day_of_week
+            WHEN 0 THEN 'Sun' WHEN 1 THEN 'Mon' WHEN 2 THEN 'Tue' WHEN 3 THEN 'Wed'
+            WHEN 4 THEN 'Thu' WHEN 5 THEN 'Fri' WHEN 6 THEN 'Sat'
+        END as day,
+        day_of_week as day_index,
+        COUNT(*)::INT as total,
+        COUNT(*) FILTER (WHERE status IN ('completed', 'rest_day'))::INT as completed,
+        CASE 
+            WHEN COUNT(*) > 0 
+            THEN ROUND((COUNT(*) FILTER (WHERE status IN ('completed', 'rest_day'))::NUMERIC / COUNT(*)) * 100)::INT
+            ELSE 0 
+        END as percentage,
+        CASE day_of_week WHEN 0 THEN 7 ELSE day_of_week END as day_order
+    FROM schedule_aware_days
+    WHERE status IS NOT NULL
+    GROUP BY day_of_week
+    ORDER BY day_order
+),
+
+goal_creation_week AS (
+    SELECT DATE_TRUNC('week', (SELECT created_at::DATE FROM goal_info))::DATE as start_week
+),
+
+all_goal_weeks AS (
+    SELECT 
+        ROW_NUMBER() OVER (ORDER BY week_start) as week_num,
+        week_start::DATE,
+        (week_start + INTERVAL '6 days')::DATE as week_end
+    FROM (
+        SELECT generate_series(
+            (SELECT start_week FROM goal_creation_week),
+            DATE_TRUNC('week', (SELECT end_date FROM effective_end))::DATE,
+            '1 week'::INTERVAL
+        )::DATE as week_start
+    ) weeks
+),
+
+weeks AS (
+    SELECT * FROM all_goal_weeks
+    ORDER BY week_num DESC
+    LIMIT 12
+),
+
+-- Max streak per week from goal_weekly_summaries (one row per week, maintained
+-- incrementally) instead of a gaps-and-islands pass over every check-in since creation.
+streak_history AS (
+    SELECT 
+        'W' || w.week_num as week,
+        w.week_start::TEXT as week_start,
+        COALESCE(ws.max_streak, 0)::INT as max_streak
+    FROM weeks w
+    LEFT JOIN goal_weekly_summaries ws
+        ON ws.goal_id = p_goal_id
+        AND ws.user_id = p_user_id
+        AND ws.week_start = w.week_start
+    ORDER BY w.week_num
+),
+
+-- Mood trend: last 14 days only (avoids fetching 30/90/180 days when chart can't show that many).
+mood_trend AS (
+    SELECT 
+        d.check_in_date::TEXT as date,
+        d.mood,
+        CASE d.mood WHEN 'amazing' THEN 3 WHEN 'good' THEN 2 WHEN 'tough' THEN 1 ELSE NULL END as mood_score,
+        TO_CHAR(d.check_in_date, 'Mon DD') as label
+    FROM day_rows d
+    WHERE d.mood IS NOT NULL
+      AND d.check_in_date >= GREATEST((SELECT created_at::DATE FROM goal_info), (SELECT end_date FROM effective_end) - 14)
+      AND d.check_in_date <= (SELECT end_date FROM effective_end)
+    ORDER BY d.check_in_date
+),
+
+skip_totals AS (
+    SELECT 
+        COUNT(*) FILTER (WHERE skip_reason = 'work') as work,
+        COUNT(*) FILTER (WHERE skip_reason = 'tired') as tired,
+        COUNT(*) FILTER (WHERE skip_reason = 'sick') as sick,
+        COUNT(*) FILTER (WHERE skip_reason = 'schedule') as schedule,
+        COUNT(*) FILTER (WHERE skip_reason = 'other' OR skip_reason IS NULL) as other,
+        COUNT(*) as total_skipped
+    FROM goal_checkins
+    WHERE status = 'skipped'
+),
+
+skip_reasons AS (
+    SELECT reason, label, count,
+        CASE WHEN (SELECT total_skipped FROM skip_totals) > 0 
+             THEN ROUND((count::NUMERIC / (SELECT total_skipped FROM skip_totals)) * 100)::INT
+             ELSE 0 END as percentage,
+        color
+    FROM (
+        SELECT 'work' as reason, 'Work' as label, (SELECT work FROM skip_totals)::INT as count, '#FF6B6B' as color
+        UNION ALL SELECT 'tired', 'Tired', (SELECT tired FROM skip_totals)::INT, '#4ECDC4'
+        UNION ALL SELECT 'sick', 'Sick', (SELECT sick FROM skip_totals)::INT, '#9B59B6'
+        UNION ALL SELECT 'schedule', 'Schedule', (SELECT schedule FROM skip_totals)::INT, '#F39C12'
+        UNION ALL SELECT 'other', 'Other', (SELECT other FROM skip_totals)::INT, '#95A5A6'
+    ) reasons
+    WHERE count > 0
+    ORDER BY count DESC
+),
+
+months AS (
+    SELECT generate_series(
+        GREATEST(
+            DATE_TRUNC('month', (SELECT start_date FROM date_range)),
+            DATE_TRUNC('month', (SELECT end_date FROM effective_end) - INTERVAL '5 months')
+        ),
+        DATE_TRUNC('month', (SELECT end_date FROM effective_end)),
+        '1 month'::INTERVAL
+    )::DATE as month_date
+),
+
+monthly_trend AS (
+    SELECT 
+        TO_CHAR(m.month_date, 'Mon') as month,
+        (EXTRACT(MONTH FROM m.month_date)::INT - 1) as month_index,
+        EXTRACT(YEAR FROM m.month_date)::INT as year,
+        COALESCE(COUNT(gc.check_in_date), 0)::INT as total,
+        COALESCE(COUNT(gc.check_in_date) FILTER (WHERE gc.status IN ('completed', 'rest_day')), 0)::INT as completed,
+        CASE WHEN COUNT(gc.check_in_date) > 0 
+             THEN ROUND((COUNT(gc.check_in_date) FILTER (WHERE gc.status IN ('completed', 'rest_day'))::NUMERIC / COUNT(gc.check_in_date)) * 100)::INT
+             ELSE 0 END as percentage
+    FROM months m
+    LEFT JOIN goal_checkins gc ON DATE_TRUNC('month', gc.check_in_date) = m.month_date
+    GROUP BY m.month_date
+    ORDER BY m.month_date
+)
+
+SELECT json_build_object(
+    'goal_id', (SELECT id FROM goal_info),
+    'goal_title', (SELECT title FROM goal_info),
+    'goal_created_at', (SELECT created_at::DATE::TEXT FROM goal_info),
+    'target_days', (SELECT target_days FROM goal_info),
+    'frequency_type', (SELECT frequency_type FROM goal_info),
+    'total_check_ins', (SELECT total_check_ins FROM schedule_aware_summary),
+    'completed_check_ins', (SELECT completed_check_ins FROM schedule_aware_summary),
+    'completion_rate', (SELECT completion_rate FROM schedule_aware_summary),
+    'current_streak', COALESCE((SELECT current_streak FROM goal_info), 0),
+    'longest_streak', COALESCE((SELECT longest_streak FROM goal_info), 0),
+    'heatmap_data', COALESCE((SELECT json_agg(row_to_json(h)) FROM heatmap_data h), '[]'::json),
+    'this_week_summary', COALESCE((SELECT json_agg(row_to_json(tw)) FROM this_week_summary tw), '[]'::json),
+    'weekly_consistency', COALESCE((SELECT json_agg(row_to_json(w)) FROM weekly_consistency w), '[]'::json),
+    'streak_history', COALESCE((SELECT json_agg(row_to_json(s)) FROM streak_history s), '[]'::json),
+    'monthly_trend', COALESCE((SELECT json_agg(row_to_json(m)) FROM monthly_trend m), '[]'::json),
+    'skip_reasons', COALESCE((SELECT json_agg(row_to_json(r)) FROM skip_reasons r), '[]'::json),
+    'mood_trend', COALESCE((SELECT json_agg(row_to_json(mt)) FROM mood_trend mt), '[]'::json),
+    'data_range_days', p_days,
+    'generated_at', NOW()::TEXT,
+    'cache_hint', 'per_goal'
+);
+$$;
+
+COMMENT ON FUNCTION get_analytics_dashboard(UUID, UUID, INT, DATE) IS
+  'Per-goal analytics dashboard assembled from daily_checkin_summaries and goal_weekly_summaries (incrementally maintained on check-in writes).';
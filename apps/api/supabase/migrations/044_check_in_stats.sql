@@ -0,0 +1,82 @@
+-- =====================================================
+-- Check-in stats RPC (GET /check-ins/stats)
+-- =====================================================
+-- The endpoint used to select every check-in the user ever made and compute
+-- totals, streaks and 7/30-day counts in Python: O(lifetime check-ins) rows
+-- over the wire, silently truncated at the PostgREST row cap. This RPC does
+-- the same work in one aggregate pass and returns a single row.
+--
+-- Semantics (unchanged from the endpoint):
+-- - total_checkins excludes pending; completion_rate = completed / total (%).
+-- - Streaks run over distinct dates with a completed check-in (across all of
+--   the user's goals unless p_goal_id is given). current_streak is the run
+--   ending at the most recent completed date.
+-- - checkins_last_7d / _30d count completed check-ins on or after
+--   p_today - 7 / p_today - 30.
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION get_check_in_stats(
+  p_user_id UUID,
+  p_goal_id UUID DEFAULT NULL,
+  p_today DATE DEFAULT CURRENT_DATE
+)
+RETURNS TABLE (
+  total_checkins INTEGER,
+  completed_checkins INTEGER,
+  completion_rate NUMERIC,
+  current_streak INTEGER,
+  longest_streak INTEGER,
+  checkins_last_7d INTEGER,
+  checkins_last_30d INTEGER
+) AS $$
+WITH scoped AS (
+  SELECT ci.check_in_date, ci.status
+  FROM check_ins ci
+  WHERE ci.user_id = p_user_id
+    AND (p_goal_id IS NULL OR ci.goal_id = p_goal_id)
+),
+totals AS (
+  SELECT
+    COUNT(*) FILTER (WHERE status <> 'pending')::INTEGER AS total,
+    COUNT(*) FILTER (WHERE status = 'completed')::INTEGER AS completed,
+    COUNT(*) FILTER (
+      WHERE status = 'completed' AND check_in_date >= p_today - 7
+    )::INTEGER AS last_7d,
+    COUNT(*) FILTER (
+      WHERE status = 'completed' AND check_in_date >= p_today - 30
+    )::INTEGER AS last_30d
+  FROM scoped
+),
+completed_days AS (
+  SELECT DISTINCT check_in_date
+  FROM scoped
+  WHERE status = 'completed'
+),
+-- Gaps and islands: consecutive dates share date - row_number
+runs AS (
+  SELECT
+    MAX(check_in_date) AS run_end,
+    COUNT(*)::INTEGER AS run_length
+  FROM (
+    SELECT
+      check_in_date,
+      check_in_date - (ROW_NUMBER() OVER (ORDER BY check_in_date))::INTEGER AS grp
+    FROM completed_days
+  ) d
+  GROUP BY grp
+)
+SELECT
+  t.total,
+  t.completed,
+  CASE WHEN t.total > 0 THEN ROUND(t.completed::NUMERIC / t.total * 100, 1) ELSE 0 END,
+  COALESCE((SELECT run_length FROM runs ORDER BY run_end DESC LIMIT 1), 0),
+  COALESCE((SELECT MAX(run_length) FROM runs), 0),
+  t.last_7d,
+  t.last_30d
+FROM totals t;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+COMMENT ON FUNCTION get_check_in_stats(UUID, UUID, DATE) IS
+  'Totals, completion rate, current/longest streak and 7/30-day completed counts for a user (optionally one goal) in one row. Used by GET /check-ins/stats.';
+
+GRANT EXECUTE ON FUNCTION get_check_in_stats(UUID, UUID, DATE) TO service_role;
@@ -0,0 +1,142 @@
+-- =====================================================
+-- Partner matching vectors
+-- =====================================================
+-- GET /partners/suggested used to score an arbitrary 100 users (no ordering)
+-- with per-candidate Python scoring, so suggestion quality depended on which
+-- rows PostgREST returned. It now ranks the whole eligible population from a
+-- compact per-user vector (app/services/partner_match_index.py):
+--
+-- - category_mask: bitset of goal categories from extract_goal_categories
+--   (bit order = partner_matching_service.MATCH_CATEGORIES)
+-- - frequency_mask: bit 0 = has daily goals, bit 1 = has weekly goals
+-- - utc_offset_minutes: users.timezone offset when the row was built
+-- - max_streak: best current_streak across active goals
+-- - goal_titles: up to 5 active goal titles (fuzzy title matching)
+-- - eligible: active, role 'user', onboarded and at least one active goal
+--
+-- Vectors are built in Python (keyword categories live there). Triggers mark
+-- users dirty when their goals or matching-relevant profile fields change;
+-- the refresh_partner_match_vectors task claims dirty users every minute and
+-- upserts their rows.
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS partner_match_vectors (
+  user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+  category_mask INTEGER NOT NULL DEFAULT 0,
+  frequency_mask SMALLINT NOT NULL DEFAULT 0,
+  utc_offset_minutes INTEGER NOT NULL DEFAULT 0,
+  max_streak INTEGER NOT NULL DEFAULT 0,
+  goal_titles TEXT[] NOT NULL DEFAULT ARRAY[]::TEXT[],
+  eligible BOOLEAN NOT NULL DEFAULT FALSE,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- The index loader reads eligible rows in user_id pages, then rows changed
+-- since its last load
+CREATE INDEX IF NOT EXISTS idx_partner_match_vectors_eligible
+  ON partner_match_vectors(user_id) WHERE eligible;
+CREATE INDEX IF NOT EXISTS idx_partner_match_vectors_updated_at
+  ON partner_match_vectors(updated_at);
+
+CREATE TABLE IF NOT EXISTS partner_match_dirty (
+  user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+  marked_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Service role only (no client access)
+ALTER TABLE partner_match_vectors ENABLE ROW LEVEL SECURITY;
+ALTER TABLE partner_match_dirty ENABLE ROW LEVEL SECURITY;
+
+-- =====================================================
+-- Dirty marking
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION mark_partner_match_dirty()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_user_id UUID;
+BEGIN
+  IF TG_TABLE_NAME = 'users' THEN
+    v_user_id := NEW.id;
+  ELSIF TG_OP = 'DELETE' THEN
+    v_user_id := OLD.user_id;
+  ELSE
+    v_user_id := NEW.user_id;
+  END IF;
+
+  -- Goal deletes cascade from user deletes; the user row may already be gone
+  INSERT INTO partner_match_dirty (user_id)
+  SELECT v_user_id
+  WHERE EXISTS (SELECT 1 FROM users WHERE id = v_user_id)
+  ON CONFLICT (user_id) DO NOTHING;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_goals_partner_match_dirty ON goals;
+CREATE TRIGGER trg_goals_partner_match_dirty
+  AFTER INSERT OR DELETE OR UPDATE OF title, frequency_type, status, current_streak
+  ON goals
+  FOR EACH ROW
+  EXECUTE FUNCTION mark_partner_match_dirty();
+
+DROP TRIGGER IF EXISTS trg_users_partner_match_dirty ON users;
+CREATE TRIGGER trg_users_partner_match_dirty
+  AFTER UPDATE OF timezone, status, role, onboarding_completed_at
+  ON users
+  FOR EACH ROW
+  WHEN (
+    OLD.timezone IS DISTINCT FROM NEW.timezone
+    OR OLD.status IS DISTINCT FROM NEW.status
+    OR OLD.role IS DISTINCT FROM NEW.role
+    OR OLD.onboarding_completed_at IS DISTINCT FROM NEW.onboarding_completed_at
+  )
+  EXECUTE FUNCTION mark_partner_match_dirty();
+
+-- =====================================================
+-- Claim a batch of dirty users (removes them from the queue)
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION claim_partner_match_dirty(p_limit INTEGER DEFAULT 500)
+RETURNS SETOF UUID AS $$
+  DELETE FROM partner_match_dirty d
+  WHERE d.user_id IN (
+    SELECT user_id
+    FROM partner_match_dirty
+    ORDER BY marked_at
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING d.user_id;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+COMMENT ON FUNCTION claim_partner_match_dirty(INTEGER) IS
+  'Pop up to p_limit users whose partner matching vector must be rebuilt. Used by refresh_partner_match_vectors.';
+
+GRANT EXECUTE ON FUNCTION claim_partner_match_dirty(INTEGER) TO service_role;
+
+-- =====================================================
+-- Mark every user dirty (backfill, and weekly so UTC offsets follow DST)
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION mark_all_partner_match_dirty()
+RETURNS INTEGER AS $$
+DECLARE
+  v_marked INTEGER;
+BEGIN
+  INSERT INTO partner_match_dirty (user_id)
+  SELECT id FROM users
+  ON CONFLICT (user_id) DO NOTHING;
+
+  GET DIAGNOSTICS v_marked = ROW_COUNT;
+  RETURN v_marked;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+COMMENT ON FUNCTION mark_all_partner_match_dirty() IS
+  'Queue every user for a partner matching vector rebuild; returns users newly queued.';
+
+GRANT EXECUTE ON FUNCTION mark_all_partner_match_dirty() TO service_role;
+
+SELECT mark_all_partner_match_dirty();
@@ -0,0 +1,166 @@
+-- =====================================================
+-- Trigram user search (GET /partners/search, GET /users/search)
+-- =====================================================
+-- Both endpoints used or_(name.ilike.%q%, username.ilike.%q%) with
+-- count="exact": a sequential scan of users plus a second full count scan on
+-- every keystroke, then a separate accountability_partners lookup.
+--
+-- - GIN pg_trgm indexes serve the substring ILIKE filters.
+-- - search_users() ranks matches and joins the searcher's partnership
+--   status in the same query, with keyset pagination on (rank, id).
+-- - count_user_search() is only called when a client asks for an exact total.
+--
+-- Ranking: exact username, then username / name prefix, then trigram
+-- similarity. rank is rounded to NUMERIC so it round-trips through the
+-- cursor exactly.
+-- =====================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_users_username_trgm
+  ON users USING gin (username gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_name_trgm
+  ON users USING gin (name gin_trgm_ops);
+
+-- LIKE pattern with %, _ and \ in the query matched literally
+CREATE OR REPLACE FUNCTION user_search_pattern(p_query TEXT)
+RETURNS TEXT AS $$
+  SELECT '%' || replace(replace(replace(lower(btrim(p_query)), '\', '\\'), '%', '\%'), '_', '\_') || '%';
+$$ LANGUAGE sql IMMUTABLE;
+
+-- =====================================================
+-- Ranked search with partnership status
+-- =====================================================
+-- p_partners_only: partner discovery filters (role 'user', onboarded) and
+--   hides users blocked in either direction.
+-- p_username_only: match usernames only (in-app invites).
+-- Next page: pass the last row's (rank, id) as p_after_rank / p_after_id.
+--   p_offset is kept for clients that still page by number.
+
+CREATE OR REPLACE FUNCTION search_users(
+  p_user_id UUID,
+  p_query TEXT,
+  p_limit INTEGER DEFAULT 20,
+  p_after_rank NUMERIC DEFAULT NULL,
+  p_after_id UUID DEFAULT NULL,
+  p_offset INTEGER DEFAULT 0,
+  p_partners_only BOOLEAN DEFAULT TRUE,
+  p_username_only BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+  id UUID,
+  name TEXT,
+  username TEXT,
+  profile_picture_url TEXT,
+  last_active_at TIMESTAMPTZ,
+  rank NUMERIC,
+  partnership_id UUID,
+  partnership_status TEXT,
+  initiated_by_user_id UUID
+) AS $$
+WITH matches AS (
+  SELECT
+    u.id,
+    u.name,
+    u.username,
+    u.profile_picture_url,
+    u.last_active_at,
+    ROUND((
+      CASE
+        WHEN lower(u.username) = lower(btrim(p_query)) THEN 3
+        WHEN starts_with(lower(u.username), lower(btrim(p_query))) THEN 2
+        WHEN NOT p_username_only AND starts_with(lower(u.name), lower(btrim(p_query))) THEN 1
+        ELSE 0
+      END
+      + GREATEST(
+        COALESCE(similarity(u.username, p_query), 0),
+        CASE WHEN p_username_only THEN 0 ELSE COALESCE(similarity(u.name, p_query), 0) END
+      )
+    )::NUMERIC, 6) AS rank
+  FROM users u
+  WHERE (
+      u.username ILIKE user_search_pattern(p_query)
+      OR (NOT p_username_only AND u.name ILIKE user_search_pattern(p_query))
+    )
+    AND u.id <> p_user_id
+    AND u.status = 'active'
+    AND (
+      NOT p_partners_only
+      OR (u.role = 'user' AND u.onboarding_completed_at IS NOT NULL)
+    )
+)
+SELECT
+  m.id,
+  m.name,
+  m.username,
+  m.profile_picture_url,
+  m.last_active_at,
+  m.rank,
+  ap.id AS partnership_id,
+  ap.status AS partnership_status,
+  ap.initiated_by_user_id
+FROM matches m
+LEFT JOIN LATERAL (
+  SELECT a.id, a.status, a.initiated_by_user_id
+  FROM accountability_partners a
+  WHERE ((a.user_id = p_user_id AND a.partner_user_id = m.id)
+      OR (a.user_id = m.id AND a.partner_user_id = p_user_id))
+    AND a.status IN ('accepted', 'pending', 'blocked')
+  ORDER BY CASE a.status WHEN 'blocked' THEN 0 WHEN 'accepted' THEN 1 ELSE 2 END
+  LIMIT 1
+) ap ON TRUE
+WHERE (NOT p_partners_only OR ap.status IS DISTINCT FROM 'blocked')
+  AND (
+    p_after_rank IS NULL
+    OR m.rank < p_after_rank
+    OR (m.rank = p_after_rank AND m.id > p_after_id)
+  )
+ORDER BY m.rank DESC, m.id
+LIMIT p_limit
+OFFSET p_offset;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+COMMENT ON FUNCTION search_users(UUID, TEXT, INTEGER, NUMERIC, UUID, INTEGER, BOOLEAN, BOOLEAN) IS
+  'Ranked trigram user search with the searcher''s partnership status; keyset pagination on (rank DESC, id).';
+
+GRANT EXECUTE ON FUNCTION search_users(UUID, TEXT, INTEGER, NUMERIC, UUID, INTEGER, BOOLEAN, BOOLEAN) TO service_role;
+
+-- =====================================================
+-- Exact match count (optional, same filters)
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION count_user_search(
+  p_user_id UUID,
+  p_query TEXT,
+  p_partners_only BOOLEAN DEFAULT TRUE,
+  p_username_only BOOLEAN DEFAULT FALSE
+)
+RETURNS INTEGER AS $$
+  SELECT COUNT(*)::INTEGER
+  FROM users u
+  WHERE (
+      u.username ILIKE user_search_pattern(p_query)
+      OR (NOT p_username_only AND u.name ILIKE user_search_pattern(p_query))
+    )
+    AND u.id <> p_user_id
+    AND u.status = 'active'
+    AND (
+      NOT p_partners_only
+      OR (
+        u.role = 'user'
+        AND u.onboarding_completed_at IS NOT NULL
+        AND NOT EXISTS (
+          SELECT 1
+          FROM accountability_partners a
+          WHERE ((a.user_id = p_user_id AND a.partner_user_id = u.id)
+              OR (a.user_id = u.id AND a.partner_user_id = p_user_id))
+            AND a.status = 'blocked'
+        )
+      )
+    );
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+COMMENT ON FUNCTION count_user_search(UUID, TEXT, BOOLEAN, BOOLEAN) IS
+  'Exact number of search_users() matches. Only used when the client requests a total.';
+
+GRANT EXECUTE ON FUNCTION count_user_search(UUID, TEXT, BOOLEAN, BOOLEAN) TO service_role;
@@ -0,0 +1,326 @@
+-- =====================================================
+-- Achievement counters
+-- =====================================================
+-- AchievementService used to load every active achievement type and run a
+-- COUNT (or SUM) per locked badge on every check-in, nudge, recap view, ...
+-- Counters are now maintained on write by triggers, one row per user, and
+-- get_achievement_progress() returns everything a badge check needs in one
+-- read. Counters mirror the old queries exactly (current row counts, so a
+-- deleted goal or nudge decrements them):
+--
+-- - checkins_completed: check_ins with status 'completed'
+-- - goals_created:      goals
+-- - partners_accepted:  accountability_partners accepted (either side)
+-- - nudges_sent:        social_nudges sent with nudge_type 'nudge'
+-- - cheers_sent:        social_nudges sent with nudge_type 'cheer'
+-- - ai_messages:        SUM(ai_coach_daily_usage.message_count)
+-- - recaps_viewed:      weekly_recaps with viewed_at set
+--
+-- Streaks (and perfect periods, which are streaks ending today) and account
+-- age are derived in the RPC rather than counted.
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS user_achievement_counters (
+  user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+  checkins_completed INTEGER NOT NULL DEFAULT 0,
+  goals_created INTEGER NOT NULL DEFAULT 0,
+  partners_accepted INTEGER NOT NULL DEFAULT 0,
+  nudges_sent INTEGER NOT NULL DEFAULT 0,
+  cheers_sent INTEGER NOT NULL DEFAULT 0,
+  ai_messages INTEGER NOT NULL DEFAULT 0,
+  recaps_viewed INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Service role only (no client access)
+ALTER TABLE user_achievement_counters ENABLE ROW LEVEL SECURITY;
+
+-- =====================================================
+-- Counter updates
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION adjust_achievement_counters(
+  p_user_id UUID,
+  p_checkins INTEGER DEFAULT 0,
+  p_goals INTEGER DEFAULT 0,
+  p_partners INTEGER DEFAULT 0,
+  p_nudges INTEGER DEFAULT 0,
+  p_cheers INTEGER DEFAULT 0,
+  p_ai_messages INTEGER DEFAULT 0,
+  p_recaps INTEGER DEFAULT 0
+)
+RETURNS VOID AS $$
+BEGIN
+  -- Row deletes cascade from user deletes; the user row may already be gone
+  INSERT INTO user_achievement_counters AS c (
+    user_id, checkins_completed, goals_created, partners_accepted,
+    nudges_sent, cheers_sent, ai_messages, recaps_viewed
+  )
+  SELECT
+    p_user_id,
+    GREATEST(p_checkins, 0),
+    GREATEST(p_goals, 0),
+    GREATEST(p_partners, 0),
+    GREATEST(p_nudges, 0),
+    GREATEST(p_cheers, 0),
+    GREATEST(p_ai_messages, 0),
+    GREATEST(p_recaps, 0)
+  WHERE p_user_id IS NOT NULL
+    AND EXISTS (SELECT 1 FROM users WHERE id = p_user_id)
+  ON CONFLICT (user_id) DO UPDATE SET
+    checkins_completed = GREATEST(c.checkins_completed + p_checkins, 0),
+    goals_created = GREATEST(c.goals_created + p_goals, 0),
+    partners_accepted = GREATEST(c.partners_accepted + p_partners, 0),
+    nudges_sent = GREATEST(c.nudges_sent + p_nudges, 0),
+    cheers_sent = GREATEST(c.cheers_sent + p_cheers, 0),
+    ai_messages = GREATEST(c.ai_messages + p_ai_messages, 0),
+    recaps_viewed = GREATEST(c.recaps_viewed + p_recaps, 0),
+    updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION achievement_counters_on_check_in()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_delta INTEGER := 0;
+BEGIN
+  IF TG_OP <> 'DELETE' AND NEW.status = 'completed' THEN
+    v_delta := v_delta + 1;
+  END IF;
+  IF TG_OP <> 'INSERT' AND OLD.status = 'completed' THEN
+    v_delta := v_delta - 1;
+  END IF;
+
+  IF v_delta <> 0 THEN
+    PERFORM adjust_achievement_counters(
+      CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END,
+      p_checkins => v_delta
+    );
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION achievement_counters_on_goal()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM adjust_achievement_counters(NEW.user_id, p_goals => 1);
+  ELSE
+    PERFORM adjust_achievement_counters(OLD.user_id, p_goals => -1);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION achievement_counters_on_partnership()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_delta INTEGER := 0;
+BEGIN
+  IF TG_OP <> 'DELETE' AND NEW.status = 'accepted' THEN
+    v_delta := v_delta + 1;
+  END IF;
+  IF TG_OP <> 'INSERT' AND OLD.status = 'accepted' THEN
+    v_delta := v_delta - 1;
+  END IF;
+
+  IF v_delta <> 0 THEN
+    IF TG_OP = 'DELETE' THEN
+      PERFORM adjust_achievement_counters(OLD.user_id, p_partners => v_delta);
+      PERFORM adjust_achievement_counters(OLD.partner_user_id, p_partners => v_delta);
+    ELSE
+      PERFORM adjust_achievement_counters(NEW.user_id, p_partners => v_delta);
+      PERFORM adjust_achievement_counters(NEW.partner_user_id, p_partners => v_delta);
+    END IF;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION achievement_counters_on_nudge()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_row social_nudges%ROWTYPE;
+  v_sign INTEGER;
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    v_row := NEW;
+    v_sign := 1;
+  ELSE
+    v_row := OLD;
+    v_sign := -1;
+  END IF;
+
+  IF v_row.nudge_type = 'nudge' THEN
+    PERFORM adjust_achievement_counters(v_row.sender_id, p_nudges => v_sign);
+  ELSIF v_row.nudge_type = 'cheer' THEN
+    PERFORM adjust_achievement_counters(v_row.sender_id, p_cheers => v_sign);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION achievement_counters_on_ai_usage()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_delta INTEGER;
+BEGIN
+  v_delta := CASE TG_OP
+    WHEN 'INSERT' THEN NEW.message_count
+    WHEN 'DELETE' THEN -OLD.message_count
+    ELSE NEW.message_count - OLD.message_count
+  END;
+
+  IF v_delta <> 0 THEN
+    PERFORM adjust_achievement_counters(
+      CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END,
+      p_ai_messages => v_delta
+    );
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION achievement_counters_on_recap()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_delta INTEGER := 0;
+BEGIN
+  IF TG_OP <> 'DELETE' AND NEW.viewed_at IS NOT NULL THEN
+    v_delta := v_delta + 1;
+  END IF;
+  IF TG_OP <> 'INSERT' AND OLD.viewed_at IS NOT NULL THEN
+    v_delta := v_delta - 1;
+  END IF;
+
+  IF v_delta <> 0 THEN
+    PERFORM adjust_achievement_counters(
+      CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END,
+      p_recaps => v_delta
+    );
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_check_ins_achievement_counters ON check_ins;
+CREATE TRIGGER trg_check_ins_achievement_counters
+  AFTER INSERT OR DELETE OR UPDATE OF status ON check_ins
+  FOR EACH ROW EXECUTE FUNCTION achievement_counters_on_check_in();
+
+DROP TRIGGER IF EXISTS trg_goals_achievement_counters ON goals;
+CREATE TRIGGER trg_goals_achievement_counters
+  AFTER INSERT OR DELETE ON goals
+  FOR EACH ROW EXECUTE FUNCTION achievement_counters_on_goal();
+
+DROP TRIGGER IF EXISTS trg_partners_achievement_counters ON accountability_partners;
+CREATE TRIGGER trg_partners_achievement_counters
+  AFTER INSERT OR DELETE OR UPDATE OF status ON accountability_partners
+  FOR EACH ROW EXECUTE FUNCTION achievement_counters_on_partnership();
+
+DROP TRIGGER IF EXISTS trg_social_nudges_achievement_counters ON social_nudges;
+CREATE TRIGGER trg_social_nudges_achievement_counters
+  AFTER INSERT OR DELETE ON social_nudges
+  FOR EACH ROW EXECUTE FUNCTION achievement_counters_on_nudge();
+
+DROP TRIGGER IF EXISTS trg_ai_usage_achievement_counters ON ai_coach_daily_usage;
+CREATE TRIGGER trg_ai_usage_achievement_counters
+  AFTER INSERT OR DELETE OR UPDATE OF message_count ON ai_coach_daily_usage
+  FOR EACH ROW EXECUTE FUNCTION achievement_counters_on_ai_usage();
+
+DROP TRIGGER IF EXISTS trg_weekly_recaps_achievement_counters ON weekly_recaps;
+CREATE TRIGGER trg_weekly_recaps_achievement_counters
+  AFTER INSERT OR DELETE OR UPDATE OF viewed_at ON weekly_recaps
+  FOR EACH ROW EXECUTE FUNCTION achievement_counters_on_recap();
+
+-- =====================================================
+-- Progress read (one call per achievement check)
+-- =====================================================
+-- current_streak: consecutive days with a completed check-in ending on
+-- p_today (distinct dates across goals); skipped unless p_include_streak.
+
+CREATE OR REPLACE FUNCTION get_achievement_progress(
+  p_user_id UUID,
+  p_today DATE DEFAULT CURRENT_DATE,
+  p_include_streak BOOLEAN DEFAULT TRUE
+)
+RETURNS TABLE (
+  checkins_completed INTEGER,
+  goals_created INTEGER,
+  partners_accepted INTEGER,
+  nudges_sent INTEGER,
+  cheers_sent INTEGER,
+  ai_messages INTEGER,
+  recaps_viewed INTEGER,
+  account_age_days INTEGER,
+  current_streak INTEGER,
+  unlocked_achievement_type_ids UUID[]
+) AS $$
+  SELECT
+    COALESCE(c.checkins_completed, 0),
+    COALESCE(c.goals_created, 0),
+    COALESCE(c.partners_accepted, 0),
+    COALESCE(c.nudges_sent, 0),
+    COALESCE(c.cheers_sent, 0),
+    COALESCE(c.ai_messages, 0),
+    COALESCE(c.recaps_viewed, 0),
+    COALESCE(EXTRACT(DAY FROM NOW() - u.created_at)::INTEGER, 0),
+    CASE WHEN p_include_streak THEN (
+      -- Distinct dates newest first: date n (0-based) continues the run
+      -- ending today iff it equals p_today - n
+      SELECT COUNT(*)::INTEGER
+      FROM (
+        SELECT d.check_in_date, ROW_NUMBER() OVER (ORDER BY d.check_in_date DESC) - 1 AS n
+        FROM (
+          SELECT DISTINCT ci.check_in_date
+          FROM check_ins ci
+          WHERE ci.user_id = p_user_id
+            AND ci.status = 'completed'
+            AND ci.check_in_date <= p_today
+        ) d
+      ) ranked
+      WHERE ranked.check_in_date = p_today - ranked.n::INTEGER
+    ) ELSE 0 END,
+    COALESCE(
+      (SELECT ARRAY_AGG(ua.achievement_type_id) FROM user_achievements ua WHERE ua.user_id = p_user_id),
+      ARRAY[]::UUID[]
+    )
+  FROM users u
+  LEFT JOIN user_achievement_counters c ON c.user_id = u.id
+  WHERE u.id = p_user_id;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+COMMENT ON FUNCTION get_achievement_progress(UUID, DATE, BOOLEAN) IS
+  'Achievement counters, account age, current streak and unlocked badge ids for one user. Used by AchievementService.';
+
+GRANT EXECUTE ON FUNCTION get_achievement_progress(UUID, DATE, BOOLEAN) TO service_role;
+
+-- =====================================================
+-- Backfill
+-- =====================================================
+
+INSERT INTO user_achievement_counters (
+  user_id, checkins_completed, goals_created, partners_accepted,
+  nudges_sent, cheers_sent, ai_messages, recaps_viewed
+)
+SELECT
+  u.id,
+  (SELECT COUNT(*) FROM check_ins ci WHERE ci.user_id = u.id AND ci.status = 'completed'),
+  (SELECT COUNT(*) FROM goals g WHERE g.user_id = u.id),
+  (SELECT COUNT(*) FROM accountability_partners ap
+    WHERE (ap.user_id = u.id OR ap.partner_user_id = u.id) AND ap.status = 'accepted'),
+  (SELECT COUNT(*) FROM social_nudges sn WHERE sn.sender_id = u.id AND sn.nudge_type = 'nudge'),
+  (SELECT COUNT(*) FROM social_nudges sn WHERE sn.sender_id = u.id AND sn.nudge_type = 'cheer'),
+  (SELECT COALESCE(SUM(a.message_count), 0) FROM ai_coach_daily_usage a WHERE a.user_id = u.id),
+  (SELECT COUNT(*) FROM weekly_recaps wr WHERE wr.user_id = u.id AND wr.viewed_at IS NOT NULL)
+FROM users u
+ON CONFLICT (user_id) DO UPDATE SET
+  checkins_completed = EXCLUDED.checkins_completed,
+  goals_created = EXCLUDED.goals_created,
+  partners_accepted = EXCLUDED.partners_accepted,
+  nudges_sent = EXCLUDED.nudges_sent,
+  cheers_sent = EXCLUDED.cheers_sent,
+  ai_messages = EXCLUDED.ai_messages,
+  recaps_viewed = EXCLUDED.recaps_viewed,
+  updated_at = NOW();
@@ -0,0 +1,183 @@
+-- =====================================================
+-- AI Coach messages as rows
+-- =====================================================
+-- ai_coach_conversations.messages held the whole thread as one JSONB array.
+-- Reading the latest page fetched the entire array, and every streamed
+-- partial (every ~250ms) and every status change re-serialized and rewrote
+-- it, so write cost grew with the length of the conversation.
+--
+-- Messages now live in ai_coach_messages, keyed by (conversation_id, seq):
+-- - append_ai_coach_messages() allocates seq under the conversation row lock
+--   and bumps message_count / last_message_at in the same statement.
+-- - Streaming, completion and failure update a single row by message_id.
+-- - History pages are keyset reads on (conversation_id, seq).
+--
+-- seq starts at 1, so seq - 1 is the message's index in the old array.
+-- Existing arrays are copied over below and then emptied; the column is
+-- kept (always '[]') until older app builds are gone.
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS ai_coach_messages (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  conversation_id UUID NOT NULL REFERENCES ai_coach_conversations(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+
+  -- Position in the conversation (1-based, gap-free per conversation)
+  seq INTEGER NOT NULL,
+
+  -- Client-visible ids (uuid strings) carried over from the JSONB messages
+  message_id TEXT,
+  request_id TEXT,
+
+  role TEXT NOT NULL CHECK (role IN ('user', 'assistant')),
+  content TEXT NOT NULL DEFAULT '',
+  status TEXT NOT NULL DEFAULT 'completed' CHECK (status IN (
+    'pending', 'generating', 'completed', 'failed'
+  )),
+
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+  UNIQUE (conversation_id, seq)
+);
+
+-- In-place updates from the worker (streaming, completion, failure)
+CREATE INDEX IF NOT EXISTS idx_ai_coach_messages_message_id
+  ON ai_coach_messages(conversation_id, message_id)
+  WHERE message_id IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_ai_coach_messages_request_id
+  ON ai_coach_messages(conversation_id, request_id)
+  WHERE request_id IS NOT NULL;
+
+-- Data export / account deletion
+CREATE INDEX IF NOT EXISTS idx_ai_coach_messages_user_id
+  ON ai_coach_messages(user_id);
+
+ALTER TABLE ai_coach_messages ENABLE ROW LEVEL SECURITY;
+
+-- Clients only read (realtime); all writes go through the API / worker
+CREATE POLICY ai_messages_select_own ON ai_coach_messages
+  FOR SELECT TO authenticated
+  USING (user_id = get_user_id_from_auth());
+
+-- Streamed content and status changes reach the app through realtime
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_publication_tables
+    WHERE pubname = 'supabase_realtime'
+    AND tablename = 'ai_coach_messages'
+  ) THEN
+    ALTER PUBLICATION supabase_realtime ADD TABLE ai_coach_messages;
+  END IF;
+END $$;
+
+-- =====================================================
+-- Append
+-- =====================================================
+-- p_messages: JSONB array of {role, content, status, message_id,
+-- request_id, created_at}. Returns the inserted rows in seq order.
+
+CREATE OR REPLACE FUNCTION append_ai_coach_messages(
+  p_conversation_id UUID,
+  p_messages JSONB
+)
+RETURNS SETOF ai_coach_messages AS $$
+DECLARE
+  v_user_id UUID;
+  v_last_seq INTEGER;
+BEGIN
+  -- The row lock serializes appends to the same conversation
+  UPDATE ai_coach_conversations
+  SET message_count = message_count + jsonb_array_length(p_messages),
+      last_message_at = NOW(),
+      updated_at = NOW()
+  WHERE id = p_conversation_id
+  RETURNING user_id INTO v_user_id;
+
+  IF v_user_id IS NULL THEN
+    RAISE EXCEPTION 'Conversation % not found', p_conversation_id;
+  END IF;
+
+  SELECT COALESCE(MAX(m.seq), 0) INTO v_last_seq
+  FROM ai_coach_messages m
+  WHERE m.conversation_id = p_conversation_id;
+
+  RETURN QUERY
+  INSERT INTO ai_coach_messages (
+    conversation_id, user_id, seq, message_id, request_id,
+    role, content, status, created_at
+  )
+  SELECT
+    p_conversation_id,
+    v_user_id,
+    v_last_seq + e.ord::INTEGER,
+    e.msg->>'message_id',
+    e.msg->>'request_id',
+    e.msg->>'role',
+    COALESCE(e.msg->>'content', ''),
+    COALESCE(e.msg->>'status', 'completed'),
+    COALESCE((e.msg->>'created_at')::TIMESTAMPTZ, NOW())
+  FROM jsonb_array_elements(p_messages) WITH ORDINALITY AS e(msg, ord)
+  ORDER BY e.ord
+  RETURNING *;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+COMMENT ON FUNCTION append_ai_coach_messages(UUID, JSONB) IS
+  'Append messages to an AI coach conversation with the next seq values; updates message_count and last_message_at.';
+
+GRANT EXECUTE ON FUNCTION append_ai_coach_messages(UUID, JSONB) TO service_role;
+
+-- =====================================================
+-- Backfill from ai_coach_conversations.messages
+-- =====================================================
+
+INSERT INTO ai_coach_messages (
+  conversation_id, user_id, seq, message_id, request_id,
+  role, content, status, created_at, updated_at
+)
+SELECT
+  c.id,
+  c.user_id,
+  e.ord::INTEGER,
+  e.msg->>'message_id',
+  e.msg->>'request_id',
+  e.msg->>'role',
+  COALESCE(e.msg->>'content', ''),
+  CASE
+    WHEN e.msg->>'status' IN ('pending', 'generating', 'completed', 'failed')
+      THEN e.msg->>'status'
+    ELSE 'completed'
+  END,
+  COALESCE((NULLIF(e.msg->>'created_at', ''))::TIMESTAMPTZ, c.created_at),
+  COALESCE(c.updated_at, NOW())
+FROM ai_coach_conversations c
+CROSS JOIN LATERAL jsonb_array_elements(
+  CASE WHEN jsonb_typeof(c.messages) = 'array' THEN c.messages ELSE '[]'::jsonb END
+) WITH ORDINALITY AS e(msg, ord)
+WHERE e.msg->>'role' IN ('user', 'assistant')
+ON CONFLICT (conversation_id, seq) DO NOTHING;
+
+-- Skipped (non user/assistant) entries leave gaps; renumber so seq stays dense
+WITH renumbered AS (
+  SELECT id, ROW_NUMBER() OVER (PARTITION BY conversation_id ORDER BY seq) AS new_seq
+  FROM ai_coach_messages
+)
+UPDATE ai_coach_messages m
+SET seq = -r.new_seq
+FROM renumbered r
+WHERE m.id = r.id AND m.seq <> r.new_seq;
+
+UPDATE ai_coach_messages SET seq = -seq WHERE seq < 0;
+
+UPDATE ai_coach_conversations c
+SET message_count = (
+      SELECT COUNT(*) FROM ai_coach_messages m WHERE m.conversation_id = c.id
+    ),
+    messages = '[]'::jsonb
+WHERE c.messages IS DISTINCT FROM '[]'::jsonb;
+
+COMMENT ON COLUMN ai_coach_conversations.messages IS
+  'Deprecated: messages are stored in ai_coach_messages (migration 048). Always empty.';
@@ -0,0 +1,63 @@
+-- =====================================================
+-- Upcoming reminder slots (AI push copy pre-generation)
+-- =====================================================
+-- send_scheduled_ai_motivations used to call OpenAI once per due goal inside
+-- the per-minute tick; a busy minute (e.g. hundreds of 08:00 reminders)
+-- overran the 60s window. pregenerate_ai_motivations now writes the copy
+-- 10-30 minutes ahead, using this RPC to find the slots coming up, and the
+-- tick only looks it up.
+--
+-- Reads goal_reminder_slots (migration 040) with the offsets as they are now;
+-- it does not apply DST changes ahead of time (a slot shifted by DST just gets
+-- template copy at send time).
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION get_upcoming_reminder_slots(
+  p_min_lead_minutes INTEGER,
+  p_max_lead_minutes INTEGER,
+  p_now TIMESTAMPTZ DEFAULT NOW()
+)
+RETURNS TABLE (
+  goal_id UUID,
+  user_id UUID,
+  slot_time TEXT,
+  timezone TEXT,
+  minutes_until INTEGER
+) AS $$
+DECLARE
+  v_now_minute INTEGER;
+  v_from SMALLINT;
+  v_to SMALLINT;
+BEGIN
+  v_now_minute := (
+    EXTRACT(HOUR FROM (p_now AT TIME ZONE 'UTC')) * 60
+    + EXTRACT(MINUTE FROM (p_now AT TIME ZONE 'UTC'))
+  )::INTEGER;
+  v_from := ((v_now_minute + p_min_lead_minutes) % 1440)::SMALLINT;
+  v_to := ((v_now_minute + p_max_lead_minutes) % 1440)::SMALLINT;
+
+  RETURN QUERY
+  SELECT
+    s.goal_id,
+    s.user_id,
+    s.slot_time,
+    s.timezone,
+    ((s.utc_minute - v_now_minute) % 1440 + 1440) % 1440 AS minutes_until
+  FROM goal_reminder_slots s
+  JOIN users u ON u.id = s.user_id
+  WHERE (
+      CASE WHEN v_from <= v_to
+        THEN s.utc_minute BETWEEN v_from AND v_to
+        -- Window wraps past UTC midnight
+        ELSE s.utc_minute >= v_from OR s.utc_minute <= v_to
+      END
+    )
+    AND u.status = 'active'
+    AND u.onboarding_completed_at IS NOT NULL;
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER;
+
+COMMENT ON FUNCTION get_upcoming_reminder_slots(INTEGER, INTEGER, TIMESTAMPTZ) IS
+  'Goal reminder slots due between p_min_lead_minutes and p_max_lead_minutes from p_now (inclusive) for active, onboarded users, with minutes until each is due.';
+
+GRANT EXECUTE ON FUNCTION get_upcoming_reminder_slots(INTEGER, INTEGER, TIMESTAMPTZ) TO service_role;
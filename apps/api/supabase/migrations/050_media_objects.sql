@@ -0,0 +1,130 @@
+-- =====================================================
+-- Content-addressed voice note storage
+-- =====================================================
+-- Voice notes were stored once per upload under a random key and sent to
+-- Whisper and the sentiment model every time, so a retried upload (flaky
+-- mobile network) paid for the R2 PUT and both OpenAI calls again.
+--
+-- media_objects has one row per distinct file (SHA-256 of the bytes,
+-- computed while the upload is spooled) with its R2 key and the cached
+-- transcript / sentiment. check_ins.voice_note_hash references it; a trigger
+-- keeps ref_count in step, so deleting a voice note, a check-in or (by
+-- cascade) a user releases the object. Objects unreferenced for a grace
+-- period are claimed by sweep_orphaned_media_objects and deleted from R2.
+--
+-- sentiment depends on the check-in's mood and note as well as the words;
+-- it is only reused when sentiment_context (a hash of both) matches.
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS media_objects (
+  sha256 TEXT PRIMARY KEY,
+  r2_key TEXT NOT NULL,
+  content_type TEXT NOT NULL,
+  size_bytes BIGINT NOT NULL,
+  duration_seconds INTEGER,
+  transcript TEXT,
+  sentiment JSONB,
+  sentiment_context TEXT,
+  ref_count INTEGER NOT NULL DEFAULT 0,
+  -- Set when ref_count drops to 0 (and on insert); cleared when referenced
+  orphaned_at TIMESTAMPTZ DEFAULT NOW(),
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  -- Touched on every dedup hit so the sweep leaves in-use rows alone
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_media_objects_orphaned
+  ON media_objects (orphaned_at)
+  WHERE ref_count = 0;
+
+-- Service role only (no client access)
+ALTER TABLE media_objects ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE check_ins
+ADD COLUMN IF NOT EXISTS voice_note_hash TEXT REFERENCES media_objects(sha256);
+
+CREATE INDEX IF NOT EXISTS idx_check_ins_voice_note_hash
+  ON check_ins (voice_note_hash)
+  WHERE voice_note_hash IS NOT NULL;
+
+COMMENT ON COLUMN check_ins.voice_note_hash IS
+  'SHA-256 of the voice note file (media_objects); NULL for voice notes stored before migration 050';
+
+-- =====================================================
+-- Reference counting
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION adjust_media_object_refs(p_sha256 TEXT, p_delta INTEGER)
+RETURNS VOID AS $$
+BEGIN
+  UPDATE media_objects SET
+    ref_count = GREATEST(ref_count + p_delta, 0),
+    orphaned_at = CASE WHEN ref_count + p_delta <= 0 THEN NOW() END,
+    updated_at = NOW()
+  WHERE sha256 = p_sha256;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION media_object_refs_on_check_in()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP <> 'INSERT' AND OLD.voice_note_hash IS NOT NULL
+     AND (TG_OP = 'DELETE' OR NEW.voice_note_hash IS DISTINCT FROM OLD.voice_note_hash) THEN
+    PERFORM adjust_media_object_refs(OLD.voice_note_hash, -1);
+  END IF;
+  IF TG_OP <> 'DELETE' AND NEW.voice_note_hash IS NOT NULL
+     AND (TG_OP = 'INSERT' OR NEW.voice_note_hash IS DISTINCT FROM OLD.voice_note_hash) THEN
+    PERFORM adjust_media_object_refs(NEW.voice_note_hash, 1);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_check_ins_media_object_refs ON check_ins;
+CREATE TRIGGER trg_check_ins_media_object_refs
+  AFTER INSERT OR DELETE OR UPDATE OF voice_note_hash ON check_ins
+  FOR EACH ROW EXECUTE FUNCTION media_object_refs_on_check_in();
+
+-- =====================================================
+-- Dedup lookup
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION get_media_object(p_sha256 TEXT)
+RETURNS SETOF media_objects AS $$
+  UPDATE media_objects SET updated_at = NOW()
+  WHERE sha256 = p_sha256
+  RETURNING *;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+COMMENT ON FUNCTION get_media_object(TEXT) IS
+  'The media_objects row for a file hash (empty if none), touched so sweep_orphaned_media_objects keeps it for another grace period.';
+
+GRANT EXECUTE ON FUNCTION get_media_object(TEXT) TO service_role;
+
+-- =====================================================
+-- Orphan sweep
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION sweep_orphaned_media_objects(
+  p_grace_minutes INTEGER DEFAULT 60,
+  p_limit INTEGER DEFAULT 1000
+)
+RETURNS TABLE (sha256 TEXT, r2_key TEXT) AS $$
+  DELETE FROM media_objects m
+  WHERE m.sha256 IN (
+    SELECT o.sha256
+    FROM media_objects o
+    WHERE o.ref_count = 0
+      AND GREATEST(o.orphaned_at, o.updated_at) < NOW() - make_interval(mins => p_grace_minutes)
+    ORDER BY o.orphaned_at
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  AND m.ref_count = 0
+  RETURNING m.sha256, m.r2_key;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+COMMENT ON FUNCTION sweep_orphaned_media_objects(INTEGER, INTEGER) IS
+  'Deletes up to p_limit media_objects rows unreferenced and untouched for p_grace_minutes and returns their R2 keys for deletion.';
+
+GRANT EXECUTE ON FUNCTION sweep_orphaned_media_objects(INTEGER, INTEGER) TO service_role;
@@ -0,0 +1,32 @@
+-- =====================================================
+-- Voice note processing status
+-- =====================================================
+-- Voice notes can now be uploaded straight to R2 with a presigned URL and
+-- processed by a Celery task (POST /media/voice-note/upload-url, then
+-- /media/voice-note/complete). The check-in row tracks that work so the app
+-- can show it and pick up the result from the check_ins realtime change:
+--
+--   processing  upload finished, pipeline queued or running
+--   ready       voice_note_url / transcript / sentiment are set
+--   failed      the pipeline rejected or could not process the file
+--
+-- NULL means no voice note was ever attached (or it was deleted). Setting
+-- 'processing' is the claim: /complete only does it while the check-in has no
+-- voice note and nothing in flight, so a check-in gets one pipeline run.
+-- =====================================================
+
+ALTER TABLE check_ins
+ADD COLUMN IF NOT EXISTS voice_note_status TEXT
+  CHECK (voice_note_status IN ('processing', 'ready', 'failed'));
+
+-- Voice notes stored before this migration are complete
+UPDATE check_ins SET voice_note_status = 'ready'
+WHERE voice_note_url IS NOT NULL AND voice_note_status IS NULL;
+
+-- The staging sweep looks for runs that never finished
+CREATE INDEX IF NOT EXISTS idx_check_ins_voice_note_processing
+  ON check_ins (updated_at)
+  WHERE voice_note_status = 'processing';
+
+COMMENT ON COLUMN check_ins.voice_note_status IS
+  'Voice note pipeline state: processing, ready or failed; NULL when the check-in has no voice note';
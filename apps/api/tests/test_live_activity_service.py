@@ -0,0 +1,215 @@
+"""Tests for batched Live Activity refresh (app/services/live_activity_service.py)."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import live_activity_service as las
+from app.services.live_activity_service import APNsDeliveryError, NextUpPayload
+
+DAY = "2026-10-16"
+
+
+class _Query:
+    def __init__(self, db, table):
+        self._db = db
+        self._table = table
+        self._update = None
+
+    def select(self, *_args):
+        return self
+
+    def eq(self, *_args):
+        return self
+
+    def update(self, values):
+        self._update = values
+        return self
+
+    def in_(self, column, values):
+        assert column == "id"
+        self._db.updates.append((self._table, self._update, sorted(values)))
+        return self
+
+    def execute(self):
+        if self._update is None:
+            return SimpleNamespace(data=self._db.devices)
+        return SimpleNamespace(data=[])
+
+
+class _FakeSupabase:
+    def __init__(self, devices):
+        self.devices = devices
+        self.updates = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+class _FakeAPNs:
+    """Returns a preset result per device token."""
+
+    def __init__(self, results):
+        self.results = results
+        self.sent = []
+
+    async def send_many(self, pushes):
+        self.sent.extend(pushes)
+        return [self.results.get(token) for token, _ in pushes]
+
+
+def _device(device_id, **fields):
+    return {"id": device_id, "user_id": "u1", "timezone": "UTC", **fields}
+
+
+def _payload(task_id="g1"):
+    return NextUpPayload(
+        dayKey=DAY,
+        nextTaskId=task_id,
+        title="Today's focus",
+        taskTitle="Run",
+        emoji=None,
+        completedCount=0,
+        totalCount=1,
+    )
+
+
+@pytest.fixture
+def run_refresh(monkeypatch):
+    async def run(devices, results, next_up):
+        supabase = _FakeSupabase(devices)
+        apns = _FakeAPNs(results)
+        computed = []
+
+        async def compute(user_id, timezone, locked_task_id, locked_day_key):
+            computed.append((timezone, locked_task_id, locked_day_key))
+            return next_up
+
+        monkeypatch.setattr(las, "get_supabase_client", lambda: supabase)
+        monkeypatch.setattr(las, "ActivityKitAPNsClient", lambda: apns)
+        monkeypatch.setattr(las, "compute_next_up_payload_for_user", compute)
+        result = await las.refresh_live_activity_for_user("u1")
+        return result, supabase.updates, apns, computed
+
+    return run
+
+
+async def test_mixed_results_clear_gone_tokens_and_skip_failed_updates(run_refresh):
+    devices = [
+        _device("d-ok", activity_push_token="tok-ok"),
+        _device("d-gone", activity_push_token="tok-gone"),
+        _device("d-missing", push_to_start_token="tok-missing"),
+        _device("d-error", activity_push_token="tok-error"),
+    ]
+    results = {
+        "tok-ok": None,
+        "tok-gone": APNsDeliveryError(410, "Unregistered"),
+        "tok-missing": APNsDeliveryError(404, "BadDeviceToken"),
+        "tok-error": APNsDeliveryError(500, "InternalServerError"),
+    }
+
+    result, updates, apns, _ = await run_refresh(devices, results, (_payload(), DAY, "g1"))
+
+    assert result == {"sent": 1, "devices": 4}
+    assert len(apns.sent) == 4
+
+    cleared = [ids for _, values, ids in updates if values.get("activity_push_token", 1) is None]
+    assert cleared == [["d-gone", "d-missing"]]
+
+    state_updates = [(values, ids) for _, values, ids in updates if "last_day_key" in values]
+    assert state_updates == [
+        (
+            {
+                "last_day_key": DAY,
+                "last_payload_hash": _payload().stable_hash(),
+                "locked_day_key": DAY,
+                "locked_task_id": "g1",
+            },
+            ["d-ok"],
+        )
+    ]
+
+
+async def test_devices_with_same_update_share_one_query(run_refresh):
+    devices = [
+        _device("d1", activity_push_token="t1"),
+        _device("d2", activity_push_token="t2"),
+        _device("d3", push_to_start_token="t3"),
+    ]
+
+    result, updates, _, computed = await run_refresh(devices, {}, (_payload(), DAY, "g1"))
+
+    assert result == {"sent": 3, "devices": 3}
+    # Same timezone and lock: next-up computed once
+    assert computed == [("UTC", None, None)]
+    assert [ids for _, _, ids in updates] == [["d1", "d2", "d3"]]
+
+
+async def test_different_locks_compute_separately_but_share_update(run_refresh):
+    devices = [
+        _device("d1", activity_push_token="t1", locked_task_id="g1", locked_day_key=DAY),
+        _device("d2", activity_push_token="t2"),
+    ]
+
+    _, updates, _, computed = await run_refresh(devices, {}, (_payload(), DAY, "g1"))
+
+    assert len(computed) == 2
+    # Same resulting state, so still one grouped update
+    assert [ids for _, _, ids in updates] == [["d1", "d2"]]
+
+
+async def test_end_clears_state_even_when_end_push_fails(run_refresh):
+    devices = [
+        _device("d1", activity_push_token="t1", locked_task_id="g1"),
+        _device("d2", activity_push_token="t2", locked_task_id="g1"),
+        _device("d3"),
+    ]
+    results = {"t2": APNsDeliveryError(500, "InternalServerError")}
+
+    result, updates, apns, _ = await run_refresh(devices, results, (None, DAY, None))
+
+    assert result == {"sent": 1, "devices": 3}
+    assert [event["aps"]["event"] for _, event in apns.sent] == ["end", "end"]
+    assert updates == [
+        (
+            "live_activity_devices",
+            {
+                "last_day_key": DAY,
+                "last_payload_hash": None,
+                "locked_day_key": None,
+                "locked_task_id": None,
+            },
+            ["d1", "d2", "d3"],
+        )
+    ]
+
+
+async def test_unchanged_payload_is_not_resent(run_refresh):
+    payload = _payload()
+    devices = [
+        _device(
+            "d1",
+            activity_push_token="t1",
+            last_day_key=DAY,
+            last_payload_hash=payload.stable_hash(),
+        )
+    ]
+
+    result, updates, apns, _ = await run_refresh(devices, {}, (payload, DAY, "g1"))
+
+    assert result == {"sent": 0, "devices": 1}
+    assert apns.sent == []
+    assert updates == []
+
+
+async def test_loop_state_is_rebuilt_after_fork(monkeypatch):
+    first = las._get_apns_loop_state()
+    assert las._get_apns_loop_state() is first
+
+    monkeypatch.setattr(las.os, "getpid", lambda: first.pid + 1)
+    second = las._get_apns_loop_state()
+
+    assert second is not first
+    assert list(las._apns_loop_states.values()) == [second]
+    await second.client.aclose()
+    await first.client.aclose()
@@ -0,0 +1,176 @@
+"""Tests for the partner matching index scorer (app/services/partner_match_index.py)."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.partner_match_index import PartnerMatchIndex, match_reasons
+from app.services.partner_matching_service import (
+    build_match_vector,
+    calculate_partner_match_score,
+)
+
+# (user_id, timezone, [(title, frequency_type, current_streak)])
+PEOPLE = [
+    ("me", "UTC", [("Run 5k every morning", "daily", 12), ("Read 20 pages", "weekly", 3)]),
+    ("u-runner", "Etc/GMT-1", [("Morning run 5k", "daily", 15)]),
+    ("u-reader", "Etc/GMT-2", [("Read a book", "weekly", 2)]),
+    ("u-far", "Etc/GMT+8", [("Practice guitar", "daily", 45)]),
+    ("u-general", "UTC", [("Do the thing", "daily", 0)]),
+    ("u-mixed", "Etc/GMT-3", [("Gym workout", "daily", 31), ("Meditate", "weekly", 9)]),
+    ("u-tied-b", "UTC", [("Journal nightly", "daily", 20)]),
+    ("u-tied-a", "UTC", [("Journal nightly", "daily", 20)]),
+]
+
+
+def _user(user_id, tz):
+    return {
+        "id": user_id,
+        "timezone": tz,
+        "status": "active",
+        "role": "user",
+        "onboarding_completed_at": "2026-01-01T00:00:00+00:00",
+    }
+
+
+def _goals(goals):
+    return [
+        {"title": title, "frequency_type": freq, "current_streak": streak}
+        for title, freq, streak in goals
+    ]
+
+
+def _vector(user_id, tz, goals):
+    return build_match_vector(_user(user_id, tz), _goals(goals))
+
+
+def _reference(user_id, tz, goals):
+    # Input shape of calculate_partner_match_score
+    return {
+        "goal_titles": [title for title, _, _ in goals],
+        "frequencies": [freq for _, freq, _ in goals],
+        "timezone": tz,
+        "max_streak": max(streak for _, _, streak in goals),
+    }
+
+
+def _index(rows):
+    index = PartnerMatchIndex(refresh_seconds=3600, rebuild_seconds=3600)
+    index._install(rows, "2026-10-16T00:00:00+00:00")
+    index._built_at = index._refreshed_at = time.monotonic()
+    return index
+
+
+@pytest.fixture
+def index():
+    return _index([_vector(*person) for person in PEOPLE[1:]])
+
+
+def test_scores_match_per_pair_reference(index):
+    me = PEOPLE[0]
+
+    total, page = index.rank(_vector(*me), set(), 0, 10)
+
+    assert total == len(PEOPLE) - 1
+    expected = {
+        person[0]: calculate_partner_match_score(_reference(*me), _reference(*person))[0]
+        for person in PEOPLE[1:]
+    }
+    assert dict(page) == pytest.approx(expected, abs=0.05)
+
+
+def test_ranking_is_by_score_then_user_id(index):
+    _, page = index.rank(_vector(*PEOPLE[0]), set(), 0, 10)
+
+    scores = [score for _, score in page]
+    assert scores == sorted(scores, reverse=True)
+    ids = [user_id for user_id, _ in page]
+    assert ids.index("u-tied-a") == ids.index("u-tied-b") - 1
+    assert ids[0] == "u-runner"
+
+
+def test_pages_match_the_full_ranking(index):
+    vector = _vector(*PEOPLE[0])
+    _, full = index.rank(vector, set(), 0, 10)
+
+    pages = []
+    for offset in range(0, len(full), 2):
+        total, page = index.rank(vector, set(), offset, 2)
+        assert total == len(full)
+        pages.extend(page)
+
+    assert pages == full
+    assert index.rank(vector, set(), len(full), 2) == (len(full), [])
+
+
+def test_excluded_and_ineligible_users_are_not_ranked(index):
+    vector = _vector(*PEOPLE[0])
+    index.valid[index._positions["u-far"]] = False
+
+    total, page = index.rank(vector, {"u-runner", "unknown"}, 0, 10)
+
+    ids = {user_id for user_id, _ in page}
+    assert total == len(PEOPLE) - 3
+    assert ids.isdisjoint({"u-runner", "u-far"})
+
+
+def test_user_without_goal_titles_gets_no_fuzzy_points():
+    candidate = _vector(*PEOPLE[1])
+    index = _index([candidate])
+    vector = {**_vector(*PEOPLE[0]), "goal_titles": [], "category_mask": 0}
+
+    _, [(_, score)] = index.rank(vector, set(), 0, 1)
+
+    # Frequency 25 * 1/2, timezone 25 - 25/3, same streak level 10
+    assert score == pytest.approx(12.5 + 25 - 25 / 3 + 10, abs=0.05)
+
+
+def test_match_reasons():
+    me = _vector(*PEOPLE[0])
+
+    assert match_reasons(me, _vector(*PEOPLE[1])) == [
+        "Similar goals: Fitness, Sleep",
+        "Similar schedule",
+        "Same timezone",
+        "Similar experience",
+    ]
+    assert match_reasons(me, _vector(*PEOPLE[3])) == ["Similar schedule"]
+    assert match_reasons(me, _vector(*PEOPLE[4])) == ["Similar schedule", "Same timezone"]
+
+
+class _ChangesQuery:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def select(self, *_args):
+        return self
+
+    def gt(self, *_args):
+        return self
+
+    def order(self, *_args):
+        return self
+
+    def limit(self, *_args):
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self._rows)
+
+
+def test_changes_update_rows_drop_ineligible_and_append_new(index):
+    runner = {**_vector(*PEOPLE[1]), "max_streak": 40, "updated_at": "2026-10-16T00:01:00+00:00"}
+    far = {**_vector(*PEOPLE[3]), "eligible": False, "updated_at": "2026-10-16T00:01:00+00:00"}
+    new = {**_vector("u-new", "UTC", [("Run daily", "daily", 1)]), "updated_at": "2026-10-16T00:02:00+00:00"}
+    supabase = SimpleNamespace(table=lambda _name: _ChangesQuery([runner, far, new]))
+
+    index._apply_changes(supabase)
+
+    assert index.get_vector("u-runner")["max_streak"] == 40
+    assert not index.valid[index._positions["u-far"]]
+    assert index.get_vector("u-new")["goal_titles"] == ["Run daily"]
+    assert index._watermark == "2026-10-16T00:02:00+00:00"
+    total, page = index.rank(_vector(*PEOPLE[0]), set(), 0, 10)
+    assert total == len(PEOPLE) - 1
+    assert "u-new" in dict(page) and "u-far" not in dict(page)
@@ -0,0 +1,153 @@
+"""Tests for the sliding-window rate limiter (app/core/rate_limiter.py)."""
+
+import pytest
+
+from app.core import rate_limiter
+from app.core.rate_limiter import (
+    RateLimitRule,
+    SlidingWindowRateLimiter,
+    _LocalSlidingWindow,
+)
+
+
+def test_local_window_allows_up_to_limit_and_does_not_count_rejections():
+    window = _LocalSlidingWindow()
+
+    results = [window.hit("k", 3, window_index=10, elapsed=0.5) for _ in range(5)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False, False]
+    assert results[2] == (True, 3)
+    assert window._counters["k"] == (10, 3, 0)
+
+
+def test_local_window_weights_previous_window_by_remaining_fraction():
+    window = _LocalSlidingWindow()
+    for _ in range(10):
+        window.hit("k", 10, window_index=10, elapsed=0.9)
+
+    # 25% into the next window: 10 * 0.75 = 7.5 carried over, so 2 more fit
+    results = [window.hit("k", 10, window_index=11, elapsed=0.25)[0] for _ in range(4)]
+    assert results == [True, True, False, False]
+
+    # Near the end of that window the previous one barely counts
+    assert window.hit("k", 10, window_index=11, elapsed=0.95) == (True, 4)
+
+
+def test_local_window_forgets_non_adjacent_windows():
+    window = _LocalSlidingWindow()
+    for _ in range(5):
+        window.hit("k", 5, window_index=10, elapsed=0.5)
+
+    assert window.hit("k", 5, window_index=12, elapsed=0.0) == (True, 1)
+
+
+def test_local_window_keys_are_independent():
+    window = _LocalSlidingWindow()
+    window.hit("a", 1, window_index=1, elapsed=0.0)
+
+    assert window.hit("a", 1, window_index=1, elapsed=0.0)[0] is False
+    assert window.hit("b", 1, window_index=1, elapsed=0.0)[0] is True
+
+
+def _limiter():
+    return SlidingWindowRateLimiter(
+        [
+            RateLimitRule(name="exempt", pattern="/health"),
+            RateLimitRule(name="auth.login", pattern="/api/v1/auth/login", limit=5, window=300, key="ip"),
+            RateLimitRule(
+                name="api.goals",
+                pattern="/api/v1/goals*",
+                limit=2,
+                methods=("POST", "PUT"),
+            ),
+            RateLimitRule(name="api.default", pattern="*", limit=3, per_path=True),
+        ]
+    )
+
+
+def test_match_first_rule_wins_and_methods_fall_through():
+    limiter = _limiter()
+
+    assert limiter.match("GET", "/health") is None
+    assert limiter.match("POST", "/api/v1/auth/login").name == "auth.login"
+    assert limiter.match("POST", "/api/v1/goals/123").name == "api.goals"
+    assert limiter.match("GET", "/api/v1/goals/123").name == "api.default"
+    assert limiter.match("GET", "/api/v1/auth/login/extra").name == "api.default"
+
+
+def test_from_security_config_honours_enabled_flag(monkeypatch):
+    from app.core.security_config import SecurityConfig
+
+    routes = [
+        {"pattern": "/health"},
+        {"pattern": "/api/v1/auth/login", "limit": ("auth", "login"), "key": "ip"},
+        {"pattern": "*", "limit": ("api", "default"), "per_path": True, "enabled": False},
+    ]
+    monkeypatch.setattr(SecurityConfig, "RATE_LIMIT_ROUTES", routes)
+
+    limiter = SlidingWindowRateLimiter.from_security_config()
+
+    assert [rule.name for rule in limiter.rules] == ["exempt", "auth.login"]
+    assert limiter.match("GET", "/api/v1/users/me") is None
+
+
+def test_catch_all_rule_is_enabled_by_default():
+    limiter = SlidingWindowRateLimiter.from_security_config()
+
+    rule = limiter.match("POST", "/api/v1/auth/verify-email")
+    assert rule is not None and rule.name == "api.default"
+
+
+@pytest.fixture
+def no_redis(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "get_async_redis_client", lambda: None)
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: 6000.0 + 30.0)
+
+
+async def test_hit_falls_back_locally_without_redis_and_sets_headers(no_redis):
+    limiter = _limiter()
+    rule = limiter.match("POST", "/api/v1/goals")
+
+    first = await limiter.hit(rule, "user:1", "/api/v1/goals")
+    second = await limiter.hit(rule, "user:1", "/api/v1/goals")
+    third = await limiter.hit(rule, "user:1", "/api/v1/goals")
+
+    assert (first.allowed, second.allowed, third.allowed) == (True, True, False)
+    assert first.headers() == {
+        "RateLimit-Limit": "2",
+        "RateLimit-Remaining": "1",
+        "RateLimit-Reset": "30",
+        "RateLimit-Policy": "2;w=60",
+    }
+    assert third.headers()["Retry-After"] == "30"
+
+
+async def test_per_path_rules_count_each_path_separately(no_redis):
+    limiter = _limiter()
+    rule = limiter.match("GET", "/api/v1/home")
+
+    for _ in range(3):
+        assert (await limiter.hit(rule, "user:1", "/api/v1/home")).allowed
+    assert not (await limiter.hit(rule, "user:1", "/api/v1/home")).allowed
+    assert (await limiter.hit(rule, "user:1", "/api/v1/partners")).allowed
+    assert (await limiter.hit(rule, "user:2", "/api/v1/home")).allowed
+
+
+class _BrokenRedis:
+    def register_script(self, _script):
+        async def run(keys, args):
+            raise ConnectionError("redis down")
+
+        return run
+
+
+async def test_redis_errors_switch_to_local_fallback(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "get_async_redis_client", lambda: _BrokenRedis())
+    limiter = _limiter()
+    rule = limiter.match("POST", "/api/v1/goals")
+
+    result = await limiter.hit(rule, "user:1", "/api/v1/goals")
+
+    assert result.allowed
+    assert limiter._redis_down_until > 0
+    assert limiter._local._counters
@@ -0,0 +1,155 @@
+"""Tests for the streak and consistency engine (app/services/streaks.py)."""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.streaks import (
+    STATUS_CODES,
+    UNKNOWN_STATUS,
+    CheckInHistory,
+    from_day,
+    scheduled_day_counts,
+    to_day,
+    weekdays,
+)
+
+TODAY = date(2026, 10, 16)  # Friday
+
+
+def _row(goal_id, days_ago, status="completed"):
+    return {
+        "goal_id": goal_id,
+        "check_in_date": (TODAY - timedelta(days=days_ago)).isoformat(),
+        "status": status,
+    }
+
+
+def test_day_numbers_round_trip_and_weekdays():
+    day = to_day(TODAY)
+    assert from_day(day) == TODAY
+    assert to_day("2026-10-16T23:30:00+00:00") == day
+    # Postgres DOW: Friday = 5, Sunday = 0
+    assert weekdays(np.array([day, to_day("2026-10-18")])).tolist() == [5, 0]
+
+
+def test_streaks_break_on_gaps():
+    rows = [_row("g1", d) for d in (0, 1, 2, 4, 5, 6, 7)]
+    history = CheckInHistory.from_rows(rows)
+
+    current, longest = history.streaks(today=TODAY)
+
+    assert current.tolist() == [3]
+    assert longest.tolist() == [4]
+
+
+def test_current_streak_is_zero_after_a_missed_day():
+    rows = [_row("g1", d) for d in (2, 3, 4)]
+    history = CheckInHistory.from_rows(rows)
+
+    current, longest = history.streaks(today=TODAY)
+    assert current.tolist() == [0]
+    assert longest.tolist() == [3]
+
+    # Within the grace window the run still counts
+    current, _ = history.streaks(today=TODAY, grace_days=2)
+    assert current.tolist() == [3]
+
+
+def test_still_pending_today_keeps_yesterdays_streak_with_grace():
+    rows = [_row("g1", 0, "pending")] + [_row("g1", d) for d in (1, 2, 3)]
+    history = CheckInHistory.from_rows(rows)
+
+    # Pending today is neither a break nor a completed day
+    assert history.streaks(today=TODAY)[0].tolist() == [0]
+    assert history.streaks(today=TODAY, grace_days=1)[0].tolist() == [3]
+    assert history.counts(["pending"], start=TODAY, end=TODAY).tolist() == [1]
+
+
+def test_rest_days_count_only_when_included():
+    rows = [_row("g1", 0), _row("g1", 1, "rest_day"), _row("g1", 2)]
+    history = CheckInHistory.from_rows(rows)
+
+    current, longest = history.streaks(today=TODAY)
+    assert (current.tolist(), longest.tolist()) == ([1], [1])
+
+    current, longest = history.streaks(today=TODAY, statuses=("completed", "rest_day"))
+    assert (current.tolist(), longest.tolist()) == ([3], [3])
+
+
+def test_streaks_use_distinct_dates_and_ignore_future_rows():
+    rows = [_row(None, 0), _row(None, 0), _row(None, 1), _row(None, -1)]
+    history = CheckInHistory.from_rows(rows, key=None)
+
+    current, longest = history.streaks(today=TODAY)
+
+    assert current.tolist() == [2]
+    assert longest.tolist() == [2]
+
+
+def test_groups_are_independent_and_fixed_keys_keep_empty_groups():
+    rows = [_row("g1", 0), _row("g1", 1), _row("g2", 0), _row("other", 0)]
+    history = CheckInHistory.from_rows(rows, keys=["g1", "g2", "g3"])
+
+    current, longest = history.streaks(today=TODAY)
+
+    assert history.keys == ["g1", "g2", "g3"]
+    assert current.tolist() == [2, 1, 0]
+    assert longest.tolist() == [2, 1, 0]
+
+
+def test_rows_without_a_date_are_dropped_and_unknown_statuses_kept():
+    rows = [
+        _row("g1", 0),
+        {"goal_id": "g1", "check_in_date": None, "status": "completed"},
+        _row("g1", 1, "archived"),
+    ]
+    history = CheckInHistory.from_rows(rows)
+
+    assert len(history.day) == 2
+    assert history.status.tolist() == [STATUS_CODES["completed"], UNKNOWN_STATUS]
+    # Unknown statuses count as rows but never as completed days
+    assert history.counts().tolist() == [2]
+    assert history.streaks(today=TODAY)[1].tolist() == [1]
+
+
+def test_window_counts_and_per_group_bounds():
+    rows = [_row("g1", d) for d in (0, 6, 7, 20, 31)] + [_row("g2", 0)]
+    history = CheckInHistory.from_rows(rows)
+
+    windows = history.window_counts(TODAY)
+    assert windows[7].tolist() == [3, 1]
+    assert windows[30].tolist() == [4, 1]
+
+    # One end bound per goal (e.g. each user's local today)
+    ends = np.array([to_day(TODAY) - 1, to_day(TODAY)])
+    assert history.counts(end=ends).tolist() == [4, 1]
+
+
+def test_weekday_status_counts():
+    rows = [_row("g1", 0), _row("g1", 7, "missed"), _row("g1", 1)]
+    history = CheckInHistory.from_rows(rows)
+
+    by_weekday = history.weekday_status_counts()
+
+    friday, thursday = 5, 4
+    assert by_weekday[0, friday, STATUS_CODES["completed"]] == 1
+    assert by_weekday[0, friday, STATUS_CODES["missed"]] == 1
+    assert by_weekday[0, thursday, STATUS_CODES["completed"]] == 1
+
+
+def test_scheduled_day_counts_follow_weekly_target_days():
+    goals = [
+        {"frequency_type": "daily"},
+        # Monday, Wednesday, Friday
+        {"frequency_type": "weekly", "target_days": [1, 3, 5]},
+        {"frequency_type": "weekly", "target_days": [0, 0]},
+        {"frequency_type": "weekly", "target_days": []},
+    ]
+    # Saturday 2026-10-03 .. Friday 2026-10-16: two full weeks
+    start, end = TODAY - timedelta(days=13), TODAY
+
+    counts = scheduled_day_counts(goals, start, end)
+
+    assert counts.tolist() == [14, 6, 2, 0]
+    assert scheduled_day_counts(goals, end, start).tolist() == [0, 0, 0, 0]
@@ -0,0 +1,102 @@
+"""Tests for user search pagination (app/services/user_search_service.py)."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import user_search_service
+from app.services.user_search_service import (
+    decode_cursor,
+    encode_cursor,
+    normalize_query,
+    search_users,
+)
+
+SEARCHER = "00000000-0000-0000-0000-000000000001"
+
+
+def _uuid(n):
+    return f"00000000-0000-0000-0000-{n:012d}"
+
+
+def test_cursor_round_trip():
+    rank = 0.4285714328289032
+
+    cursor = encode_cursor(rank, _uuid(7))
+
+    assert decode_cursor(cursor) == (repr(rank), _uuid(7))
+    assert float(decode_cursor(cursor)[0]) == rank
+    assert decode_cursor(encode_cursor(1, _uuid(2))) == ("1", _uuid(2))
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["", "0.5", "0.5:", "abc:" + _uuid(1), "0.5:not-a-uuid", ":" + _uuid(1)],
+)
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_normalize_query():
+    assert normalize_query("  Jane   DOE ") == "jane doe"
+
+
+class _FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=self.rows))
+
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    monkeypatch.setattr(user_search_service, "get_redis_client", lambda: None)
+
+
+def _rows(count):
+    return [{"id": _uuid(n), "rank": 1.0 - n / 10} for n in range(1, count + 1)]
+
+
+def test_next_cursor_points_at_last_row_of_a_full_page():
+    supabase = _FakeSupabase(_rows(3))
+
+    rows, next_cursor = search_users(supabase, SEARCHER, " Jane ", limit=2)
+
+    assert [row["id"] for row in rows] == [_uuid(1), _uuid(2)]
+    assert decode_cursor(next_cursor) == ("0.8", _uuid(2))
+    name, params = supabase.calls[0]
+    assert name == "search_users"
+    assert params["p_query"] == "jane"
+    assert params["p_limit"] == 3
+    assert (params["p_after_rank"], params["p_after_id"]) == (None, None)
+
+
+def test_last_page_has_no_cursor():
+    rows, next_cursor = search_users(_FakeSupabase(_rows(2)), SEARCHER, "jane", limit=2)
+
+    assert len(rows) == 2
+    assert next_cursor is None
+
+
+def test_cursor_is_passed_to_rpc_and_overrides_offset():
+    supabase = _FakeSupabase([])
+    cursor = encode_cursor(0.8, _uuid(2))
+
+    search_users(supabase, SEARCHER, "jane", limit=2, cursor=cursor, offset=40)
+
+    params = supabase.calls[0][1]
+    assert (params["p_after_rank"], params["p_after_id"]) == ("0.8", _uuid(2))
+    assert params["p_offset"] == 0
+
+
+def test_malformed_cursor_fails_before_querying():
+    supabase = _FakeSupabase([])
+
+    with pytest.raises(ValueError):
+        search_users(supabase, SEARCHER, "jane", cursor="garbage")
+
+    assert supabase.calls == []
@@ -165,6 +165,8 @@ export function useAICoachChat() {
   const [isLoadingMoreMessages, setIsLoadingMoreMessages] = useState(false);
   const [totalMessages, setTotalMessages] = useState(0);
   const messageOffsetRef = useRef(0);
+  // seq of the oldest loaded message (keyset cursor for older pages)
+  const oldestSeqRef = useRef<number | null>(null);
 
   // Track failed message for retry
   const failedMessageRef = useRef<{ text: string; userMessageId: string; language: string } | null>(
@@ -558,6 +560,7 @@ export function useAICoachChat() {
         setHasMoreMessages(false);
         setTotalMessages(0);
         messageOffsetRef.current = 0;
+        oldestSeqRef.current = null;
       }
 
       // Update lastContextRef immediately
@@ -578,6 +581,7 @@ export function useAICoachChat() {
 
       // Reset pagination state for new conversation load
       messageOffsetRef.current = 0;
+      oldestSeqRef.current = null;
 
       setIsLoadingConversation(true);
       setError(null);
@@ -659,6 +663,7 @@ export function useAICoachChat() {
           setHasMoreMessages(conversation.has_more_messages ?? false);
           setTotalMessages(conversation.total_messages ?? conversation.messages.length);
           messageOffsetRef.current = conversation.messages.length;
+          oldestSeqRef.current = conversation.messages[0]?.seq ?? null;
           // Update last loaded context
           lastContextRef.current = {
             conversationId: conversation.id,
@@ -724,7 +729,8 @@ export function useAICoachChat() {
       const response = await aiCoachService.getConversation(
         conversationId,
         MESSAGES_PER_PAGE,
-        messageOffsetRef.current
+        messageOffsetRef.current,
+        oldestSeqRef.current
       );
 
       if (response.data) {
@@ -736,6 +742,7 @@ export function useAICoachChat() {
         // Update pagination state
         setHasMoreMessages(response.data.has_more_messages ?? false);
         messageOffsetRef.current += response.data.messages.length;
+        oldestSeqRef.current = response.data.messages[0]?.seq ?? oldestSeqRef.current;
       }
     } catch (err) {
       logger.error("Failed to load more messages", err as Record<string, unknown>);
@@ -759,6 +766,7 @@ export function useAICoachChat() {
     setHasMoreMessages(false);
     setTotalMessages(0);
     messageOffsetRef.current = 0;
+    oldestSeqRef.current = null;
     // Reset last context when clearing
     lastContextRef.current = { conversationId: null, goalId: null };
   }, []);
@@ -775,6 +783,7 @@ export function useAICoachChat() {
     setHasMoreMessages(false);
     setTotalMessages(0);
     messageOffsetRef.current = 0;
+    oldestSeqRef.current = null;
     forceNewChatRef.current = true;
     // Reset last context when starting new chat
     lastContextRef.current = { conversationId: null, goalId: null };
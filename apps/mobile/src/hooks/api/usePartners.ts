@@ -101,17 +101,23 @@ export const useSearchPartners = (query: string) => {
 export const useSearchPartnersInfinite = (query: string, limit: number = 20) => {
   return useInfiniteQuery({
     queryKey: partnersQueryKeys.searchInfinite(query),
-    queryFn: async ({ pageParam = 1 }) => {
-      const response = await partnersService.searchUsers(query, pageParam, limit);
+    queryFn: async ({ pageParam }) => {
+      const response = await partnersService.searchUsers(
+        query,
+        pageParam.page,
+        limit,
+        pageParam.cursor
+      );
       if (response.status !== 200 || !response.data) {
         throw new Error(response.error || "Failed to search users");
       }
       return response.data;
     },
-    initialPageParam: 1,
+    // Keyset pagination: the server's next_cursor keeps pages stable
+    initialPageParam: { page: 1, cursor: null as string | null },
     getNextPageParam: (lastPage) => {
       if (lastPage.has_more) {
-        return lastPage.page + 1;
+        return { page: lastPage.page + 1, cursor: lastPage.next_cursor ?? null };
       }
       return undefined;
     },
@@ -245,7 +245,8 @@ export const ROUTES = {
 
   // Voice Notes routes (consolidated into media.py)
   VOICE_NOTES: {
-    UPLOAD: "/media/upload", // Uses media.py with media_type=voice_note
+    UPLOAD_URL: "/media/voice-note/upload-url", // Presigned R2 PUT (media.py)
+    COMPLETE: "/media/voice-note/complete", // Queues processing after the PUT
     DELETE: (checkinId: string) => `/media/voice-note/${checkinId}`
   },
 
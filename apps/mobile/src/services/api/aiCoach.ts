@@ -28,6 +28,7 @@ export interface ConversationSummary {
 export interface ConversationMessage {
   message_id?: string;
   request_id?: string;
+  seq?: number; // Position in the conversation; pass as beforeSeq to load older messages
   role: "user" | "assistant";
   content: string;
   created_at?: string;
@@ -149,16 +150,19 @@ class AICoachService extends BaseApiService {
    * @param id Conversation ID
    * @param messageLimit Max number of messages to return (default 50)
    * @param messageOffset Offset from most recent messages for pagination
+   * @param beforeSeq Load messages older than this seq (preferred over messageOffset)
    */
   async getConversation(
     id: string,
     messageLimit: number = 50,
-    messageOffset: number = 0
+    messageOffset: number = 0,
+    beforeSeq?: number | null
   ): Promise<ApiResponse<ConversationDetail>> {
     const params = new URLSearchParams({
       message_limit: messageLimit.toString(),
       message_offset: messageOffset.toString()
     });
+    if (beforeSeq) params.set("before_seq", beforeSeq.toString());
     return this.get<ConversationDetail>(`${ROUTES.AI_COACH.CONVERSATION(id)}?${params}`);
   }
 
@@ -55,6 +55,7 @@ export interface CheckIn {
   voice_note_url?: string; // Premium feature
   voice_note_transcript?: string;
   voice_note_duration?: number;
+  voice_note_status?: "processing" | "ready" | "failed"; // Set while/after the upload is processed
   ai_response?: string; // AI's personalized message after check-in
   created_at: string;
 }
@@ -99,6 +99,7 @@ export interface PaginatedSearchResponse {
   page: number;
   limit: number;
   has_more: boolean;
+  next_cursor?: string | null; // Search only: pass back as cursor for the next page
 }
 
 class PartnersService extends BaseApiService {
@@ -206,12 +207,16 @@ class PartnersService extends BaseApiService {
   async searchUsers(
     query: string,
     page: number = 1,
-    limit: number = 20
+    limit: number = 20,
+    cursor?: string | null
   ): Promise<ApiResponse<PaginatedSearchResponse>> {
     const params = new URLSearchParams();
     params.append("query", query);
     params.append("page", page.toString());
     params.append("limit", limit.toString());
+    if (cursor) {
+      params.append("cursor", cursor);
+    }
 
     return this.get<PaginatedSearchResponse>(
       `${ROUTES.PARTNERS.SEARCH_USERS}?${params.toString()}`
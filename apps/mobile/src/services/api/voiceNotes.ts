@@ -2,28 +2,30 @@
  * V2 Voice Notes API Service
  *
  * Premium feature for recording voice reflections after check-ins.
- * - Upload voice notes to R2 storage via media.py
- * - Transcription via Whisper API
- * - Attached to check-ins
+ * - Upload goes straight to R2 storage with a presigned URL from media.py
+ * - Transcription (Whisper) and sentiment run in a background task
+ * - Attached to check-ins; the check-in's voice_note_status goes
+ *   processing -> ready/failed, delivered through the check_ins realtime change
  *
- * Upload uses raw fetch (like media.ts): no Content-Type header so React Native
- * sets multipart/form-data with boundary. BaseApiService.request with
- * Content-Type: multipart/form-data causes 400.
+ * The PUT uses FileSystem.uploadAsync (binary body streamed from the file,
+ * like media.ts reads files) with exactly the headers the API signed.
  */
 
+import * as FileSystem from "expo-file-system/legacy";
 import { BaseApiService, ApiResponse } from "./base";
-import { TokenManager } from "./base";
 import { ROUTES } from "@/lib/routes";
 
-export interface VoiceNoteUploadResponse {
+interface VoiceNoteUploadUrlResponse {
+  upload_id: string;
   url: string;
-  filename: string;
-  file_size: number;
-  content_type: string;
-  duration?: number;
-  created_at: string;
-  transcript?: string;
-  checkin_id?: string;
+  method: string;
+  headers: Record<string, string>;
+  expires_in: number;
+}
+
+export interface VoiceNoteUploadResponse {
+  checkin_id: string;
+  voice_note_status: "processing" | "ready" | "failed";
 }
 
 export interface VoiceNoteDeleteResponse {
@@ -33,8 +35,9 @@ export interface VoiceNoteDeleteResponse {
 class VoiceNotesService extends BaseApiService {
   /**
    * Upload a voice note for a check-in.
-   * Uses fetch + FormData (same pattern as media.ts). Do not set Content-Type;
-   * React Native sets multipart/form-data with boundary.
+   * 1. Ask the API for a presigned URL (checks premium, limits, size)
+   * 2. PUT the file to R2
+   * 3. Tell the API the upload is done; it processes the file in the background
    *
    * @param checkinId - The check-in ID to attach the voice note to
    * @param audioUri - Local file URI of the recorded audio
@@ -45,42 +48,39 @@ class VoiceNotesService extends BaseApiService {
     audioUri: string,
     duration: number
   ): Promise<ApiResponse<VoiceNoteUploadResponse>> {
-    const formData = new FormData();
-    const filename = audioUri.split("/").pop() || "voice_note.m4a";
-    const match = /\.(\w+)$/.exec(filename);
-    const type = match ? `audio/${match[1]}` : "audio/m4a";
+    const fileInfo = await FileSystem.getInfoAsync(audioUri);
+    if (!fileInfo.exists) {
+      throw new Error("File does not exist");
+    }
 
-    formData.append("file", {
-      uri: audioUri,
-      name: filename,
-      type
-    } as any);
-    formData.append("checkin_id", checkinId);
-    formData.append("duration", duration.toString());
+    const filename = audioUri.split("/").pop() || "voice_note.m4a";
 
-    const token = await TokenManager.getAccessToken();
-    if (!token) {
-      throw new Error("Not authenticated");
+    const uploadUrl = await this.post<VoiceNoteUploadUrlResponse>(
+      ROUTES.VOICE_NOTES.UPLOAD_URL,
+      {
+        checkin_id: checkinId,
+        filename,
+        size_bytes: fileInfo.size,
+        duration
+      }
+    );
+    const target = uploadUrl.data;
+    if (!target) {
+      throw new Error("Voice note upload failed");
     }
 
-    const url = `${this.baseURL}${ROUTES.VOICE_NOTES.UPLOAD}?media_type=voice_note`;
-
-    const res = await fetch(url, {
-      method: "POST",
-      headers: {
-        Authorization: `Bearer ${token}`
-        // Don't set Content-Type - React Native sets it with boundary for FormData
-      },
-      body: formData
+    const put = await FileSystem.uploadAsync(target.url, audioUri, {
+      httpMethod: "PUT",
+      headers: target.headers,
+      uploadType: FileSystem.FileSystemUploadType.BINARY_CONTENT
     });
-
-    if (!res.ok) {
-      const err = await res.json().catch(() => ({ detail: res.statusText }));
-      throw new Error(err.detail ?? "Voice note upload failed");
+    if (put.status < 200 || put.status >= 300) {
+      throw new Error(`Voice note upload failed (${put.status})`);
     }
 
-    const data = (await res.json()) as VoiceNoteUploadResponse;
-    return { data, status: res.status };
+    return this.post<VoiceNoteUploadResponse>(ROUTES.VOICE_NOTES.COMPLETE, {
+      upload_id: target.upload_id
+    });
   }
 
   /**
@@ -83,6 +83,7 @@ const REALTIME_TABLES = [
   "social_nudges",
   // AI
   "ai_coach_conversations",
+  "ai_coach_messages",
   "weekly_recaps",
   "pattern_insights",
   // Achievements
@@ -429,6 +430,11 @@ class RealtimeService {
           { event: "*", schema: "public", table: "ai_coach_conversations" },
           (payload) => this.handleChange("ai_coach_conversations", payload)
         )
+        .on(
+          "postgres_changes",
+          { event: "*", schema: "public", table: "ai_coach_messages" },
+          (payload) => this.handleChange("ai_coach_messages", payload)
+        )
         .on(
           "postgres_changes",
           { event: "*", schema: "public", table: "weekly_recaps" },
@@ -539,6 +545,9 @@ class RealtimeService {
       case "ai_coach_conversations":
         this.handleAICoachConversationsChange(payload);
         break;
+      case "ai_coach_messages":
+        this.handleAICoachMessagesChange(payload);
+        break;
       case "weekly_recaps":
         this.handleWeeklyRecapsChange(payload);
         break;
@@ -1963,108 +1972,8 @@ class RealtimeService {
     await this.queryClient.cancelQueries({ queryKey: aiCoachQueryKeys.all });
 
     if (payload.eventType === "UPDATE") {
-      // Check if messages were removed (deletion detection)
-      let messagesWereRemoved = false;
-      try {
-        const oldMessages = oldRecord?.messages;
-        const newMessages = newRecord?.messages;
-
-        if (oldMessages && newMessages) {
-          const parsedOld = typeof oldMessages === "string" ? JSON.parse(oldMessages) : oldMessages;
-          const parsedNew = typeof newMessages === "string" ? JSON.parse(newMessages) : newMessages;
-
-          if (Array.isArray(parsedOld) && Array.isArray(parsedNew)) {
-            // If new array is shorter, messages were removed
-            messagesWereRemoved = parsedNew.length < parsedOld.length;
-            if (messagesWereRemoved) {
-              console.log(`[Realtime] 🗑️ AI Coach message(s) removed from conversation`, {
-                oldCount: parsedOld.length,
-                newCount: parsedNew.length
-              });
-            }
-          }
-        }
-      } catch (e) {
-        console.warn("[Realtime] Failed to compare old/new messages:", e);
-      }
-
-      // If messages were removed, force UI to reload this conversation (works for general + goal-specific)
-      if (messagesWereRemoved) {
-        scheduleInvalidate(aiCoachQueryKeys.conversations());
-        scheduleInvalidate(aiCoachQueryKeys.conversation(conversationId));
-        scheduleRefetch(aiCoachQueryKeys.conversation(conversationId), "active");
-        scheduleRefetch(aiCoachQueryKeys.conversations(), "active");
-        // UI displays from local state; tell the hook to reload this conversation
-        useAICoachStore.getState().setConversationMessagesInvalidatedId(conversationId);
-        return;
-      }
-
-      // Check if there's a new assistant message
-      const messages = newRecord?.messages;
-
-      if (messages) {
-        try {
-          const parsedMessages = typeof messages === "string" ? JSON.parse(messages) : messages;
-
-          if (Array.isArray(parsedMessages) && parsedMessages.length > 0) {
-            const lastMessage = parsedMessages[parsedMessages.length - 1];
-            const lastMessageAt = lastMessage?.created_at;
-            const currentConversationId = useAICoachStore.getState().currentConversationId;
-
-            // Streaming partial update: status "generating" with content
-            // Skip if we already processed "completed" for this message (out-of-order delivery)
-            if (
-              lastMessage?.role === "assistant" &&
-              lastMessage?.status === "generating" &&
-              currentConversationId === conversationId &&
-              !(lastMessageAt && lastMessageAt === this.lastProcessedAIMessageAt)
-            ) {
-              useAICoachStore.getState().setPendingAIResponse({
-                conversationId,
-                content: lastMessage.content || "",
-                messageIndex: parsedMessages.length - 1,
-                status: "generating",
-                isPartial: true
-              });
-              scheduleInvalidate(aiCoachQueryKeys.conversations());
-              if (currentConversationId === conversationId) {
-                scheduleInvalidate(aiCoachQueryKeys.conversation(conversationId));
-              }
-              return;
-            }
-
-            // Final completed message: use dedupe to avoid double-clearing
-            if (
-              lastMessage?.role === "assistant" &&
-              lastMessage?.status === "completed" &&
-              lastMessageAt &&
-              lastMessageAt !== this.lastProcessedAIMessageAt
-            ) {
-              this.lastProcessedAIMessageAt = lastMessageAt;
-
-              console.log(`[Realtime] 🤖 New AI response detected`);
-
-              if (currentConversationId === conversationId) {
-                useAICoachStore.getState().setPendingAIResponse({
-                  conversationId,
-                  content: lastMessage.content || "",
-                  messageIndex: parsedMessages.length - 1,
-                  status: "completed"
-                });
-              }
-
-              scheduleInvalidate(aiCoachQueryKeys.conversations());
-              if (currentConversationId === conversationId) {
-                scheduleInvalidate(aiCoachQueryKeys.conversation(conversationId));
-              }
-              return;
-            }
-          }
-        } catch (e) {
-          console.warn("[Realtime] Failed to parse AI Coach messages:", e);
-        }
-      }
-
+      // Title / message_count / last_message_at changed. Message content and
+      // status arrive as ai_coach_messages changes.
       scheduleInvalidate(aiCoachQueryKeys.conversations());
     } else if (payload.eventType === "INSERT") {
       scheduleInvalidate(aiCoachQueryKeys.conversations());
@@ -2089,6 +1998,71 @@ class RealtimeService {
     }
   }
 
+  // ========================================
+  // AI COACH MESSAGES
+  // ========================================
+
+  private async handleAICoachMessagesChange(payload: RealtimePostgresChangesPayload<any>) {
+    if (!this.queryClient) return;
+    // Messages are removed only with their conversation (handled above)
+    if (payload.eventType === "DELETE") return;
+
+    const message = payload.new as any;
+    const conversationId = message?.conversation_id;
+    if (!conversationId) return;
+
+    if (message.role !== "assistant") {
+      scheduleInvalidate(aiCoachQueryKeys.conversations());
+      return;
+    }
+
+    const messageAt = message.created_at;
+    // seq is 1-based; messageIndex is the position in the conversation
+    const messageIndex = (message.seq ?? 1) - 1;
+    const currentConversationId = useAICoachStore.getState().currentConversationId;
+
+    // Streaming partial update: status "generating" with content
+    // Skip if we already processed "completed" for this message (out-of-order delivery)
+    if (
+      message.status === "generating" &&
+      currentConversationId === conversationId &&
+      !(messageAt && messageAt === this.lastProcessedAIMessageAt)
+    ) {
+      useAICoachStore.getState().setPendingAIResponse({
+        conversationId,
+        content: message.content || "",
+        messageIndex,
+        status: "generating",
+        isPartial: true
+      });
+      scheduleInvalidate(aiCoachQueryKeys.conversations());
+      scheduleInvalidate(aiCoachQueryKeys.conversation(conversationId));
+      return;
+    }
+
+    // Final completed message: use dedupe to avoid double-clearing
+    if (message.status === "completed" && messageAt && messageAt !== this.lastProcessedAIMessageAt) {
+      this.lastProcessedAIMessageAt = messageAt;
+
+      console.log(`[Realtime] 🤖 New AI response detected`);
+
+      if (currentConversationId === conversationId) {
+        useAICoachStore.getState().setPendingAIResponse({
+          conversationId,
+          content: message.content || "",
+          messageIndex,
+          status: "completed"
+        });
+        scheduleInvalidate(aiCoachQueryKeys.conversation(conversationId));
+      }
+
+      scheduleInvalidate(aiCoachQueryKeys.conversations());
+      return;
+    }
+
+    scheduleInvalidate(aiCoachQueryKeys.conversations());
+  }
+
   // ========================================
   // WEEKLY RECAPS
   // ========================================